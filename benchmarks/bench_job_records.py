@@ -0,0 +1,73 @@
+"""
+Benchmark per-job memory and GET /jobs latency.
+
+Jobs are admitted without being dispatched (job type limit of 0), then the
+memory held per job is measured with tracemalloc and full pages of
+``GET /jobs`` are timed through the ASGI app. Requires httpx for
+FastAPI's TestClient.
+
+Usage:
+    python benchmarks/bench_job_records.py [--jobs 100000] [--limit 1000]
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+
+from mcp_core.agents.base_agent import AgentRegistry
+from mcp_core.api.server import app
+from mcp_core.jobs.job_schema import JobType
+from mcp_core.jobs.scheduler import JobScheduler
+from mcp_core.mcp_server import MCPServer
+import mcp_core.mcp_server as mcp_server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--jobs", type=int, default=100000)
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    AgentRegistry.register_external_service(JobType.GENERIC, "http://localhost:9")
+    server = MCPServer(scheduler=JobScheduler(max_pending=args.jobs, default_type_limit=0))
+    mcp_server._server_instance = server
+
+    batch = [
+        {"type": JobType.GENERIC.value, "payload": {"n": n}, "metadata": {"tenant": "bench"}}
+        for n in range(args.jobs)
+    ]
+
+    # Measure what the server retains per job, excluding the submissions themselves
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    asyncio.run(server.submit_jobs(batch))
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del batch
+
+    with TestClient(app) as client:
+        client.get("/jobs/", params={"limit": args.limit})
+        start = time.perf_counter()
+        for _ in range(args.repeats):
+            response = client.get("/jobs/", params={"limit": args.limit})
+            assert response.status_code == 200
+        page_ms = (time.perf_counter() - start) / args.repeats * 1000
+
+    print(f"jobs in memory:          {len(server.jobs)}")
+    print(f"memory per job (bytes):  {(after - before) / args.jobs:.0f}")
+    print(f"GET /jobs?limit={args.limit} (ms): {page_ms:.2f}")
+
+
+if __name__ == "__main__":
+    main()
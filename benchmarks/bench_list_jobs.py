@@ -0,0 +1,66 @@
+"""
+Benchmark list_jobs latency and status transition cost as the number of jobs in memory grows.
+
+Jobs are admitted without being dispatched (job type limit of 0) and a
+fraction is moved to RUNNING, timing each status transition, then the
+newest running jobs and the newest jobs overall are listed repeatedly.
+
+Usage:
+    python benchmarks/bench_list_jobs.py [--sizes 10000 100000 500000] [--limit 50]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_core.agents.base_agent import AgentRegistry
+from mcp_core.jobs.job_schema import JobStatus, JobType
+from mcp_core.jobs.scheduler import JobScheduler
+from mcp_core.mcp_server import MCPServer
+
+
+async def measure(size: int, limit: int, repeats: int) -> dict:
+    """Build a server holding ``size`` jobs and time list_jobs calls."""
+    server = MCPServer(scheduler=JobScheduler(max_pending=size, default_type_limit=0))
+
+    batch = [{"type": JobType.GENERIC.value, "payload": {"n": n}} for n in range(size)]
+    await server.submit_jobs(batch)
+
+    # Mark every tenth job as running, timing the status index updates
+    to_run = list(server.jobs.values())[::10]
+    start = time.perf_counter()
+    for job in to_run:
+        server._transition(job, JobStatus.RUNNING)
+    timings = {"transition": (time.perf_counter() - start) / len(to_run) * 1e6}
+
+    for label, status_filter in (("running", JobStatus.RUNNING), ("all", None)):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            await server.list_jobs(status_filter=status_filter, limit=limit)
+        timings[label] = (time.perf_counter() - start) / repeats * 1000
+
+    await server.shutdown()
+    return timings
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 500000])
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    AgentRegistry.register_external_service(JobType.GENERIC, "http://localhost:9")
+
+    print(f"{'jobs':>10}  {'transition (us)':>16}  {'newest running (ms)':>20}  {'newest all (ms)':>16}")
+    for size in args.sizes:
+        timings = await measure(size, args.limit, args.repeats)
+        print(f"{size:>10}  {timings['transition']:>16.2f}  {timings['running']:>20.3f}  {timings['all']:>16.3f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -3,12 +3,25 @@ Abstract base agent class and registry system for MCP Core.
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, Type
+from enum import Enum
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, Any, List, Optional, Tuple, Type
 import asyncio
 import logging
+import time
+import weakref
 from datetime import datetime
 
 from ..jobs.job_schema import Job, JobStatus, JobType
+from ..utils.wire import BodyFormat, ContentEncoding, check_available
+from .load_balancer import (
+    LeastOutstandingBalancer, LoadBalancer, LoadBalancingStrategy, PowerOfTwoBalancer, RoundRobinBalancer,
+    ServiceReplica, create_balancer
+)
+
+if TYPE_CHECKING:
+    from ..jobs.scheduler import JobScheduler
+    from ..state.backend import StateBackend
 
 
 class BaseAgent(ABC):
@@ -54,22 +67,260 @@ class BaseAgent(ABC):
         return job.type in self.get_supported_job_types()
 
 
+class DispatchMode(str, Enum):
+    """How the orchestrator learns the outcome of a job sent to a service."""
+    SYNC = "sync"  # /execute responds with the result
+    CALLBACK = "callback"  # /execute responds 202; the service posts to /jobs/{id}/complete
+    POLL = "poll"  # /execute responds 202; the orchestrator polls the job's status URL
+
+
 class AgentRegistry:
     """Registry for managing external microservices and routing jobs."""
     
-    _external_services: Dict[JobType, str] = {}  # job_type -> service_url
+    _external_services: Dict[JobType, List[ServiceReplica]] = {}  # job_type -> replicas
+    _balancers: Dict[JobType, LoadBalancer] = {}  # job_type -> replica selection, round-robin if absent
+    _dispatch_modes: Dict[str, DispatchMode] = {}  # service_url -> dispatch mode, sync if absent
+    _wire_formats: Dict[str, Tuple[BodyFormat, ContentEncoding]] = {}  # service_url -> request encoding, JSON if absent
+    _leases: Dict[str, float] = {}  # service_url -> lease expiry (epoch seconds), absent for static services
+    _state_backend: Optional["StateBackend"] = None  # shared with other worker processes
+    _backend_writer: Optional[ThreadPoolExecutor] = None  # applies backend writes in order, off the event loop
+    _last_backend_write: Optional[Future] = None
+    _changes = 0  # local registration changes, so a reload never undoes one made while it ran
+    _schedulers: "weakref.WeakSet[JobScheduler]" = weakref.WeakSet()  # service limits follow replica capacities
     
     @classmethod
-    def register_external_service(cls, job_type: JobType, service_url: str):
+    def register_external_service(
+        cls,
+        job_type: JobType,
+        service_url: str,
+        dispatch_mode: DispatchMode = DispatchMode.SYNC,
+        weight: float = 1.0,
+        capacity: Optional[int] = None,
+        lease_seconds: Optional[float] = None,
+        body_format: BodyFormat = BodyFormat.JSON,
+        content_encoding: ContentEncoding = ContentEncoding.IDENTITY
+    ):
         """
-        Register an external microservice for a specific job type.
+        Register an external microservice replica for a specific job type.
+        
+        Registering another URL for the same job type adds a replica;
+        registering a known URL again updates it.
         
         Args:
             job_type: The job type this service handles
             service_url: The base URL of the external service
+            dispatch_mode: How the service reports job outcomes
+            weight: Relative share of the job type's jobs sent to this replica
+            capacity: Concurrent requests the replica accepts (scheduler default if None)
+            lease_seconds: Registration lifetime unless renewed with ``renew_lease`` (no expiry if None)
+            body_format: Serialization of the job requests sent to the service
+            content_encoding: Compression of the job requests sent to the service
+            
+        Raises:
+            ValueError: If the body format or encoding needs a package that is not installed
+        """
+        job_type = JobType(job_type)
+        dispatch_mode = DispatchMode(dispatch_mode)
+        body_format, content_encoding = BodyFormat(body_format), ContentEncoding(content_encoding)
+        check_available(body_format, content_encoding)
+        replica = ServiceReplica(url=service_url, weight=weight, capacity=capacity)
+        cls._put_replica(job_type, replica)
+        cls._dispatch_modes[service_url] = dispatch_mode
+        cls._wire_formats[service_url] = (body_format, content_encoding)
+        if lease_seconds is None:
+            cls._leases.pop(service_url, None)
+        else:
+            cls._leases[service_url] = time.time() + lease_seconds
+        if cls._state_backend is not None:
+            cls._write_backend(
+                cls._state_backend.put_service, job_type.value, service_url, dispatch_mode.value, weight, capacity,
+                cls._leases.get(service_url), body_format.value, content_encoding.value
+            )
+        logging.getLogger("agent_registry").info(
+            f"Registered external service {service_url} ({dispatch_mode.value}) for job type {job_type.value}"
+        )
+    
+    @classmethod
+    def deregister_external_service(cls, job_type: JobType, service_url: str) -> bool:
+        """
+        Remove a replica of a job type's service.
+        
+        Args:
+            job_type: The job type
+            service_url: Base URL of the replica
+            
+        Returns:
+            True if the replica was registered
+        """
+        job_type = JobType(job_type)
+        replicas = cls._external_services.get(job_type, [])
+        remaining = [replica for replica in replicas if replica.url != service_url]
+        if len(remaining) == len(replicas):
+            return False
+        
+        if remaining:
+            cls._external_services[job_type] = remaining
+        else:
+            del cls._external_services[job_type]
+        if not cls.is_registered(service_url):
+            cls._leases.pop(service_url, None)
+            cls._dispatch_modes.pop(service_url, None)
+            cls._wire_formats.pop(service_url, None)
+        if cls._state_backend is not None:
+            cls._write_backend(cls._state_backend.remove_service, job_type.value, service_url)
+        logging.getLogger("agent_registry").info(
+            f"Deregistered external service {service_url} for job type {job_type.value}"
+        )
+        return True
+    
+    @classmethod
+    def renew_lease(cls, service_url: str, lease_seconds: float) -> bool:
+        """
+        Extend the lease of a service, covering all job types it is registered for.
+        
+        Services registered without a lease keep none.
+        
+        Args:
+            service_url: Base URL of the service
+            lease_seconds: Seconds from now until the lease expires
+            
+        Returns:
+            False if the service is not registered, e.g. because its lease already expired
         """
-        cls._external_services[job_type] = service_url
-        logging.getLogger("agent_registry").info(f"Registered external service {service_url} for job type {job_type}")
+        if not cls.is_registered(service_url):
+            return False
+        if service_url not in cls._leases:
+            return True
+        
+        cls._leases[service_url] = lease_expires = time.time() + lease_seconds
+        if cls._state_backend is not None:
+            cls._write_backend(cls._state_backend.renew_service_lease, service_url, lease_expires)
+        return True
+    
+    @classmethod
+    def get_lease_expiry(cls, service_url: str) -> Optional[float]:
+        """Get when a service's lease expires (epoch seconds), or None if it has no lease."""
+        return cls._leases.get(service_url)
+    
+    @classmethod
+    def lease_alive(cls, service_url: str) -> bool:
+        """Check that a service has no lease or an unexpired one."""
+        lease_expires = cls._leases.get(service_url)
+        return lease_expires is None or lease_expires > time.time()
+    
+    @classmethod
+    async def expire_leases(cls) -> List[str]:
+        """
+        Deregister every service whose lease expired.
+        
+        With a state backend, leases are reloaded first so a renewal received
+        by another worker is not mistaken for an expiry.
+        
+        Returns:
+            URLs of the removed services
+        """
+        now = time.time()
+        expired = [service_url for service_url, lease_expires in cls._leases.items() if lease_expires <= now]
+        if expired and cls._state_backend is not None:
+            await cls.refresh_from_backend()
+            expired = [service_url for service_url, lease_expires in cls._leases.items() if lease_expires <= now]
+        for service_url in expired:
+            for job_type in list(cls._external_services):
+                cls.deregister_external_service(job_type, service_url)
+            logging.getLogger("agent_registry").warning(f"Lease of service {service_url} expired")
+        return expired
+    
+    @classmethod
+    def is_registered(cls, service_url: str) -> bool:
+        """Check whether a URL is a replica of any job type."""
+        return any(
+            replica.url == service_url for replicas in cls._external_services.values() for replica in replicas
+        )
+    
+    @classmethod
+    def set_load_balancer(cls, job_type: JobType, strategy: LoadBalancingStrategy) -> None:
+        """
+        Choose how a job type's jobs are spread over its replicas.
+        
+        Args:
+            job_type: The job type
+            strategy: Load balancing strategy
+        """
+        cls._balancers[JobType(job_type)] = create_balancer(strategy)
+    
+    @classmethod
+    def add_scheduler(cls, scheduler: "JobScheduler") -> None:
+        """
+        Keep a scheduler's service limits in step with replica capacities.
+        
+        Capacities of replicas already registered are applied at once, and
+        later registrations, local or reloaded from the state backend, as
+        they happen. Replicas without a capacity keep the scheduler's limit.
+        
+        Args:
+            scheduler: Scheduler dispatching jobs to the registered services
+        """
+        cls._schedulers.add(scheduler)
+        for replicas in cls._external_services.values():
+            cls._apply_capacities(replicas)
+    
+    @classmethod
+    def set_state_backend(cls, state_backend: Optional["StateBackend"]) -> None:
+        """
+        Share service registrations with other workers through a state backend.
+        
+        Services already registered in this process are published to the
+        backend, then the registry is refreshed from it.
+        
+        Args:
+            state_backend: Shared state backend, or None to stay process-local
+        """
+        cls._state_backend = state_backend
+        if state_backend is None:
+            return
+        
+        for job_type, replicas in cls._external_services.items():
+            for replica in replicas:
+                body_format, content_encoding = cls.get_wire_format(replica.url)
+                state_backend.put_service(
+                    JobType(job_type).value, replica.url, cls.get_dispatch_mode(replica.url).value,
+                    replica.weight, replica.capacity, cls._leases.get(replica.url),
+                    body_format.value, content_encoding.value
+                )
+        cls.sync_from_backend()
+    
+    @classmethod
+    def sync_from_backend(cls) -> None:
+        """Reload service registrations made or removed by other workers."""
+        if cls._state_backend is None:
+            return
+        
+        cls._apply_services(cls._state_backend.get_services())
+    
+    @classmethod
+    async def refresh_from_backend(cls) -> None:
+        """
+        Reload service registrations like ``sync_from_backend``, reading the backend in a worker thread.
+        
+        This worker's own pending writes are applied first. If a service is
+        registered, renewed or removed locally while the backend is read,
+        the stale snapshot is dropped and the next refresh picks the change up.
+        """
+        if cls._state_backend is None:
+            return
+        
+        await cls.flush_backend()
+        changes = cls._changes
+        services = await asyncio.to_thread(cls._state_backend.get_services)
+        if changes == cls._changes and cls._state_backend is not None:
+            cls._apply_services(services)
+    
+    @classmethod
+    async def flush_backend(cls) -> None:
+        """Wait until every registration change made so far is written to the state backend; failures are only logged."""
+        last_write = cls._last_backend_write
+        if last_write is not None and not last_write.done():
+            await asyncio.wait([asyncio.wrap_future(last_write)])
     
     @classmethod
     def get_service_url(cls, job_type: JobType) -> Optional[str]:
@@ -80,9 +331,88 @@ class AgentRegistry:
             job_type: The job type to get service URL for
             
         Returns:
-            Service URL or None if not found
+            URL of the first registered replica, or None if not found
+        """
+        replicas = cls._external_services.get(job_type)
+        return replicas[0].url if replicas else None
+    
+    @classmethod
+    def get_replicas(cls, job_type: JobType) -> List[ServiceReplica]:
+        """
+        Get the replicas registered for a job type.
+        
+        Args:
+            job_type: The job type
+            
+        Returns:
+            Registered replicas (do not modify the list)
+        """
+        return cls._external_services.get(job_type, [])
+    
+    @classmethod
+    def choose_replica(
+        cls,
+        job_type: JobType,
+        in_flight: Callable[[str], int],
+        eligible: Optional[Callable[[ServiceReplica], bool]] = None
+    ) -> Optional[ServiceReplica]:
+        """
+        Pick the replica for a job through the job type's load balancer.
+        
+        Args:
+            job_type: The job type
+            in_flight: Requests currently outstanding at a replica URL
+            eligible: Returns False for replicas that cannot take a job now
+            
+        Returns:
+            The chosen replica, or None if no replica is eligible
+        """
+        replicas = cls._external_services.get(job_type, [])
+        if eligible is not None:
+            replicas = [replica for replica in replicas if eligible(replica)]
+        if len(replicas) <= 1:
+            return replicas[0] if replicas else None
+        
+        balancer = cls._balancers.get(job_type)
+        if balancer is None:
+            balancer = cls._balancers[JobType(job_type)] = RoundRobinBalancer()
+        return balancer.choose(replicas, in_flight)
+    
+    @classmethod
+    def get_load_balancing_strategy(cls, job_type: JobType) -> LoadBalancingStrategy:
+        """Get the load balancing strategy of a job type."""
+        balancer = cls._balancers.get(job_type)
+        if isinstance(balancer, LeastOutstandingBalancer):
+            return LoadBalancingStrategy.LEAST_OUTSTANDING
+        if isinstance(balancer, PowerOfTwoBalancer):
+            return LoadBalancingStrategy.POWER_OF_TWO
+        return LoadBalancingStrategy.ROUND_ROBIN
+    
+    @classmethod
+    def get_dispatch_mode(cls, service_url: str) -> DispatchMode:
+        """
+        Get the dispatch mode of a service.
+        
+        Args:
+            service_url: Base URL of the service
+            
+        Returns:
+            The registered dispatch mode (sync for unknown services)
         """
-        return cls._external_services.get(job_type)
+        return cls._dispatch_modes.get(service_url, DispatchMode.SYNC)
+    
+    @classmethod
+    def get_wire_format(cls, service_url: str) -> Tuple[BodyFormat, ContentEncoding]:
+        """
+        Get how job requests to a service are encoded.
+        
+        Args:
+            service_url: Base URL of the service
+            
+        Returns:
+            Tuple of (body format, content encoding); uncompressed JSON for unknown services
+        """
+        return cls._wire_formats.get(service_url, (BodyFormat.JSON, ContentEncoding.IDENTITY))
     
     @classmethod
     def get_supported_job_types(cls) -> list[JobType]:
@@ -111,3 +441,80 @@ class AgentRegistry:
     def clear(cls):
         """Clear all registered services (useful for testing)."""
         cls._external_services.clear()
+        cls._balancers.clear()
+        cls._dispatch_modes.clear()
+        cls._wire_formats.clear()
+        cls._leases.clear()
+    
+    @classmethod
+    def _apply_services(cls, services: List[Dict[str, Any]]) -> None:
+        """Replace the registry with service rows read from the state backend."""
+        replicas: Dict[JobType, List[ServiceReplica]] = {}
+        dispatch_modes: Dict[str, DispatchMode] = {}
+        wire_formats: Dict[str, Tuple[BodyFormat, ContentEncoding]] = {}
+        leases: Dict[str, float] = {}
+        for service in services:
+            replicas.setdefault(JobType(service["job_type"]), []).append(ServiceReplica(
+                url=service["service_url"], weight=service["weight"], capacity=service["capacity"]
+            ))
+            dispatch_modes[service["service_url"]] = DispatchMode(service["dispatch_mode"])
+            wire_formats[service["service_url"]] = (
+                BodyFormat(service["body_format"]), ContentEncoding(service["content_encoding"])
+            )
+            if service["lease_expires"] is not None:
+                leases[service["service_url"]] = max(
+                    leases.get(service["service_url"], 0.0), service["lease_expires"]
+                )
+        # Rebuilt rather than updated, so services removed by other workers drop out
+        cls._external_services = replicas
+        cls._dispatch_modes = dispatch_modes
+        cls._wire_formats = wire_formats
+        cls._leases = leases
+        for job_replicas in replicas.values():
+            cls._apply_capacities(job_replicas)
+    
+    @classmethod
+    def _write_backend(cls, write: Callable[..., Any], *args: Any) -> None:
+        """
+        Apply a registration change to the state backend.
+        
+        Inside an event loop the write runs on a single background thread,
+        so writes never block the loop and reach the backend in the order
+        they were made; elsewhere it runs inline.
+        """
+        cls._changes += 1
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            write(*args)
+            return
+        
+        if cls._backend_writer is None:
+            cls._backend_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="agent_registry")
+        cls._last_backend_write = cls._backend_writer.submit(write, *args)
+        cls._last_backend_write.add_done_callback(cls._log_backend_write)
+    
+    @staticmethod
+    def _log_backend_write(future: Future) -> None:
+        """Log a failed background write to the state backend."""
+        if future.exception() is not None:
+            logging.getLogger("agent_registry").error(
+                f"Failed to write a service registration to the state backend: {future.exception()}"
+            )
+    
+    @classmethod
+    def _put_replica(cls, job_type: JobType, replica: ServiceReplica) -> None:
+        """Add a replica, replacing one with the same URL."""
+        replicas = [existing for existing in cls._external_services.get(job_type, []) if existing.url != replica.url]
+        replicas.append(replica)
+        cls._external_services[job_type] = replicas
+        cls._apply_capacities([replica])
+    
+    @classmethod
+    def _apply_capacities(cls, replicas: List[ServiceReplica]) -> None:
+        """Set each replica's capacity as its service limit in every added scheduler."""
+        for replica in replicas:
+            if replica.capacity is None:
+                continue
+            for scheduler in cls._schedulers:
+                scheduler.set_service_limit(replica.url, replica.capacity)
@@ -0,0 +1,229 @@
+"""
+Per-service HTTP connection pools.
+"""
+
+from collections import deque
+from types import SimpleNamespace
+from typing import Any, Deque, Dict, Iterable, List, Optional
+import asyncio
+import logging
+import time
+
+import aiohttp
+from pydantic import BaseModel, Field
+
+
+class ConnectionPoolPolicy(BaseModel):
+    """Connector settings applied to every service pool."""
+
+    max_connections: int = Field(default=100, ge=1)  # per service, whatever the caller asks for
+    keepalive_timeout: float = Field(default=30.0, gt=0)  # seconds an idle connection stays open
+    dns_cache_ttl: int = Field(default=300, ge=0)  # seconds resolved addresses are cached
+    connect_timeout: float = Field(default=5.0, gt=0)  # seconds to open a connection
+    warm_connections: int = Field(default=2, ge=0)  # connections opened when a service registers
+    warm_path: str = "/health"  # requested to open the warm connections
+
+
+class _ServicePool:
+    """Session, connector and counters of one service."""
+
+    __slots__ = ("session", "limit", "active", "requests", "created", "reused", "queued", "waits")
+
+    def __init__(self, limit: int):
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.limit = limit
+        self.active = 0  # requests holding or waiting for a connection
+        self.requests = 0
+        self.created = 0  # connections opened
+        self.reused = 0  # requests served by a kept-alive connection
+        self.queued = 0  # requests that waited for a free connection
+        self.waits: Deque[float] = deque(maxlen=1024)  # recent seconds spent waiting for a connection
+
+
+class ServiceConnectionPools:
+    """
+    One aiohttp session per service, each with its own bounded connector.
+
+    A slow or saturated service can only exhaust its own connections, so
+    requests to other services never queue behind it. Connections are kept
+    alive between jobs, DNS lookups are cached, and the time requests spend
+    waiting for a free connection is recorded through aiohttp's tracing
+    hooks.
+    """
+
+    def __init__(self, policy: Optional[ConnectionPoolPolicy] = None, default_limit: int = 32):
+        """
+        Args:
+            policy: Connector settings
+            default_limit: Connections per service when the caller does not ask for a number
+        """
+        self.logger = logging.getLogger("connection_pools")
+        self.policy = policy or ConnectionPoolPolicy()
+        self.default_limit = default_limit
+        self._pools: Dict[str, _ServicePool] = {}
+        self._retired: List[_ServicePool] = []  # replaced pools, closed once their requests finish
+        self._closed = False
+
+    def session(self, service_url: str, limit: Optional[int] = None) -> aiohttp.ClientSession:
+        """
+        Get the session for a service, creating its pool on first use.
+
+        A pool is replaced by a larger one when a higher limit is requested,
+        e.g. after the service's capacity was raised.
+
+        Args:
+            service_url: Base URL of the service
+            limit: Connections the pool needs, capped at the policy's
+                ``max_connections`` (default limit if None)
+
+        Returns:
+            Client session bound to the service's connector
+
+        Raises:
+            RuntimeError: If the pools were closed
+        """
+        limit = min(limit or self.default_limit, self.policy.max_connections)
+        pool = self._pools.get(service_url)
+        if pool is None:
+            pool = self._create(service_url, limit)
+        elif limit > pool.limit:
+            self._retired.append(pool)
+            pool = self._create(service_url, limit)
+        return pool.session
+
+    async def warm(self, service_url: str, limit: Optional[int] = None) -> int:
+        """
+        Open the policy's number of connections to a service ahead of its first job.
+
+        Args:
+            service_url: Base URL of the service
+            limit: Connections the pool needs (see ``session``)
+
+        Returns:
+            Number of warm-up requests that got a response
+        """
+        count = self.policy.warm_connections
+        if not count:
+            return 0
+
+        session = self.session(service_url, limit)
+        timeout = aiohttp.ClientTimeout(total=self.policy.connect_timeout)
+
+        async def request() -> bool:
+            try:
+                async with session.get(f"{service_url}{self.policy.warm_path}", timeout=timeout) as response:
+                    await response.read()
+                return True
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                return False
+
+        # Concurrent requests each take their own connection, which is then kept alive
+        outcomes = await asyncio.gather(*(request() for _ in range(count)))
+        self.logger.debug(f"Warmed {sum(outcomes)} of {count} connection(s) to {service_url}")
+        return sum(outcomes)
+
+    async def retain(self, service_urls: Iterable[str]) -> None:
+        """
+        Close the pools of services that are no longer registered, and replaced pools.
+
+        Pools with requests in progress are kept until those finish.
+
+        Args:
+            service_urls: URLs still registered
+        """
+        keep = set(service_urls)
+        for service_url in [url for url, pool in self._pools.items() if url not in keep and not pool.active]:
+            await self._pools.pop(service_url).session.close()
+
+        idle = [pool for pool in self._retired if not pool.active]
+        self._retired = [pool for pool in self._retired if pool.active]
+        for pool in idle:
+            await pool.session.close()
+
+    async def close(self) -> None:
+        """Close every pool; sessions requested afterwards raise RuntimeError."""
+        self._closed = True
+        pools = list(self._pools.values()) + self._retired
+        self._pools.clear()
+        self._retired = []
+        for pool in pools:
+            await pool.session.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get connection use and wait times per service.
+
+        Returns:
+            Dict mapping service URL to pool statistics
+        """
+        stats = {}
+        for service_url, pool in self._pools.items():
+            waits = sorted(pool.waits)
+            connector = pool.session.connector
+            stats[service_url] = {
+                "limit": pool.limit,
+                "active": pool.active,
+                "idle": sum(len(conns) for conns in getattr(connector, "_conns", {}).values()),
+                "requests": pool.requests,
+                "connections_created": pool.created,
+                "connections_reused": pool.reused,
+                "queued": pool.queued,
+                "wait_avg": round(sum(waits) / len(waits), 6) if waits else None,
+                "wait_p99": round(waits[min(len(waits) - 1, int(len(waits) * 0.99))], 6) if waits else None,
+                "wait_max": round(waits[-1], 6) if waits else None
+            }
+        return stats
+
+    def _create(self, service_url: str, limit: int) -> _ServicePool:
+        """Create the session and connector of a service."""
+        if self._closed:
+            raise RuntimeError("Connection pools are closed")
+
+        connector = aiohttp.TCPConnector(
+            limit=limit,
+            limit_per_host=limit,
+            keepalive_timeout=self.policy.keepalive_timeout,
+            ttl_dns_cache=self.policy.dns_cache_ttl
+        )
+        pool = self._pools[service_url] = _ServicePool(limit)
+        pool.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(connect=self.policy.connect_timeout),
+            auto_decompress=False,  # responses are decoded off the event loop when large
+            trace_configs=[self._trace(pool)]
+        )
+        return pool
+
+    @staticmethod
+    def _trace(pool: _ServicePool) -> aiohttp.TraceConfig:
+        """Count requests and connection waits of a pool through aiohttp's tracing hooks."""
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, context: SimpleNamespace, params) -> None:
+            pool.active += 1
+            pool.requests += 1
+
+        async def on_request_done(session, context: SimpleNamespace, params) -> None:
+            pool.active -= 1
+
+        async def on_queued_start(session, context: SimpleNamespace, params) -> None:
+            context.queued_at = time.monotonic()
+            pool.queued += 1
+
+        async def on_queued_end(session, context: SimpleNamespace, params) -> None:
+            pool.waits.append(time.monotonic() - context.queued_at)
+
+        async def on_create_end(session, context: SimpleNamespace, params) -> None:
+            pool.created += 1
+
+        async def on_reuse(session, context: SimpleNamespace, params) -> None:
+            pool.reused += 1
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_done)
+        trace_config.on_request_exception.append(on_request_done)
+        trace_config.on_connection_queued_start.append(on_queued_start)
+        trace_config.on_connection_queued_end.append(on_queued_end)
+        trace_config.on_connection_create_end.append(on_create_end)
+        trace_config.on_connection_reuseconn.append(on_reuse)
+        return trace_config
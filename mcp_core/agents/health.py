@@ -0,0 +1,280 @@
+"""
+Liveness and load tracking for external services.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+import logging
+import time
+
+from pydantic import BaseModel, Field
+
+
+class HealthCheckPolicy(BaseModel):
+    """How external services are probed and how long their load reports are trusted."""
+
+    interval: float = Field(default=0.5, gt=0)  # seconds between probe rounds
+    max_interval: float = Field(default=30.0, gt=0)  # longest wait between probes of an unhealthy service
+    timeout: float = Field(default=0.5, gt=0)  # seconds a probe may take
+    path: str = "/health"  # probed with GET; 2xx is healthy, and so is 404/405 from services without the route
+    unhealthy_threshold: int = Field(default=1, ge=1)  # consecutive failed probes that take a service out
+    healthy_threshold: int = Field(default=1, ge=1)  # consecutive good probes that bring it back
+    load_report_ttl: float = Field(default=5.0, gt=0)  # seconds a heartbeat's load report stays valid
+
+
+class ServiceHealth:
+    """Probe results and the last load report of one service URL."""
+
+    __slots__ = (
+        "healthy", "consecutive_failures", "consecutive_successes", "last_error", "last_probe_ts",
+        "next_probe_ts", "in_flight", "free_slots", "reported_ts", "running_at_report"
+    )
+
+    def __init__(self):
+        self.healthy = True  # services are trusted until a probe fails
+        self.consecutive_failures = 0
+        self.consecutive_successes = 0
+        self.last_error: Optional[str] = None
+        self.last_probe_ts: Optional[float] = None
+        self.next_probe_ts = 0.0  # epoch seconds when the service is due for its next probe
+        self.in_flight: Optional[int] = None  # as reported by the service
+        self.free_slots: Optional[int] = None  # as reported by the service
+        self.reported_ts = 0.0
+        self.running_at_report = 0  # jobs this worker had dispatched to the service at report time
+
+
+class ServiceHealthMonitor:
+    """
+    Tracks which services can take jobs.
+
+    A service is out of dispatch while its probes fail or while its last
+    heartbeat reported no free slots. Load reports are corrected by the jobs
+    dispatched locally since the report, so a service announcing two free
+    slots stops receiving jobs after the second one, not at the next
+    heartbeat.
+
+    Healthy services are due for a probe every ``interval`` seconds. Once a
+    service is unhealthy the wait doubles with every further failed probe,
+    up to ``max_interval``, so replicas that are down for long are not
+    hammered by every worker.
+    """
+
+    def __init__(self, policy: Optional[HealthCheckPolicy] = None):
+        self.logger = logging.getLogger("service_health")
+        self.policy = policy or HealthCheckPolicy()
+        self._services: Dict[str, ServiceHealth] = {}
+        self.probes_total = 0
+        self.probe_failures_total = 0
+
+    def record_heartbeat(
+        self,
+        service_url: str,
+        running: int,
+        in_flight: Optional[int] = None,
+        free_slots: Optional[int] = None
+    ) -> None:
+        """
+        Record the load a service reported with its heartbeat.
+
+        Args:
+            service_url: Base URL of the service
+            running: Jobs this worker currently has dispatched to it
+            in_flight: Requests the service is working on
+            free_slots: Further requests the service can accept
+        """
+        health = self._get(service_url)
+        health.in_flight = in_flight
+        health.free_slots = free_slots
+        health.reported_ts = time.monotonic()
+        health.running_at_report = running
+
+    def record_probe(self, service_url: str, ok: bool, error: Optional[str] = None) -> bool:
+        """
+        Record the outcome of a health probe or failed connection.
+
+        Args:
+            service_url: Base URL of the service
+            ok: Whether the service answered the probe as healthy
+            error: What went wrong, if it did not
+
+        Returns:
+            True if the service became healthy or unhealthy
+        """
+        health = self._get(service_url)
+        health.last_probe_ts = time.time()
+        self.probes_total += 1
+        changed = False
+        if ok:
+            health.consecutive_failures = 0
+            health.consecutive_successes += 1
+            health.last_error = None
+            if not health.healthy and health.consecutive_successes >= self.policy.healthy_threshold:
+                health.healthy = True
+                self.logger.info(f"Service {service_url} is healthy again")
+                changed = True
+        else:
+            self.probe_failures_total += 1
+            health.consecutive_successes = 0
+            health.consecutive_failures += 1
+            health.last_error = error
+            if health.healthy and health.consecutive_failures >= self.policy.unhealthy_threshold:
+                health.healthy = False
+                self.logger.warning(f"Service {service_url} is unhealthy: {error}")
+                changed = True
+
+        health.next_probe_ts = health.last_probe_ts + self._probe_delay(health)
+        return changed
+
+    def due_for_probe(self, service_urls: Iterable[str]) -> List[str]:
+        """
+        Select the services whose next probe is due.
+
+        Args:
+            service_urls: URLs of the registered services
+
+        Returns:
+            URLs to probe now; services never probed are always due
+        """
+        now = time.time()
+        due = []
+        for service_url in service_urls:
+            health = self._services.get(service_url)
+            if health is None or health.next_probe_ts <= now:
+                due.append(service_url)
+        return due
+
+    def export(self, service_url: str) -> Optional[Dict[str, Any]]:
+        """
+        Serialize the probe state of a service for other workers.
+
+        Args:
+            service_url: Base URL of the service
+
+        Returns:
+            Dict with service_url, healthy, consecutive_failures, last_error,
+            probed_ts and next_probe_ts, or None if it was never probed
+        """
+        health = self._services.get(service_url)
+        if health is None or health.last_probe_ts is None:
+            return None
+        return {
+            "service_url": service_url,
+            "healthy": health.healthy,
+            "consecutive_failures": health.consecutive_failures,
+            "last_error": health.last_error,
+            "probed_ts": health.last_probe_ts,
+            "next_probe_ts": health.next_probe_ts
+        }
+
+    def apply(self, records: Iterable[Dict[str, Any]]) -> bool:
+        """
+        Adopt probe results shared by the worker that runs the probes.
+
+        A record older than what this worker observed itself, e.g. a
+        connection failure while dispatching, is skipped.
+
+        Args:
+            records: Dicts as returned by ``export``
+
+        Returns:
+            True if a service became healthy
+        """
+        recovered = False
+        for record in records:
+            health = self._get(record["service_url"])
+            if health.last_probe_ts is not None and health.last_probe_ts >= record["probed_ts"]:
+                continue
+
+            if record["healthy"] != health.healthy:
+                recovered = recovered or record["healthy"]
+                if record["healthy"]:
+                    self.logger.info(f"Service {record['service_url']} is healthy again")
+                else:
+                    self.logger.warning(f"Service {record['service_url']} is unhealthy: {record['last_error']}")
+            health.healthy = record["healthy"]
+            health.consecutive_failures = record["consecutive_failures"]
+            health.consecutive_successes = 0 if record["consecutive_failures"] else 1
+            health.last_error = record["last_error"]
+            health.last_probe_ts = record["probed_ts"]
+            health.next_probe_ts = record["next_probe_ts"]
+        return recovered
+
+    def is_available(self, service_url: str, running: int) -> bool:
+        """
+        Check whether a service can take another job.
+
+        Args:
+            service_url: Base URL of the service
+            running: Jobs this worker currently has dispatched to it
+
+        Returns:
+            False if the service is unhealthy or reported being saturated
+        """
+        health = self._services.get(service_url)
+        if health is None:
+            return True
+        if not health.healthy:
+            return False
+        if health.free_slots is None or not self._report_valid(health):
+            return True
+        return health.free_slots - max(0, running - health.running_at_report) > 0
+
+    def estimate_in_flight(self, service_url: str, running: int) -> int:
+        """
+        Estimate the requests a service is working on, across all orchestrator workers.
+
+        Args:
+            service_url: Base URL of the service
+            running: Jobs this worker currently has dispatched to it
+
+        Returns:
+            The reported count adjusted by local dispatches since, or ``running`` without a recent report
+        """
+        health = self._services.get(service_url)
+        if health is None or health.in_flight is None or not self._report_valid(health):
+            return running
+        return max(running, health.in_flight + running - health.running_at_report)
+
+    def retain(self, service_urls: Iterable[str]) -> None:
+        """
+        Forget services that are no longer registered.
+
+        Args:
+            service_urls: URLs still registered
+        """
+        keep = set(service_urls)
+        for service_url in [url for url in self._services if url not in keep]:
+            del self._services[service_url]
+
+    def get_health(self, service_url: str) -> Optional[ServiceHealth]:
+        """Get the tracked state of a service, if any."""
+        return self._services.get(service_url)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get monitor counters.
+
+        Returns:
+            Dict of monitor statistics
+        """
+        return {
+            "services": len(self._services),
+            "unhealthy": sum(1 for health in self._services.values() if not health.healthy),
+            "probes": self.probes_total,
+            "probe_failures": self.probe_failures_total
+        }
+
+    def _get(self, service_url: str) -> ServiceHealth:
+        health = self._services.get(service_url)
+        if health is None:
+            health = self._services[service_url] = ServiceHealth()
+        return health
+
+    def _probe_delay(self, health: ServiceHealth) -> float:
+        """Seconds until the next probe: ``interval``, doubled per failed probe while unhealthy."""
+        if health.healthy:
+            return self.policy.interval
+        doublings = min(health.consecutive_failures - self.policy.unhealthy_threshold, 32)
+        return min(self.policy.max_interval, self.policy.interval * 2 ** max(0, doublings))
+
+    def _report_valid(self, health: ServiceHealth) -> bool:
+        return time.monotonic() - health.reported_ts < self.policy.load_report_ttl
@@ -0,0 +1,129 @@
+"""
+Replica selection strategies for external services.
+"""
+
+from abc import ABC, abstractmethod
+from enum import Enum
+from typing import Callable, Dict, Optional, Sequence
+import random
+
+from pydantic import BaseModel, Field
+
+
+class LoadBalancingStrategy(str, Enum):
+    """How a job type's replicas share its jobs."""
+    ROUND_ROBIN = "round_robin"  # smooth weighted round-robin
+    LEAST_OUTSTANDING = "least_outstanding"  # fewest in-flight requests per unit of weight
+    POWER_OF_TWO = "power_of_two"  # less loaded of two replicas drawn by weight
+
+
+class ServiceReplica(BaseModel):
+    """One instance of an external service."""
+
+    url: str
+    weight: float = Field(default=1.0, gt=0)  # relative share of the job type's jobs
+    capacity: Optional[int] = Field(default=None, ge=1)  # concurrent requests; scheduler default if unset
+
+
+class LoadBalancer(ABC):
+    """Picks the replica that receives the next job."""
+
+    @abstractmethod
+    def choose(self, replicas: Sequence[ServiceReplica], in_flight: Callable[[str], int]) -> ServiceReplica:
+        """
+        Pick a replica.
+
+        Args:
+            replicas: Candidates, all with a free slot (never empty)
+            in_flight: Requests currently outstanding at a replica URL
+
+        Returns:
+            The chosen replica
+        """
+        pass
+
+
+class RoundRobinBalancer(LoadBalancer):
+    """
+    Smooth weighted round-robin.
+
+    Every pick adds each candidate's weight to its running score and takes
+    the highest, which then gives back the total weight, so a replica with
+    weight 3 is picked three times as often, interleaved with the others
+    rather than in bursts.
+    """
+
+    def __init__(self):
+        self._scores: Dict[str, float] = {}
+
+    def choose(self, replicas: Sequence[ServiceReplica], in_flight: Callable[[str], int]) -> ServiceReplica:
+        total = 0.0
+        best = None
+        best_score = 0.0
+        for replica in replicas:
+            score = self._scores.get(replica.url, 0.0) + replica.weight
+            self._scores[replica.url] = score
+            total += replica.weight
+            if best is None or score > best_score:
+                best, best_score = replica, score
+        self._scores[best.url] -= total
+        return best
+
+
+class LeastOutstandingBalancer(LoadBalancer):
+    """Picks the replica with the fewest in-flight requests per unit of weight, breaking ties at random."""
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self._rng = rng or random.Random()
+
+    def choose(self, replicas: Sequence[ServiceReplica], in_flight: Callable[[str], int]) -> ServiceReplica:
+        return min(
+            replicas,
+            key=lambda replica: ((in_flight(replica.url) + 1) / replica.weight, self._rng.random())
+        )
+
+
+class PowerOfTwoBalancer(LoadBalancer):
+    """
+    Power of two choices.
+
+    Draws two distinct replicas with probability proportional to weight and
+    keeps the less loaded one, which spreads load almost as evenly as
+    least-outstanding without every dispatcher converging on the same
+    replica when load reports lag.
+    """
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self._rng = rng or random.Random()
+
+    def choose(self, replicas: Sequence[ServiceReplica], in_flight: Callable[[str], int]) -> ServiceReplica:
+        if len(replicas) == 1:
+            return replicas[0]
+
+        first = self._draw(replicas)
+        second = self._draw([replica for replica in replicas if replica is not first])
+        load_first = (in_flight(first.url) + 1) / first.weight
+        load_second = (in_flight(second.url) + 1) / second.weight
+        return first if load_first <= load_second else second
+
+    def _draw(self, replicas: Sequence[ServiceReplica]) -> ServiceReplica:
+        """Draw one replica with probability proportional to its weight."""
+        return self._rng.choices(replicas, weights=[replica.weight for replica in replicas])[0]
+
+
+def create_balancer(strategy: LoadBalancingStrategy) -> LoadBalancer:
+    """
+    Create the balancer for a strategy.
+
+    Args:
+        strategy: Load balancing strategy
+
+    Returns:
+        A new balancer
+    """
+    strategy = LoadBalancingStrategy(strategy)
+    if strategy == LoadBalancingStrategy.LEAST_OUTSTANDING:
+        return LeastOutstandingBalancer()
+    if strategy == LoadBalancingStrategy.POWER_OF_TWO:
+        return PowerOfTwoBalancer()
+    return RoundRobinBalancer()
@@ -0,0 +1,171 @@
+"""
+Retry policies and circuit breakers for calls to external services.
+"""
+
+from enum import Enum
+from typing import Any, Dict, Optional
+import logging
+import random
+import time
+
+from pydantic import BaseModel, Field
+
+
+class ServiceCallError(Exception):
+    """Raised when a call to an external service fails."""
+
+    def __init__(self, message: str, retryable: bool = False, status: Optional[int] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.status = status
+
+
+class RetryPolicy(BaseModel):
+    """Exponential backoff with jitter for retryable service failures."""
+
+    max_attempts: int = Field(default=3, ge=1)  # total attempts, including the first
+    initial_delay: float = Field(default=1.0, ge=0)  # seconds before the first retry
+    max_delay: float = Field(default=60.0, ge=0)
+    multiplier: float = Field(default=2.0, ge=1)
+    jitter: float = Field(default=0.5, ge=0, le=1)  # fraction of the delay that is randomized
+
+    def next_delay(self, attempt: int) -> float:
+        """
+        Compute the delay before the next attempt.
+
+        Args:
+            attempt: Number of attempts made so far (1 after the first failure)
+
+        Returns:
+            Delay in seconds
+        """
+        delay = min(self.max_delay, self.initial_delay * self.multiplier ** (attempt - 1))
+        return delay * (1 - self.jitter * random.random())
+
+
+class CircuitState(str, Enum):
+    """Circuit breaker states."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreakerPolicy(BaseModel):
+    """Thresholds for a per-service circuit breaker."""
+
+    failure_threshold: int = Field(default=5, ge=1)  # consecutive failures that open the circuit
+    recovery_timeout: float = Field(default=30.0, ge=0)  # seconds to stay open before probing
+    half_open_max_calls: int = Field(default=1, ge=1)  # trial calls allowed while half-open
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for a single service.
+
+    The circuit opens after ``failure_threshold`` consecutive failures. Once
+    ``recovery_timeout`` has passed, a limited number of trial calls are let
+    through; a success closes the circuit and a failure re-opens it.
+    """
+
+    def __init__(self, name: str, policy: Optional[CircuitBreakerPolicy] = None):
+        self.logger = logging.getLogger("circuit_breaker")
+        self.name = name
+        self.policy = policy or CircuitBreakerPolicy()
+        self.state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_calls = 0
+        self._open_count = 0
+        self._open_seconds = 0.0
+
+    def allows_dispatch(self) -> bool:
+        """
+        Check whether a call may be sent to the service now.
+
+        Returns:
+            True if the circuit is closed or has room for a trial call
+        """
+        if self.state == CircuitState.CLOSED:
+            return True
+        if self.state == CircuitState.OPEN and self.retry_after() > 0:
+            return False
+        return self._trial_calls < self.policy.half_open_max_calls
+
+    def on_dispatch(self) -> None:
+        """Record that a call is being sent to the service."""
+        if self.state == CircuitState.OPEN and self.retry_after() <= 0:
+            self._close_open_period()
+            self.state = CircuitState.HALF_OPEN
+            self._trial_calls = 0
+            self.logger.info(f"Circuit for {self.name} is half-open")
+
+        if self.state == CircuitState.HALF_OPEN:
+            self._trial_calls += 1
+
+    def record_success(self) -> None:
+        """Record a successful call."""
+        self._consecutive_failures = 0
+        if self.state == CircuitState.HALF_OPEN:
+            self.state = CircuitState.CLOSED
+            self._trial_calls = 0
+            self.logger.info(f"Circuit for {self.name} closed")
+
+    def record_failure(self) -> None:
+        """Record a failed call."""
+        self._consecutive_failures += 1
+        if self.state == CircuitState.HALF_OPEN:
+            self._trial_calls = max(0, self._trial_calls - 1)
+            self._open()
+        elif self.state == CircuitState.CLOSED and self._consecutive_failures >= self.policy.failure_threshold:
+            self._open()
+
+    def record_abandoned(self) -> None:
+        """Record a call that ended without telling us anything about service health."""
+        if self.state == CircuitState.HALF_OPEN:
+            self._trial_calls = max(0, self._trial_calls - 1)
+
+    def retry_after(self) -> float:
+        """
+        Seconds until an open circuit lets trial calls through.
+
+        Returns:
+            Remaining open time, or 0 if the circuit is not open
+        """
+        if self.state != CircuitState.OPEN or self._opened_at is None:
+            return 0.0
+        return max(0.0, self._opened_at + self.policy.recovery_timeout - time.monotonic())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get breaker state and counters.
+
+        Returns:
+            Dict of breaker statistics
+        """
+        open_seconds = self._open_seconds
+        if self._opened_at is not None:
+            open_seconds += time.monotonic() - self._opened_at
+
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self._consecutive_failures,
+            "times_opened": self._open_count,
+            "open_seconds_total": round(open_seconds, 3),
+            "retry_after": round(self.retry_after(), 3)
+        }
+
+    def _open(self) -> None:
+        """Move the circuit to the open state."""
+        self._close_open_period()
+        self.state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        self._open_count += 1
+        self.logger.warning(
+            f"Circuit for {self.name} opened after {self._consecutive_failures} consecutive failures"
+        )
+
+    def _close_open_period(self) -> None:
+        """Account the time spent in the current open period."""
+        if self._opened_at is not None:
+            self._open_seconds += time.monotonic() - self._opened_at
+            self._opened_at = None
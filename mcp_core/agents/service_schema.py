@@ -0,0 +1,65 @@
+"""
+Service registration schema definitions for MCP Core.
+"""
+
+from typing import Optional
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+from .base_agent import DispatchMode
+from .load_balancer import LoadBalancingStrategy
+from ..jobs.job_schema import JobType
+from ..utils.wire import BodyFormat, ContentEncoding
+
+
+class ServiceRegistration(BaseModel):
+    """Model for registering a service replica with the orchestrator."""
+
+    job_type: JobType
+    service_url: str
+    dispatch_mode: DispatchMode = DispatchMode.SYNC
+    weight: float = Field(default=1.0, gt=0)
+    capacity: Optional[int] = Field(default=None, ge=1)
+    load_balancer: Optional[LoadBalancingStrategy] = None  # strategy for the whole job type
+    lease_seconds: Optional[float] = Field(default=None, gt=0)  # expires unless heartbeats renew it; None never expires
+    body_format: BodyFormat = BodyFormat.JSON  # serialization of job requests sent to the service
+    content_encoding: ContentEncoding = ContentEncoding.IDENTITY  # compression of job requests
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "job_type": "backtest",
+                "service_url": "http://backtest-1:8002",
+                "weight": 1.0,
+                "capacity": 8,
+                "lease_seconds": 10
+            }
+        }
+
+
+class ServiceHeartbeat(BaseModel):
+    """Model for a service renewing its lease and reporting its load."""
+
+    service_url: str
+    in_flight: Optional[int] = Field(default=None, ge=0)  # requests the service is working on
+    free_slots: Optional[int] = Field(default=None, ge=0)  # requests it can still accept; 0 pauses dispatch
+    lease_seconds: float = Field(default=10.0, gt=0)  # lease extension from now
+
+
+class ServiceStatus(BaseModel):
+    """Model for a registered service replica as seen by the orchestrator."""
+
+    job_type: JobType
+    service_url: str
+    dispatch_mode: DispatchMode
+    body_format: BodyFormat
+    content_encoding: ContentEncoding
+    weight: float
+    capacity: int  # effective concurrency limit
+    lease_expires_at: Optional[datetime] = None
+    healthy: bool
+    available: bool  # healthy, leased, not saturated and circuit closed
+    in_flight: int  # jobs this orchestrator worker has dispatched to it
+    reported_in_flight: Optional[int] = None
+    free_slots: Optional[int] = None
+    last_error: Optional[str] = None
@@ -9,7 +9,7 @@ from typing import Optional
 import click
 
 from ..mcp_server import get_server
-from ..jobs.job_schema import JobSubmission, JobType, JobStatus
+from ..jobs.job_schema import JobSubmission, JobType, JobStatus, JobPriority
 from ..agents.base_agent import AgentRegistry
 from ..utils.logger import setup_logging
 
@@ -29,7 +29,10 @@ def cli(verbose: bool, json_logs: bool):
               help='Type of job to submit')
 @click.option('--config', required=True, help='Job configuration (JSON string or file path)')
 @click.option('--metadata', help='Additional metadata (JSON string)')
-def submit(job_type: str, config: str, metadata: Optional[str]):
+@click.option('--priority', default='normal',
+              type=click.Choice(['high', 'normal', 'low']),
+              help='Priority class of the job')
+def submit(job_type: str, config: str, metadata: Optional[str], priority: str):
     """Submit a new job for execution."""
     try:
         # Parse job type
@@ -63,6 +66,7 @@ def submit(job_type: str, config: str, metadata: Optional[str]):
             job_submission = JobSubmission(
                 type=job_type_enum,
                 payload=payload,
+                priority=JobPriority(priority),
                 metadata=metadata_dict
             )
             job_id = await server.submit_job(job_submission)
@@ -100,8 +104,7 @@ def status(job_id: str):
             "created_at": job_response.created_at.isoformat(),
             "started_at": job_response.started_at.isoformat() if job_response.started_at else None,
             "completed_at": job_response.completed_at.isoformat() if job_response.completed_at else None,
-            "error": job_response.error,
-            "logs": job_response.logs
+            "error": job_response.error
         }
         
         click.echo(json.dumps(output, indent=2))
@@ -191,10 +194,44 @@ def agents():
 @click.option('--host', default='0.0.0.0', help='Host to bind to')
 @click.option('--port', default=8000, help='Port to bind to')
 @click.option('--reload', is_flag=True, help='Enable auto-reload for development')
-def serve(host: str, port: int, reload: bool):
+@click.option('--data-dir', envvar='MCP_DATA_DIR', help='Directory for persistent orchestrator state')
+@click.option('--workers', default=1, help='Number of worker processes')
+@click.option('--state-db', envvar='MCP_STATE_DB',
+              help='SQLite file with job, artifact and service state shared by all workers '
+                   '(defaults to state.sqlite3 in --data-dir when --workers > 1)')
+def serve(host: str, port: int, reload: bool, data_dir: Optional[str], workers: int, state_db: Optional[str]):
     """Start the MCP Orchestrator REST API server."""
+    import os
     from ..api.server import run_server
-    run_server(host=host, port=port, reload=reload)
+    if data_dir:
+        os.environ["MCP_DATA_DIR"] = data_dir
+    if workers > 1 and not state_db:
+        if not data_dir:
+            click.echo("Error: --workers > 1 needs --state-db or --data-dir", err=True)
+            sys.exit(1)
+        state_db = os.path.join(data_dir, "state.sqlite3")
+    if state_db:
+        os.environ["MCP_STATE_DB"] = state_db
+    run_server(host=host, port=port, reload=reload, workers=workers)
+
+
+def _call_api(method: str, server_url: str, path: str, **kwargs):
+    """Send a request to a running orchestrator and return the decoded JSON body."""
+    import aiohttp
+    
+    async def request():
+        async with aiohttp.ClientSession() as session:
+            async with session.request(method, f"{server_url.rstrip('/')}{path}", **kwargs) as response:
+                body = await response.json(content_type=None)
+                if response.status >= 400:
+                    detail = body.get("detail") if isinstance(body, dict) else body
+                    raise click.ClickException(f"Server returned status {response.status}: {detail}")
+                return body
+    
+    try:
+        return asyncio.run(request())
+    except aiohttp.ClientError as e:
+        raise click.ClickException(f"Could not reach the orchestrator at {server_url}: {e}")
 
 
 @cli.command()
@@ -202,30 +239,77 @@ def serve(host: str, port: int, reload: bool):
               type=click.Choice(['ml_experiment', 'backtest']),
               help='Job type to register service for')
 @click.option('--service-url', required=True, help='Base URL of the external service')
-def register_service(job_type: str, service_url: str):
-    """Register an external microservice."""
-    from ..jobs.job_schema import JobType
-    from ..agents.base_agent import AgentRegistry
-    
-    job_type_enum = JobType(job_type)
-    AgentRegistry.register_external_service(job_type_enum, service_url)
-    click.echo(f"Registered {job_type} service at {service_url}")
+@click.option('--dispatch-mode', default='sync', type=click.Choice(['sync', 'callback', 'poll']),
+              help='How the service reports job outcomes')
+@click.option('--weight', default=1.0, type=float, help='Share of the job type\'s jobs relative to other replicas')
+@click.option('--capacity', type=int, help='Concurrent requests the replica accepts')
+@click.option('--balancer', type=click.Choice(['round_robin', 'least_outstanding', 'power_of_two']),
+              help='Load balancing strategy across the job type\'s replicas')
+@click.option('--lease-seconds', type=float,
+              help='Expire the registration unless the service sends heartbeats (never expires if omitted)')
+@click.option('--body-format', default='json', type=click.Choice(['json', 'msgpack']),
+              help='Serialization of job requests sent to the service')
+@click.option('--content-encoding', default='identity', type=click.Choice(['identity', 'gzip', 'zstd']),
+              help='Compression of job requests sent to the service')
+@click.option('--server-url', default='http://localhost:8000', envvar='MCP_SERVER_URL',
+              help='Base URL of the running orchestrator')
+def register_service(
+    job_type: str,
+    service_url: str,
+    dispatch_mode: str,
+    weight: float,
+    capacity: Optional[int],
+    balancer: Optional[str],
+    lease_seconds: Optional[float],
+    body_format: str,
+    content_encoding: str,
+    server_url: str
+):
+    """Register an external microservice replica with a running orchestrator."""
+    registration = {
+        "job_type": job_type,
+        "service_url": service_url,
+        "dispatch_mode": dispatch_mode,
+        "weight": weight,
+        "capacity": capacity,
+        "load_balancer": balancer,
+        "lease_seconds": lease_seconds,
+        "body_format": body_format,
+        "content_encoding": content_encoding
+    }
+    _call_api("POST", server_url, "/services/", json=registration)
+    click.echo(f"Registered {job_type} service at {service_url} ({dispatch_mode} dispatch, weight {weight})")
 
 
 @cli.command()
-def list_services():
-    """List registered external services."""
-    from ..agents.base_agent import AgentRegistry
-    
-    services = AgentRegistry.get_supported_job_types()
+@click.option('--job-type', required=True, type=click.Choice(['ml_experiment', 'backtest']),
+              help='Job type the replica serves')
+@click.option('--service-url', required=True, help='Base URL of the external service')
+@click.option('--server-url', default='http://localhost:8000', envvar='MCP_SERVER_URL',
+              help='Base URL of the running orchestrator')
+def deregister_service(job_type: str, service_url: str, server_url: str):
+    """Remove an external microservice replica from a running orchestrator."""
+    _call_api("DELETE", server_url, "/services/", params={"job_type": job_type, "service_url": service_url})
+    click.echo(f"Deregistered {job_type} service at {service_url}")
+
+
+@cli.command()
+@click.option('--server-url', default='http://localhost:8000', envvar='MCP_SERVER_URL',
+              help='Base URL of the running orchestrator')
+def list_services(server_url: str):
+    """List the external services registered with a running orchestrator."""
+    services = _call_api("GET", server_url, "/services/")
     if not services:
         click.echo("No external services registered")
         return
     
     click.echo("Registered external services:")
-    for job_type in services:
-        service_url = AgentRegistry.get_service_url(job_type)
-        click.echo(f"  {job_type}: {service_url}")
+    for service in services:
+        state = "available" if service["available"] else ("healthy" if service["healthy"] else "unhealthy")
+        click.echo(
+            f"  {service['job_type']}: {service['service_url']} "
+            f"(weight {service['weight']}, capacity {service['capacity']}, in flight {service['in_flight']}, {state})"
+        )
 
 
 if __name__ == '__main__':
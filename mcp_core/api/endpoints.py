@@ -2,21 +2,63 @@
 REST API endpoints for MCP Core.
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response, Header, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from typing import List, Optional
+import asyncio
+import codecs
+import json
 import logging
+import weakref
 
-from ..jobs.job_schema import JobSubmission, JobResponse, JobStatus, JobType
+from ..jobs.job_schema import (
+    JobSubmission, JobResponse, JobStatus, JobType, JobBatchResponse, JobCompletion, TERMINAL_STATUSES
+)
+from ..jobs.workflow_schema import WorkflowResponse, WorkflowStatus, WorkflowSubmission
+from ..agents.service_schema import ServiceHeartbeat, ServiceRegistration, ServiceStatus
 from ..artifacts.artifact_schema import ArtifactRegistration, ArtifactResponse, ArtifactType
+from ..jobs.scheduler import QueueFullError
 from ..mcp_server import get_server
 from ..artifacts.artifact_registry import ArtifactRegistry
+from ..utils.pagination import encode_cursor
+from ..utils.wire import decode_body_async
+from .response_cache import EncodedJSONResponse, EncodedResponseCache, FastJSONResponse, encode_json, json_array
 
 logger = logging.getLogger("api")
 
 # Create routers
 jobs_router = APIRouter(prefix="/jobs", tags=["jobs"])
 artifacts_router = APIRouter(prefix="/artifacts", tags=["artifacts"])
+workflows_router = APIRouter(prefix="/workflows", tags=["workflows"])
+services_router = APIRouter(prefix="/services", tags=["services"])
 health_router = APIRouter(prefix="/health", tags=["health"])
+metrics_router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+# Maximum number of submissions accepted by POST /jobs/batch
+MAX_BATCH_SIZE = 10000
+
+# Most jobs, artifacts or workflows returned by one list request
+MAX_PAGE_SIZE = 10000
+
+# Seconds between keepalive comments on an idle event stream
+EVENT_KEEPALIVE_SECONDS = 15
+
+# Longest a wait request may park
+MAX_WAIT_SECONDS = 300
+
+# Most log lines returned by one GET /jobs/{job_id}/logs request or follow read
+MAX_LOG_LINES = 10000
+
+# Seconds a log follower waits for new lines before re-checking the job's status
+LOG_FOLLOW_INTERVAL = 5
+
+
+# Encoded bodies of finished jobs and artifacts, served without re-validation
+response_cache = EncodedResponseCache()
+
+# Registries whose artifact changes invalidate response_cache
+_watched_registries = weakref.WeakSet()
 
 
 # Dependency to get MCP server instance
@@ -26,7 +68,65 @@ def get_mcp_server():
 
 # Dependency to get artifact registry instance
 def get_artifact_registry(server = Depends(get_mcp_server)):
-    return server.artifact_registry
+    registry = server.artifact_registry
+    if registry not in _watched_registries:
+        registry.add_listener(_invalidate_artifact)
+        _watched_registries.add(registry)
+    return registry
+
+
+def _invalidate_artifact(artifact_id: str) -> None:
+    """Drop the cached view of an artifact that changed or was deleted."""
+    response_cache.invalidate(("artifact", artifact_id))
+
+
+def _job_body(job) -> bytes:
+    """
+    Encode the JSON view of a job.
+    
+    Finished jobs never change again, so their encoding is cached.
+    
+    Args:
+        job: Job record
+        
+    Returns:
+        Encoded JobResponse
+    """
+    if job.status not in TERMINAL_STATUSES:
+        return encode_json(job.to_json_dict())
+    
+    key = ("job", job.id)
+    body = response_cache.get(key)
+    if body is None:
+        body = encode_json(job.to_json_dict())
+        response_cache.put(key, body)
+    return body
+
+
+def _artifact_body(artifact, registry) -> bytes:
+    """
+    Encode the JSON view of an artifact.
+    
+    The encoding is cached until the registry reports a change to the
+    artifact; with a shared state backend other workers can change it
+    unseen, so it is encoded every time.
+    
+    Args:
+        artifact: Artifact
+        registry: Registry the artifact came from
+        
+    Returns:
+        Encoded ArtifactResponse
+    """
+    if registry.state_backend is not None:
+        return encode_json(artifact.model_dump(mode="json"))
+    
+    key = ("artifact", artifact.metadata.id)
+    body = response_cache.get(key)
+    if body is None:
+        body = encode_json(artifact.model_dump(mode="json"))
+        response_cache.put(key, body)
+    return body
 
 
 # Health endpoints
@@ -42,10 +142,25 @@ async def readiness_check():
     return {"status": "ready", "service": "mcp-orchestrator"}
 
 
+# Metrics endpoints
+@metrics_router.get("/")
+async def get_metrics(server = Depends(get_mcp_server)):
+    """
+    Get orchestrator runtime metrics.
+    
+    Returns:
+        Queue depth, slot usage and other subsystem metrics
+    """
+    metrics = server.get_metrics()
+    metrics["response_cache"] = response_cache.get_stats()
+    return metrics
+
+
 # Job endpoints
 @jobs_router.post("/", response_model=dict)
 async def submit_job(
     job_submission: JobSubmission,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     server = Depends(get_mcp_server)
 ):
     """
@@ -53,13 +168,19 @@ async def submit_job(
     
     Args:
         job_submission: Job submission data
+        idempotency_key: Optional key; retries with the same key return the original job
         
     Returns:
         Job ID and status
     """
+    if idempotency_key:
+        job_submission.idempotency_key = idempotency_key
+    
     try:
         job_id = await server.submit_job(job_submission)
         return {"job_id": job_id, "status": "submitted"}
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -67,6 +188,176 @@ async def submit_job(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@jobs_router.post("/batch", response_model=JobBatchResponse)
+async def submit_jobs(
+    request: Request,
+    server = Depends(get_mcp_server)
+):
+    """
+    Submit many jobs in a single request.
+    
+    The body is either a JSON array of job submissions or, with
+    ``Content-Type: application/x-ndjson``, one submission per line.
+    
+    Returns:
+        Job IDs in submission order, with per-item errors
+    """
+    body = await request.body()
+    
+    try:
+        if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+            items = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            items = json.loads(body)
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch body: {e}")
+    
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Batch body must be a JSON array or NDJSON")
+    if len(items) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {MAX_BATCH_SIZE} submissions")
+    
+    results = await server.submit_jobs(items)
+    failed = sum(1 for item in results if item.error)
+    
+    return JobBatchResponse(submitted=len(results) - failed, failed=failed, results=results)
+
+
+@jobs_router.get("/events")
+async def stream_job_events(
+    job_id: Optional[List[str]] = Query(None, description="Only events for these jobs"),
+    type: Optional[List[JobType]] = Query(None, description="Only events for jobs of these types"),
+    status: Optional[List[JobStatus]] = Query(None, description="Only events moving jobs into these statuses"),
+    server = Depends(get_mcp_server)
+):
+    """
+    Stream job status changes as server-sent events.
+    
+    Args:
+        job_id: Optional job ID filter (repeatable)
+        type: Optional job type filter (repeatable)
+        status: Optional status filter (repeatable)
+        
+    Returns:
+        text/event-stream response
+    """
+    subscription = server.subscribe_events(job_ids=job_id, job_types=type, statuses=status)
+    
+    async def event_stream():
+        try:
+            while not subscription.closed:
+                event = await subscription.get(timeout=EVENT_KEEPALIVE_SECONDS)
+                if event is None:
+                    if not subscription.closed:
+                        yield ": keepalive\n\n"
+                    continue
+                yield f"data: {event}\n\n"
+        finally:
+            subscription.close()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@jobs_router.websocket("/events/ws")
+async def job_events_websocket(
+    websocket: WebSocket,
+    job_id: Optional[List[str]] = Query(None),
+    type: Optional[List[JobType]] = Query(None),
+    status: Optional[List[JobStatus]] = Query(None),
+    server = Depends(get_mcp_server)
+):
+    """
+    Stream job status changes over a WebSocket, one JSON message per event.
+    
+    Accepts the same filters as GET /jobs/events.
+    """
+    await websocket.accept()
+    subscription = server.subscribe_events(job_ids=job_id, job_types=type, statuses=status)
+    
+    async def watch_disconnect():
+        # Clients only listen; ending the subscription wakes the sender below
+        try:
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        finally:
+            subscription.close()
+    
+    watcher = asyncio.create_task(watch_disconnect())
+    try:
+        while True:
+            event = await subscription.get()
+            if event is None:
+                break
+            await websocket.send_text(event)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        subscription.close()
+        if not watcher.done():
+            # Stream ended by the server (shutdown)
+            watcher.cancel()
+            await websocket.close()
+
+
+@jobs_router.get("/wait")
+async def wait_for_any_job(
+    job_id: Optional[List[str]] = Query(None, description="Jobs to wait for (repeatable)"),
+    timeout: float = Query(30, ge=0, le=MAX_WAIT_SECONDS, description="Seconds to wait"),
+    until: str = Query("terminal", pattern="^(terminal|change)$", description="terminal or change"),
+    server = Depends(get_mcp_server)
+):
+    """
+    Wait until the first of several jobs finishes (or changes status).
+    
+    Args:
+        job_id: Job IDs
+        timeout: Maximum seconds to wait
+        until: "terminal" for a finished job, "change" for any status change
+        
+    Returns:
+        The jobs meeting the condition, empty with timed_out set on timeout
+    """
+    if not job_id:
+        raise HTTPException(status_code=422, detail="At least one job_id is required")
+    
+    jobs = await server.wait_for_jobs(job_id, timeout, until)
+    if jobs is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    body = b'{"jobs":' + json_array(_job_body(job) for job in jobs)
+    return EncodedJSONResponse(body + (b',"timed_out":false}' if jobs else b',"timed_out":true}'))
+
+
+@jobs_router.get("/{job_id}/wait", response_model=JobResponse)
+async def wait_for_job(
+    job_id: str,
+    timeout: float = Query(30, ge=0, le=MAX_WAIT_SECONDS, description="Seconds to wait"),
+    until: str = Query("terminal", pattern="^(terminal|change)$", description="terminal or change"),
+    server = Depends(get_mcp_server)
+):
+    """
+    Wait until a job finishes (or changes status), then return it.
+    
+    Args:
+        job_id: The job ID
+        timeout: Maximum seconds to wait
+        until: "terminal" to wait for a finished job, "change" for any status change
+        
+    Returns:
+        Job status and details; X-Wait-Timed-Out is "true" if the timeout expired first
+    """
+    jobs = await server.wait_for_jobs([job_id], timeout, until)
+    if jobs is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    job = jobs[0] if jobs else await server.get_job_record(job_id)
+    return EncodedJSONResponse(_job_body(job), headers={"X-Wait-Timed-Out": "false" if jobs else "true"})
+
+
 @jobs_router.get("/{job_id}", response_model=JobResponse)
 async def get_job_status(
     job_id: str,
@@ -81,30 +372,83 @@ async def get_job_status(
     Returns:
         Job status and details
     """
-    job_response = await server.get_job_status(job_id)
-    if not job_response:
+    job = await server.get_job_record(job_id)
+    if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    return job_response
+    
+    # Serialize the stored record directly instead of validating a JobResponse
+    return EncodedJSONResponse(_job_body(job))
+
+
+@jobs_router.get("/{job_id}/result")
+async def get_job_result(
+    job_id: str,
+    server = Depends(get_mcp_server)
+):
+    """
+    Get the full result of a job.
+    
+    A result kept out of line (``result_ref`` set on the job) is streamed
+    from the result store without being loaded into memory; other results
+    are returned as stored on the job.
+    
+    Args:
+        job_id: The job ID
+        
+    Returns:
+        The result body the service returned
+    """
+    job = await server.get_job_record(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    if job.result_ref is None:
+        if job.result is None:
+            raise HTTPException(status_code=404, detail="Job has no result")
+        return FastJSONResponse(content=job.result)
+    
+    size = server.result_store.size(job_id)
+    if size is None:
+        # Stored by a worker whose result directory this one cannot see, or removed since
+        raise HTTPException(status_code=404, detail="Result not available")
+    return StreamingResponse(
+        server.result_store.iter_chunks(job_id),
+        media_type="application/json",
+        headers={"Content-Length": str(size)}
+    )
 
 
 @jobs_router.get("/", response_model=List[JobResponse])
 async def list_jobs(
     status: Optional[JobStatus] = Query(None, description="Filter by job status"),
-    limit: Optional[int] = Query(100, description="Maximum number of jobs to return"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of jobs to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
     server = Depends(get_mcp_server)
 ):
     """
-    List jobs with optional filtering.
+    List jobs with optional filtering, newest first.
+    
+    When the page is full, the ``X-Next-Cursor`` response header holds the
+    cursor for the next page.
     
     Args:
         status: Optional status filter
         limit: Maximum number of jobs to return
+        cursor: Optional cursor returned with the previous page
         
     Returns:
         List of jobs
     """
-    jobs = await server.list_jobs(status_filter=status, limit=limit)
-    return jobs
+    try:
+        jobs = await server.list_job_records(status_filter=status, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Serialize the stored records directly instead of validating JobResponses
+    headers = {}
+    if len(jobs) == limit:
+        headers["X-Next-Cursor"] = encode_cursor(jobs[-1].created_at, jobs[-1].id)
+    return EncodedJSONResponse(json_array(_job_body(job) for job in jobs), headers=headers)
 
 
 @jobs_router.delete("/{job_id}")
@@ -127,10 +471,152 @@ async def cancel_job(
     return {"job_id": job_id, "status": "cancelled"}
 
 
+@jobs_router.post("/{job_id}/complete")
+async def complete_job(
+    job_id: str,
+    request: Request,
+    callback_token: str = Header(..., alias="X-Callback-Token"),
+    server = Depends(get_mcp_server)
+):
+    """
+    Report the outcome of a job dispatched to a callback-mode service.
+    
+    The body is a JobCompletion, shaped like a sync /execute response, in
+    JSON or MessagePack and optionally gzip or zstd compressed, as declared
+    by its Content-Type and Content-Encoding headers.
+    
+    Args:
+        job_id: The job ID
+        callback_token: ``callback_token`` from the /execute request
+        
+    Returns:
+        Acceptance status
+    """
+    try:
+        body = await decode_body_async(
+            await request.body(), request.headers.get("content-type"), request.headers.get("content-encoding")
+        )
+        completion = JobCompletion.model_validate(body)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    accepted = await server.complete_job(job_id, callback_token, completion.model_dump())
+    if not accepted:
+        raise HTTPException(status_code=404, detail="Job not found or not awaiting this completion")
+    return {"job_id": job_id, "status": "accepted"}
+
+
+@jobs_router.post("/{job_id}/logs")
+async def append_job_logs(
+    job_id: str,
+    request: Request,
+    server = Depends(get_mcp_server)
+):
+    """
+    Append log lines to a job.
+    
+    The body is newline-separated text and may be sent with chunked
+    transfer encoding; lines are stored as each chunk arrives, so
+    followers see them while the upload is still open.
+    
+    Args:
+        job_id: The job ID
+        
+    Returns:
+        Number of lines stored and the job's new log offset
+    """
+    job = await server.get_job_record(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job_id not in server.jobs:
+        # Archived jobs take no more lines, and another worker's job keeps its buffer there
+        raise HTTPException(status_code=409, detail="Job is archived or held by another worker")
+    
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    received = 0
+    next_offset = None
+    async for chunk in request.stream():
+        lines = (pending + decoder.decode(chunk)).split("\n")
+        pending = lines.pop()
+        if lines:
+            next_offset = await server.job_logs.append(job_id, [line.rstrip("\r") for line in lines])
+            received += len(lines)
+    
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        next_offset = await server.job_logs.append(job_id, [pending.rstrip("\r")])
+        received += 1
+    if next_offset is None:
+        next_offset = await server.job_logs.append(job_id, [])
+    
+    return {"job_id": job_id, "lines": received, "next_offset": next_offset}
+
+
+@jobs_router.get("/{job_id}/logs")
+async def get_job_logs(
+    job_id: str,
+    since: int = Query(0, ge=0, description="Offset of the first line to return"),
+    limit: int = Query(1000, ge=1, le=MAX_LOG_LINES, description="Maximum number of lines (without follow)"),
+    follow: bool = Query(False, description="Keep streaming new lines until the job finishes"),
+    server = Depends(get_mcp_server)
+):
+    """
+    Read or tail the log lines of a job.
+    
+    Args:
+        job_id: The job ID
+        since: Offset of the first line to return
+        limit: Maximum number of lines without follow
+        follow: Stream lines as they arrive until the job finishes
+        
+    Returns:
+        text/plain lines; without follow, X-Next-Offset gives the offset to pass as ``since`` next
+    """
+    job = await server.get_job_record(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    if not follow:
+        lines, next_offset = await server.job_logs.read(job_id, since, limit)
+        return Response(
+            content="".join(line + "\n" for line in lines),
+            media_type="text/plain",
+            headers={"X-Next-Offset": str(next_offset)}
+        )
+    
+    async def log_stream():
+        offset = since
+        finished = False
+        while True:
+            lines, offset = await server.job_logs.read(job_id, offset, MAX_LOG_LINES)
+            if lines:
+                yield "".join(line + "\n" for line in lines)
+                continue
+            if finished:
+                break
+            
+            current = await server.get_job_record(job_id)
+            if current is None or current.status in TERMINAL_STATUSES:
+                # One more read picks up lines appended before the job finished
+                finished = True
+                continue
+            await server.job_logs.wait(job_id, offset, LOG_FOLLOW_INTERVAL)
+    
+    return StreamingResponse(
+        log_stream(),
+        media_type="text/plain",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 # Artifact endpoints
 @artifacts_router.post("/", response_model=dict)
 async def register_artifact(
     artifact_registration: ArtifactRegistration,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     registry = Depends(get_artifact_registry)
 ):
     """
@@ -138,10 +624,14 @@ async def register_artifact(
     
     Args:
         artifact_registration: Artifact registration data
+        idempotency_key: Optional key; retries with the same key return the original artifact
         
     Returns:
         Artifact ID
     """
+    if idempotency_key:
+        artifact_registration.idempotency_key = idempotency_key
+    
     try:
         artifact_id = await registry.register_artifact(artifact_registration)
         return {"artifact_id": artifact_id, "status": "registered"}
@@ -170,14 +660,7 @@ async def get_artifact(
     if not artifact:
         raise HTTPException(status_code=404, detail="Artifact not found")
     
-    return ArtifactResponse(
-        metadata=artifact.metadata,
-        storage_location=artifact.storage_location,
-        service_id=artifact.service_id,
-        job_id=artifact.job_id,
-        dependencies=artifact.dependencies,
-        referenced_by=artifact.referenced_by
-    )
+    return EncodedJSONResponse(_artifact_body(artifact, registry))
 
 
 @artifacts_router.get("/", response_model=List[ArtifactResponse])
@@ -185,39 +668,44 @@ async def list_artifacts(
     artifact_type: Optional[ArtifactType] = Query(None, description="Filter by artifact type"),
     job_id: Optional[str] = Query(None, description="Filter by job ID"),
     service_id: Optional[str] = Query(None, description="Filter by service ID"),
-    limit: Optional[int] = Query(100, description="Maximum number of artifacts to return"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of artifacts to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
     registry = Depends(get_artifact_registry)
 ):
     """
-    List artifacts with optional filtering.
+    List artifacts with optional filtering, newest first.
+    
+    When the page is full, the ``X-Next-Cursor`` response header holds the
+    cursor for the next page.
     
     Args:
         artifact_type: Optional type filter
         job_id: Optional job ID filter
         service_id: Optional service ID filter
         limit: Maximum number of artifacts to return
+        cursor: Optional cursor returned with the previous page
         
     Returns:
         List of artifacts
     """
-    artifacts = await registry.list_artifacts(
-        artifact_type=artifact_type,
-        job_id=job_id,
-        service_id=service_id,
-        limit=limit
-    )
-    
-    return [
-        ArtifactResponse(
-            metadata=artifact.metadata,
-            storage_location=artifact.storage_location,
-            service_id=artifact.service_id,
-            job_id=artifact.job_id,
-            dependencies=artifact.dependencies,
-            referenced_by=artifact.referenced_by
+    try:
+        artifacts = await registry.list_artifacts(
+            artifact_type=artifact_type,
+            job_id=job_id,
+            service_id=service_id,
+            limit=limit,
+            cursor=cursor
         )
-        for artifact in artifacts
-    ]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    headers = {}
+    if len(artifacts) == limit:
+        last = artifacts[-1].metadata
+        headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+    
+    body = json_array(_artifact_body(artifact, registry) for artifact in artifacts)
+    return EncodedJSONResponse(body, headers=headers)
 
 
 @artifacts_router.get("/job/{job_id}", response_model=List[ArtifactResponse])
@@ -236,17 +724,7 @@ async def get_artifacts_by_job(
     """
     artifacts = await registry.get_artifacts_by_job(job_id)
     
-    return [
-        ArtifactResponse(
-            metadata=artifact.metadata,
-            storage_location=artifact.storage_location,
-            service_id=artifact.service_id,
-            job_id=artifact.job_id,
-            dependencies=artifact.dependencies,
-            referenced_by=artifact.referenced_by
-        )
-        for artifact in artifacts
-    ]
+    return EncodedJSONResponse(json_array(_artifact_body(artifact, registry) for artifact in artifacts))
 
 
 @artifacts_router.get("/{artifact_id}/dependencies", response_model=List[ArtifactResponse])
@@ -265,17 +743,7 @@ async def get_artifact_dependencies(
     """
     artifacts = await registry.get_artifact_dependencies(artifact_id)
     
-    return [
-        ArtifactResponse(
-            metadata=artifact.metadata,
-            storage_location=artifact.storage_location,
-            service_id=artifact.service_id,
-            job_id=artifact.job_id,
-            dependencies=artifact.dependencies,
-            referenced_by=artifact.referenced_by
-        )
-        for artifact in artifacts
-    ]
+    return EncodedJSONResponse(json_array(_artifact_body(artifact, registry) for artifact in artifacts))
 
 
 @artifacts_router.delete("/{artifact_id}")
@@ -296,3 +764,181 @@ async def delete_artifact(
     if not success:
         raise HTTPException(status_code=404, detail="Artifact not found")
     return {"artifact_id": artifact_id, "status": "deleted"}
+
+
+# Workflow endpoints
+@workflows_router.post("/", response_model=dict)
+async def submit_workflow(
+    submission: WorkflowSubmission,
+    server = Depends(get_mcp_server)
+):
+    """
+    Start a workflow: a DAG of jobs chained through artifacts.
+    
+    Args:
+        submission: Workflow nodes and their dependencies
+        
+    Returns:
+        Workflow ID and status
+    """
+    try:
+        run = await server.submit_workflow(submission)
+        return {"workflow_id": run.id, "status": run.status.value, "nodes": len(run.nodes)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error submitting workflow: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@workflows_router.get("/{workflow_id}", response_model=WorkflowResponse)
+async def get_workflow(
+    workflow_id: str,
+    server = Depends(get_mcp_server)
+):
+    """
+    Get the status of a workflow and its nodes.
+    
+    Args:
+        workflow_id: The workflow ID
+        
+    Returns:
+        Workflow status, per-node status and job IDs
+    """
+    run = server.get_workflow(workflow_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    return run.to_response()
+
+
+@workflows_router.get("/", response_model=List[WorkflowResponse])
+async def list_workflows(
+    status: Optional[WorkflowStatus] = Query(None, description="Filter by workflow status"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of workflows to return"),
+    server = Depends(get_mcp_server)
+):
+    """
+    List workflows, newest first.
+    
+    Args:
+        status: Optional status filter
+        limit: Maximum number of workflows to return
+        
+    Returns:
+        List of workflows
+    """
+    runs = []
+    for run in reversed(list(server.workflows.values())):
+        if status is None or run.status == status:
+            runs.append(run.to_response())
+            if len(runs) >= limit:
+                break
+    return runs
+
+
+@workflows_router.delete("/{workflow_id}")
+async def cancel_workflow(
+    workflow_id: str,
+    server = Depends(get_mcp_server)
+):
+    """
+    Cancel a workflow and its running jobs.
+    
+    Args:
+        workflow_id: The workflow ID
+        
+    Returns:
+        Cancellation status
+    """
+    if not server.cancel_workflow(workflow_id):
+        raise HTTPException(status_code=404, detail="Workflow not found or already finished")
+    return {"workflow_id": workflow_id, "status": "cancelled"}
+
+
+# Service endpoints
+@services_router.post("/", response_model=ServiceStatus)
+async def register_service(
+    registration: ServiceRegistration,
+    server = Depends(get_mcp_server)
+):
+    """
+    Register a service replica for a job type.
+    
+    With ``lease_seconds`` the registration expires unless renewed through
+    ``POST /services/heartbeat``.
+    
+    Args:
+        registration: Service URL, job type, weight, capacity, lease and wire format
+        
+    Returns:
+        Status of the registered replica
+        
+    Raises:
+        HTTPException: If the body format or encoding is not available
+    """
+    try:
+        return await server.register_service(registration)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@services_router.post("/heartbeat", response_model=List[ServiceStatus])
+async def service_heartbeat(
+    heartbeat: ServiceHeartbeat,
+    server = Depends(get_mcp_server)
+):
+    """
+    Renew a service's lease and report its current load.
+    
+    Args:
+        heartbeat: Service URL, in-flight requests and free slots
+        
+    Returns:
+        Status of the service's replicas
+    """
+    statuses = await server.service_heartbeat(heartbeat)
+    if statuses is None:
+        # Lease expired or never registered: the service has to register again
+        raise HTTPException(status_code=404, detail="Service not registered")
+    return statuses
+
+
+@services_router.get("/", response_model=List[ServiceStatus])
+async def list_services(
+    job_type: Optional[JobType] = Query(None, description="Only replicas of this job type"),
+    server = Depends(get_mcp_server)
+):
+    """
+    List registered service replicas with their health and load.
+    
+    Args:
+        job_type: Only replicas of this job type
+        
+    Returns:
+        List of replica statuses
+    """
+    services = server.list_services()
+    if job_type is not None:
+        services = [service for service in services if service.job_type == job_type]
+    return services
+
+
+@services_router.delete("/")
+async def deregister_service(
+    job_type: JobType = Query(..., description="Job type the replica serves"),
+    service_url: str = Query(..., description="Base URL of the replica"),
+    server = Depends(get_mcp_server)
+):
+    """
+    Remove a service replica.
+    
+    Args:
+        job_type: Job type the replica serves
+        service_url: Base URL of the replica
+        
+    Returns:
+        Deregistration status
+    """
+    if not await server.deregister_service(job_type, service_url):
+        raise HTTPException(status_code=404, detail="Service not registered")
+    return {"job_type": job_type.value, "service_url": service_url, "status": "deregistered"}
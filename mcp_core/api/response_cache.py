@@ -0,0 +1,152 @@
+"""
+Pre-encoded JSON responses for MCP Core API views that rarely change.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional
+import json
+
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def encode_json(content: Any) -> bytes:
+    """
+    Encode a JSON-compatible value compactly as UTF-8.
+    
+    Uses orjson when it is installed, and otherwise produces the same bytes
+    as FastAPI's JSONResponse.
+    
+    Args:
+        content: JSON-compatible value
+        
+    Returns:
+        Encoded body
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(content)
+        except TypeError:
+            # Keys that are not strings, or integers beyond 64 bits
+            pass
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def json_array(bodies: Iterable[bytes]) -> bytes:
+    """Join encoded JSON values into an encoded array."""
+    return b"[" + b",".join(bodies) + b"]"
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with ``encode_json``."""
+    
+    def render(self, content: Any) -> bytes:
+        return encode_json(content)
+
+
+class EncodedJSONResponse(Response):
+    """Response for a body that is already encoded JSON; nothing is validated or re-encoded."""
+    
+    media_type = "application/json"
+
+
+class EncodedResponseCache:
+    """
+    Encoded JSON bodies of immutable views, least recently used first out.
+    
+    Callers decide what is safe to cache (finished jobs, artifacts whose
+    registry reports changes) and invalidate entries when a view changes.
+    The cache is bounded by entry count and total body size.
+    """
+    
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 32 * 1024 * 1024):
+        """
+        Args:
+            max_entries: Most bodies kept
+            max_bytes: Most body bytes kept
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._bodies: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "invalidations": 0,
+            "evictions": 0
+        }
+    
+    def get(self, key: Hashable) -> Optional[bytes]:
+        """
+        Get a cached body.
+        
+        Args:
+            key: View key
+            
+        Returns:
+            Encoded body or None on a miss
+        """
+        body = self._bodies.get(key)
+        if body is None:
+            self._stats["misses"] += 1
+            return None
+        
+        self._bodies.move_to_end(key)
+        self._stats["hits"] += 1
+        return body
+    
+    def put(self, key: Hashable, body: bytes) -> None:
+        """
+        Cache a body, evicting the least recently used ones over the limits.
+        
+        Args:
+            key: View key
+            body: Encoded body
+        """
+        if len(body) > self.max_bytes:
+            return
+        
+        self.invalidate(key, count=False)
+        self._bodies[key] = body
+        self._bytes += len(body)
+        while len(self._bodies) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._bodies.popitem(last=False)
+            self._bytes -= len(evicted)
+            self._stats["evictions"] += 1
+    
+    def invalidate(self, key: Hashable, count: bool = True) -> None:
+        """
+        Drop a cached body, if any.
+        
+        Args:
+            key: View key
+            count: Whether to count the drop in the invalidation statistics
+        """
+        body = self._bodies.pop(key, None)
+        if body is not None:
+            self._bytes -= len(body)
+            if count:
+                self._stats["invalidations"] += 1
+    
+    def clear(self) -> None:
+        """Drop every cached body."""
+        self._bodies.clear()
+        self._bytes = 0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+        
+        Returns:
+            Dict of cache statistics
+        """
+        return {
+            **self._stats,
+            "entries": len(self._bodies),
+            "bytes": self._bytes,
+            "encoder": "orjson" if orjson is not None else "json"
+        }
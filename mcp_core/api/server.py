@@ -2,13 +2,17 @@
 FastAPI application for MCP Core.
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import logging
+import os
 import uvicorn
 
-from .endpoints import jobs_router, artifacts_router, health_router
+from .response_cache import FastJSONResponse
+from .endpoints import jobs_router, artifacts_router, workflows_router, services_router, health_router, metrics_router
+from ..mcp_server import start_server, stop_server
 from ..utils.logger import setup_logging
 
 # Setup logging
@@ -16,13 +20,31 @@ setup_logging()
 
 logger = logging.getLogger("mcp_api")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Run the orchestrator for as long as this worker process serves requests.
+    
+    On shutdown, unfinished jobs are handed to other workers if state is
+    shared, and service connection pools are closed.
+    """
+    await start_server()
+    try:
+        yield
+    finally:
+        await stop_server()
+
+
 # Create FastAPI application
 app = FastAPI(
     title="MCP Orchestrator",
     description="Microservice Control Platform - Central orchestrator for ML experiments and backtests",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -50,6 +72,9 @@ async def global_exception_handler(request: Request, exc: Exception):
 app.include_router(health_router)
 app.include_router(jobs_router)
 app.include_router(artifacts_router)
+app.include_router(workflows_router)
+app.include_router(services_router)
+app.include_router(metrics_router)
 
 
 @app.get("/")
@@ -63,12 +88,14 @@ async def root():
             "health": "/health",
             "jobs": "/jobs",
             "artifacts": "/artifacts",
+            "services": "/services",
+            "metrics": "/metrics",
             "docs": "/docs"
         }
     }
 
 
-def run_server(host: str = "0.0.0.0", port: int = 8000, reload: bool = False):
+def run_server(host: str = "0.0.0.0", port: int = 8000, reload: bool = False, workers: int = 1):
     """
     Run the FastAPI server.
     
@@ -76,13 +103,30 @@ def run_server(host: str = "0.0.0.0", port: int = 8000, reload: bool = False):
         host: Host to bind to
         port: Port to bind to
         reload: Enable auto-reload for development
+        workers: Number of worker processes; more than one requires a
+            shared state database (MCP_STATE_DB), and each worker then
+            enforces an equal share of the concurrency limits
+        
+    Raises:
+        ValueError: If several workers are requested without a state database
     """
-    logger.info(f"Starting MCP Orchestrator server on {host}:{port}")
+    if workers > 1 and not os.environ.get("MCP_STATE_DB"):
+        raise ValueError("Running several workers requires a shared state database (MCP_STATE_DB)")
+    if workers > 1:
+        # Each worker counts its own running jobs, so it gets a share of every limit
+        logger.warning(
+            f"Concurrency limits are enforced per worker: each of the {workers} workers allows "
+            f"1/{workers} of every job type and service limit (at least one)"
+        )
+    os.environ["MCP_WORKERS"] = str(workers)
+    
+    logger.info(f"Starting MCP Orchestrator server on {host}:{port} with {workers} worker(s)")
     uvicorn.run(
         "mcp_core.api.server:app",
         host=host,
         port=port,
         reload=reload,
+        workers=workers,
         log_level="info"
     )
 
@@ -2,22 +2,74 @@
 Artifact registry implementation for MCP Core.
 """
 
-from typing import Dict, List, Optional, Any
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Any
+import asyncio
+import itertools
 import logging
 from datetime import datetime
 
 from .artifact_schema import Artifact, ArtifactMetadata, ArtifactType, ArtifactRegistration, ArtifactReference
+from ..utils.hashing import content_hash
+from ..utils.idempotency import IdempotencyIndex
+from ..utils.ordered_index import OrderedIndex
+from ..utils.pagination import decode_cursor
+from ..utils.timestamps import datetime_to_epoch
+
+if TYPE_CHECKING:
+    from ..state.backend import StateBackend
+    from ..state.journal import WriteAheadLog
 
 
 class ArtifactRegistry:
-    """Central registry for managing artifacts and their metadata."""
+    """
+    Central registry for managing artifacts and their metadata.
+    
+    Artifacts are kept in process memory, or, when a state backend is
+    given, only in the backend so that every worker sees the same set.
+    In-memory artifacts can be made durable with a write-ahead log.
+    """
     
-    def __init__(self):
+    def __init__(
+        self,
+        idempotency_index: Optional[IdempotencyIndex] = None,
+        state_backend: Optional["StateBackend"] = None,
+        journal: Optional["WriteAheadLog"] = None
+    ):
         self.logger = logging.getLogger("artifact_registry")
+        self.idempotency_index = idempotency_index or IdempotencyIndex(state_backend=state_backend, scope="artifacts")
+        self.state_backend = state_backend
+        self.journal = journal
         self._artifacts: Dict[str, Artifact] = {}  # artifact_id -> Artifact
-        self._artifacts_by_job: Dict[str, List[str]] = {}  # job_id -> [artifact_ids]
-        self._artifacts_by_service: Dict[str, List[str]] = {}  # service_id -> [artifact_ids]
-        self._artifacts_by_type: Dict[ArtifactType, List[str]] = {}  # type -> [artifact_ids]
+        # Secondary indexes hold (created_at, artifact_id) keys in creation order
+        self._artifacts_by_created = OrderedIndex()
+        self._artifacts_by_job: Dict[str, OrderedIndex] = {}  # job_id -> artifact keys
+        self._artifacts_by_service: Dict[str, OrderedIndex] = {}  # service_id -> artifact keys
+        self._artifacts_by_type: Dict[ArtifactType, OrderedIndex] = {}  # type -> artifact keys
+        self._listeners: List[Callable[[str], None]] = []  # called with the ID of a changed or deleted artifact
+    
+    def add_listener(self, listener: Callable[[str], None]) -> None:
+        """
+        Get notified when a registered artifact changes or is deleted.
+        
+        The listener is called with the artifact ID after the change, e.g.
+        when a new artifact adds itself to a dependency's ``referenced_by``.
+        Changes made by other workers through a shared state backend are
+        not reported.
+        
+        Args:
+            listener: Callback taking the artifact ID
+        """
+        self._listeners.append(listener)
+    
+    def remove_listener(self, listener: Callable[[str], None]) -> None:
+        """
+        Stop notifying a listener added with ``add_listener``.
+        
+        Args:
+            listener: Callback to remove
+        """
+        if listener in self._listeners:
+            self._listeners.remove(listener)
     
     async def register_artifact(self, registration: ArtifactRegistration) -> str:
         """
@@ -30,8 +82,18 @@ class ArtifactRegistry:
             Artifact ID
             
         Raises:
-            ValueError: If artifact ID already exists
+            ValueError: If artifact ID already exists, or the idempotency key
+                was already used with a different registration
+            OSError: If the artifact could not be written to the write-ahead log
         """
+        # Return the original artifact for a repeated idempotency key
+        request_hash = None
+        if registration.idempotency_key:
+            request_hash = content_hash(registration.model_dump(mode="json", exclude={"idempotency_key"}))
+            existing_id = self.idempotency_index.get(registration.idempotency_key, request_hash)
+            if existing_id:
+                return existing_id
+        
         # Create artifact metadata
         metadata = ArtifactMetadata(
             name=registration.name,
@@ -54,18 +116,35 @@ class ArtifactRegistry:
         )
         
         # Check for duplicate ID (shouldn't happen with UUID, but just in case)
-        if artifact.metadata.id in self._artifacts:
+        if await self.get_artifact(artifact.metadata.id):
             raise ValueError(f"Artifact with ID {artifact.metadata.id} already exists")
         
-        # Store artifact
-        self._artifacts[artifact.metadata.id] = artifact
+        # Claim the key before storing, so concurrent retries on any worker get this artifact back
+        if registration.idempotency_key:
+            claimed_id = await self.idempotency_index.claim(
+                registration.idempotency_key, artifact.metadata.id, request_hash
+            )
+            if claimed_id != artifact.metadata.id:
+                return claimed_id
         
-        # Update indexes
-        self._update_indexes(artifact)
+        # Store artifact
+        try:
+            await self._save(artifact, new=True)
+        except Exception:
+            if registration.idempotency_key:
+                await self.idempotency_index.release(registration.idempotency_key, artifact.metadata.id)
+            raise
         
         # Update dependency references
         await self._update_dependency_references(artifact)
         
+        if self.journal is not None:
+            # Logged after the artifact so a replayed key never points at a missing artifact
+            record = self.idempotency_index.export(registration.idempotency_key) if registration.idempotency_key else None
+            if record is not None:
+                self.journal.append("idempotency", record)
+            await self.journal.sync()
+        
         self.logger.info(f"Registered artifact {artifact.metadata.id} ({artifact.metadata.name})")
         return artifact.metadata.id
     
@@ -79,6 +158,9 @@ class ArtifactRegistry:
         Returns:
             Artifact or None if not found
         """
+        if self.state_backend is not None:
+            data = await asyncio.to_thread(self.state_backend.get_artifact, artifact_id)
+            return Artifact.model_validate(data) if data else None
         return self._artifacts.get(artifact_id)
     
     async def list_artifacts(
@@ -86,42 +168,56 @@ class ArtifactRegistry:
         artifact_type: Optional[ArtifactType] = None,
         job_id: Optional[str] = None,
         service_id: Optional[str] = None,
-        limit: Optional[int] = None
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
     ) -> List[Artifact]:
         """
-        List artifacts with optional filtering.
+        List artifacts newest first, with optional filtering.
         
         Args:
             artifact_type: Filter by artifact type
             job_id: Filter by job ID
             service_id: Filter by service ID
             limit: Maximum number of artifacts to return
+            cursor: Only return artifacts created before the one the cursor
+                points at (see ``encode_cursor``)
             
         Returns:
             List of artifacts
+            
+        Raises:
+            ValueError: If the cursor is malformed
         """
-        artifacts = []
+        before = decode_cursor(cursor) if cursor else None
+        
+        if self.state_backend is not None:
+            rows = await asyncio.to_thread(
+                self.state_backend.list_artifacts,
+                artifact_type=ArtifactType(artifact_type).value if artifact_type else None,
+                job_id=job_id,
+                service_id=service_id,
+                limit=limit,
+                before=(datetime_to_epoch(before[0]), before[1]) if before else None
+            )
+            return [Artifact.model_validate(data) for data in rows]
         
         if artifact_type:
-            artifact_ids = self._artifacts_by_type.get(artifact_type, [])
+            index = self._artifacts_by_type.get(artifact_type)
         elif job_id:
-            artifact_ids = self._artifacts_by_job.get(job_id, [])
+            index = self._artifacts_by_job.get(job_id)
         elif service_id:
-            artifact_ids = self._artifacts_by_service.get(service_id, [])
+            index = self._artifacts_by_service.get(service_id)
         else:
-            artifact_ids = list(self._artifacts.keys())
-        
-        # Get artifacts
-        for artifact_id in artifact_ids:
-            if artifact_id in self._artifacts:
-                artifacts.append(self._artifacts[artifact_id])
+            index = self._artifacts_by_created
         
-        # Sort by creation time (newest first)
-        artifacts.sort(key=lambda x: x.metadata.created_at, reverse=True)
+        if index is None:
+            return []
         
-        # Apply limit
+        # Walk the index newest first, stopping at the limit
+        keys = index.iter_desc(before=before)
         if limit:
-            artifacts = artifacts[:limit]
+            keys = itertools.islice(keys, limit)
+        artifacts = [self._artifacts[artifact_id] for _, artifact_id in keys]
         
         return artifacts
     
@@ -135,8 +231,13 @@ class ArtifactRegistry:
         Returns:
             List of artifacts
         """
-        artifact_ids = self._artifacts_by_job.get(job_id, [])
-        return [self._artifacts[aid] for aid in artifact_ids if aid in self._artifacts]
+        if self.state_backend is not None:
+            return list(reversed(await self.list_artifacts(job_id=job_id)))
+        
+        index = self._artifacts_by_job.get(job_id)
+        if index is None:
+            return []
+        return [self._artifacts[aid] for _, aid in index.iter_asc()]
     
     async def get_artifact_dependencies(self, artifact_id: str) -> List[Artifact]:
         """
@@ -182,6 +283,34 @@ class ArtifactRegistry:
         
         return references
     
+    async def get_input_checksums(self, artifact_ids: List[str]) -> Optional[Dict[str, str]]:
+        """
+        Collect checksums of the given artifacts and everything they depend on.
+        
+        Args:
+            artifact_ids: IDs of the directly referenced artifacts
+            
+        Returns:
+            Mapping of artifact_id -> checksum for the transitive closure, or
+            None if any artifact is missing or has no checksum
+        """
+        checksums: Dict[str, str] = {}
+        stack = list(artifact_ids)
+        
+        while stack:
+            artifact_id = stack.pop()
+            if artifact_id in checksums:
+                continue
+            
+            artifact = await self.get_artifact(artifact_id)
+            if not artifact or not artifact.metadata.checksum:
+                return None
+            
+            checksums[artifact_id] = artifact.metadata.checksum
+            stack.extend(dep_ref.artifact_id for dep_ref in artifact.dependencies)
+        
+        return checksums
+    
     async def delete_artifact(self, artifact_id: str) -> bool:
         """
         Delete an artifact from the registry.
@@ -192,67 +321,108 @@ class ArtifactRegistry:
         Returns:
             True if deleted, False if not found
         """
-        if artifact_id not in self._artifacts:
+        artifact = await self.get_artifact(artifact_id)
+        if not artifact:
             return False
         
-        artifact = self._artifacts[artifact_id]
-        
-        # Remove from indexes
-        self._remove_from_indexes(artifact)
+        # Delete artifact
+        if self.state_backend is not None:
+            if not await asyncio.to_thread(self.state_backend.delete_artifact, artifact_id):
+                return False
+        else:
+            self._remove_from_indexes(artifact)
+            del self._artifacts[artifact_id]
+            if self.journal is not None:
+                self.journal.append("artifact_deleted", artifact_id)
+        self._notify(artifact_id)
         
         # Remove dependency references
         await self._remove_dependency_references(artifact)
         
-        # Delete artifact
-        del self._artifacts[artifact_id]
-        
         self.logger.info(f"Deleted artifact {artifact_id}")
         return True
     
+    async def _save(self, artifact: Artifact, new: bool = False) -> None:
+        """
+        Store a new or modified artifact.
+        
+        Args:
+            artifact: Artifact to store
+            new: Whether the artifact is being registered
+        """
+        if self.state_backend is not None:
+            data = artifact.model_dump(mode="json")
+            data["created_ts"] = datetime_to_epoch(artifact.metadata.created_at)
+            await asyncio.to_thread(self.state_backend.put_artifact, data)
+        else:
+            if new:
+                self._artifacts[artifact.metadata.id] = artifact
+                self._update_indexes(artifact)
+            if self.journal is not None:
+                self.journal.append("artifact", artifact.model_dump(mode="json"))
+        if not new:
+            self._notify(artifact.metadata.id)
+    
+    def _notify(self, artifact_id: str) -> None:
+        """Tell the listeners that an artifact changed or was deleted."""
+        for listener in list(self._listeners):
+            try:
+                listener(artifact_id)
+            except Exception as e:
+                self.logger.error(f"Artifact listener failed for {artifact_id}: {e}")
+    
+    def restore(self, artifacts: Iterable[Dict[str, Any]]) -> None:
+        """
+        Load artifacts replayed from the write-ahead log.
+        
+        Args:
+            artifacts: Serialized artifacts
+        """
+        for data in artifacts:
+            artifact = Artifact.model_validate(data)
+            self._artifacts[artifact.metadata.id] = artifact
+            self._update_indexes(artifact)
+    
     def _update_indexes(self, artifact: Artifact):
         """Update internal indexes for the artifact."""
-        artifact_id = artifact.metadata.id
+        key = (artifact.metadata.created_at, artifact.metadata.id)
+        self._artifacts_by_created.add(key)
         
         # Update job index
         if artifact.job_id:
             if artifact.job_id not in self._artifacts_by_job:
-                self._artifacts_by_job[artifact.job_id] = []
-            if artifact_id not in self._artifacts_by_job[artifact.job_id]:
-                self._artifacts_by_job[artifact.job_id].append(artifact_id)
+                self._artifacts_by_job[artifact.job_id] = OrderedIndex()
+            self._artifacts_by_job[artifact.job_id].add(key)
         
         # Update service index
         if artifact.service_id:
             if artifact.service_id not in self._artifacts_by_service:
-                self._artifacts_by_service[artifact.service_id] = []
-            if artifact_id not in self._artifacts_by_service[artifact.service_id]:
-                self._artifacts_by_service[artifact.service_id].append(artifact_id)
+                self._artifacts_by_service[artifact.service_id] = OrderedIndex()
+            self._artifacts_by_service[artifact.service_id].add(key)
         
         # Update type index
         artifact_type = artifact.metadata.type
         if artifact_type not in self._artifacts_by_type:
-            self._artifacts_by_type[artifact_type] = []
-        if artifact_id not in self._artifacts_by_type[artifact_type]:
-            self._artifacts_by_type[artifact_type].append(artifact_id)
+            self._artifacts_by_type[artifact_type] = OrderedIndex()
+        self._artifacts_by_type[artifact_type].add(key)
     
     def _remove_from_indexes(self, artifact: Artifact):
         """Remove artifact from internal indexes."""
-        artifact_id = artifact.metadata.id
+        key = (artifact.metadata.created_at, artifact.metadata.id)
+        self._artifacts_by_created.remove(key)
         
         # Remove from job index
         if artifact.job_id and artifact.job_id in self._artifacts_by_job:
-            if artifact_id in self._artifacts_by_job[artifact.job_id]:
-                self._artifacts_by_job[artifact.job_id].remove(artifact_id)
+            self._artifacts_by_job[artifact.job_id].remove(key)
         
         # Remove from service index
         if artifact.service_id and artifact.service_id in self._artifacts_by_service:
-            if artifact_id in self._artifacts_by_service[artifact.service_id]:
-                self._artifacts_by_service[artifact.service_id].remove(artifact_id)
+            self._artifacts_by_service[artifact.service_id].remove(key)
         
         # Remove from type index
         artifact_type = artifact.metadata.type
         if artifact_type in self._artifacts_by_type:
-            if artifact_id in self._artifacts_by_type[artifact_type]:
-                self._artifacts_by_type[artifact_type].remove(artifact_id)
+            self._artifacts_by_type[artifact_type].remove(key)
     
     async def _update_dependency_references(self, artifact: Artifact):
         """Update referenced_by lists for dependency artifacts."""
@@ -267,6 +437,7 @@ class ArtifactRegistry:
                     metadata={"reference_type": dep_ref.reference_type}
                 )
                 dep_artifact.referenced_by.append(ref)
+                await self._save(dep_artifact)
     
     async def _remove_dependency_references(self, artifact: Artifact):
         """Remove referenced_by entries for dependency artifacts."""
@@ -278,3 +449,4 @@ class ArtifactRegistry:
                     ref for ref in dep_artifact.referenced_by 
                     if ref.artifact_id != artifact.metadata.id
                 ]
+                await self._save(dep_artifact)
@@ -73,6 +73,7 @@ class ArtifactRegistration(BaseModel):
     checksum: Optional[str] = None
     tags: List[str] = Field(default_factory=list)
     metadata: Dict[str, Any] = Field(default_factory=dict)
+    idempotency_key: Optional[str] = None  # repeat registrations with this key return the original artifact
 
 
 class ArtifactResponse(BaseModel):
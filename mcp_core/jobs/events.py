@@ -0,0 +1,229 @@
+"""
+Fan-out of job status changes to streaming subscribers.
+"""
+
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set
+import asyncio
+import json
+import logging
+import time
+
+from .job_record import JobRecord
+from .job_schema import JobStatus, JobType
+
+
+class JobSubscription:
+    """
+    One subscriber's filtered view of job events.
+
+    Events are buffered up to ``max_buffer``; when a consumer falls behind
+    the oldest events are dropped and the next read returns an ``overflow``
+    event with the number lost, so publishing never waits on a consumer.
+    """
+
+    def __init__(
+        self,
+        broker: "JobEventBroker",
+        job_ids: Optional[Set[str]],
+        job_types: Optional[Set[str]],
+        statuses: Optional[Set[str]],
+        max_buffer: int
+    ):
+        self._broker = broker
+        self.job_ids = job_ids
+        self.job_types = job_types
+        self.statuses = statuses
+        self._buffer: Deque[str] = deque(maxlen=max_buffer)
+        self._waiter: Optional[asyncio.Future] = None
+        self.dropped = 0  # events lost since the last read
+        self.closed = False
+
+    def matches(self, job_type: str, status: str) -> bool:
+        """Check the type and status filters (job IDs are matched by the broker)."""
+        return (
+            (self.job_types is None or job_type in self.job_types)
+            and (self.statuses is None or status in self.statuses)
+        )
+
+    def push(self, event: str) -> None:
+        """Buffer an encoded event, dropping the oldest one if the buffer is full."""
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+            self._broker.dropped_total += 1
+        self._buffer.append(event)
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Wait for the next encoded event.
+
+        Args:
+            timeout: Seconds to wait before returning None
+
+        Returns:
+            JSON-encoded event, or None on timeout or once closed
+        """
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            return json.dumps({"event": "overflow", "dropped": dropped})
+
+        while not self._buffer:
+            if self.closed:
+                return None
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await asyncio.wait_for(self._waiter, timeout)
+            except asyncio.TimeoutError:
+                return None
+            finally:
+                self._waiter = None
+
+        return self._buffer.popleft()
+
+    def close(self) -> None:
+        """Stop receiving events."""
+        if self.closed:
+            return
+        self.closed = True
+        self._broker._remove(self)
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+
+class JobEventBroker:
+    """
+    Publishes job status changes to subscriptions.
+
+    Each change is encoded once and the same string is handed to every
+    matching subscriber. Subscribers filtering by job ID are indexed by ID,
+    so a change only visits the subscribers that can match it.
+    """
+
+    def __init__(self, max_buffer: int = 1000):
+        self.logger = logging.getLogger("job_events")
+        self.max_buffer = max_buffer
+        self._by_job: Dict[str, Set[JobSubscription]] = {}  # job_id -> subscriptions filtering on it
+        self._unfiltered: Set[JobSubscription] = set()  # subscriptions without a job ID filter
+        self._subscribers = 0
+        self._sequence = 0
+        self.published_total = 0
+        self.dropped_total = 0
+
+    def subscribe(
+        self,
+        job_ids: Optional[Iterable[str]] = None,
+        job_types: Optional[Iterable[JobType]] = None,
+        statuses: Optional[Iterable[JobStatus]] = None,
+        max_buffer: Optional[int] = None
+    ) -> JobSubscription:
+        """
+        Start receiving job events.
+
+        Args:
+            job_ids: Only events for these jobs
+            job_types: Only events for jobs of these types
+            statuses: Only events moving jobs into these statuses
+            max_buffer: Events buffered for a slow consumer (broker default if omitted)
+
+        Returns:
+            Subscription; call ``close`` when done
+        """
+        subscription = JobSubscription(
+            self,
+            job_ids=set(job_ids) if job_ids else None,
+            job_types={JobType(job_type).value for job_type in job_types} if job_types else None,
+            statuses={JobStatus(status).value for status in statuses} if statuses else None,
+            max_buffer=max_buffer or self.max_buffer
+        )
+        if subscription.job_ids is None:
+            self._unfiltered.add(subscription)
+        else:
+            for job_id in subscription.job_ids:
+                self._by_job.setdefault(job_id, set()).add(subscription)
+        self._subscribers += 1
+        return subscription
+
+    def publish(self, job: JobRecord) -> None:
+        """
+        Announce a job's current status to matching subscribers.
+
+        Args:
+            job: Job whose status was set
+        """
+        if not self._subscribers:
+            return
+
+        job_type = job.type
+        status = job.status.value
+        targets: List[JobSubscription] = [
+            subscription for subscription in self._unfiltered if subscription.matches(job_type, status)
+        ]
+        for subscription in self._by_job.get(job.id, ()):
+            if subscription.matches(job_type, status):
+                targets.append(subscription)
+        if not targets:
+            return
+
+        event = self.encode(job)
+        for subscription in targets:
+            subscription.push(event)
+
+    def encode(self, job: JobRecord) -> str:
+        """
+        Encode the status event for a job.
+
+        Args:
+            job: Job to describe
+
+        Returns:
+            JSON event string
+        """
+        self._sequence += 1
+        self.published_total += 1
+        failure_reason = job.failure_reason
+        return json.dumps({
+            "event": "status",
+            "seq": self._sequence,
+            "job_id": job.id,
+            "type": job.type,
+            "status": job.status.value,
+            "failure_reason": failure_reason.value if failure_reason else None,
+            "attempts": job.attempts,
+            "timestamp": round(time.time(), 6)
+        })
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get broker counters.
+
+        Returns:
+            Dict of broker statistics
+        """
+        return {
+            "subscribers": self._subscribers,
+            "published": self.published_total,
+            "dropped": self.dropped_total
+        }
+
+    def close(self) -> None:
+        """End every subscription."""
+        subscriptions = list(self._unfiltered)
+        for subscribers in self._by_job.values():
+            subscriptions.extend(subscribers)
+        for subscription in subscriptions:
+            subscription.close()
+
+    def _remove(self, subscription: JobSubscription) -> None:
+        """Forget a closed subscription."""
+        if subscription.job_ids is None:
+            self._unfiltered.discard(subscription)
+        else:
+            for job_id in subscription.job_ids:
+                subscribers = self._by_job.get(job_id)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._by_job[job_id]
+        self._subscribers -= 1
@@ -0,0 +1,375 @@
+"""
+Per-job log buffers with overflow spilled to disk.
+"""
+
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+from urllib.parse import quote
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+
+
+class _JobLog:
+    """Log state of one job: lines [0, spilled) are on disk, the rest in memory."""
+
+    __slots__ = ("lines", "buffered_bytes", "spilled", "spilled_bytes", "checkpoints", "waiters", "loading")
+
+    def __init__(self):
+        self.lines: Deque[str] = deque()
+        self.buffered_bytes = 0  # encoded size of the lines in memory
+        self.spilled = 0
+        self.spilled_bytes = 0
+        self.checkpoints: List[int] = []  # byte offset of every JobLogStore.checkpoint_lines-th spilled line
+        self.waiters: Set[asyncio.Future] = set()
+        self.loading: Optional[asyncio.Future] = None  # indexing of the job's existing file, while it runs
+
+    @property
+    def end(self) -> int:
+        return self.spilled + len(self.lines)
+
+
+class JobLogStore:
+    """
+    Log lines streamed in by services, addressed by line offset.
+
+    Each job keeps at most ``max_lines`` recent lines, and at most
+    ``max_bytes`` of them, in memory. When a job goes over, its oldest lines
+    are appended to a per-job file in one write, and all remaining lines are
+    written out once the job finishes, so memory only grows with the number
+    of jobs still producing output. A byte offset is remembered every
+    ``checkpoint_lines`` spilled lines so reads from disk seek close to the
+    requested line. File writes run in worker threads, one after another
+    per job, and reads wait for the writes before them. Without a directory
+    the files go to a temporary directory that is created on first spill and
+    removed on close.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_lines: int = 1000,
+        max_bytes: int = 256 * 1024,
+        checkpoint_lines: int = 1024
+    ):
+        """
+        Args:
+            directory: Directory for spilled log files
+            max_lines: Lines kept in memory per job
+            max_bytes: Encoded size of the lines kept in memory per job
+            checkpoint_lines: Spilled lines between remembered file offsets
+        """
+        self.logger = logging.getLogger("job_logs")
+        self.directory = directory
+        self._temporary = directory is None
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self.checkpoint_lines = checkpoint_lines
+        self._logs: Dict[str, _JobLog] = {}
+        self._writes: Dict[str, asyncio.Future] = {}  # job_id -> last queued file write
+        self._stats = {
+            "lines": 0,
+            "spilled_lines": 0,
+            "disk_reads": 0,
+            "removed_files": 0
+        }
+
+    async def append(self, job_id: str, lines: List[str]) -> int:
+        """
+        Add log lines to a job.
+
+        Args:
+            job_id: Job ID
+            lines: Lines without trailing newlines
+
+        Returns:
+            Offset after the last line, i.e. the job's line count
+        """
+        log = await self._get_log(job_id)
+        for line in lines:
+            log.lines.append(line)
+            log.buffered_bytes += len(line.encode("utf-8")) + 1
+        self._stats["lines"] += len(lines)
+        if len(log.lines) > self.max_lines or log.buffered_bytes > self.max_bytes:
+            # Spill down to half the buffer so spills happen once per half buffer of new output
+            self._spill(job_id, log, self.max_lines // 2, self.max_bytes // 2)
+        self._wake(log)
+        return log.end
+
+    async def read(self, job_id: str, since: int = 0, limit: int = 1000) -> Tuple[List[str], int]:
+        """
+        Read log lines of a job.
+
+        Args:
+            job_id: Job ID
+            since: Offset of the first line to return
+            limit: Maximum number of lines
+
+        Returns:
+            Tuple of (lines, offset after the last line returned)
+        """
+        lines: List[str] = []
+        offset = since
+        while len(lines) < limit:
+            log = self._logs.get(job_id)
+            if log is not None and log.loading is not None:
+                await asyncio.shield(log.loading)
+            if log is not None and offset >= log.spilled:
+                start = offset - log.spilled
+                chunk = [log.lines[i] for i in range(start, min(len(log.lines), start + limit - len(lines)))]
+                lines.extend(chunk)
+                offset += len(chunk)
+                break
+
+            # Lines on disk; wait for queued writes, later spills only append past the lines requested
+            stop = None if log is None else log.spilled
+            checkpoints = None if log is None else list(log.checkpoints)
+            await self._written(job_id)
+            count = limit - len(lines) if stop is None else min(limit - len(lines), stop - offset)
+            self._stats["disk_reads"] += 1
+            chunk = await asyncio.to_thread(self._read_file, job_id, offset, count, checkpoints)
+            lines.extend(chunk)
+            offset += len(chunk)
+            if len(chunk) < count or log is None:
+                break
+
+        return lines, offset
+
+    async def wait(self, job_id: str, offset: int, timeout: float) -> None:
+        """
+        Wait until a job has lines past an offset, or it finishes.
+
+        Args:
+            job_id: Job ID
+            offset: Offset already read
+            timeout: Maximum seconds to wait
+        """
+        log = await self._get_log(job_id)
+        if log.end > offset:
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        log.waiters.add(waiter)
+        try:
+            await asyncio.wait((waiter,), timeout=timeout)
+        finally:
+            log.waiters.discard(waiter)
+            if not log.waiters and not log.end and self._logs.get(job_id) is log:
+                # Followers of a job without output leave nothing behind
+                del self._logs[job_id]
+
+    def finish(self, job_id: str) -> None:
+        """
+        Queue the buffered lines of a finished job for writing and wake its followers.
+
+        Args:
+            job_id: Job ID
+        """
+        log = self._logs.get(job_id)
+        if log is None:
+            return
+        if log.loading is not None:
+            # The file is still being indexed; spill once its line count is known
+            log.loading.add_done_callback(lambda _loading: self.finish(job_id))
+            return
+        if log.lines:
+            self._spill(job_id, log, 0, 0)
+        self._wake(log)
+
+    def forget(self, job_id: str) -> None:
+        """
+        Drop the in-memory state of a job; its lines stay readable from disk.
+
+        Args:
+            job_id: Job ID
+        """
+        log = self._logs.get(job_id)
+        if log is not None and log.loading is not None:
+            log.loading.add_done_callback(lambda _loading: self.forget(job_id))
+            return
+        self.finish(job_id)
+        self._logs.pop(job_id, None)
+
+    def remove(self, job_id: str) -> bool:
+        """
+        Delete the log file of a job that is gone for good.
+
+        The job's in-memory state must already be dropped with ``forget``
+        and its writes finished; this is a blocking call meant for a worker
+        thread.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            True if a log file was deleted
+        """
+        if self.directory is None:
+            return False
+        try:
+            os.remove(self._path(job_id))
+        except FileNotFoundError:
+            return False
+        self._stats["removed_files"] += 1
+        return True
+
+    async def close(self) -> None:
+        """Write out every buffered line, removing the directory if it was temporary."""
+        for job_id in list(self._logs):
+            self.forget(job_id)
+        while self._writes:
+            await asyncio.wait(list(self._writes.values()))
+
+        if self._temporary and self.directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get log store counters.
+
+        Returns:
+            Dict of log store statistics
+        """
+        return {
+            **self._stats,
+            "jobs": len(self._logs),
+            "buffered_lines": sum(len(log.lines) for log in self._logs.values()),
+            "buffered_bytes": sum(log.buffered_bytes for log in self._logs.values()),
+            "pending_writes": len(self._writes),
+            "directory": self.directory
+        }
+
+    async def _get_log(self, job_id: str) -> _JobLog:
+        """Get the state of a job, rebuilding it from its file after a restart or ``forget``."""
+        log = self._logs.get(job_id)
+        if log is None:
+            log = _JobLog()
+            self._logs[job_id] = log
+            if self.directory or job_id in self._writes:
+                log.loading = asyncio.ensure_future(self._load(job_id, log))
+        if log.loading is not None:
+            await asyncio.shield(log.loading)
+        return log
+
+    async def _load(self, job_id: str, log: _JobLog) -> None:
+        """Index a job's existing file in a worker thread once its queued writes are done."""
+        try:
+            await self._written(job_id)
+            await asyncio.to_thread(self._index_file, job_id, log)
+        except OSError as e:
+            self.logger.error(f"Failed to index the log file of job {job_id}: {e}")
+        finally:
+            log.loading = None
+
+    async def _written(self, job_id: str) -> None:
+        """Wait until every write queued for a job so far is on disk."""
+        write = self._writes.get(job_id)
+        if write is not None:
+            await asyncio.wait((write,))
+
+    def _spill(self, job_id: str, log: _JobLog, keep_lines: int, keep_bytes: int) -> None:
+        """Move the oldest buffered lines to the job's file until at most ``keep_lines`` and ``keep_bytes`` remain."""
+        chunks = []
+        position = log.spilled_bytes
+        number = log.spilled
+        while log.lines and (len(log.lines) > keep_lines or log.buffered_bytes > keep_bytes):
+            encoded = log.lines.popleft().encode("utf-8") + b"\n"
+            log.buffered_bytes -= len(encoded)
+            if number % self.checkpoint_lines == 0:
+                log.checkpoints.append(position)
+            chunks.append(encoded)
+            position += len(encoded)
+            number += 1
+
+        self._stats["spilled_lines"] += number - log.spilled
+        log.spilled = number
+        log.spilled_bytes = position
+        if chunks:
+            self._queue_write(job_id, b"".join(chunks))
+
+    def _queue_write(self, job_id: str, data: bytes) -> None:
+        """Append data to a job's file in a worker thread, after the job's earlier writes."""
+        write = asyncio.ensure_future(self._write_after(self._writes.get(job_id), job_id, data))
+        self._writes[job_id] = write
+        write.add_done_callback(lambda done: self._write_done(job_id, done))
+
+    def _write_done(self, job_id: str, write: asyncio.Future) -> None:
+        """Stop tracking a job's writes once its last queued one is done."""
+        if self._writes.get(job_id) is write:
+            del self._writes[job_id]
+
+    async def _write_after(self, previous: Optional[asyncio.Future], job_id: str, data: bytes) -> None:
+        """Wait for the previous write of a job, then append to its file."""
+        if previous is not None:
+            await asyncio.wait((previous,))
+        try:
+            await asyncio.to_thread(self._append_file, job_id, data)
+        except OSError as e:
+            self.logger.error(f"Failed to write log lines of job {job_id}: {e}")
+
+    def _append_file(self, job_id: str, data: bytes) -> None:
+        """Append encoded lines to a job's file."""
+        if self.directory is None:
+            self.directory = tempfile.mkdtemp(prefix="mcp_job_logs_")
+        os.makedirs(self.directory, exist_ok=True)
+
+        # Buffered append without fsync; a small write to the page cache
+        with open(self._path(job_id), "ab") as log_file:
+            log_file.write(data)
+
+    def _index_file(self, job_id: str, log: _JobLog) -> None:
+        """Count the lines of an existing file and rebuild its checkpoints."""
+        position = 0
+        try:
+            log_file = open(self._path(job_id), "rb")
+        except FileNotFoundError:
+            return
+
+        with log_file:
+            for number, line in enumerate(log_file):
+                if number % self.checkpoint_lines == 0:
+                    log.checkpoints.append(position)
+                position += len(line)
+                log.spilled = number + 1
+        log.spilled_bytes = position
+
+    def _read_file(self, job_id: str, since: int, count: int, checkpoints: Optional[List[int]]) -> List[str]:
+        """Read up to ``count`` lines from a job's file, starting at line ``since``."""
+        if self.directory is None:
+            return []
+
+        try:
+            log_file = open(self._path(job_id), "rb")
+        except FileNotFoundError:
+            return []
+
+        lines = []
+        with log_file:
+            number = 0
+            if checkpoints:
+                index = min(since // self.checkpoint_lines, len(checkpoints) - 1)
+                log_file.seek(checkpoints[index])
+                number = index * self.checkpoint_lines
+
+            for line in log_file:
+                if not line.endswith(b"\n"):
+                    break
+                if number >= since:
+                    lines.append(line[:-1].decode("utf-8", errors="replace"))
+                    if len(lines) >= count:
+                        break
+                number += 1
+
+        return lines
+
+    def _wake(self, log: _JobLog) -> None:
+        """Resolve the futures of ``wait`` callers."""
+        for waiter in log.waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.directory, quote(job_id, safe="") + ".log")
@@ -0,0 +1,233 @@
+"""
+Compact in-memory job records for MCP Core.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence
+import time
+import uuid
+
+from .job_schema import JobFailureReason, JobPriority, JobResponse, JobStatus, JobType, ResultReference
+from ..artifacts.artifact_schema import ArtifactReference
+from ..utils.timestamps import datetime_to_epoch, epoch_to_datetime
+
+
+# Enum members by their stored code
+_TYPES = tuple(JobType)
+_PRIORITIES = tuple(JobPriority)
+_STATUSES = tuple(JobStatus)
+_FAILURE_REASONS = tuple(JobFailureReason)
+
+# Enum value -> stored code
+_TYPE_CODES = {member.value: code for code, member in enumerate(_TYPES)}
+_PRIORITY_CODES = {member.value: code for code, member in enumerate(_PRIORITIES)}
+_STATUS_CODES = {member.value: code for code, member in enumerate(_STATUSES)}
+_FAILURE_REASON_CODES = {member.value: code for code, member in enumerate(_FAILURE_REASONS)}
+
+
+def _isoformat(value: Optional[float]) -> Optional[str]:
+    """Format an optional epoch timestamp the way pydantic serializes datetimes."""
+    return None if value is None else epoch_to_datetime(value).isoformat()
+
+
+class JobRecord:
+    """
+    Job state as stored by the orchestrator.
+
+    Exposes the same attributes as the ``Job`` model, but enums are kept as
+    small integer codes and timestamps as epoch seconds in ``__slots__``, and
+    nothing is validated on assignment. Pydantic models are only built at
+    the API edge through ``to_response``, or skipped entirely with
+    ``to_json_dict``.
+    """
+
+    __slots__ = (
+        "id", "payload", "tenant", "metadata", "result", "result_ref", "error",
+        "fingerprint", "coalesced_with", "input_artifacts", "use_cache", "cache_hit", "attempts",
+        "_type", "_priority", "_status", "_failure_reason",
+        "created_ts", "started_ts", "completed_ts", "deadline_ts"
+    )
+
+    def __init__(
+        self,
+        type: JobType,
+        payload: Dict[str, Any],
+        priority: JobPriority = JobPriority.NORMAL,
+        tenant: str = "default",
+        metadata: Optional[Dict[str, Any]] = None,
+        id: Optional[str] = None,
+        created_ts: Optional[float] = None
+    ):
+        self.id = id or str(uuid.uuid4())
+        self._type = _TYPE_CODES[JobType(type).value]
+        self._priority = _PRIORITY_CODES[JobPriority(priority).value]
+        self._status = _STATUS_CODES[JobStatus.PENDING.value]
+        self._failure_reason: Optional[int] = None
+        self.payload = payload
+        self.tenant = tenant  # owner key used for fair queuing
+        self.metadata = metadata if metadata is not None else {}
+        self.result: Optional[Dict[str, Any]] = None
+        self.result_ref: Optional[Dict[str, Any]] = None  # ResultReference fields when ``result`` is a summary
+        self.error: Optional[str] = None
+        self.fingerprint: Optional[str] = None  # payload hash, set for coalescing jobs
+        self.coalesced_with: Optional[str] = None  # job whose execution this job shares
+        self.input_artifacts: Sequence[ArtifactReference] = ()
+        self.use_cache = False
+        self.cache_hit = False
+        self.attempts = 0  # dispatches to the external service so far
+        # Microsecond precision keeps (created_ts, id) keys in step with the created_at datetimes in cursors
+        self.created_ts = round(time.time(), 6) if created_ts is None else created_ts
+        self.started_ts: Optional[float] = None
+        self.completed_ts: Optional[float] = None
+        self.deadline_ts: Optional[float] = None  # queue wait plus execution must finish by this time
+
+    @property
+    def type(self) -> str:
+        return _TYPES[self._type].value
+
+    @property
+    def priority(self) -> str:
+        return _PRIORITIES[self._priority].value
+
+    @property
+    def status(self) -> JobStatus:
+        return _STATUSES[self._status]
+
+    @status.setter
+    def status(self, value: JobStatus) -> None:
+        self._status = _STATUS_CODES[JobStatus(value).value]
+
+    @property
+    def failure_reason(self) -> Optional[JobFailureReason]:
+        return None if self._failure_reason is None else _FAILURE_REASONS[self._failure_reason]
+
+    @failure_reason.setter
+    def failure_reason(self, value: Optional[JobFailureReason]) -> None:
+        self._failure_reason = None if value is None else _FAILURE_REASON_CODES[JobFailureReason(value).value]
+
+    @property
+    def created_at(self) -> datetime:
+        return epoch_to_datetime(self.created_ts)
+
+    @property
+    def started_at(self) -> Optional[datetime]:
+        return None if self.started_ts is None else epoch_to_datetime(self.started_ts)
+
+    @property
+    def completed_at(self) -> Optional[datetime]:
+        return None if self.completed_ts is None else epoch_to_datetime(self.completed_ts)
+
+    @property
+    def deadline(self) -> Optional[datetime]:
+        return None if self.deadline_ts is None else epoch_to_datetime(self.deadline_ts)
+
+    def to_response(self) -> JobResponse:
+        """
+        Build the API model for this job without re-validating its fields.
+
+        Returns:
+            Job response
+        """
+        return JobResponse.model_construct(
+            id=self.id,
+            type=self.type,
+            status=self.status.value,
+            priority=self.priority,
+            tenant=self.tenant,
+            created_at=self.created_at,
+            started_at=self.started_at,
+            completed_at=self.completed_at,
+            result=self.result,
+            result_ref=None if self.result_ref is None else ResultReference.model_construct(**self.result_ref),
+            error=self.error,
+            failure_reason=self.failure_reason.value if self.failure_reason else None,
+            deadline=self.deadline,
+            metadata=self.metadata,
+            coalesced_with=self.coalesced_with,
+            cache_hit=self.cache_hit,
+            attempts=self.attempts
+        )
+
+    def to_json_dict(self) -> Dict[str, Any]:
+        """
+        Build the JSON form of ``to_response`` directly.
+
+        Returns:
+            Dict with the same shape and values as the serialized JobResponse
+        """
+        failure_reason = self.failure_reason
+        return {
+            "id": self.id,
+            "type": self.type,
+            "status": self.status.value,
+            "priority": self.priority,
+            "tenant": self.tenant,
+            "created_at": _isoformat(self.created_ts),
+            "started_at": _isoformat(self.started_ts),
+            "completed_at": _isoformat(self.completed_ts),
+            "result": self.result,
+            "result_ref": self.result_ref,
+            "error": self.error,
+            "failure_reason": failure_reason.value if failure_reason else None,
+            "deadline": _isoformat(self.deadline_ts),
+            "metadata": self.metadata,
+            "coalesced_with": self.coalesced_with,
+            "cache_hit": self.cache_hit,
+            "attempts": self.attempts
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialize every field, in the JSON shape of the ``Job`` model.
+
+        Returns:
+            JSON-compatible dict accepted by ``from_dict``
+        """
+        data = self.to_json_dict()
+        data.update({
+            "payload": self.payload,
+            "fingerprint": self.fingerprint,
+            "input_artifacts": [ref.model_dump(mode="json") for ref in self.input_artifacts],
+            "use_cache": self.use_cache
+        })
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "JobRecord":
+        """
+        Rebuild a record from ``to_dict`` output.
+
+        Args:
+            data: Serialized job
+
+        Returns:
+            Job record
+        """
+        def epoch(key: str) -> Optional[float]:
+            value = data.get(key)
+            return None if value is None else datetime_to_epoch(datetime.fromisoformat(value))
+
+        record = cls(
+            type=data["type"],
+            payload=data.get("payload") or {},
+            priority=data.get("priority", JobPriority.NORMAL),
+            tenant=data.get("tenant", "default"),
+            metadata=data.get("metadata"),
+            id=data["id"],
+            created_ts=epoch("created_at")
+        )
+        record.status = data["status"]
+        record.failure_reason = data.get("failure_reason")
+        record.result = data.get("result")
+        record.result_ref = data.get("result_ref")
+        record.error = data.get("error")
+        record.fingerprint = data.get("fingerprint")
+        record.coalesced_with = data.get("coalesced_with")
+        record.input_artifacts = [ArtifactReference.model_validate(ref) for ref in data.get("input_artifacts") or ()]
+        record.use_cache = data.get("use_cache", False)
+        record.cache_hit = data.get("cache_hit", False)
+        record.attempts = data.get("attempts", 0)
+        record.started_ts = epoch("started_at")
+        record.completed_ts = epoch("completed_at")
+        record.deadline_ts = epoch("deadline")
+        return record
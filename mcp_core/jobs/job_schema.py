@@ -8,6 +8,8 @@ from datetime import datetime
 from pydantic import BaseModel, Field
 import uuid
 
+from ..artifacts.artifact_schema import ArtifactReference
+
 
 class JobStatus(str, Enum):
     """Job execution status."""
@@ -18,6 +20,9 @@ class JobStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
+TERMINAL_STATUSES = frozenset({JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED})
+
+
 class JobType(str, Enum):
     """Supported job types."""
     ML_EXPERIMENT = "ml_experiment"
@@ -25,20 +30,55 @@ class JobType(str, Enum):
     GENERIC = "generic"
 
 
+class JobFailureReason(str, Enum):
+    """Why a job ended in the FAILED state."""
+    TIMED_OUT = "timed_out"  # deadline passed while queued or running
+    SERVICE_ERROR = "service_error"  # the external service failed or was unreachable
+    ERROR = "error"  # any other orchestration error
+
+
+class JobPriority(str, Enum):
+    """Job priority classes, dispatched in strict order."""
+    HIGH = "high"
+    NORMAL = "normal"
+    LOW = "low"
+
+
+class ResultReference(BaseModel):
+    """
+    Marks a result kept out of line; the job's ``result`` holds only a summary.
+    
+    The full result is served by GET /jobs/{id}/result.
+    """
+    
+    size: int  # bytes of the full result as JSON
+    omitted_keys: int = 0  # top-level result fields left out of the summary
+
+
 class Job(BaseModel):
     """Job model representing a task to be executed."""
     
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     type: JobType
     payload: Dict[str, Any]
+    priority: JobPriority = JobPriority.NORMAL
+    tenant: str = "default"  # owner key used for fair queuing
     status: JobStatus = JobStatus.PENDING
     created_at: datetime = Field(default_factory=datetime.utcnow)
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     result: Optional[Dict[str, Any]] = None
+    result_ref: Optional[ResultReference] = None  # set when the full result is stored out of line
     error: Optional[str] = None
-    logs: List[str] = Field(default_factory=list)
+    failure_reason: Optional[JobFailureReason] = None
+    deadline: Optional[datetime] = None  # queue wait plus execution must finish by this time
     metadata: Dict[str, Any] = Field(default_factory=dict)
+    fingerprint: Optional[str] = None  # payload hash, set for coalescing jobs
+    coalesced_with: Optional[str] = None  # job whose execution this job shares
+    input_artifacts: List[ArtifactReference] = Field(default_factory=list)
+    use_cache: bool = False
+    cache_hit: bool = False
+    attempts: int = 0  # dispatches to the external service so far
     
     class Config:
         use_enum_values = True
@@ -49,7 +89,13 @@ class JobSubmission(BaseModel):
     
     type: JobType
     payload: Dict[str, Any]
-    metadata: Optional[Dict[str, Any]] = None
+    priority: JobPriority = JobPriority.NORMAL
+    metadata: Optional[Dict[str, Any]] = None  # "tenant" or "owner" selects the fair-queuing tenant
+    coalesce: bool = False  # share execution with an identical in-flight job
+    input_artifacts: List[ArtifactReference] = Field(default_factory=list)  # artifacts the payload reads
+    use_cache: bool = False  # reuse a cached result for identical payload and inputs
+    idempotency_key: Optional[str] = None  # repeat submissions with this key return the original job
+    timeout_seconds: Optional[float] = Field(default=None, gt=0)  # budget for queue wait plus execution
 
 
 class JobResponse(BaseModel):
@@ -58,13 +104,53 @@ class JobResponse(BaseModel):
     id: str
     type: JobType
     status: JobStatus
+    priority: JobPriority = JobPriority.NORMAL
+    tenant: str = "default"
     created_at: datetime
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     result: Optional[Dict[str, Any]] = None
+    result_ref: Optional[ResultReference] = None
     error: Optional[str] = None
-    logs: List[str] = []
+    failure_reason: Optional[JobFailureReason] = None
+    deadline: Optional[datetime] = None
     metadata: Dict[str, Any] = {}
+    coalesced_with: Optional[str] = None
+    cache_hit: bool = False
+    attempts: int = 0
     
     class Config:
         use_enum_values = True
+
+
+class JobBatchItem(BaseModel):
+    """Outcome of one submission within a batch."""
+    
+    index: int
+    job_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class JobBatchResponse(BaseModel):
+    """Model for batch job submission responses."""
+    
+    submitted: int
+    failed: int
+    results: List[JobBatchItem]
+
+
+class JobCompletion(BaseModel):
+    """
+    Outcome reported by a callback-mode service through POST /jobs/{id}/complete.
+    
+    Same shape as the body a sync-mode service returns from /execute; it is
+    stored as the job's result.
+    """
+    
+    status: str = "completed"
+    result: Optional[Dict[str, Any]] = None
+    artifacts: List[Dict[str, Any]] = Field(default_factory=list)
+    error: Optional[str] = None
+    
+    class Config:
+        extra = "allow"
@@ -0,0 +1,260 @@
+"""
+Content-addressed job result cache for MCP Core.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from ..utils.hashing import canonical_json
+
+# Cached results at least this large are decoded off the event loop
+DECODE_THREAD_THRESHOLD = 256 * 1024
+
+
+class ResultCache:
+    """
+    Two-tier cache of job results keyed by job inputs.
+
+    The memory tier is an LRU bounded by entry count and total bytes. The
+    optional disk tier is a SQLite file that survives restarts and is bounded
+    by its own byte budget. Entries in both tiers expire after ``ttl_seconds``.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: Optional[float] = 7 * 24 * 3600,
+        disk_path: Optional[str] = None,
+        max_disk_bytes: int = 1024 * 1024 * 1024
+    ):
+        self.logger = logging.getLogger("result_cache")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.disk_path = disk_path
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()  # key -> (stored_at, encoded result)
+        self._memory_bytes = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._disk_bytes = 0
+
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expirations": 0
+        }
+
+        if disk_path:
+            self._open_disk_tier(disk_path)
+
+    @staticmethod
+    def make_key(job_type: str, payload: Dict[str, Any], input_checksums: Dict[str, str]) -> str:
+        """
+        Build a cache key from a job's canonical inputs.
+
+        Args:
+            job_type: Job type value
+            payload: Job payload
+            input_checksums: artifact_id -> checksum for every transitive input artifact
+
+        Returns:
+            Hex-encoded SHA-256 digest
+        """
+        return hashlib.sha256(canonical_json({
+            "type": job_type,
+            "payload": payload,
+            "inputs": input_checksums
+        })).hexdigest()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached result or None on a miss
+        """
+        entry = self._memory.get(key)
+        if entry is not None:
+            stored_at, encoded = entry
+            if not self._is_expired(stored_at):
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return await self._decode(encoded)
+            self._evict_memory(key)
+            self._stats["expirations"] += 1
+
+        if self._db is not None:
+            row = await asyncio.to_thread(self._disk_get, key)
+            if row is not None:
+                stored_at, encoded = row
+                self._stats["disk_hits"] += 1
+                self._put_memory(key, stored_at, encoded)
+                return await self._decode(encoded)
+
+        self._stats["misses"] += 1
+        return None
+
+    async def put(self, key: str, result: Dict[str, Any]) -> None:
+        """
+        Store a result in both tiers.
+
+        Args:
+            key: Cache key
+            result: Result to cache
+        """
+        encoded = canonical_json(result)
+        stored_at = time.time()
+
+        self._put_memory(key, stored_at, encoded)
+        if self._db is not None:
+            await asyncio.to_thread(self._disk_put, key, stored_at, encoded)
+
+        self._stats["stores"] += 1
+
+    def close(self) -> None:
+        """Close the disk tier."""
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters and tier usage.
+
+        Returns:
+            Dict of cache statistics
+        """
+        lookups = self._stats["memory_hits"] + self._stats["disk_hits"] + self._stats["misses"]
+        hits = lookups - self._stats["misses"]
+
+        return {
+            **self._stats,
+            "hit_ratio": round(hits / lookups, 4) if lookups else None,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "disk_enabled": self._db is not None,
+            "disk_bytes": self._disk_bytes
+        }
+
+    @staticmethod
+    async def _decode(encoded: bytes) -> Dict[str, Any]:
+        """Decode a cached result, in a worker thread when it is large."""
+        if len(encoded) >= DECODE_THREAD_THRESHOLD:
+            return await asyncio.to_thread(json.loads, encoded)
+        return json.loads(encoded)
+
+    def _is_expired(self, stored_at: float) -> bool:
+        """Check whether an entry stored at the given time has expired."""
+        return self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds
+
+    def _put_memory(self, key: str, stored_at: float, encoded: bytes) -> None:
+        """Insert into the memory tier, evicting least recently used entries."""
+        if len(encoded) > self.max_bytes:
+            return
+
+        if key in self._memory:
+            self._evict_memory(key)
+
+        self._memory[key] = (stored_at, encoded)
+        self._memory_bytes += len(encoded)
+
+        while len(self._memory) > self.max_entries or self._memory_bytes > self.max_bytes:
+            oldest_key = next(iter(self._memory))
+            self._evict_memory(oldest_key)
+            self._stats["evictions"] += 1
+
+    def _evict_memory(self, key: str) -> None:
+        """Remove an entry from the memory tier."""
+        _, encoded = self._memory.pop(key)
+        self._memory_bytes -= len(encoded)
+
+    def _open_disk_tier(self, path: str) -> None:
+        """Open (or create) the SQLite disk tier."""
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+            "stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_accessed_at ON results (accessed_at)")
+        self._db.commit()
+
+        self._disk_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        self.logger.info(f"Opened result cache at {path} ({self._disk_bytes} bytes)")
+
+    def _disk_get(self, key: str) -> Optional[Tuple[float, bytes]]:
+        """Read an entry from the disk tier, dropping it if expired."""
+        with self._db_lock:
+            row = self._db.execute("SELECT stored_at, value, size FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+
+            stored_at, value, size = row
+            if self._is_expired(stored_at):
+                self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                self._db.commit()
+                self._disk_bytes -= size
+                self._stats["expirations"] += 1
+                return None
+
+            self._db.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            return stored_at, bytes(value)
+
+    def _disk_put(self, key: str, stored_at: float, encoded: bytes) -> None:
+        """Write an entry to the disk tier and enforce the disk budget."""
+        if len(encoded) > self.max_disk_bytes:
+            return
+
+        with self._db_lock:
+            existing = self._db.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+            if existing:
+                self._disk_bytes -= existing[0]
+
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, value, size, stored_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, encoded, len(encoded), stored_at, stored_at)
+            )
+            self._disk_bytes += len(encoded)
+
+            # Evict expired entries first, then least recently used ones
+            if self.ttl_seconds is not None:
+                cutoff = time.time() - self.ttl_seconds
+                count, size = self._db.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results WHERE stored_at < ?", (cutoff,)
+                ).fetchone()
+                if count:
+                    self._db.execute("DELETE FROM results WHERE stored_at < ?", (cutoff,))
+                    self._disk_bytes -= size
+                    self._stats["expirations"] += count
+
+            while self._disk_bytes > self.max_disk_bytes:
+                row = self._db.execute(
+                    "SELECT key, size FROM results ORDER BY accessed_at LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    break
+                self._db.execute("DELETE FROM results WHERE key = ?", (row[0],))
+                self._disk_bytes -= row[1]
+                self._stats["evictions"] += 1
+
+            self._db.commit()
@@ -0,0 +1,211 @@
+"""
+Out-of-line storage for large job results.
+"""
+
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from urllib.parse import quote
+import asyncio
+import json
+import logging
+import mmap
+import os
+import shutil
+import tempfile
+
+from ..utils.hashing import estimate_json_size
+
+
+# Top-level result entries kept inline in the summary of a stored result
+SUMMARY_MAX_KEYS = 16
+SUMMARY_MAX_CHARS = 200
+
+
+class ResultStore:
+    """
+    Files holding job results too large to keep on the job record.
+
+    A result over ``inline_limit`` bytes (estimated as JSON) is written to
+    one file per job, and the job keeps a summary of its small top-level
+    fields plus a reference. Files are encoded and written in a worker
+    thread, and read back through a memory map in chunks, so serving a large
+    result neither loads it into memory nor blocks the event loop. Without
+    a directory the files go to a temporary directory that is created on
+    first write and removed on close.
+    """
+
+    def __init__(self, directory: Optional[str] = None, inline_limit: int = 64 * 1024, chunk_size: int = 1024 * 1024):
+        """
+        Args:
+            directory: Directory for result files
+            inline_limit: Largest result in bytes kept on the job record
+            chunk_size: Bytes per chunk when streaming a stored result
+        """
+        self.logger = logging.getLogger("result_store")
+        self.directory = directory
+        self._temporary = directory is None
+        self.inline_limit = inline_limit
+        self.chunk_size = chunk_size
+        self._stats = {
+            "stored": 0,
+            "stored_bytes": 0,
+            "removed": 0,
+            "reads": 0
+        }
+
+    async def store(self, job_id: str, result: Any) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """
+        Write a result to a file if it is too large to keep inline.
+
+        Args:
+            job_id: Job ID the file is named after
+            result: Result as returned by the service
+
+        Returns:
+            Tuple of (summary, reference) for a stored result, or None if
+            the result should stay on the job record
+        """
+        if not isinstance(result, dict) or estimate_json_size(result, self.inline_limit) <= self.inline_limit:
+            return None
+
+        size = await asyncio.to_thread(self._write, job_id, result)
+        self._stats["stored"] += 1
+        self._stats["stored_bytes"] += size
+
+        summary = {}
+        omitted = 0
+        for key, value in result.items():
+            small = value is None or isinstance(value, (bool, int, float)) or (
+                isinstance(value, str) and len(value) <= SUMMARY_MAX_CHARS
+            )
+            if small and len(summary) < SUMMARY_MAX_KEYS:
+                summary[key] = value
+            else:
+                omitted += 1
+        return summary, {"size": size, "omitted_keys": omitted}
+
+    def link(self, job_id: str, other_job_id: str) -> None:
+        """
+        Make a stored result available under another job as well.
+
+        Args:
+            job_id: Job whose result is stored
+            other_job_id: Job that shares the result
+        """
+        try:
+            os.link(self._path(job_id), self._path(other_job_id))
+        except FileExistsError:
+            pass
+        except OSError:
+            shutil.copyfile(self._path(job_id), self._path(other_job_id))
+
+    def remove(self, job_id: str) -> bool:
+        """
+        Delete a job's stored result.
+
+        Jobs sharing the result through ``link`` hold their own hard link
+        (or copy) of the file, so their result stays readable until they
+        are removed too.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            True if a stored result was deleted
+        """
+        if self.directory is None:
+            return False
+        try:
+            os.remove(self._path(job_id))
+        except FileNotFoundError:
+            return False
+        self._stats["removed"] += 1
+        return True
+
+    def size(self, job_id: str) -> Optional[int]:
+        """
+        Get the size of a stored result.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            Size in bytes, or None if no result is stored for the job
+        """
+        if self.directory is None:
+            return None
+        try:
+            return os.stat(self._path(job_id)).st_size
+        except FileNotFoundError:
+            return None
+
+    async def iter_chunks(self, job_id: str) -> AsyncIterator[bytes]:
+        """
+        Read a stored result as JSON bytes.
+
+        Chunks are copied out of a memory map of the file in a worker
+        thread, so pages that are not cached fault in off the event loop.
+
+        Args:
+            job_id: Job ID
+
+        Yields:
+            Chunks of at most ``chunk_size`` bytes
+        """
+        mapped = await asyncio.to_thread(self._map, job_id)
+        if mapped is None:
+            return
+
+        self._stats["reads"] += 1
+        try:
+            for start in range(0, len(mapped), self.chunk_size):
+                yield await asyncio.to_thread(mapped.__getitem__, slice(start, start + self.chunk_size))
+        finally:
+            mapped.close()
+
+    def close(self) -> None:
+        """Remove the directory if it was temporary; stored results are kept otherwise."""
+        if self._temporary and self.directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get result store counters.
+
+        Returns:
+            Dict of result store statistics
+        """
+        return {
+            **self._stats,
+            "inline_limit": self.inline_limit,
+            "directory": self.directory
+        }
+
+    def _write(self, job_id: str, result: Dict[str, Any]) -> int:
+        """Encode a result and atomically replace the job's file with it."""
+        if self.directory is None:
+            self.directory = tempfile.mkdtemp(prefix="mcp_results_")
+        os.makedirs(self.directory, exist_ok=True)
+
+        encoded = json.dumps(result, separators=(",", ":"), default=str).encode("utf-8")
+        path = self._path(job_id)
+        with open(path + ".tmp", "wb") as result_file:
+            result_file.write(encoded)
+        os.replace(path + ".tmp", path)
+        return len(encoded)
+
+    def _map(self, job_id: str) -> Optional[mmap.mmap]:
+        """Memory-map a stored result read-only."""
+        if self.directory is None:
+            return None
+        try:
+            with open(self._path(job_id), "rb") as result_file:
+                return mmap.mmap(result_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            # Empty files cannot be mapped
+            return None
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.directory, quote(job_id, safe="") + ".json")
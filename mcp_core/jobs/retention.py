@@ -0,0 +1,210 @@
+"""
+Retention limits and on-disk archive for finished jobs.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import zlib
+
+from pydantic import BaseModel, Field
+
+from .job_record import JobRecord
+from ..utils.hashing import estimate_json_size
+
+# Encoded size of a job's IDs, enums and timestamps
+JOB_FIXED_FIELDS_BYTES = 512
+
+
+class RetentionPolicy(BaseModel):
+    """Limits on how many finished jobs stay in memory, and how long the archive keeps them."""
+
+    max_terminal_jobs: Optional[int] = Field(default=10000, ge=0)  # finished jobs kept in memory
+    max_age_seconds: Optional[float] = Field(default=24 * 3600, ge=0)  # since completion
+    max_terminal_bytes: Optional[int] = Field(default=256 * 1024 * 1024, ge=0)  # encoded size of kept jobs
+    archive_max_age_seconds: Optional[float] = Field(default=None, ge=0)  # since completion, then deleted
+    sweep_interval: float = Field(default=60.0, gt=0)  # seconds between age checks
+
+
+def estimate_job_size(job: JobRecord, limit: int) -> int:
+    """
+    Estimate the encoded size of a finished job without serializing it.
+
+    Args:
+        job: Finished job
+        limit: Size in bytes after which the estimate stops growing
+
+    Returns:
+        Estimated size in bytes
+    """
+    return JOB_FIXED_FIELDS_BYTES + estimate_json_size(
+        [job.payload, job.result, job.error, job.metadata], limit
+    )
+
+
+class JobArchive:
+    """
+    SQLite archive of evicted jobs.
+
+    Each job is stored as zlib-compressed JSON under its ID. Without an
+    explicit path the archive lives in a temporary file that is created on
+    first write and removed on close.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.logger = logging.getLogger("job_archive")
+        self.path = path
+        self._temporary = path is None
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._stats = {
+            "archived": 0,
+            "expired": 0,
+            "lookups": 0,
+            "hits": 0
+        }
+
+        if path and os.path.exists(path):
+            self._open()
+
+    async def put_many(self, jobs: Iterable[JobRecord]) -> None:
+        """
+        Archive finished jobs.
+
+        Args:
+            jobs: Jobs to archive
+        """
+        rows = [
+            (
+                job.id,
+                job.type,
+                job.status.value,
+                job.created_ts,
+                job.completed_ts,
+                zlib.compress(json.dumps(job.to_dict(), separators=(",", ":"), default=str).encode("utf-8"))
+            )
+            for job in jobs
+        ]
+        if rows:
+            await asyncio.to_thread(self._put_rows, rows)
+
+    async def get(self, job_id: str) -> Optional[JobRecord]:
+        """
+        Load an archived job.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            The archived job or None if it is not in the archive
+        """
+        self._stats["lookups"] += 1
+        if self._db is None:
+            return None
+
+        data = await asyncio.to_thread(self._get_row, job_id)
+        if data is None:
+            return None
+
+        self._stats["hits"] += 1
+        return JobRecord.from_dict(json.loads(zlib.decompress(data)))
+
+    async def expire(self, completed_before: float) -> List[str]:
+        """
+        Delete archived jobs that finished before a cutoff.
+
+        Args:
+            completed_before: Epoch seconds; older jobs are deleted
+
+        Returns:
+            IDs of the deleted jobs
+        """
+        if self._db is None:
+            return []
+        return await asyncio.to_thread(self._delete_rows, completed_before)
+
+    def close(self) -> None:
+        """Close the archive, removing it if it was temporary."""
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
+
+        if self._temporary and self.path:
+            for suffix in ("", "-wal", "-shm"):
+                try:
+                    os.remove(self.path + suffix)
+                except FileNotFoundError:
+                    pass
+            self.path = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get archive counters.
+
+        Returns:
+            Dict of archive statistics
+        """
+        return {
+            **self._stats,
+            "path": self.path,
+            "temporary": self._temporary
+        }
+
+    def _open(self) -> None:
+        """Open (or create) the archive database."""
+        if self.path is None:
+            fd, self.path = tempfile.mkstemp(prefix="mcp_job_archive_", suffix=".sqlite3")
+            os.close(fd)
+
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, type TEXT NOT NULL, status TEXT NOT NULL, "
+            "created_at REAL NOT NULL, completed_at REAL, data BLOB NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_completed ON jobs (completed_at)")
+        self._db.commit()
+        self.logger.info(f"Opened job archive at {self.path}")
+
+    def _put_rows(self, rows: List[tuple]) -> None:
+        """Write archive rows in one transaction."""
+        with self._db_lock:
+            if self._db is None:
+                self._open()
+            self._db.executemany(
+                "INSERT OR REPLACE INTO jobs (id, type, status, created_at, completed_at, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._db.commit()
+            self._stats["archived"] += len(rows)
+
+    def _delete_rows(self, completed_before: float) -> List[str]:
+        """Delete the rows of jobs completed before a cutoff in one transaction."""
+        with self._db_lock:
+            if self._db is None:
+                return []
+            job_ids = [
+                job_id for job_id, in self._db.execute(
+                    "SELECT id FROM jobs WHERE completed_at < ?", (completed_before,)
+                )
+            ]
+            self._db.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in job_ids])
+            self._db.commit()
+            self._stats["expired"] += len(job_ids)
+            return job_ids
+
+    def _get_row(self, job_id: str) -> Optional[bytes]:
+        """Read the compressed record of an archived job."""
+        with self._db_lock:
+            if self._db is None:
+                return None
+            row = self._db.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return bytes(row[0]) if row else None
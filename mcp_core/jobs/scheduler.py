@@ -0,0 +1,419 @@
+"""
+Job admission queue and concurrency-limited scheduling for MCP Core.
+"""
+
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+import heapq
+import itertools
+import logging
+import time
+
+from .job_record import JobRecord
+from .job_schema import JobPriority, JobType
+
+
+class QueueFullError(Exception):
+    """Raised when the pending job queue has reached its capacity."""
+    pass
+
+
+class JobScheduler:
+    """
+    Bounded pending queue with per-job-type and per-service concurrency limits.
+
+    Jobs are admitted into a bounded queue and handed out by ``pop_ready`` only
+    when both their job type and the service URL that will execute them have a
+    free slot. Slots are returned with ``release`` once execution finishes.
+
+    Priority classes are served in strict order. Within a class, tenants share
+    dispatch capacity through weighted fair queuing: every job is stamped with a
+    virtual finish time ``max(V, last_finish[tenant]) + 1 / weight`` and the
+    smallest stamp is dispatched first, so a tenant with a deep backlog cannot
+    starve one that submits occasionally.
+
+    Limits are counted in this process only. When ``workers`` orchestrator
+    processes share the load, each enforces an equal share of every limit,
+    rounded down but at least one, so together they stay within the
+    configured concurrency.
+    """
+
+    PRIORITY_ORDER = (JobPriority.HIGH.value, JobPriority.NORMAL.value, JobPriority.LOW.value)
+
+    def __init__(
+        self,
+        max_pending: int = 10000,
+        type_limits: Optional[Dict[JobType, int]] = None,
+        service_limits: Optional[Dict[str, int]] = None,
+        default_type_limit: int = 16,
+        default_service_limit: int = 16,
+        tenant_weights: Optional[Dict[str, float]] = None,
+        wait_sample_size: int = 1000,
+        workers: int = 1
+    ):
+        self.logger = logging.getLogger("job_scheduler")
+        self.max_pending = max_pending
+        self.workers = max(1, workers)
+        self.default_type_limit = default_type_limit
+        self.default_service_limit = default_service_limit
+        self._type_limits: Dict[str, int] = {
+            JobType(job_type).value: limit for job_type, limit in (type_limits or {}).items()
+        }
+        self._service_limits: Dict[str, int] = dict(service_limits or {})
+        self._tenant_weights: Dict[str, float] = dict(tenant_weights or {})
+
+        # (job_type, priority) -> heap of (finish_tag, seq, job)
+        self._queues: Dict[Tuple[str, str], List[Tuple[float, int, JobRecord]]] = {}
+        self._pending: Dict[str, JobRecord] = {}  # job_id -> queued job
+        self._pending_by_type: Dict[str, int] = {}  # job_type -> queued count
+        self._pending_by_priority: Dict[str, int] = {}  # priority -> queued count
+        self._stale_entries: Dict[Tuple[str, str], int] = {}  # (job_type, priority) -> discarded entries in the heap
+        self._running_by_type: Dict[str, int] = {}  # job_type -> slots in use
+        self._running_by_service: Dict[str, int] = {}  # service_url -> slots in use
+        self._seq = itertools.count()
+
+        # Weighted fair queuing state, kept per priority class
+        self._virtual_time: Dict[str, float] = {}  # priority -> finish tag of last dispatched job
+        self._tenant_finish: Dict[Tuple[str, str], float] = {}  # (priority, tenant) -> last finish tag
+        self._queued_by_tenant: Dict[Tuple[str, str], int] = {}  # (priority, tenant) -> queued count
+        # priority -> heap of (finish_tag, tenant) for idle tenants whose tag is still ahead of virtual time
+        self._idle_tenants: Dict[str, List[Tuple[float, str]]] = {}
+
+        # Recent queue-wait samples per priority class, in seconds
+        self._queue_waits: Dict[str, Deque[float]] = {
+            priority: deque(maxlen=wait_sample_size) for priority in self.PRIORITY_ORDER
+        }
+
+    def set_type_limit(self, job_type: JobType, limit: int) -> None:
+        """
+        Set the maximum number of concurrently running jobs of a type.
+
+        Args:
+            job_type: The job type
+            limit: Maximum concurrent jobs
+        """
+        self._type_limits[JobType(job_type).value] = limit
+
+    def set_service_limit(self, service_url: str, limit: int) -> None:
+        """
+        Set the maximum number of concurrent requests to a service.
+
+        Args:
+            service_url: Base URL of the external service
+            limit: Maximum concurrent jobs
+        """
+        self._service_limits[service_url] = limit
+
+    def set_tenant_weight(self, tenant: str, weight: float) -> None:
+        """
+        Set a tenant's fair-queuing weight.
+
+        Args:
+            tenant: Tenant key
+            weight: Relative share of dispatch capacity (default 1.0)
+
+        Raises:
+            ValueError: If the weight is not positive
+        """
+        if weight <= 0:
+            raise ValueError("Tenant weight must be positive")
+        self._tenant_weights[tenant] = weight
+
+    def get_type_limit(self, job_type: JobType) -> int:
+        """Get this worker's concurrency limit for a job type."""
+        return self._worker_share(self._type_limits.get(job_type, self.default_type_limit))
+
+    def get_service_limit(self, service_url: str) -> int:
+        """Get this worker's concurrency limit for a service URL."""
+        return self._worker_share(self._service_limits.get(service_url, self.default_service_limit))
+
+    def get_service_running(self, service_url: str) -> int:
+        """Get the number of jobs currently dispatched to a service URL."""
+        return self._running_by_service.get(service_url, 0)
+
+    def has_service_slot(self, service_url: str) -> bool:
+        """Check whether a service URL is below its concurrency limit."""
+        return self._running_by_service.get(service_url, 0) < self.get_service_limit(service_url)
+
+    def get_tenant_weight(self, tenant: str) -> float:
+        """Get a tenant's fair-queuing weight."""
+        return self._tenant_weights.get(tenant, 1.0)
+
+    @property
+    def pending_count(self) -> int:
+        """Number of jobs waiting for a slot."""
+        return len(self._pending)
+
+    def enqueue(self, job: JobRecord, force: bool = False) -> None:
+        """
+        Admit a job into the pending queue.
+
+        Args:
+            job: Job to queue
+            force: Skip the capacity check, e.g. for jobs that are re-queued
+                for a retry after already being admitted once
+
+        Raises:
+            QueueFullError: If the pending queue is at capacity
+        """
+        if not force and len(self._pending) >= self.max_pending:
+            raise QueueFullError(f"Job queue is full ({self.max_pending} pending jobs)")
+
+        priority = JobPriority(job.priority).value
+        tenant_key = (priority, job.tenant)
+        start_tag = max(self._virtual_time.get(priority, 0.0), self._tenant_finish.get(tenant_key, 0.0))
+        finish_tag = start_tag + 1.0 / self.get_tenant_weight(job.tenant)
+        self._tenant_finish[tenant_key] = finish_tag
+        self._queued_by_tenant[tenant_key] = self._queued_by_tenant.get(tenant_key, 0) + 1
+
+        queue_key = (job.type, priority)
+        queue = self._queues.get(queue_key)
+        if queue is None:
+            queue = self._queues[queue_key] = []
+        heapq.heappush(queue, (finish_tag, next(self._seq), job))
+
+        self._pending[job.id] = job
+        self._pending_by_type[job.type] = self._pending_by_type.get(job.type, 0) + 1
+        self._pending_by_priority[priority] = self._pending_by_priority.get(priority, 0) + 1
+
+    def discard(self, job_id: str) -> bool:
+        """
+        Remove a queued job, e.g. when it is cancelled before dispatch.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            True if the job was queued, False otherwise
+        """
+        job = self._pending.pop(job_id, None)
+        if not job:
+            return False
+
+        # The queue entry itself is skipped lazily by pop_ready
+        priority = JobPriority(job.priority).value
+        self._pending_by_type[job.type] -= 1
+        self._pending_by_priority[priority] -= 1
+        self._count_stale((job.type, priority))
+        self._dequeue_tenant(priority, job.tenant)
+        return True
+
+    def pop_ready(
+        self,
+        pick_service: Callable[[JobType], Optional[str]],
+        has_capacity: Optional[Callable[[JobType], bool]] = None
+    ) -> Optional[Tuple[JobRecord, Optional[str]]]:
+        """
+        Take the next dispatchable job whose type and service both have a free slot.
+
+        Higher priority classes always win; within a class the job with the
+        smallest fair-queuing finish tag is chosen. The slots are acquired
+        before returning; callers must hand them back with ``release`` once
+        the job finishes.
+
+        Args:
+            pick_service: Chooses the service URL that runs a job of a type;
+                called only for the job being dispatched, so it may advance
+                load balancer state
+            has_capacity: Returns False for job types none of whose services
+                can take a job right now; must not change any state, as it
+                is asked about every job type with queued jobs
+
+        Returns:
+            Tuple of (job, service_url) or None if nothing can be dispatched
+        """
+        # Slot availability per job type, checked at most once per call
+        available: Dict[str, bool] = {}
+
+        for priority in self.PRIORITY_ORDER:
+            while self._pending_by_priority.get(priority):
+                best_key = None
+                best_entry = None
+
+                for queue_key, queue in self._queues.items():
+                    job_type, queue_priority = queue_key
+                    if queue_priority != priority:
+                        continue
+
+                    # Drop entries for jobs that were discarded while queued
+                    while queue and queue[0][2].id not in self._pending:
+                        heapq.heappop(queue)
+                        self._stale_entries[queue_key] -= 1
+                    if not queue:
+                        continue
+
+                    if job_type not in available:
+                        available[job_type] = self._has_type_slot(job_type) and (
+                            has_capacity is None or has_capacity(job_type)
+                        )
+                    if not available[job_type]:
+                        continue
+
+                    if best_entry is None or queue[0][:2] < best_entry[:2]:
+                        best_key, best_entry = queue_key, queue[0]
+
+                if best_key is None:
+                    break
+
+                job_type = best_key[0]
+                service_url = pick_service(job_type)
+                if service_url and not self.has_service_slot(service_url):
+                    # The chosen service is full; try the next job type in this class
+                    available[job_type] = False
+                    continue
+                return self._take(best_key, service_url)
+
+        return None
+
+    def release(self, job_type: JobType, service_url: Optional[str]) -> None:
+        """
+        Return the slots acquired by ``pop_ready``.
+
+        Args:
+            job_type: Type of the finished job
+            service_url: Service URL the job was dispatched to
+        """
+        self._running_by_type[job_type] = max(0, self._running_by_type.get(job_type, 0) - 1)
+        if service_url:
+            self._running_by_service[service_url] = max(0, self._running_by_service.get(service_url, 0) - 1)
+
+    def clear(self) -> None:
+        """Drop all queued jobs."""
+        self._queues.clear()
+        self._pending.clear()
+        self._pending_by_type.clear()
+        self._pending_by_priority.clear()
+        self._stale_entries.clear()
+        self._tenant_finish.clear()
+        self._queued_by_tenant.clear()
+        self._idle_tenants.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get queue depth and slot usage.
+
+        Returns:
+            Dict with pending counts, running counts, this worker's limits and
+            queue-wait percentiles per priority class
+        """
+        job_types = set(self._pending_by_type) | set(self._running_by_type) | set(self._type_limits)
+        services = set(self._running_by_service) | set(self._service_limits)
+
+        return {
+            "pending": len(self._pending),
+            "max_pending": self.max_pending,
+            "workers": self.workers,
+            "job_types": {
+                job_type: {
+                    "pending": self._pending_by_type.get(job_type, 0),
+                    "running": self._running_by_type.get(job_type, 0),
+                    "limit": self.get_type_limit(job_type)
+                }
+                for job_type in job_types
+            },
+            "services": {
+                service_url: {
+                    "running": self._running_by_service.get(service_url, 0),
+                    "limit": self.get_service_limit(service_url)
+                }
+                for service_url in services
+            },
+            "priorities": {
+                priority: {
+                    "pending": self._pending_by_priority.get(priority, 0),
+                    "queue_wait_p50": self._percentile(self._queue_waits[priority], 0.50),
+                    "queue_wait_p99": self._percentile(self._queue_waits[priority], 0.99)
+                }
+                for priority in self.PRIORITY_ORDER
+            },
+            "tenant_weights": dict(self._tenant_weights),
+            "tracked_tenants": len(self._tenant_finish)
+        }
+
+    def _has_type_slot(self, job_type: str) -> bool:
+        """Check whether a job type is below its concurrency limit."""
+        return self._running_by_type.get(job_type, 0) < self.get_type_limit(job_type)
+
+    def _take(self, queue_key: Tuple[str, str], service_url: Optional[str]) -> Tuple[JobRecord, Optional[str]]:
+        """Pop the head of a queue and acquire its slots."""
+        job_type, priority = queue_key
+        finish_tag, _, job = heapq.heappop(self._queues[queue_key])
+
+        del self._pending[job.id]
+        self._pending_by_type[job_type] -= 1
+        self._pending_by_priority[priority] -= 1
+
+        # Advance virtual time so newly active tenants start level with the rest
+        self._virtual_time[priority] = max(self._virtual_time.get(priority, 0.0), finish_tag)
+        self._queue_waits[priority].append(time.time() - job.created_ts)
+        self._dequeue_tenant(priority, job.tenant)
+        self._prune_idle_tenants(priority)
+
+        self._running_by_type[job_type] = self._running_by_type.get(job_type, 0) + 1
+        if service_url:
+            self._running_by_service[service_url] = self._running_by_service.get(service_url, 0) + 1
+
+        return job, service_url
+
+    def _dequeue_tenant(self, priority: str, tenant: str) -> None:
+        """
+        Count a job of a tenant leaving the queue.
+
+        A tenant with nothing left queued in the class whose finish tag is
+        not ahead of virtual time would start at virtual time anyway, so its
+        tag is dropped; a tag still ahead is dropped once virtual time passes it.
+        """
+        tenant_key = (priority, tenant)
+        remaining = self._queued_by_tenant[tenant_key] - 1
+        if remaining:
+            self._queued_by_tenant[tenant_key] = remaining
+            return
+
+        del self._queued_by_tenant[tenant_key]
+        finish_tag = self._tenant_finish[tenant_key]
+        if finish_tag <= self._virtual_time.get(priority, 0.0):
+            del self._tenant_finish[tenant_key]
+        else:
+            heapq.heappush(self._idle_tenants.setdefault(priority, []), (finish_tag, tenant))
+
+    def _prune_idle_tenants(self, priority: str) -> None:
+        """Drop the tags of idle tenants that virtual time has caught up with."""
+        idle = self._idle_tenants.get(priority)
+        virtual_time = self._virtual_time[priority]
+        while idle and idle[0][0] <= virtual_time:
+            finish_tag, tenant = heapq.heappop(idle)
+            tenant_key = (priority, tenant)
+            # Skip tenants that queued again since going idle
+            if tenant_key not in self._queued_by_tenant and self._tenant_finish.get(tenant_key) == finish_tag:
+                del self._tenant_finish[tenant_key]
+
+    def _count_stale(self, queue_key: Tuple[str, str]) -> None:
+        """
+        Count a discarded entry left in a queue.
+
+        Once discarded entries make up more than half of the heap it is
+        rebuilt without them, so cancelling jobs that never reach the head of
+        their queue cannot grow it without bound.
+        """
+        stale = self._stale_entries.get(queue_key, 0) + 1
+        queue = self._queues[queue_key]
+        if stale * 2 > len(queue):
+            queue[:] = [entry for entry in queue if entry[2].id in self._pending]
+            heapq.heapify(queue)
+            stale = 0
+        self._stale_entries[queue_key] = stale
+
+    def _worker_share(self, limit: int) -> int:
+        """Split a configured limit evenly across the workers; a zero limit stays closed."""
+        if limit <= 0 or self.workers == 1:
+            return limit
+        return max(1, limit // self.workers)
+
+    @staticmethod
+    def _percentile(samples: Deque[float], fraction: float) -> Optional[float]:
+        """Nearest-rank percentile of the given samples."""
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(fraction * len(ordered)))
+        return round(ordered[index], 6)
@@ -0,0 +1,221 @@
+"""
+Dependency tracking for workflow DAGs.
+"""
+
+from collections import deque
+from typing import Dict, List, Optional, Set
+import time
+import uuid
+
+from .job_schema import JobStatus
+from .workflow_schema import (
+    WorkflowNode, WorkflowNodeResponse, WorkflowNodeStatus, WorkflowResponse, WorkflowStatus, WorkflowSubmission
+)
+from ..utils.timestamps import epoch_to_datetime
+
+
+# Node status for each terminal job status
+_NODE_STATUSES = {
+    JobStatus.COMPLETED: WorkflowNodeStatus.COMPLETED,
+    JobStatus.FAILED: WorkflowNodeStatus.FAILED,
+    JobStatus.CANCELLED: WorkflowNodeStatus.CANCELLED
+}
+
+
+class WorkflowRun:
+    """
+    Runtime state of one workflow.
+
+    Each node counts its unfinished upstream nodes; when a node completes,
+    the counts of its dependents drop and those reaching zero are returned
+    as ready, so ready nodes are found in time proportional to the edges
+    leaving the finished node. When a node does not complete, everything
+    downstream of it is skipped while independent branches keep running.
+    """
+
+    def __init__(self, submission: WorkflowSubmission):
+        """
+        Args:
+            submission: Workflow definition
+
+        Raises:
+            ValueError: If node IDs repeat, a dependency is unknown or the graph has a cycle
+        """
+        self.id = str(uuid.uuid4())
+        self.name = submission.name
+        self.metadata = submission.metadata
+        self.fail_fast = submission.fail_fast
+        self.status = WorkflowStatus.RUNNING
+        self.created_ts = time.time()
+        self.completed_ts: Optional[float] = None
+
+        self.nodes: Dict[str, WorkflowNode] = {}
+        for node in submission.nodes:
+            if node.id in self.nodes:
+                raise ValueError(f"Duplicate workflow node ID: {node.id}")
+            self.nodes[node.id] = node
+
+        self.dependents: Dict[str, List[str]] = {node_id: [] for node_id in self.nodes}
+        self.waiting: Dict[str, int] = {}  # node_id -> upstream nodes not yet completed
+        for node in self.nodes.values():
+            upstream: Set[str] = set(node.depends_on)
+            upstream.update(workflow_input.node for workflow_input in node.inputs)
+            for upstream_id in upstream:
+                if upstream_id not in self.nodes:
+                    raise ValueError(f"Node {node.id} depends on unknown node: {upstream_id}")
+                if upstream_id == node.id:
+                    raise ValueError(f"Node {node.id} depends on itself")
+                self.dependents[upstream_id].append(node.id)
+            self.waiting[node.id] = len(upstream)
+        self._check_acyclic()
+
+        self.node_status: Dict[str, WorkflowNodeStatus] = {
+            node_id: WorkflowNodeStatus.WAITING for node_id in self.nodes
+        }
+        self.job_ids: Dict[str, str] = {}  # node_id -> submitted job
+        self.errors: Dict[str, str] = {}  # node_id -> why it did not complete
+        self._unfinished = len(self.nodes)
+
+    @property
+    def finished(self) -> bool:
+        return self.status != WorkflowStatus.RUNNING
+
+    def ready_nodes(self) -> List[str]:
+        """
+        Get the nodes without upstream dependencies.
+
+        Returns:
+            IDs of the nodes that can start immediately
+        """
+        return [node_id for node_id, count in self.waiting.items() if count == 0]
+
+    def node_submitted(self, node_id: str, job_id: str) -> None:
+        """Record the job started for a node."""
+        self.job_ids[node_id] = job_id
+        self.node_status[node_id] = WorkflowNodeStatus.SUBMITTED
+
+    def node_finished(self, node_id: str, status: JobStatus, error: Optional[str] = None) -> List[str]:
+        """
+        Record the outcome of a node.
+
+        Args:
+            node_id: Finished node
+            status: Terminal status of its job
+            error: Why the node did not complete, if it did not
+
+        Returns:
+            IDs of the nodes that became ready
+        """
+        if self.node_status[node_id] not in (WorkflowNodeStatus.WAITING, WorkflowNodeStatus.SUBMITTED):
+            return []
+
+        node_status = _NODE_STATUSES[JobStatus(status)]
+        self.node_status[node_id] = node_status
+        self._unfinished -= 1
+        if error:
+            self.errors[node_id] = error
+
+        ready = []
+        if node_status == WorkflowNodeStatus.COMPLETED:
+            for dependent in self.dependents[node_id]:
+                self.waiting[dependent] -= 1
+                if self.waiting[dependent] == 0 and self.node_status[dependent] == WorkflowNodeStatus.WAITING:
+                    ready.append(dependent)
+        else:
+            self._skip_downstream(node_id)
+
+        self._finish_if_done()
+        return [] if self.finished else ready
+
+    def cancel(self, status: WorkflowStatus = WorkflowStatus.CANCELLED) -> List[str]:
+        """
+        Stop the workflow: waiting nodes are skipped.
+
+        Args:
+            status: Final workflow status
+
+        Returns:
+            Jobs of submitted nodes, which the caller cancels
+        """
+        if self.status == WorkflowStatus.RUNNING:
+            self.status = status
+        for node_id, node_status in self.node_status.items():
+            if node_status == WorkflowNodeStatus.WAITING:
+                self.node_status[node_id] = WorkflowNodeStatus.SKIPPED
+                self._unfinished -= 1
+        self._finish_if_done()
+        return [
+            self.job_ids[node_id]
+            for node_id, node_status in self.node_status.items()
+            if node_status == WorkflowNodeStatus.SUBMITTED
+        ]
+
+    def to_response(self) -> WorkflowResponse:
+        """
+        Build the API model for this workflow.
+
+        Returns:
+            Workflow response
+        """
+        progress: Dict[str, int] = {}
+        for node_status in self.node_status.values():
+            progress[node_status.value] = progress.get(node_status.value, 0) + 1
+
+        return WorkflowResponse(
+            id=self.id,
+            name=self.name,
+            status=self.status,
+            created_at=epoch_to_datetime(self.created_ts),
+            completed_at=None if self.completed_ts is None else epoch_to_datetime(self.completed_ts),
+            metadata=self.metadata,
+            progress=progress,
+            nodes=[
+                WorkflowNodeResponse(
+                    id=node_id,
+                    type=node.type,
+                    status=self.node_status[node_id],
+                    job_id=self.job_ids.get(node_id),
+                    error=self.errors.get(node_id)
+                )
+                for node_id, node in self.nodes.items()
+            ]
+        )
+
+    def _skip_downstream(self, node_id: str) -> None:
+        """Skip every waiting node that depends, directly or not, on a node."""
+        pending = deque(self.dependents[node_id])
+        while pending:
+            dependent = pending.popleft()
+            if self.node_status[dependent] != WorkflowNodeStatus.WAITING:
+                continue
+            self.node_status[dependent] = WorkflowNodeStatus.SKIPPED
+            self.errors[dependent] = f"Upstream node {node_id} did not complete"
+            self._unfinished -= 1
+            pending.extend(self.dependents[dependent])
+
+    def _finish_if_done(self) -> None:
+        """Settle the workflow status once no node is waiting or running."""
+        if self._unfinished or self.completed_ts is not None:
+            return
+
+        self.completed_ts = time.time()
+        if self.status == WorkflowStatus.RUNNING:
+            completed = all(
+                node_status == WorkflowNodeStatus.COMPLETED for node_status in self.node_status.values()
+            )
+            self.status = WorkflowStatus.COMPLETED if completed else WorkflowStatus.FAILED
+
+    def _check_acyclic(self) -> None:
+        """Raise ValueError if the dependencies contain a cycle."""
+        remaining = dict(self.waiting)
+        ready = deque(node_id for node_id, count in remaining.items() if count == 0)
+        visited = 0
+        while ready:
+            node_id = ready.popleft()
+            visited += 1
+            for dependent in self.dependents[node_id]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+        if visited != len(self.nodes):
+            raise ValueError("Workflow dependencies contain a cycle")
@@ -0,0 +1,93 @@
+"""
+Workflow schema definitions for MCP Core.
+"""
+
+from enum import Enum
+from typing import Any, Dict, Optional, List
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+from .job_schema import JobPriority, JobType
+from ..artifacts.artifact_schema import ArtifactReference, ArtifactType
+
+
+class WorkflowStatus(str, Enum):
+    """Status of a whole workflow."""
+    RUNNING = "running"
+    COMPLETED = "completed"  # every node completed
+    FAILED = "failed"  # a node failed; nodes depending on it were skipped
+    CANCELLED = "cancelled"
+
+
+class WorkflowNodeStatus(str, Enum):
+    """Status of one workflow node."""
+    WAITING = "waiting"  # upstream nodes still running
+    SUBMITTED = "submitted"  # job submitted (queued or running)
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    SKIPPED = "skipped"  # an upstream node did not complete
+
+
+class WorkflowInput(BaseModel):
+    """Artifacts of an upstream node passed to a node as inputs."""
+    
+    node: str  # upstream node ID
+    artifact_type: Optional[ArtifactType] = None  # only artifacts of this type
+    name: Optional[str] = None  # only artifacts with this name
+    payload_key: Optional[str] = None  # payload field set to the artifact ID (a list if several match)
+    reference_type: str = "input"
+
+
+class WorkflowNode(BaseModel):
+    """One job of a workflow."""
+    
+    id: str  # unique within the workflow
+    type: JobType
+    payload: Dict[str, Any] = Field(default_factory=dict)
+    priority: JobPriority = JobPriority.NORMAL
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+    depends_on: List[str] = Field(default_factory=list)  # ordering-only dependencies
+    inputs: List[WorkflowInput] = Field(default_factory=list)  # artifact dependencies
+    input_artifacts: List[ArtifactReference] = Field(default_factory=list)  # artifacts known up front
+    use_cache: bool = False
+    coalesce: bool = False
+    timeout_seconds: Optional[float] = Field(default=None, gt=0)
+
+
+class WorkflowSubmission(BaseModel):
+    """Model for workflow submission requests: a DAG of job specs."""
+    
+    name: Optional[str] = None
+    nodes: List[WorkflowNode] = Field(..., min_length=1, max_length=10000)
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+    fail_fast: bool = False  # cancel every other node as soon as one fails
+
+
+class WorkflowNodeResponse(BaseModel):
+    """Status of one workflow node."""
+    
+    id: str
+    type: JobType
+    status: WorkflowNodeStatus
+    job_id: Optional[str] = None
+    error: Optional[str] = None
+    
+    class Config:
+        use_enum_values = True
+
+
+class WorkflowResponse(BaseModel):
+    """Model for workflow status responses."""
+    
+    id: str
+    name: Optional[str] = None
+    status: WorkflowStatus
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+    metadata: Dict[str, Any] = {}
+    progress: Dict[str, int] = {}  # node count per node status
+    nodes: List[WorkflowNodeResponse] = []
+    
+    class Config:
+        use_enum_values = True
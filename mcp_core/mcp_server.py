@@ -4,194 +4,1968 @@ Main MCP Server - Job orchestration and lifecycle management.
 
 import asyncio
 import aiohttp
-from typing import Dict, Optional, List, Any
-from datetime import datetime
+import itertools
+import json
+import os
+import secrets
+import socket
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, List, Any, Set, Tuple, Union
+from urllib.parse import urljoin
 import logging
 
-from .jobs.job_schema import Job, JobStatus, JobSubmission, JobResponse
-from .agents.base_agent import AgentRegistry
+from pydantic import ValidationError
+
+from .jobs.job_schema import (
+    JobStatus, JobType, JobFailureReason, JobSubmission, JobResponse, JobBatchItem, TERMINAL_STATUSES
+)
+from .jobs.job_record import JobRecord
+from .jobs.events import JobEventBroker, JobSubscription
+from .jobs.job_logs import JobLogStore
+from .jobs.scheduler import JobScheduler, QueueFullError
+from .jobs.result_cache import ResultCache
+from .jobs.result_store import ResultStore
+from .jobs.retention import JobArchive, RetentionPolicy, estimate_job_size
+from .jobs.workflow import WorkflowRun
+from .jobs.workflow_schema import WorkflowNodeStatus, WorkflowStatus, WorkflowSubmission
+from .agents.base_agent import AgentRegistry, DispatchMode
+from .agents.connection_pool import ConnectionPoolPolicy, ServiceConnectionPools
+from .agents.load_balancer import ServiceReplica
+from .agents.health import HealthCheckPolicy, ServiceHealthMonitor
+from .agents.service_schema import ServiceHeartbeat, ServiceRegistration, ServiceStatus
+from .agents.resilience import (
+    CircuitBreaker, CircuitBreakerPolicy, CircuitState, RetryPolicy, ServiceCallError
+)
 from .artifacts.artifact_registry import ArtifactRegistry
+from .artifacts.artifact_schema import ArtifactReference, ArtifactType
+from .state.backend import SQLiteStateBackend, StateBackend
+from .state.journal import WriteAheadLog
+from .utils.hashing import content_hash, payload_fingerprint
+from .utils.idempotency import IdempotencyIndex
+from .utils.ordered_index import OrderedIndex
+from .utils.pagination import decode_cursor
+from .utils.timestamps import datetime_to_epoch, epoch_to_datetime
+from .utils.wire import accept_headers, decode_body_async, decompress, encode_body_async
 from .utils.logger import get_logger, log_job_event
 
 
+# Per-call timeout for jobs without a deadline
+DEFAULT_EXECUTION_TIMEOUT = 3600.0
+
+# Time callback- and poll-mode services get to acknowledge /execute or answer a status poll
+ACKNOWLEDGE_TIMEOUT = 30.0
+
+# Backoff between status polls of poll-mode services
+POLL_INTERVAL_INITIAL = 1.0
+POLL_INTERVAL_MAX = 30.0
+
+# How often waiters re-read jobs run by other workers, whose changes are not seen here
+REMOTE_WAIT_INTERVAL = 1.0
+
+# Finished workflows kept for status queries
+MAX_FINISHED_WORKFLOWS = 1000
+
+# Connections a service pool has beyond the service's concurrency limit, for health probes and warm-up
+POOL_HEADROOM = 4
+
+
 class MCPServer:
     """Main MCP Server for job orchestration."""
     
-    def __init__(self):
-        self.logger = get_logger("mcp_server")
-        self.jobs: Dict[str, Job] = {}
-        self.running_tasks: Dict[str, asyncio.Task] = {}
-        self._shutdown_event = asyncio.Event()
-        self.artifact_registry = ArtifactRegistry()
-        self._http_session: Optional[aiohttp.ClientSession] = None
+    def __init__(
+        self,
+        scheduler: Optional[JobScheduler] = None,
+        result_cache: Optional[ResultCache] = None,
+        idempotency_index: Optional[IdempotencyIndex] = None,
+        retry_policies: Optional[Dict[JobType, RetryPolicy]] = None,
+        circuit_breaker_policy: Optional[CircuitBreakerPolicy] = None,
+        health_check_policy: Optional[HealthCheckPolicy] = None,
+        connection_pool_policy: Optional[ConnectionPoolPolicy] = None,
+        default_timeouts: Optional[Dict[JobType, float]] = None,
+        retention_policy: Optional[RetentionPolicy] = None,
+        job_archive: Optional[JobArchive] = None,
+        job_logs: Optional[JobLogStore] = None,
+        result_store: Optional[ResultStore] = None,
+        state_backend: Optional[StateBackend] = None,
+        worker_id: Optional[str] = None,
+        lease_seconds: float = 30.0,
+        journal: Optional[WriteAheadLog] = None,
+        callback_url: Optional[str] = None,
+        data_dir: Optional[str] = None
+    ):
+        """
+        Args:
+            scheduler: Job scheduler (default limits if omitted)
+            result_cache: Result cache (memory-only unless data_dir is set)
+            idempotency_index: Index of job idempotency keys
+            retry_policies: Retry policy per job type (default policy otherwise)
+            circuit_breaker_policy: Thresholds for the per-service circuit breakers
+            health_check_policy: Probe interval and thresholds for the service health checks
+            connection_pool_policy: Connector settings for the per-service connection pools
+            default_timeouts: Deadline in seconds per job type for jobs that set no timeout
+            retention_policy: Limits on finished jobs kept in memory
+            job_archive: Archive for evicted jobs (temporary file unless data_dir is set)
+            job_logs: Store for log lines sent by services (spills to a temporary directory unless data_dir is set)
+            result_store: Store for results too large to keep on the job (temporary directory unless data_dir is set)
+            state_backend: Store shared with other worker processes; jobs,
+                artifacts and services stay process-local if omitted
+            worker_id: Name of this worker in job leases (host:pid by default)
+            lease_seconds: How long a job stays owned by a worker that stops heartbeating
+            journal: Write-ahead log of job and artifact state, replayed by
+                ``recover`` (kept under data_dir by default unless a state
+                backend already persists that state)
+            callback_url: Base URL at which callback-mode services reach this
+                orchestrator; without it they only get the callback path
+            data_dir: Directory for persistent state such as the result cache
+        """
+        self.logger = get_logger("mcp_server")
+        self.data_dir = data_dir
+        if data_dir:
+            os.makedirs(data_dir, exist_ok=True)
+        self.jobs: Dict[str, JobRecord] = {}
+        self._jobs_by_created = OrderedIndex()  # (created_at, job_id) of every job in memory
+        self._jobs_by_status: Dict[str, OrderedIndex] = {
+            status.value: OrderedIndex() for status in JobStatus
+        }
+        self.running_tasks: Dict[str, asyncio.Task] = {}
+        self._shutdown_event = asyncio.Event()
+        self.events = JobEventBroker()
+        self.state_backend = state_backend
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self._dirty_jobs: Dict[str, JobRecord] = {}  # jobs changed since the last state flush
+        self._flush_handle: Optional[asyncio.Handle] = None
+        self._unwritten_rows: List[Dict[str, Any]] = []  # flushed rows not yet handed to the state backend
+        self._state_writer: Optional[asyncio.Task] = None  # writes flushed rows to the state backend in order
+        self._heartbeat_handle: Optional[asyncio.TimerHandle] = None
+        self._adopted_total = 0
+        self._lost_total = 0
+        if state_backend is not None:
+            AgentRegistry.set_state_backend(state_backend)
+        if journal is None and data_dir and state_backend is None:
+            journal = WriteAheadLog(os.path.join(data_dir, "journal"))
+        self.journal = journal
+        self._recovery: Optional[Dict[str, Any]] = None  # counts from the last recover()
+        self.artifact_registry = ArtifactRegistry(state_backend=state_backend, journal=journal)
+        self.scheduler = scheduler or JobScheduler()
+        AgentRegistry.add_scheduler(self.scheduler)
+        self.result_cache = result_cache or ResultCache(
+            disk_path=os.path.join(data_dir, "result_cache.sqlite3") if data_dir else None
+        )
+        self._inflight_by_fingerprint: Dict[str, str] = {}  # payload fingerprint -> leader job_id
+        self._coalesced_jobs: Dict[str, List[JobRecord]] = {}  # leader job_id -> attached jobs
+        self._coalesced_total = 0
+        self.idempotency_index = idempotency_index or IdempotencyIndex(state_backend=state_backend, scope="jobs")
+        self.retry_policies: Dict[str, RetryPolicy] = {
+            JobType(job_type).value: policy for job_type, policy in (retry_policies or {}).items()
+        }
+        self.default_retry_policy = RetryPolicy()
+        self.circuit_breaker_policy = circuit_breaker_policy or CircuitBreakerPolicy()
+        self.circuit_breakers: Dict[str, CircuitBreaker] = {}  # service_url -> breaker
+        self.service_health = ServiceHealthMonitor(health_check_policy)
+        self._health_check_handle: Optional[asyncio.TimerHandle] = None
+        self._retry_handles: Dict[str, asyncio.TimerHandle] = {}  # job_id -> pending retry
+        self._redispatch_handle: Optional[asyncio.TimerHandle] = None
+        self._retry_counts: Dict[str, int] = {}  # job_type -> retries scheduled
+        self._retries_exhausted = 0
+        self.default_timeouts: Dict[str, float] = {
+            JobType(job_type).value: timeout for job_type, timeout in (default_timeouts or {}).items()
+        }
+        self._deadline_handles: Dict[str, asyncio.TimerHandle] = {}  # job_id -> deadline timer
+        self.retention_policy = retention_policy or RetentionPolicy()
+        self.job_archive = job_archive or JobArchive(
+            os.path.join(data_dir, "job_archive.sqlite3") if data_dir else None
+        )
+        self.job_logs = job_logs or JobLogStore(
+            os.path.join(data_dir, "job_logs") if data_dir else None
+        )
+        self.result_store = result_store or ResultStore(
+            os.path.join(data_dir, "results") if data_dir else None
+        )
+        self._terminal_jobs: "OrderedDict[str, int]" = OrderedDict()  # job_id -> encoded size, oldest first
+        self._terminal_bytes = 0
+        self._archiving: Dict[str, JobRecord] = {}  # evicted jobs whose archive write is in progress
+        self._archive_tasks: set = set()
+        self._retention_handle: Optional[asyncio.TimerHandle] = None
+        self._evicted_total = 0
+        self.callback_url = callback_url
+        self._completions: Dict[str, Tuple[str, asyncio.Future]] = {}  # job_id -> (callback token, outcome)
+        self._job_waiters: Dict[str, Set[asyncio.Future]] = {}  # job_id -> futures woken on its next status change
+        self.workflows: Dict[str, WorkflowRun] = {}
+        self._finished_workflows: "OrderedDict[str, None]" = OrderedDict()  # finished workflow IDs, oldest first
+        self._workflow_jobs: Dict[str, Tuple[str, str]] = {}  # job_id -> (workflow_id, node_id)
+        self._workflow_tasks: set = set()  # node submissions in progress
+        self._polling_jobs = 0
+        self._callbacks_received = 0
+        self.connection_pools = ServiceConnectionPools(connection_pool_policy)
+        self._warm_tasks: set = set()  # connection pool warm-ups in progress
+        
+    async def submit_job(self, job_submission: JobSubmission) -> str:
+        """
+        Submit a new job for execution.
+        
+        Args:
+            job_submission: Job submission data
+            
+        Returns:
+            Job ID
+            
+        Raises:
+            ValueError: If no agent is available for the job type, or the
+                idempotency key was already used with a different submission
+            QueueFullError: If the pending job queue is at capacity
+            OSError: If the job could not be written to the write-ahead log
+        """
+        job_id = await self._accept_submission(job_submission)
+        
+        self._dispatch_pending()
+        await self._sync_state()
+        if self.journal is not None:
+            await self.journal.sync()
+        
+        return job_id
+    
+    async def submit_jobs(
+        self,
+        job_submissions: List[Union[JobSubmission, Dict[str, Any]]]
+    ) -> List[JobBatchItem]:
+        """
+        Submit many jobs in one pass.
+        
+        Each item is validated, stored and queued independently, so a bad item
+        does not reject the rest of the batch. Dispatch runs once at the end.
+        
+        Args:
+            job_submissions: Job submissions or raw submission dicts
+            
+        Returns:
+            One result per submission, in input order
+        """
+        results = []
+        
+        for index, job_submission in enumerate(job_submissions):
+            try:
+                if not isinstance(job_submission, JobSubmission):
+                    job_submission = JobSubmission.model_validate(job_submission)
+                job_id = await self._accept_submission(job_submission)
+                results.append(JobBatchItem(index=index, job_id=job_id))
+            except ValidationError as e:
+                results.append(JobBatchItem(index=index, error=_format_validation_error(e)))
+            except (ValueError, QueueFullError) as e:
+                results.append(JobBatchItem(index=index, error=str(e)))
+        
+        self._dispatch_pending()
+        await self._sync_state()
+        if self.journal is not None:
+            await self.journal.sync()
+        
+        return results
+    
+    async def get_job_status(self, job_id: str) -> Optional[JobResponse]:
+        """
+        Get the status of a job.
+        
+        Args:
+            job_id: Job ID
+            
+        Returns:
+            Job response or None if not found
+        """
+        job = await self.get_job_record(job_id)
+        return job.to_response() if job else None
+    
+    async def get_job_record(self, job_id: str) -> Optional[JobRecord]:
+        """
+        Get the stored record of a job.
+        
+        Args:
+            job_id: Job ID
+            
+        Returns:
+            Job record or None if not found
+        """
+        job = self.jobs.get(job_id) or self._archiving.get(job_id)
+        if not job and self.state_backend is not None:
+            # Jobs owned by other workers
+            data = await asyncio.to_thread(self.state_backend.get_job, job_id)
+            job = JobRecord.from_dict(data) if data else None
+        if not job:
+            # Finished jobs evicted from memory are still served from the archive
+            job = await self.job_archive.get(job_id)
+        return job
+    
+    async def cancel_job(self, job_id: str) -> bool:
+        """
+        Cancel a running job.
+        
+        Args:
+            job_id: Job ID
+            
+        Returns:
+            True if job was cancelled, False if not found or already completed
+        """
+        job = self.jobs.get(job_id)
+        if not job:
+            # The worker that owns the job cancels it on its next heartbeat
+            if self.state_backend is not None:
+                return await asyncio.to_thread(self.state_backend.request_cancel, job_id)
+            return False
+        
+        if job.status in TERMINAL_STATUSES:
+            return False
+        
+        self._stop_job(job, JobStatus.CANCELLED)
+        return True
+    
+    async def list_jobs(
+        self,
+        status_filter: Optional[JobStatus] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> List[JobResponse]:
+        """
+        List jobs held in memory, newest first, optionally filtered by status.
+        
+        Finished jobs evicted by the retention policy are not listed; they
+        can still be fetched individually with ``get_job_status``.
+        
+        Args:
+            status_filter: Optional status filter
+            limit: Maximum number of jobs to return
+            cursor: Only return jobs created before the one the cursor points
+                at (see ``encode_cursor``); jobs submitted meanwhile never
+                shift later pages
+            
+        Returns:
+            List of job responses
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        jobs = await self.list_job_records(status_filter=status_filter, limit=limit, cursor=cursor)
+        return [job.to_response() for job in jobs]
+    
+    async def list_job_records(
+        self,
+        status_filter: Optional[JobStatus] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> List[JobRecord]:
+        """
+        List stored job records; same ordering and arguments as ``list_jobs``.
+        
+        With a state backend the jobs of all workers are listed.
+        
+        Returns:
+            List of job records
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        before = None
+        if cursor:
+            created_at, job_id = decode_cursor(cursor)
+            before = (datetime_to_epoch(created_at), job_id)
+        
+        if self.state_backend is not None:
+            # List every worker's jobs; this worker's own changes are written first
+            await self._sync_state()
+            rows = await asyncio.to_thread(
+                self.state_backend.list_jobs,
+                status=JobStatus(status_filter).value if status_filter else None, limit=limit, before=before
+            )
+            return [self.jobs.get(data["id"]) or JobRecord.from_dict(data) for data in rows]
+        
+        index = self._jobs_by_status[JobStatus(status_filter).value] if status_filter else self._jobs_by_created
+        
+        # Walk the index newest first, stopping at the limit
+        keys = index.iter_desc(before=before)
+        if limit:
+            keys = itertools.islice(keys, limit)
+        return [self.jobs[job_id] for _, job_id in keys]
+    
+    async def wait_for_jobs(
+        self,
+        job_ids: List[str],
+        timeout: float,
+        until: str = "terminal"
+    ) -> Optional[List[JobRecord]]:
+        """
+        Wait until one of several jobs finishes or changes status.
+        
+        Waiters park on a future woken by ``_transition``, so they cost
+        nothing until one of their jobs changes.
+        
+        Args:
+            job_ids: Jobs to wait for
+            timeout: Maximum seconds to wait
+            until: "terminal" to wait for a finished job, "change" for any status change
+            
+        Returns:
+            The jobs meeting the condition (empty on timeout), or None if a job does not exist
+        """
+        jobs = {}
+        for job_id in job_ids:
+            job = await self.get_job_record(job_id)
+            if not job:
+                return None
+            jobs[job_id] = job
+        
+        initial = {job_id: job.status for job_id, job in jobs.items()}
+        
+        def ready() -> List[JobRecord]:
+            if until == "terminal":
+                return [job for job in jobs.values() if job.status in TERMINAL_STATUSES]
+            return [job for job_id, job in jobs.items() if job.status != initial[job_id]]
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            done = ready()
+            remaining = deadline - loop.time()
+            if done or remaining <= 0 or self._shutdown_event.is_set():
+                return done
+            
+            remote = [job_id for job_id in jobs if job_id not in self.jobs]
+            if remote:
+                remaining = min(remaining, REMOTE_WAIT_INTERVAL)
+            
+            waiter = loop.create_future()
+            for job_id in jobs:
+                self._job_waiters.setdefault(job_id, set()).add(waiter)
+            try:
+                await asyncio.wait((waiter,), timeout=remaining)
+            finally:
+                for job_id in jobs:
+                    waiters = self._job_waiters.get(job_id)
+                    if waiters is not None:
+                        waiters.discard(waiter)
+                        if not waiters:
+                            del self._job_waiters[job_id]
+            
+            for job_id in remote:
+                jobs[job_id] = await self.get_job_record(job_id) or jobs[job_id]
+    
+    async def submit_workflow(self, submission: WorkflowSubmission) -> WorkflowRun:
+        """
+        Start a workflow.
+        
+        Nodes without dependencies are submitted at once; every other node
+        is submitted as soon as its last upstream node completes, with the
+        artifacts named by its inputs resolved from the artifact registry.
+        
+        Args:
+            submission: Workflow definition
+            
+        Returns:
+            The running workflow
+            
+        Raises:
+            ValueError: If the node graph is invalid
+        """
+        run = WorkflowRun(submission)
+        self.workflows[run.id] = run
+        self.logger.info(f"Workflow {run.id} started with {len(run.nodes)} node(s)")
+        for node_id in run.ready_nodes():
+            self._start_workflow_node(run, node_id)
+        return run
+    
+    def get_workflow(self, workflow_id: str) -> Optional[WorkflowRun]:
+        """
+        Get a workflow.
+        
+        Args:
+            workflow_id: Workflow ID
+            
+        Returns:
+            The workflow or None if not found
+        """
+        return self.workflows.get(workflow_id)
+    
+    def cancel_workflow(self, workflow_id: str) -> bool:
+        """
+        Cancel a workflow and the jobs of its running nodes.
+        
+        Args:
+            workflow_id: Workflow ID
+            
+        Returns:
+            True if the workflow was cancelled, False if not found or already finished
+        """
+        run = self.workflows.get(workflow_id)
+        if not run or run.finished:
+            return False
+        
+        self._stop_workflow(run, WorkflowStatus.CANCELLED)
+        return True
+    
+    def subscribe_events(
+        self,
+        job_ids: Optional[List[str]] = None,
+        job_types: Optional[List[JobType]] = None,
+        statuses: Optional[List[JobStatus]] = None
+    ) -> JobSubscription:
+        """
+        Subscribe to status changes of jobs handled by this process.
+        
+        When specific jobs are requested, their current status is queued
+        first so callers cannot miss a change made before subscribing.
+        
+        Args:
+            job_ids: Only these jobs
+            job_types: Only jobs of these types
+            statuses: Only changes into these statuses
+            
+        Returns:
+            Subscription; close it when done
+        """
+        subscription = self.events.subscribe(job_ids=job_ids, job_types=job_types, statuses=statuses)
+        for job_id in job_ids or ():
+            job = self.jobs.get(job_id)
+            if job and subscription.matches(job.type, job.status.value):
+                subscription.push(self.events.encode(job))
+        return subscription
+    
+    async def complete_job(self, job_id: str, token: str, result: Dict[str, Any]) -> bool:
+        """
+        Deliver the outcome reported by a callback-mode service.
+        
+        Args:
+            job_id: Job ID
+            token: ``callback_token`` sent with the job's current dispatch
+            result: Reported outcome, shaped like a sync /execute response
+            
+        Returns:
+            True if the job was waiting for this outcome
+        """
+        if job_id not in self.jobs and self.state_backend is not None:
+            # Dispatched by another worker, which picks it up on its next heartbeat
+            return await asyncio.to_thread(self.state_backend.post_completion, job_id, token, result)
+        return self._resolve_completion(job_id, token, result)
+    
+    async def recover(self) -> None:
+        """
+        Rebuild jobs, artifacts and idempotency keys from the write-ahead log.
+        
+        Finished jobs are restored as they were (and evicted again if over
+        the retention limits); jobs that were pending or running are queued
+        again and run from the start. Does nothing without a write-ahead log
+        or when called a second time.
+        """
+        if self.journal is None or self._recovery is not None:
+            return
+        
+        started = time.monotonic()
+        jobs, artifacts, idempotency_keys = await asyncio.to_thread(self.journal.load)
+        
+        self.artifact_registry.restore(artifacts.values())
+        self.idempotency_index.restore(idempotency_keys)
+        self.artifact_registry.idempotency_index.restore(idempotency_keys)
+        
+        requeued = 0
+        for data in sorted(jobs.values(), key=lambda data: data["created_ts"]):
+            job = JobRecord.from_dict(data)
+            if job.status in TERMINAL_STATUSES:
+                self._store_job(job, persist=False)
+                self._retain(job)
+            else:
+                self._resume_job(job)
+                requeued += 1
+        
+        self._recovery = {
+            "jobs": len(jobs),
+            "requeued": requeued,
+            "artifacts": len(artifacts),
+            "idempotency_keys": len(idempotency_keys),
+            "seconds": round(time.monotonic() - started, 3)
+        }
+        self.logger.info(
+            f"Recovered {len(jobs)} job(s) ({requeued} requeued) and {len(artifacts)} artifact(s) "
+            f"in {self._recovery['seconds']}s"
+        )
+        
+        self._dispatch_pending()
+    
+    def _resolve_completion(self, job_id: str, token: str, result: Dict[str, Any]) -> bool:
+        """Wake the dispatch waiting for a job's callback if the token matches."""
+        waiting = self._completions.get(job_id)
+        if waiting is None:
+            return False
+        
+        expected, completion = waiting
+        if completion.done() or not secrets.compare_digest(token, expected):
+            return False
+        
+        completion.set_result(result)
+        self._callbacks_received += 1
+        return True
+    
+    def _stop_job(
+        self,
+        job: JobRecord,
+        status: JobStatus,
+        error: Optional[str] = None,
+        failure_reason: Optional[JobFailureReason] = None
+    ) -> None:
+        """
+        End a job before its execution finishes (cancellation or deadline).
+        
+        Args:
+            job: Job to stop
+            status: Terminal status to record
+            error: Error message, if any
+            failure_reason: Failure reason, if any
+        """
+        # Update job status
+        self._transition(job, status, error=error, failure_reason=failure_reason)
+        
+        # Coalesced jobs share one execution; keep it alive while anyone still waits on it
+        leader_id = job.coalesced_with or job.id
+        if any(member.status not in TERMINAL_STATUSES for member in self._flight_members(leader_id)):
+            return
+        self._end_flight(leader_id)
+        
+        # Drop the job from the queue if it has not been dispatched yet
+        self.scheduler.discard(leader_id)
+        retry_handle = self._retry_handles.pop(leader_id, None)
+        if retry_handle:
+            retry_handle.cancel()
+        
+        # Cancel the task
+        if leader_id in self.running_tasks:
+            task = self.running_tasks[leader_id]
+            task.cancel()
+            del self.running_tasks[leader_id]
+    
+    def _on_deadline(self, job: JobRecord) -> None:
+        """Timer callback that fails a job whose deadline has passed."""
+        self._deadline_handles.pop(job.id, None)
+        if job.status in TERMINAL_STATUSES:
+            return
+        
+        self.logger.warning(f"Job {job.id} timed out while {job.status}")
+        self._stop_job(
+            job,
+            JobStatus.FAILED,
+            error=f"Job exceeded its deadline of {job.deadline.isoformat()}Z",
+            failure_reason=JobFailureReason.TIMED_OUT
+        )
+    
+    async def _accept_submission(self, job_submission: JobSubmission) -> str:
+        """
+        Create and admit a job, honouring its idempotency key.
+        
+        Args:
+            job_submission: Job submission data
+            
+        Returns:
+            ID of the new job, or of the original job for a repeated key
+        """
+        if self.state_backend is not None and AgentRegistry.get_service_url(job_submission.type) is None:
+            # The service may have been registered through another worker since the last heartbeat
+            await AgentRegistry.refresh_from_backend()
+        
+        key = job_submission.idempotency_key
+        if not key:
+            job = self._create_job(job_submission)
+            self._admit_job(job)
+            return job.id
+        
+        request_hash = content_hash(job_submission.model_dump(mode="json", exclude={"idempotency_key"}))
+        existing_id = self.idempotency_index.get(key, request_hash)
+        if existing_id:
+            return existing_id
+        
+        # Claim the key before admitting, so concurrent retries on any worker get this job back
+        job = self._create_job(job_submission)
+        job_id = await self.idempotency_index.claim(key, job.id, request_hash)
+        if job_id != job.id:
+            return job_id
+        
+        try:
+            self._admit_job(job)
+        except Exception:
+            await self.idempotency_index.release(key, job.id)
+            raise
+        
+        if self.journal is not None:
+            # Log the job first so a replayed key never points at a job the log lacks
+            self._flush_state()
+            record = self.idempotency_index.export(key)
+            if record is not None:
+                self.journal.append("idempotency", record)
+        return job.id
+    
+    def _create_job(self, job_submission: JobSubmission) -> JobRecord:
+        """
+        Build a job from a submission.
+        
+        Args:
+            job_submission: Job submission data
+            
+        Returns:
+            New pending job
+            
+        Raises:
+            ValueError: If no agent is available for the job type
+        """
+        metadata = job_submission.metadata or {}
+        job = JobRecord(
+            type=job_submission.type,
+            payload=job_submission.payload,
+            priority=job_submission.priority,
+            tenant=str(metadata.get("tenant") or metadata.get("owner") or "default"),
+            metadata=metadata
+        )
+        
+        # Check if external service is available
+        if not AgentRegistry.can_handle_job(job):
+            raise ValueError(f"No external service available for job type: {job.type}")
+        
+        job.input_artifacts = job_submission.input_artifacts
+        job.use_cache = job_submission.use_cache
+        
+        if job_submission.coalesce:
+            # Jobs reading different inputs, or treating the cache differently, must not share a result
+            job.fingerprint = payload_fingerprint(job.type, job.payload, {
+                "input_artifacts": [ref.model_dump(mode="json") for ref in job.input_artifacts],
+                "use_cache": job.use_cache
+            })
+        
+        timeout = job_submission.timeout_seconds or self.default_timeouts.get(job.type)
+        if timeout:
+            job.deadline_ts = job.created_ts + timeout
+        
+        return job
+    
+    def _admit_job(self, job: JobRecord) -> None:
+        """
+        Queue and store a job; it stays pending until a concurrency slot frees up.
+        
+        A coalescing job whose payload matches a pending or running job is
+        attached to that job's execution instead of being queued.
+        
+        Args:
+            job: Job to admit
+            
+        Raises:
+            QueueFullError: If the pending job queue is at capacity
+        """
+        if job.fingerprint:
+            leader_id = self._inflight_by_fingerprint.get(job.fingerprint)
+            if leader_id:
+                self._attach_to_flight(job, leader_id)
+                return
+        
+        self.scheduler.enqueue(job)
+        self._store_job(job)
+        
+        if job.fingerprint:
+            self._inflight_by_fingerprint[job.fingerprint] = job.id
+        
+        self._arm_deadline(job)
+    
+    def _store_job(self, job: JobRecord, persist: bool = True) -> None:
+        """Add a job to the in-memory store and its indexes."""
+        self.jobs[job.id] = job
+        key = (job.created_ts, job.id)
+        self._jobs_by_created.add(key)
+        self._jobs_by_status[job.status.value].add(key)
+        if persist:
+            self._persist(job)
+            self.events.publish(job)
+    
+    def _start_workflow_node(self, run: WorkflowRun, node_id: str) -> None:
+        """Submit the job of a ready workflow node in the background."""
+        task = asyncio.create_task(self._submit_workflow_node(run, node_id))
+        self._workflow_tasks.add(task)
+        task.add_done_callback(self._workflow_tasks.discard)
+    
+    async def _submit_workflow_node(self, run: WorkflowRun, node_id: str) -> None:
+        """
+        Resolve a node's input artifacts and submit its job.
+        
+        Args:
+            run: Workflow
+            node_id: Ready node
+        """
+        node = run.nodes[node_id]
+        try:
+            payload = dict(node.payload)
+            input_artifacts = list(node.input_artifacts)
+            for workflow_input in node.inputs:
+                upstream = await self.get_job_record(run.job_ids[workflow_input.node])
+                # Coalesced jobs share the artifacts registered under the job that ran
+                producer_id = upstream.coalesced_with or upstream.id if upstream else run.job_ids[workflow_input.node]
+                artifacts = [
+                    artifact for artifact in await self.artifact_registry.get_artifacts_by_job(producer_id)
+                    if (workflow_input.artifact_type is None
+                        or ArtifactType(artifact.metadata.type) == workflow_input.artifact_type)
+                    and (workflow_input.name is None or artifact.metadata.name == workflow_input.name)
+                ]
+                if not artifacts:
+                    raise ValueError(f"Node {workflow_input.node} produced no matching artifact")
+                
+                for artifact in artifacts:
+                    input_artifacts.append(ArtifactReference(
+                        artifact_id=artifact.metadata.id,
+                        artifact_type=artifact.metadata.type,
+                        reference_type=workflow_input.reference_type,
+                        metadata={"workflow_node": workflow_input.node}
+                    ))
+                if workflow_input.payload_key:
+                    artifact_ids = [artifact.metadata.id for artifact in artifacts]
+                    payload[workflow_input.payload_key] = artifact_ids[0] if len(artifact_ids) == 1 else artifact_ids
+            
+            if run.node_status[node_id] != WorkflowNodeStatus.WAITING:
+                return  # the workflow stopped while inputs were resolved
+            
+            job_id = await self.submit_job(JobSubmission(
+                type=node.type,
+                payload=payload,
+                priority=node.priority,
+                metadata={**node.metadata, "workflow_id": run.id, "workflow_node": node_id},
+                coalesce=node.coalesce,
+                input_artifacts=input_artifacts,
+                use_cache=node.use_cache,
+                timeout_seconds=node.timeout_seconds
+            ))
+        except Exception as e:
+            self.logger.error(f"Workflow {run.id} node {node_id} could not be submitted: {e}")
+            self._workflow_node_finished(run, node_id, JobStatus.FAILED, str(e))
+            return
+        
+        if run.node_status[node_id] != WorkflowNodeStatus.WAITING:
+            # Stopped while the job was submitted
+            await self.cancel_job(job_id)
+            return
+        
+        run.node_submitted(node_id, job_id)
+        job = self.jobs.get(job_id)
+        if job is None or job.status in TERMINAL_STATUSES:
+            # Finished already, or owned by another worker: nothing will call _advance_workflow
+            job = job or await self.get_job_record(job_id)
+            self._workflow_node_finished(run, node_id, job.status if job else JobStatus.FAILED, job.error if job else None)
+        else:
+            self._workflow_jobs[job_id] = (run.id, node_id)
+    
+    def _advance_workflow(self, job: JobRecord) -> None:
+        """Feed the outcome of a workflow job back into its workflow."""
+        workflow_id, node_id = self._workflow_jobs.pop(job.id)
+        run = self.workflows.get(workflow_id)
+        if run is not None:
+            self._workflow_node_finished(run, node_id, job.status, job.error)
+    
+    def _workflow_node_finished(
+        self,
+        run: WorkflowRun,
+        node_id: str,
+        status: JobStatus,
+        error: Optional[str] = None
+    ) -> None:
+        """
+        Record a node outcome and submit the nodes it unblocked.
+        
+        Args:
+            run: Workflow
+            node_id: Finished node
+            status: Terminal status of the node's job
+            error: Error of the node's job, if any
+        """
+        was_finished = run.finished
+        for ready_id in run.node_finished(node_id, status, error):
+            self._start_workflow_node(run, ready_id)
+        
+        if status == JobStatus.FAILED and run.fail_fast and not run.finished:
+            self._stop_workflow(run, WorkflowStatus.FAILED)
+        elif run.finished and not was_finished:
+            self._workflow_finished(run)
+    
+    def _stop_workflow(self, run: WorkflowRun, status: WorkflowStatus) -> None:
+        """Skip a workflow's waiting nodes and cancel its running jobs."""
+        for job_id in run.cancel(status):
+            job = self.jobs.get(job_id)
+            if job is not None and job.status not in TERMINAL_STATUSES:
+                self._stop_job(job, JobStatus.CANCELLED)
+        self._workflow_finished(run)
+    
+    def _workflow_finished(self, run: WorkflowRun) -> None:
+        """Log a finished workflow and forget the oldest finished ones."""
+        self.logger.info(f"Workflow {run.id} {run.status.value}")
+        self._finished_workflows[run.id] = None
+        while len(self._finished_workflows) > MAX_FINISHED_WORKFLOWS:
+            workflow_id, _ = self._finished_workflows.popitem(last=False)
+            self.workflows.pop(workflow_id, None)
+    
+    def _wake_waiters(self, job_id: str) -> None:
+        """Resolve the ``wait_for_jobs`` futures parked on a job."""
+        waiters = self._job_waiters.pop(job_id, None)
+        if waiters:
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+    
+    def _drop_job(self, job_id: str) -> Optional[JobRecord]:
+        """Remove a job from the in-memory store and its indexes."""
+        job = self.jobs.pop(job_id, None)
+        if job:
+            key = (job.created_ts, job.id)
+            self._jobs_by_created.remove(key)
+            self._jobs_by_status[job.status.value].remove(key)
+        return job
+    
+    def _arm_deadline(self, job: JobRecord) -> None:
+        """Start the timer that enforces a job's deadline."""
+        if job.deadline_ts is None:
+            return
+        
+        delay = job.deadline_ts - time.time()
+        self._deadline_handles[job.id] = asyncio.get_running_loop().call_later(
+            max(0.0, delay), self._on_deadline, job
+        )
+    
+    def _attach_to_flight(self, job: JobRecord, leader_id: str) -> None:
+        """
+        Attach a job to an in-flight execution of an identical job.
+        
+        Args:
+            job: Job to attach
+            leader_id: ID of the job that owns the execution
+        """
+        job.coalesced_with = leader_id
+        self._store_job(job)
+        if leader_id in self.running_tasks:
+            self._transition(job, JobStatus.RUNNING)
+        
+        self._coalesced_jobs.setdefault(leader_id, []).append(job)
+        self._coalesced_total += 1
+        self._arm_deadline(job)
+    
+    def _flight_members(self, leader_id: str) -> List[JobRecord]:
+        """Get the job owning an execution together with all jobs attached to it."""
+        leader = self.jobs.get(leader_id)
+        members = [leader] if leader else []
+        return members + self._coalesced_jobs.get(leader_id, [])
+    
+    def _end_flight(self, leader_id: str) -> None:
+        """Stop attaching new jobs to an execution."""
+        leader = self.jobs.get(leader_id)
+        if leader and leader.fingerprint and self._inflight_by_fingerprint.get(leader.fingerprint) == leader_id:
+            del self._inflight_by_fingerprint[leader.fingerprint]
+        self._coalesced_jobs.pop(leader_id, None)
+    
+    async def _complete_flight(self, leader: JobRecord, result: Dict[str, Any]) -> None:
+        """
+        Complete an execution successfully, storing a large result out of line.
+        
+        Jobs attached to the execution share the stored file.
+        
+        Args:
+            leader: Job that owns the execution
+            result: Execution result
+        """
+        stored = await self.result_store.store(leader.id, result)
+        if stored is None:
+            self._finish_flight(leader, JobStatus.COMPLETED, result=result)
+            return
+        
+        summary, result_ref = stored
+        linked = set()
+        while True:
+            # Jobs may attach while links are made, so repeat until every member has one
+            unlinked = [
+                member.id for member in self._flight_members(leader.id)
+                if member is not leader and member.id not in linked
+            ]
+            if not unlinked:
+                break
+            await asyncio.to_thread(self._link_results, leader.id, unlinked)
+            linked.update(unlinked)
+        self._finish_flight(leader, JobStatus.COMPLETED, result=summary, result_ref=result_ref)
+    
+    def _link_results(self, job_id: str, other_job_ids: List[str]) -> None:
+        """Share a job's stored result with other jobs; runs in a worker thread."""
+        for other_job_id in other_job_ids:
+            self.result_store.link(job_id, other_job_id)
+    
+    def _finish_flight(
+        self,
+        leader: JobRecord,
+        status: JobStatus,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+        failure_reason: Optional[JobFailureReason] = None,
+        result_ref: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Complete a job and every job attached to its execution.
+        
+        Args:
+            leader: Job that owns the execution
+            status: Terminal status
+            result: Execution result, or its summary if stored out of line
+            error: Error message, if any
+            failure_reason: Failure reason, if any
+            result_ref: Reference to the result in the result store, if stored there
+        """
+        for member in self._flight_members(leader.id):
+            self._transition(
+                member, status, result=result, error=error, failure_reason=failure_reason, result_ref=result_ref
+            )
+        self._end_flight(leader.id)
+    
+    def _transition(
+        self,
+        job: JobRecord,
+        status: JobStatus,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+        failure_reason: Optional[JobFailureReason] = None,
+        result_ref: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """
+        Move a job to a new status.
+        
+        Terminal jobs never change status again.
+        
+        Args:
+            job: Job to update
+            status: New status
+            result: Execution result to record, if any
+            error: Error message to record, if any
+            failure_reason: Failure reason to record, if any
+            result_ref: Result store reference to record, if any
+            
+        Returns:
+            True if the job was updated
+        """
+        if job.status in TERMINAL_STATUSES:
+            return False
+        
+        previous = job.status
+        job.status = status
+        if job.status != previous and job.id in self.jobs:
+            key = (job.created_ts, job.id)
+            self._jobs_by_status[previous.value].remove(key)
+            self._jobs_by_status[job.status.value].add(key)
+        if status == JobStatus.RUNNING:
+            job.started_ts = time.time()
+        elif status in TERMINAL_STATUSES:
+            job.completed_ts = time.time()
+            deadline_handle = self._deadline_handles.pop(job.id, None)
+            if deadline_handle:
+                deadline_handle.cancel()
+        
+        if result is not None:
+            job.result = result
+        if result_ref is not None:
+            job.result_ref = result_ref
+        if error is not None:
+            job.error = error
+        if failure_reason is not None:
+            job.failure_reason = failure_reason
+        
+        if job.id in self.jobs:
+            self._persist(job)
+            self.events.publish(job)
+            self._wake_waiters(job.id)
+            if status in TERMINAL_STATUSES:
+                self.job_logs.finish(job.id)
+                self._retain(job)
+                if job.id in self._workflow_jobs:
+                    self._advance_workflow(job)
+        
+        return True
+    
+    def _retain(self, job: JobRecord) -> None:
+        """Track a finished job for retention and evict old ones if over the limits."""
+        # Sizes only matter under a byte limit; estimate them rather than encode on the event loop
+        limit = self.retention_policy.max_terminal_bytes
+        size = estimate_job_size(job, limit) if limit is not None else 0
+        self._terminal_jobs[job.id] = size
+        self._terminal_bytes += size
+        
+        self._enforce_retention()
+        
+        if self._retention_handle is None and (
+            self.retention_policy.max_age_seconds is not None
+            or self.retention_policy.archive_max_age_seconds is not None
+        ):
+            self._retention_handle = asyncio.get_running_loop().call_later(
+                self.retention_policy.sweep_interval, self._retention_sweep
+            )
+    
+    def _retention_sweep(self) -> None:
+        """Timer callback that evicts finished jobs past their maximum age and expires old archived jobs."""
+        self._retention_handle = None
+        if self._shutdown_event.is_set():
+            return
+        
+        self._enforce_retention()
+        if self.retention_policy.archive_max_age_seconds is not None:
+            task = asyncio.create_task(self._expire_archive())
+            self._archive_tasks.add(task)
+            task.add_done_callback(self._archive_tasks.discard)
+        
+        if self._terminal_jobs or self.retention_policy.archive_max_age_seconds is not None:
+            self._retention_handle = asyncio.get_running_loop().call_later(
+                self.retention_policy.sweep_interval, self._retention_sweep
+            )
+    
+    def _enforce_retention(self) -> None:
+        """Move the oldest finished jobs to the archive until the retention limits hold."""
+        policy = self.retention_policy
+        age_cutoff = None
+        if policy.max_age_seconds is not None:
+            age_cutoff = time.time() - policy.max_age_seconds
+        
+        # Walk the oldest jobs without copying the whole map; removals happen after the walk
+        evict_ids = []
+        remaining_count = len(self._terminal_jobs)
+        remaining_bytes = self._terminal_bytes
+        for job_id, size in self._terminal_jobs.items():
+            over_count = (
+                policy.max_terminal_jobs is not None
+                and remaining_count > policy.max_terminal_jobs
+            )
+            over_bytes = (
+                policy.max_terminal_bytes is not None
+                and remaining_bytes > policy.max_terminal_bytes
+            )
+            job = self.jobs.get(job_id)
+            too_old = (
+                age_cutoff is not None and job is not None
+                and job.completed_ts is not None and job.completed_ts < age_cutoff
+            )
+            if not (over_count or over_bytes or too_old):
+                break
+            
+            # Keep jobs whose execution is still shared with or driven by other work
+            if job_id in self.running_tasks or job_id in self._coalesced_jobs or job_id in self._retry_handles:
+                continue
+            
+            evict_ids.append(job_id)
+            remaining_count -= 1
+            remaining_bytes -= size
+        
+        evicted = []
+        for job_id in evict_ids:
+            self._terminal_bytes -= self._terminal_jobs.pop(job_id)
+            job = self._drop_job(job_id)
+            self.job_logs.forget(job_id)
+            if job:
+                self._archiving[job_id] = job
+                evicted.append(job)
+        
+        if evicted:
+            self._evicted_total += len(evicted)
+            task = asyncio.create_task(self._archive_jobs(evicted))
+            self._archive_tasks.add(task)
+            task.add_done_callback(self._archive_tasks.discard)
+    
+    async def _archive_jobs(self, jobs: List[JobRecord]) -> None:
+        """
+        Write evicted jobs to the archive and drop them from the state backend.
+        
+        Args:
+            jobs: Jobs removed from memory
+        """
+        try:
+            await self.job_archive.put_many(jobs)
+            if self.journal is not None:
+                # Log the final state first so replay never sees it after the eviction
+                self._flush_state()
+                for job in jobs:
+                    self.journal.append("job_evicted", job.id)
+            if self.state_backend is not None:
+                # Their final rows must land before the delete, or a later write would bring them back
+                await self._sync_state()
+                await asyncio.to_thread(self.state_backend.delete_jobs, [job.id for job in jobs], self.worker_id)
+        except Exception as e:
+            self.logger.error(f"Failed to archive {len(jobs)} job(s): {e}")
+        finally:
+            for job in jobs:
+                self._archiving.pop(job.id, None)
+    
+    async def _expire_archive(self) -> None:
+        """Delete archived jobs past the archive's maximum age, together with their result and log files."""
+        completed_before = time.time() - self.retention_policy.archive_max_age_seconds
+        try:
+            job_ids = await self.job_archive.expire(completed_before)
+            if job_ids:
+                await asyncio.to_thread(self._remove_job_files, job_ids)
+                self.logger.info(f"Expired {len(job_ids)} archived job(s)")
+        except Exception as e:
+            self.logger.error(f"Failed to expire archived jobs: {e}")
+    
+    def _remove_job_files(self, job_ids: List[str]) -> None:
+        """Delete the result and log files kept for expired jobs; runs in a worker thread."""
+        for job_id in job_ids:
+            self.result_store.remove(job_id)
+            self.job_logs.remove(job_id)
+    
+    def _persist(self, job: JobRecord) -> None:
+        """Queue a changed job for the next write to the state backend and write-ahead log."""
+        if (self.state_backend is None and self.journal is None) or self._shutdown_event.is_set():
+            return
+        
+        self._dirty_jobs[job.id] = job
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_soon(self._flush_state)
+    
+    def _flush_state(self) -> None:
+        """
+        Write queued job changes to the write-ahead log and hand them to the state backend writer.
+        
+        The log is appended inline so its order matches the order of the
+        changes; the backend write runs in a worker thread (see ``_write_state``).
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._dirty_jobs:
+            return
+        
+        rows = []
+        for job in self._dirty_jobs.values():
+            data = job.to_dict()
+            data["created_ts"] = job.created_ts
+            rows.append(data)
+        self._dirty_jobs.clear()
+        
+        if self.journal is not None:
+            for data in rows:
+                self.journal.append("job", data)
+        
+        if self.state_backend is not None:
+            self._unwritten_rows.extend(rows)
+            if self._state_writer is None:
+                self._state_writer = asyncio.create_task(self._write_state())
+    
+    async def _sync_state(self) -> None:
+        """Flush queued job changes and wait until the state backend holds them."""
+        self._flush_state()
+        if self._state_writer is not None:
+            await asyncio.shield(self._state_writer)
+    
+    async def _write_state(self) -> None:
+        """
+        Write flushed rows to the state backend, one transaction per batch.
+        
+        Only one writer runs at a time and it drains the rows in the order
+        they were flushed, so a later state of a job never gets overwritten by
+        an earlier one. Rows flushed during a write go out in the next batch.
+        """
+        try:
+            while self._unwritten_rows:
+                rows, self._unwritten_rows = self._unwritten_rows, []
+                try:
+                    await asyncio.to_thread(self.state_backend.put_jobs, rows, self.worker_id, self.lease_seconds)
+                except Exception as e:
+                    self.logger.error(f"Failed to write {len(rows)} job(s) to the state backend: {e}")
+        finally:
+            self._state_writer = None
+        
+        self._start_heartbeat()
+    
+    def _start_heartbeat(self) -> None:
+        """Start renewing this worker's job leases if a state backend is configured."""
+        if self.state_backend is None or self._heartbeat_handle is not None or self._shutdown_event.is_set():
+            return
+        
+        self._heartbeat_handle = asyncio.get_running_loop().call_later(
+            self.lease_seconds / 3, self._on_heartbeat
+        )
+    
+    def _on_heartbeat(self) -> None:
+        """Timer callback for the state backend heartbeat."""
+        task = asyncio.create_task(self._heartbeat())
+        task.add_done_callback(lambda _task: self._restart_heartbeat())
+    
+    def _restart_heartbeat(self) -> None:
+        """Schedule the next heartbeat."""
+        self._heartbeat_handle = None
+        self._start_heartbeat()
+    
+    async def _heartbeat(self) -> None:
+        """
+        Sync this worker with the state backend.
+        
+        Renews the leases on owned jobs, applies cancellations and
+        completion callbacks received by other workers, adopts jobs whose worker stopped renewing its
+        leases and reloads service registrations.
+        """
+        backend = self.state_backend
+        try:
+            await self._sync_state()
+            await asyncio.to_thread(backend.renew_leases, self.worker_id, self.lease_seconds)
+            
+            for job_id in await asyncio.to_thread(backend.pop_cancel_requests, self.worker_id):
+                job = self.jobs.get(job_id)
+                if job and job.status not in TERMINAL_STATUSES:
+                    self._stop_job(job, JobStatus.CANCELLED)
+            
+            for job_id, token, result in await asyncio.to_thread(backend.pop_completions, self.worker_id):
+                self._resolve_completion(job_id, token, result)
+            
+            # Only adopt what fits in the queue
+            capacity = self.scheduler.max_pending - self.scheduler.pending_count
+            adopted = await asyncio.to_thread(
+                backend.adopt_expired_jobs, self.worker_id, self.lease_seconds, capacity
+            ) if capacity > 0 else []
+            for data in adopted:
+                self._adopt_job(JobRecord.from_dict(data))
+            
+            await AgentRegistry.refresh_from_backend()
+            self._start_health_checks()
+        except Exception as e:
+            self.logger.error(f"State backend heartbeat failed: {e}")
+            return
+        
+        if adopted:
+            self._dispatch_pending()
+    
+    def _adopt_job(self, job: JobRecord) -> None:
+        """
+        Take over a job from a worker that stopped renewing its lease.
         
-    async def submit_job(self, job_submission: JobSubmission) -> str:
+        Args:
+            job: Job loaded from the state backend
         """
-        Submit a new job for execution.
+        if job.id in self.jobs:
+            return
+        
+        self.logger.warning(f"Adopting job {job.id} ({job.status.value}) from an expired lease")
+        self._resume_job(job)
+        self._adopted_total += 1
+    
+    def _resume_job(self, job: JobRecord) -> None:
+        """
+        Queue an unfinished job loaded from persistent state.
+        
+        The job runs again from the start; it is queued on its own even if it
+        was coalesced with another job.
         
         Args:
-            job_submission: Job submission data
+            job: Job that was pending or running
+        """
+        job.status = JobStatus.PENDING
+        job.started_ts = None
+        job.coalesced_with = None
+        job.fingerprint = None
+        
+        self.scheduler.enqueue(job, force=True)
+        self._store_job(job)
+        self._arm_deadline(job)
+    
+    def _abandon_flight(self, job: JobRecord) -> None:
+        """
+        Forget a job (and its coalesced jobs) now owned by another worker.
+        
+        Args:
+            job: Job whose lease was lost
+        """
+        self.logger.warning(f"Lost the lease on job {job.id}; leaving it to its new owner")
+        members = self._flight_members(job.id)
+        self._end_flight(job.id)
+        
+        for member in members:
+            deadline_handle = self._deadline_handles.pop(member.id, None)
+            if deadline_handle:
+                deadline_handle.cancel()
+            self._dirty_jobs.pop(member.id, None)
+            self._drop_job(member.id)
+            self._lost_total += 1
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get runtime metrics for the orchestrator.
+        
+        Returns:
+            Dict of metrics grouped by subsystem
+        """
+        return {
+            "jobs": {status: len(index) for status, index in self._jobs_by_status.items()},
+            "scheduler": self.scheduler.get_stats(),
+            "coalescing": {
+                "inflight": len(self._inflight_by_fingerprint),
+                "attached_total": self._coalesced_total
+            },
+            "result_cache": self.result_cache.get_stats(),
+            "idempotency": {
+                "jobs": self.idempotency_index.get_stats(),
+                "artifacts": self.artifact_registry.idempotency_index.get_stats()
+            },
+            "retries": {
+                "scheduled": sum(self._retry_counts.values()),
+                "exhausted": self._retries_exhausted,
+                "waiting": len(self._retry_handles),
+                "by_type": dict(self._retry_counts)
+            },
+            "circuit_breakers": {
+                service_url: breaker.get_stats()
+                for service_url, breaker in self.circuit_breakers.items()
+            },
+            "services": {
+                JobType(job_type).value: {
+                    "load_balancer": AgentRegistry.get_load_balancing_strategy(job_type).value,
+                    "replicas": [
+                        {
+                            "url": replica.url,
+                            "weight": replica.weight,
+                            "capacity": self.scheduler.get_service_limit(replica.url),
+                            "in_flight": self.scheduler.get_service_running(replica.url),
+                            "available": self._service_available(replica.url)
+                        }
+                        for replica in AgentRegistry.get_replicas(job_type)
+                    ]
+                }
+                for job_type in AgentRegistry.get_supported_job_types()
+            },
+            "service_health": self.service_health.get_stats(),
+            "connection_pools": self.connection_pools.get_stats(),
+            "logs": self.job_logs.get_stats(),
+            "result_store": self.result_store.get_stats(),
+            "workflows": {
+                "total": len(self.workflows),
+                "running": len(self.workflows) - len(self._finished_workflows),
+                "running_jobs": len(self._workflow_jobs)
+            },
+            "events": {
+                **self.events.get_stats(),
+                "waited_jobs": len(self._job_waiters)
+            },
+            "async_dispatch": {
+                "awaiting_callback": len(self._completions),
+                "polling": self._polling_jobs,
+                "callbacks_received": self._callbacks_received
+            },
+            "journal": {
+                **self.journal.get_stats(),
+                "recovered": self._recovery
+            } if self.journal else None,
+            "state": {
+                "backend": type(self.state_backend).__name__ if self.state_backend else None,
+                "worker_id": self.worker_id,
+                "unflushed_jobs": len(self._dirty_jobs),
+                "adopted_total": self._adopted_total,
+                "lost_total": self._lost_total
+            },
+            "retention": {
+                "jobs_in_memory": len(self.jobs),
+                "terminal_jobs": len(self._terminal_jobs),
+                "terminal_bytes": self._terminal_bytes,
+                "evicted_total": self._evicted_total,
+                "archive": self.job_archive.get_stats()
+            }
+        }
+    
+    def get_retry_policy(self, job_type: JobType) -> RetryPolicy:
+        """Get the retry policy for a job type."""
+        return self.retry_policies.get(job_type, self.default_retry_policy)
+    
+    async def register_service(self, registration: ServiceRegistration) -> ServiceStatus:
+        """
+        Register a service replica and start probing its health.
+        
+        Args:
+            registration: Service registration
             
         Returns:
-            Job ID
+            Status of the registered replica
             
         Raises:
-            ValueError: If no agent is available for the job type
+            ValueError: If the body format or encoding needs a package that is not installed
         """
-        # Create job
-        job = Job(
-            type=job_submission.type,
-            payload=job_submission.payload,
-            metadata=job_submission.metadata or {}
+        AgentRegistry.register_external_service(
+            registration.job_type,
+            registration.service_url,
+            registration.dispatch_mode,
+            weight=registration.weight,
+            capacity=registration.capacity,
+            lease_seconds=registration.lease_seconds,
+            body_format=registration.body_format,
+            content_encoding=registration.content_encoding
         )
+        if registration.load_balancer is not None:
+            AgentRegistry.set_load_balancer(registration.job_type, registration.load_balancer)
         
-        # Check if external service is available
-        if not AgentRegistry.can_handle_job(job):
-            raise ValueError(f"No external service available for job type: {job.type}")
+        self._start_health_checks()
+        self._warm_connections(registration.service_url)
+        self._dispatch_pending()
+        await AgentRegistry.flush_backend()
+        return self._service_status(registration.job_type, AgentRegistry.get_replicas(registration.job_type)[-1])
+    
+    async def service_heartbeat(self, heartbeat: ServiceHeartbeat) -> Optional[List[ServiceStatus]]:
+        """
+        Renew a service's lease and record the load it reports.
         
-        # Store job
-        self.jobs[job.id] = job
+        Args:
+            heartbeat: Heartbeat sent by the service
+            
+        Returns:
+            Status of the service's replicas, or None if it is not registered
+            (e.g. its lease expired) and has to register again
+        """
+        service_url = heartbeat.service_url
+        if not AgentRegistry.renew_lease(service_url, heartbeat.lease_seconds):
+            return None
+        await AgentRegistry.flush_backend()
         
-        # Start execution
-        task = asyncio.create_task(self._execute_job(job))
-        self.running_tasks[job.id] = task
+        self.service_health.record_heartbeat(
+            service_url,
+            self.scheduler.get_service_running(service_url),
+            in_flight=heartbeat.in_flight,
+            free_slots=heartbeat.free_slots
+        )
         
-        return job.id
+        # Free slots reported after a saturation let queued jobs through
+        if self.scheduler.pending_count:
+            self._dispatch_pending()
+        return [status for status in self.list_services() if status.service_url == service_url]
     
-    async def get_job_status(self, job_id: str) -> Optional[JobResponse]:
+    async def deregister_service(self, job_type: JobType, service_url: str) -> bool:
         """
-        Get the status of a job.
+        Remove a service replica.
+        
+        Jobs already dispatched to it keep running.
         
         Args:
-            job_id: Job ID
+            job_type: Job type the replica serves
+            service_url: Base URL of the replica
             
         Returns:
-            Job response or None if not found
+            True if the replica was registered
         """
-        job = self.jobs.get(job_id)
-        if not job:
-            return None
+        removed = AgentRegistry.deregister_external_service(job_type, service_url)
+        if removed and not AgentRegistry.is_registered(service_url):
+            self.service_health.retain(
+                replica.url
+                for registered_type in AgentRegistry.get_supported_job_types()
+                for replica in AgentRegistry.get_replicas(registered_type)
+            )
+        await AgentRegistry.flush_backend()
+        return removed
+    
+    def list_services(self) -> List[ServiceStatus]:
+        """
+        Get the status of every registered service replica.
         
-        return JobResponse(
-            id=job.id,
-            type=job.type,
-            status=job.status,
-            created_at=job.created_at,
-            started_at=job.started_at,
-            completed_at=job.completed_at,
-            result=job.result,
-            error=job.error,
-            logs=job.logs,
-            metadata=job.metadata
+        Returns:
+            One entry per (job type, replica)
+        """
+        return [
+            self._service_status(job_type, replica)
+            for job_type in AgentRegistry.get_supported_job_types()
+            for replica in AgentRegistry.get_replicas(job_type)
+        ]
+    
+    def _service_status(self, job_type: JobType, replica: ServiceReplica) -> ServiceStatus:
+        """Build the API model for a registered replica."""
+        health = self.service_health.get_health(replica.url)
+        lease_expires = AgentRegistry.get_lease_expiry(replica.url)
+        body_format, content_encoding = AgentRegistry.get_wire_format(replica.url)
+        return ServiceStatus(
+            job_type=job_type,
+            service_url=replica.url,
+            dispatch_mode=AgentRegistry.get_dispatch_mode(replica.url),
+            body_format=body_format,
+            content_encoding=content_encoding,
+            weight=replica.weight,
+            capacity=replica.capacity or self.scheduler.get_service_limit(replica.url),
+            lease_expires_at=None if lease_expires is None else epoch_to_datetime(lease_expires),
+            healthy=health is None or health.healthy,
+            available=self._service_available(replica.url),
+            in_flight=self.scheduler.get_service_running(replica.url),
+            reported_in_flight=None if health is None else health.in_flight,
+            free_slots=None if health is None else health.free_slots,
+            last_error=None if health is None else health.last_error
         )
     
-    async def cancel_job(self, job_id: str) -> bool:
+    def _service_session(self, service_url: str) -> aiohttp.ClientSession:
         """
-        Cancel a running job.
+        Get the pooled session for a service.
+        
+        A pool gets a few more connections than the service's concurrency
+        limit, leaving room for health probes, up to the pool policy's
+        ``max_connections``; beyond that, requests wait for a connection.
         
         Args:
-            job_id: Job ID
+            service_url: Base URL of the service
             
         Returns:
-            True if job was cancelled, False if not found or already completed
+            Client session of the service's connection pool
         """
-        job = self.jobs.get(job_id)
-        if not job:
-            return False
+        return self.connection_pools.session(
+            service_url, limit=self.scheduler.get_service_limit(service_url) + POOL_HEADROOM
+        )
+    
+    def _warm_connections(self, service_url: str) -> None:
+        """Open connections to a newly registered service in the background."""
+        if self._shutdown_event.is_set():
+            return
         
-        if job.status in [JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED]:
-            return False
+        task = asyncio.create_task(self.connection_pools.warm(
+            service_url, limit=self.scheduler.get_service_limit(service_url) + POOL_HEADROOM
+        ))
+        self._warm_tasks.add(task)
+        task.add_done_callback(self._warm_tasks.discard)
+    
+    def _start_health_checks(self) -> None:
+        """Schedule the next round of health probes while services are registered."""
+        if (
+            self._health_check_handle is not None
+            or self._shutdown_event.is_set()
+            or not AgentRegistry.get_supported_job_types()
+        ):
+            return
         
-        # Cancel the task
-        if job_id in self.running_tasks:
-            task = self.running_tasks[job_id]
-            task.cancel()
-            del self.running_tasks[job_id]
+        self._health_check_handle = asyncio.get_running_loop().call_later(
+            self.service_health.policy.interval, self._on_health_check
+        )
+    
+    def _on_health_check(self) -> None:
+        """Timer callback for the health probes."""
+        task = asyncio.create_task(self._check_service_health())
+        task.add_done_callback(lambda _task: self._restart_health_checks())
+    
+    def _restart_health_checks(self) -> None:
+        """Schedule the next round of health probes."""
+        self._health_check_handle = None
+        self._start_health_checks()
+    
+    async def _check_service_health(self) -> None:
+        """
+        Drop services whose lease expired and probe the rest.
         
-        # Update job status
-        job.status = JobStatus.CANCELLED
-        job.completed_at = datetime.utcnow()
+        Services due for a probe are probed concurrently; a service answering
+        with an error status, a connection error or not within the probe
+        timeout counts as a failed probe. With a state backend only the
+        worker holding the probe lease probes, and the others adopt the
+        results it stores.
+        """
+        try:
+            await AgentRegistry.expire_leases()
+            service_urls = {
+                replica.url
+                for job_type in AgentRegistry.get_supported_job_types()
+                for replica in AgentRegistry.get_replicas(job_type)
+            }
+            self.service_health.retain(service_urls)
+            await self.connection_pools.retain(service_urls)
+            if not service_urls:
+                return
+            
+            backend = self.state_backend
+            if backend is not None and not await asyncio.to_thread(
+                backend.claim_health_probes, self.worker_id, self.lease_seconds
+            ):
+                records = await asyncio.to_thread(backend.get_service_health)
+                recovered = self.service_health.apply(
+                    record for record in records if record["service_url"] in service_urls
+                )
+            else:
+                due = self.service_health.due_for_probe(service_urls)
+                outcomes = await asyncio.gather(*(self._probe_service(service_url) for service_url in due))
+                recovered = any(outcomes)
+                if backend is not None and due:
+                    await asyncio.to_thread(
+                        backend.put_service_health, [self.service_health.export(service_url) for service_url in due]
+                    )
+        except Exception as e:
+            self.logger.error(f"Service health check failed: {e}")
+            return
         
-        return True
+        # A service coming back lets queued jobs through
+        if recovered and self.scheduler.pending_count:
+            self._dispatch_pending()
     
-    async def list_jobs(self, status_filter: Optional[JobStatus] = None, limit: Optional[int] = None) -> List[JobResponse]:
+    async def _probe_service(self, service_url: str) -> bool:
         """
-        List all jobs, optionally filtered by status.
+        Probe one service's health endpoint.
         
         Args:
-            status_filter: Optional status filter
-            limit: Maximum number of jobs to return
+            service_url: Base URL of the service
             
         Returns:
-            List of job responses
+            True if the service became healthy
+        """
+        policy = self.service_health.policy
+        error = None
+        try:
+            async with self._service_session(service_url).get(
+                f"{service_url}{policy.path}", timeout=aiohttp.ClientTimeout(total=policy.timeout)
+            ) as response:
+                # Services without a health route are judged by reachability alone
+                if not 200 <= response.status < 300 and response.status not in (404, 405):
+                    error = f"Health check returned status {response.status}"
+        except aiohttp.ClientError as e:
+            error = f"Health check failed: {e}"
+        except asyncio.TimeoutError:
+            error = f"Health check did not respond within {policy.timeout}s"
+        
+        changed = self.service_health.record_probe(service_url, error is None, error)
+        return changed and error is None
+    
+    def set_retry_policy(self, job_type: JobType, policy: RetryPolicy) -> None:
+        """
+        Set the retry policy for a job type.
+        
+        Args:
+            job_type: The job type
+            policy: Retry policy to apply to its jobs
         """
-        jobs = list(self.jobs.values())
+        self.retry_policies[JobType(job_type).value] = policy
+    
+    def _get_circuit_breaker(self, service_url: str) -> CircuitBreaker:
+        """Get (or create) the circuit breaker for a service."""
+        breaker = self.circuit_breakers.get(service_url)
+        if breaker is None:
+            breaker = self.circuit_breakers[service_url] = CircuitBreaker(service_url, self.circuit_breaker_policy)
+        return breaker
+    
+    def _service_available(self, service_url: str) -> bool:
+        """Check whether a service is leased, healthy, not saturated and its circuit lets jobs through."""
+        breaker = self.circuit_breakers.get(service_url)
+        return (
+            (breaker is None or breaker.allows_dispatch())
+            and AgentRegistry.lease_alive(service_url)
+            and self.service_health.is_available(service_url, self.scheduler.get_service_running(service_url))
+        )
+    
+    def _service_load(self, service_url: str) -> int:
+        """Estimate the requests outstanding at a service, for the load balancers."""
+        return self.service_health.estimate_in_flight(service_url, self.scheduler.get_service_running(service_url))
+    
+    def _replica_eligible(self, replica: ServiceReplica) -> bool:
+        """Check whether a replica has a free slot and is leased, healthy, not saturated and has a closed circuit."""
+        return self.scheduler.has_service_slot(replica.url) and self._service_available(replica.url)
+    
+    def _has_service_capacity(self, job_type: JobType) -> bool:
+        """
+        Check whether a replica of a job type could take a job now.
+        
+        Only reads state, so the scheduler can ask about every queued job
+        type without moving the load balancers.
         
-        if status_filter:
-            jobs = [job for job in jobs if job.status == status_filter]
+        Args:
+            job_type: The job type
+            
+        Returns:
+            True if a replica is eligible, or if no service is registered so
+            the job fails at dispatch instead of waiting forever
+        """
+        replicas = AgentRegistry.get_replicas(job_type)
+        if not replicas:
+            return True
         
-        # Sort by creation time (newest first)
-        jobs.sort(key=lambda x: x.created_at, reverse=True)
+        return any(self._replica_eligible(replica) for replica in replicas)
+    
+    def _pick_service(self, job_type: JobType) -> Optional[str]:
+        """
+        Pick the replica that runs the job being dispatched.
         
-        # Apply limit
-        if limit:
-            jobs = jobs[:limit]
+        Only eligible replicas are offered to the job type's load balancer,
+        which advances once per dispatched job. If none qualifies, the first
+        replica is returned so the scheduler sees it as busy and keeps the
+        job queued.
         
-        return [
-            JobResponse(
-                id=job.id,
-                type=job.type,
-                status=job.status,
-                created_at=job.created_at,
-                started_at=job.started_at,
-                completed_at=job.completed_at,
-                result=job.result,
-                error=job.error,
-                logs=job.logs,
-                metadata=job.metadata
+        Args:
+            job_type: The job type
+            
+        Returns:
+            Service URL, or None if no service is registered
+        """
+        replicas = AgentRegistry.get_replicas(job_type)
+        if not replicas:
+            return None
+        
+        replica = AgentRegistry.choose_replica(job_type, self._service_load, eligible=self._replica_eligible)
+        return (replica or replicas[0]).url
+    
+    def _dispatch_pending(self) -> None:
+        """Start queued jobs for as long as concurrency slots are available."""
+        while True:
+            ready = self.scheduler.pop_ready(self._pick_service, self._has_service_capacity)
+            if ready is None:
+                break
+            
+            job, service_url = ready
+            task = asyncio.create_task(self._execute_job(job, service_url))
+            self.running_tasks[job.id] = task
+            task.add_done_callback(
+                lambda _task, job=job, service_url=service_url: self._on_job_finished(job, service_url)
             )
-            for job in jobs
-        ]
+        
+        # Jobs parked behind an open circuit are retried once it half-opens
+        if self.scheduler.pending_count:
+            reopen_delays = [
+                breaker.retry_after() for breaker in self.circuit_breakers.values()
+                if breaker.state == CircuitState.OPEN and breaker.retry_after() > 0
+            ]
+            if reopen_delays:
+                self._schedule_redispatch(min(reopen_delays))
+    
+    def _schedule_redispatch(self, delay: float) -> None:
+        """Run the dispatcher again after the given delay."""
+        loop = asyncio.get_running_loop()
+        when = loop.time() + delay
+        
+        if self._redispatch_handle is not None:
+            if self._redispatch_handle.when() <= when:
+                return
+            self._redispatch_handle.cancel()
+        
+        self._redispatch_handle = loop.call_at(when, self._redispatch)
+    
+    def _redispatch(self) -> None:
+        """Timer callback for a scheduled dispatcher run."""
+        self._redispatch_handle = None
+        if not self._shutdown_event.is_set():
+            self._dispatch_pending()
+    
+    def _requeue_later(self, job: JobRecord, delay: float) -> None:
+        """
+        Put a dispatched job back into the queue after a delay.
+        
+        The job and any jobs coalesced with it return to PENDING meanwhile.
+        
+        Args:
+            job: Job that owns the execution
+            delay: Seconds to wait before re-queuing
+        """
+        for member in self._flight_members(job.id):
+            self._transition(member, JobStatus.PENDING)
+        
+        loop = asyncio.get_running_loop()
+        self._retry_handles[job.id] = loop.call_later(delay, self._requeue_job, job)
+    
+    def _requeue_job(self, job: JobRecord) -> None:
+        """Timer callback that re-queues a job waiting for a retry."""
+        self._retry_handles.pop(job.id, None)
+        if self._shutdown_event.is_set():
+            return
+        
+        # Skip jobs that were cancelled while waiting
+        if all(member.status in TERMINAL_STATUSES for member in self._flight_members(job.id)):
+            self._end_flight(job.id)
+            return
+        
+        self.scheduler.enqueue(job, force=True)
+        self._dispatch_pending()
     
-    async def _execute_job(self, job: Job) -> None:
+    def _on_job_finished(self, job: JobRecord, service_url: Optional[str]) -> None:
+        """Release the job's concurrency slots, apply retention and dispatch waiting jobs."""
+        self.scheduler.release(job.type, service_url)
+        if not self._shutdown_event.is_set():
+            # The job could not be evicted while its task was still running
+            self._enforce_retention()
+            self._dispatch_pending()
+    
+    async def _execute_job(self, job: JobRecord, service_url: Optional[str]) -> None:
         """
         Execute a job using the appropriate external service.
         
         Args:
             job: Job to execute
+            service_url: Service URL selected by the scheduler
         """
         try:
-            # Update status to running
-            job.status = JobStatus.RUNNING
-            job.started_at = datetime.utcnow()
+            # Make sure no other worker has taken the job over in the meantime
+            if self.state_backend is not None:
+                await self._sync_state()
+                owned = await asyncio.to_thread(
+                    self.state_backend.claim_job, job.id, self.worker_id, self.lease_seconds
+                )
+                if not owned:
+                    self._abandon_flight(job)
+                    return
+            
+            # Update status to running, including any coalesced jobs
+            for member in self._flight_members(job.id):
+                self._transition(member, JobStatus.RUNNING)
+            
+            # Complete straight from the result cache when inputs are unchanged
+            cache_key = await self._result_cache_key(job)
+            if cache_key:
+                cached = await self.result_cache.get(cache_key)
+                if cached is not None:
+                    for member in self._flight_members(job.id):
+                        member.cache_hit = True
+                    await self._register_service_artifacts(job, cached)
+                    await self._complete_flight(job, cached)
+                    return
             
-            # Get service URL for job type
-            service_url = AgentRegistry.get_service_url(job.type)
             if not service_url:
                 raise ValueError(f"No service URL configured for job type: {job.type}")
             
+            # Park the job again if the service's circuit opened while it was being dispatched
+            breaker = self._get_circuit_breaker(service_url)
+            if not breaker.allows_dispatch():
+                self._requeue_later(job, 0)
+                return
+            
             # Execute job via external service
-            result = await self._execute_job_via_service(job, service_url)
+            breaker.on_dispatch()
+            job.attempts += 1
+            try:
+                result = await self._execute_job_via_service(job, service_url)
+            except ServiceCallError as e:
+                # Only transport errors and overload responses count against the service
+                if e.retryable:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                raise
+            except asyncio.CancelledError:
+                breaker.record_abandoned()
+                raise
+            breaker.record_success()
+            
+            # Register any artifacts returned by the service before the job shows as
+            # completed, so whoever reacts to the completion (workflows included) finds them
+            await self._register_service_artifacts(job, result)
             
             # Update job with result
-            job.status = JobStatus.COMPLETED
-            job.completed_at = datetime.utcnow()
-            job.result = result
+            await self._complete_flight(job, result)
             
-            # Register any artifacts returned by the service
-            await self._register_service_artifacts(job, result)
+            if cache_key and result.get("status") != "failed":
+                await self.result_cache.put(cache_key, result)
             
         except asyncio.CancelledError:
             # Job was cancelled
-            job.status = JobStatus.CANCELLED
-            job.completed_at = datetime.utcnow()
+            self._finish_flight(job, JobStatus.CANCELLED)
             raise
             
+        except ServiceCallError as e:
+            policy = self.get_retry_policy(job.type)
+            retry = e.retryable and job.attempts < policy.max_attempts
+            delay = policy.next_delay(job.attempts) if retry else 0.0
+            if self._deadline_passed(job, delay):
+                # The deadline passed, or would pass before a retry could start
+                self._finish_flight(
+                    job, JobStatus.FAILED, error=f"Job timed out: {e}", failure_reason=JobFailureReason.TIMED_OUT
+                )
+                self.logger.error(f"Job {job.id} timed out after {job.attempts} attempt(s): {e}")
+            elif retry:
+                # Retry with backoff; the job waits in PENDING and frees its slot
+                self._retry_counts[job.type] = self._retry_counts.get(job.type, 0) + 1
+                self._requeue_later(job, delay)
+                self.logger.warning(
+                    f"Job {job.id} attempt {job.attempts} failed, retrying in {delay:.1f}s: {e}"
+                )
+            else:
+                if e.retryable:
+                    self._retries_exhausted += 1
+                self._finish_flight(
+                    job, JobStatus.FAILED, error=str(e), failure_reason=JobFailureReason.SERVICE_ERROR
+                )
+                self.logger.error(f"Job {job.id} failed after {job.attempts} attempt(s): {e}")
+            
         except Exception as e:
             # Job failed
-            job.status = JobStatus.FAILED
-            job.completed_at = datetime.utcnow()
-            job.error = str(e)
+            self._finish_flight(job, JobStatus.FAILED, error=str(e), failure_reason=JobFailureReason.ERROR)
             self.logger.error(f"Job {job.id} failed: {e}")
             
         finally:
@@ -199,20 +1973,54 @@ class MCPServer:
             if job.id in self.running_tasks:
                 del self.running_tasks[job.id]
     
-    async def _execute_job_via_service(self, job: Job, service_url: str) -> Dict[str, Any]:
+    def _deadline_passed(self, job: JobRecord, margin: float = 0.0) -> bool:
+        """Check whether a job's deadline passes within ``margin`` seconds."""
+        return job.deadline_ts is not None and time.time() + margin >= job.deadline_ts
+    
+    async def _result_cache_key(self, job: JobRecord) -> Optional[str]:
+        """
+        Build the result cache key for a job.
+        
+        The key covers the job type, the canonical payload and the checksums
+        of every input artifact and its transitive dependencies.
+        
+        Args:
+            job: Job to key
+            
+        Returns:
+            Cache key, or None if the job is not cacheable
+        """
+        if not job.use_cache:
+            return None
+        
+        input_checksums = await self.artifact_registry.get_input_checksums(
+            [ref.artifact_id for ref in job.input_artifacts]
+        )
+        if input_checksums is None:
+            return None
+        
+        return ResultCache.make_key(job.type, job.payload, input_checksums)
+    
+    async def _execute_job_via_service(self, job: JobRecord, service_url: str) -> Dict[str, Any]:
         """
         Execute a job via external service HTTP API.
         
+        Sync-mode services answer /execute with the result. Callback- and
+        poll-mode services answer 202 right away and the result arrives
+        later through ``complete_job`` or from polling, so no connection is
+        held while the job runs.
+        
         Args:
             job: Job to execute
             service_url: Base URL of the external service
             
         Returns:
             Execution result from the service
+            
+        Raises:
+            ServiceCallError: If the service could not be reached, rejected the
+                job or did not finish in time
         """
-        if not self._http_session:
-            self._http_session = aiohttp.ClientSession()
-        
         # Prepare job data for the service
         job_data = {
             "job_id": job.id,
@@ -220,24 +2028,241 @@ class MCPServer:
             "payload": job.payload,
             "metadata": job.metadata
         }
+        if job.input_artifacts:
+            job_data["input_artifacts"] = await self._describe_input_artifacts(job)
+        
+        # Bound the call by the job's remaining time and tell the service about it
+        headers = {}
+        timeout = DEFAULT_EXECUTION_TIMEOUT
+        if job.deadline_ts is not None:
+            timeout = max(0.0, job.deadline_ts - time.time())
+            headers["X-Job-Deadline"] = job.deadline.isoformat() + "Z"
+            headers["X-Job-Timeout"] = f"{timeout:.3f}"
+        
+        mode = AgentRegistry.get_dispatch_mode(service_url)
+        if mode == DispatchMode.SYNC:
+            _, result = await self._post_execute(service_url, job_data, headers, timeout)
+            return result
+        
+        expires = time.monotonic() + timeout
+        token = secrets.token_urlsafe(16)
+        callback_path = f"/jobs/{job.id}/complete"
+        job_data.update({"dispatch_mode": mode.value, "callback_token": token, "callback_path": callback_path})
+        if self.callback_url:
+            job_data["callback_url"] = self.callback_url.rstrip("/") + callback_path
+        
+        completion = asyncio.get_running_loop().create_future()
+        if mode == DispatchMode.CALLBACK:
+            # Registered before dispatch, since the callback may arrive before the 202
+            self._completions[job.id] = (token, completion)
+        try:
+            status, body = await self._post_execute(
+                service_url, job_data, headers, min(timeout, ACKNOWLEDGE_TIMEOUT), accept_async=True
+            )
+            if status == 200:
+                # The service finished right away
+                return body
+            
+            if mode == DispatchMode.CALLBACK:
+                try:
+                    return await asyncio.wait_for(completion, max(0.0, expires - time.monotonic()))
+                except asyncio.TimeoutError:
+                    raise ServiceCallError(
+                        f"Service {service_url} did not report completion within {timeout:.0f}s", retryable=True
+                    )
+            
+            status_url = urljoin(f"{service_url}/", body.get("status_url") or f"jobs/{job.id}")
+            return await self._poll_job_status(service_url, status_url, expires)
+        finally:
+            self._completions.pop(job.id, None)
+    
+    async def _post_execute(
+        self,
+        service_url: str,
+        job_data: Dict[str, Any],
+        headers: Dict[str, str],
+        timeout: float,
+        accept_async: bool = False
+    ) -> Tuple[int, Dict[str, Any]]:
+        """
+        POST a job to a service's /execute endpoint.
+        
+        Args:
+            service_url: Base URL of the external service
+            job_data: Request body
+            headers: Extra request headers
+            timeout: Seconds to wait for the response
+            accept_async: Whether a 202 acknowledgement is expected
+            
+        The body is encoded as registered for the service, and the response
+        is decoded by its Content-Type and Content-Encoding.
         
+        Returns:
+            Tuple of (status, body); for a 202 the body carries ``status_url``
+            from the body or Location header, if the service sent one
+            
+        Raises:
+            ServiceCallError: On transport errors, timeouts, other statuses
+                and undecodable responses
+        """
+        body_format, content_encoding = AgentRegistry.get_wire_format(service_url)
+        data, body_headers = await encode_body_async(job_data, body_format, content_encoding)
         try:
-            async with self._http_session.post(
+            async with self._service_session(service_url).post(
                 f"{service_url}/execute",
-                json=job_data,
-                timeout=aiohttp.ClientTimeout(total=3600)  # 1 hour timeout
+                data=data,
+                headers={**headers, **body_headers, **accept_headers()},
+                timeout=aiohttp.ClientTimeout(total=timeout)
             ) as response:
                 if response.status == 200:
-                    result = await response.json()
-                    return result
+                    result = await self._read_body(service_url, response)
+                    return 200, result
+                elif response.status == 202 and accept_async:
+                    try:
+                        body = await self._read_body(service_url, response)
+                    except ServiceCallError:
+                        body = {}
+                    if not isinstance(body, dict):
+                        body = {}
+                    if response.headers.get("Location"):
+                        body.setdefault("status_url", response.headers["Location"])
+                    return 202, body
                 else:
-                    error_text = await response.text()
-                    raise Exception(f"Service returned status {response.status}: {error_text}")
+                    error_text = await self._read_error(response)
+                    raise ServiceCallError(
+                        f"Service returned status {response.status}: {error_text}",
+                        retryable=response.status >= 500 or response.status in (408, 429),
+                        status=response.status
+                    )
                     
+        except aiohttp.ClientConnectorError as e:
+            # Unreachable: keep further jobs away until a health probe succeeds
+            self.service_health.record_probe(service_url, False, f"Connection failed: {e}")
+            raise ServiceCallError(f"Failed to communicate with service {service_url}: {e}", retryable=True)
         except aiohttp.ClientError as e:
-            raise Exception(f"Failed to communicate with service {service_url}: {e}")
+            raise ServiceCallError(f"Failed to communicate with service {service_url}: {e}", retryable=True)
+        except asyncio.TimeoutError:
+            raise ServiceCallError(f"Service {service_url} did not respond within {timeout:.0f}s", retryable=True)
+    
+    async def _read_body(self, service_url: str, response: aiohttp.ClientResponse) -> Any:
+        """
+        Read and decode a service response, in a worker thread if it is large.
+        
+        Args:
+            service_url: Base URL of the service
+            response: Response whose body has not been read
+            
+        Returns:
+            Decoded body, or an empty dict for an empty body
+            
+        Raises:
+            ServiceCallError: If the body does not match its Content-Type and Content-Encoding
+        """
+        body = await response.read()
+        if not body:
+            return {}
+        try:
+            return await decode_body_async(
+                body, response.headers.get("Content-Type"), response.headers.get("Content-Encoding")
+            )
+        except ValueError as e:
+            raise ServiceCallError(f"Service {service_url} sent an unreadable response: {e}")
+    
+    async def _read_error(self, response: aiohttp.ClientResponse) -> str:
+        """Read an error response as text, undoing its compression if possible."""
+        body = await response.read()
+        try:
+            body = decompress(body, response.headers.get("Content-Encoding"))
+        except ValueError:
+            pass
+        return body.decode("utf-8", errors="replace")
+    
+    async def _poll_job_status(self, service_url: str, status_url: str, expires: float) -> Dict[str, Any]:
+        """
+        Poll a poll-mode service until it reports a job's outcome.
+        
+        Polls back off exponentially. Transport errors, throttling and 5xx
+        responses only delay the next poll, so a flaky network does not
+        restart a long job.
+        
+        Args:
+            service_url: Base URL of the external service
+            status_url: URL of the job's status
+            expires: ``time.monotonic()`` value by which the job must finish
+            
+        Returns:
+            The outcome body once its status is no longer pending or running
+            
+        Raises:
+            ServiceCallError: If the service forgot or rejected the job, or it
+                did not finish in time
+        """
+        delay = POLL_INTERVAL_INITIAL
+        self._polling_jobs += 1
+        try:
+            while True:
+                remaining = expires - time.monotonic()
+                if remaining <= 0:
+                    raise ServiceCallError(f"Service {service_url} did not finish the job in time", retryable=True)
+                await asyncio.sleep(min(delay, remaining))
+                delay = min(delay * 2, POLL_INTERVAL_MAX)
+                
+                try:
+                    async with self._service_session(service_url).get(
+                        status_url, headers=accept_headers(), timeout=aiohttp.ClientTimeout(total=ACKNOWLEDGE_TIMEOUT)
+                    ) as response:
+                        if response.status == 200:
+                            body = await self._read_body(service_url, response)
+                            if not isinstance(body, dict):
+                                raise ServiceCallError(f"Service {service_url} sent a status that is not an object")
+                            if body.get("status") not in ("accepted", "pending", "running"):
+                                return body
+                        elif response.status == 404:
+                            raise ServiceCallError(
+                                f"Service {service_url} no longer knows the job", retryable=True, status=404
+                            )
+                        elif 400 <= response.status < 500 and response.status not in (408, 429):
+                            error_text = await self._read_error(response)
+                            raise ServiceCallError(
+                                f"Service returned status {response.status} for {status_url}: {error_text}",
+                                retryable=False,
+                                status=response.status
+                            )
+                        elif response.status != 202:
+                            self.logger.warning(f"Polling {status_url} returned {response.status}")
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    self.logger.warning(f"Polling {status_url} failed: {e}")
+                except ServiceCallError as e:
+                    if e.status is not None:
+                        raise
+                    # An unreadable status is treated like a failed poll
+                    self.logger.warning(f"Polling {status_url} failed: {e}")
+        finally:
+            self._polling_jobs -= 1
+    
+    async def _describe_input_artifacts(self, job: JobRecord) -> List[Dict[str, Any]]:
+        """
+        Describe a job's input artifacts for the service, with their storage locations.
+        
+        Args:
+            job: Job being dispatched
+            
+        Returns:
+            One dict per input artifact; artifacts missing from the registry have no location
+        """
+        described = []
+        for ref in job.input_artifacts:
+            artifact = await self.artifact_registry.get_artifact(ref.artifact_id)
+            described.append({
+                "artifact_id": ref.artifact_id,
+                "artifact_type": ArtifactType(ref.artifact_type).value,
+                "reference_type": ref.reference_type,
+                "name": artifact.metadata.name if artifact else None,
+                "storage_location": artifact.storage_location if artifact else None
+            })
+        return described
     
-    async def _register_service_artifacts(self, job: Job, result: Dict[str, Any]) -> None:
+    async def _register_service_artifacts(self, job: JobRecord, result: Dict[str, Any]) -> None:
         """
         Register artifacts returned by the service.
         
@@ -271,7 +2296,41 @@ class MCPServer:
                 self.logger.error(f"Failed to register artifact for job {job.id}: {e}")
     
     async def shutdown(self) -> None:
-        """Gracefully shutdown the server."""
+        """
+        Gracefully shutdown the server.
+        
+        With a state backend, unfinished jobs are handed over to the other
+        workers instead of being cancelled; with a write-ahead log they are
+        queued again by ``recover`` on the next start.
+        """
+        # Cancellations below are not persisted
+        await self._sync_state()
+        if self.state_backend is not None:
+            if self._heartbeat_handle is not None:
+                self._heartbeat_handle.cancel()
+            await asyncio.to_thread(self.state_backend.release_leases, self.worker_id)
+        
+        self._shutdown_event.set()
+        
+        # Drop queued jobs that never started
+        self.scheduler.clear()
+        for retry_handle in self._retry_handles.values():
+            retry_handle.cancel()
+        self._retry_handles.clear()
+        if self._redispatch_handle is not None:
+            self._redispatch_handle.cancel()
+        for deadline_handle in self._deadline_handles.values():
+            deadline_handle.cancel()
+        self._deadline_handles.clear()
+        if self._retention_handle is not None:
+            self._retention_handle.cancel()
+        if self._health_check_handle is not None:
+            self._health_check_handle.cancel()
+        for task in self._workflow_tasks:
+            task.cancel()
+        for task in self._warm_tasks:
+            task.cancel()
+        
         # Cancel all running tasks
         for task in self.running_tasks.values():
             task.cancel()
@@ -280,11 +2339,37 @@ class MCPServer:
         if self.running_tasks:
             await asyncio.gather(*self.running_tasks.values(), return_exceptions=True)
         
-        # Close HTTP session
-        if self._http_session:
-            await self._http_session.close()
+        # End event streams and release parked waiters
+        self.events.close()
+        for job_id in list(self._job_waiters):
+            self._wake_waiters(job_id)
         
-        self._shutdown_event.set()
+        # Close service connections
+        await self.connection_pools.close()
+        
+        # Finish archive writes before closing the archive
+        if self._archive_tasks:
+            await asyncio.gather(*self._archive_tasks, return_exceptions=True)
+        
+        self.result_cache.close()
+        self.job_archive.close()
+        await self.job_logs.close()
+        self.result_store.close()
+        if self.journal is not None:
+            await self.journal.close()
+        if self.state_backend is not None:
+            await self._sync_state()
+            await AgentRegistry.flush_backend()
+            AgentRegistry.set_state_backend(None)
+            self.state_backend.close()
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    """Flatten a pydantic validation error into a single line."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+        for detail in error.errors()
+    )
 
 
 # Global server instance
@@ -295,11 +2380,29 @@ def get_server() -> MCPServer:
     """Get the global server instance."""
     global _server_instance
     if _server_instance is None:
-        _server_instance = MCPServer()
+        state_db = os.environ.get("MCP_STATE_DB")
+        _server_instance = MCPServer(
+            scheduler=JobScheduler(workers=int(os.environ.get("MCP_WORKERS", "1"))),
+            state_backend=SQLiteStateBackend(state_db) if state_db else None,
+            worker_id=os.environ.get("MCP_WORKER_ID"),
+            callback_url=os.environ.get("MCP_CALLBACK_URL"),
+            data_dir=os.environ.get("MCP_DATA_DIR")
+        )
     return _server_instance
 
 
 async def start_server() -> MCPServer:
     """Start the MCP server."""
     server = get_server()
+    await server.recover()
+    server._start_heartbeat()
+    server._start_health_checks()
     return server
+
+
+async def stop_server() -> None:
+    """Shut down the global server instance, if one was created."""
+    global _server_instance
+    server, _server_instance = _server_instance, None
+    if server is not None:
+        await server.shutdown()
@@ -0,0 +1,8 @@
+"""
+Shared state backends for MCP Core.
+"""
+
+from .backend import StateBackend, SQLiteStateBackend
+from .journal import WriteAheadLog
+
+__all__ = ["StateBackend", "SQLiteStateBackend", "WriteAheadLog"]
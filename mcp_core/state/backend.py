@@ -0,0 +1,691 @@
+"""
+Shared state backends for running MCP Core in several worker processes.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+
+# Job statuses that still need a worker
+ACTIVE_JOB_STATUSES = ("pending", "running")
+
+# Database layout version, stored in PRAGMA user_version
+SCHEMA_VERSION = 5
+
+# Statements that upgrade a database from the previous layout version
+SCHEMA_MIGRATIONS: Dict[int, List[str]] = {
+    2: ["ALTER TABLE services ADD COLUMN dispatch_mode TEXT NOT NULL DEFAULT 'sync'"],
+    3: [
+        "CREATE TABLE service_replicas ("
+        "job_type TEXT NOT NULL, service_url TEXT NOT NULL, dispatch_mode TEXT NOT NULL DEFAULT 'sync', "
+        "weight REAL NOT NULL DEFAULT 1.0, capacity INTEGER, updated_ts REAL NOT NULL, "
+        "PRIMARY KEY (job_type, service_url))",
+        "INSERT INTO service_replicas (job_type, service_url, dispatch_mode, updated_ts) "
+        "SELECT job_type, service_url, dispatch_mode, updated_ts FROM services",
+        "DROP TABLE services"
+    ],
+    4: ["ALTER TABLE service_replicas ADD COLUMN lease_expires REAL"],
+    5: [
+        "ALTER TABLE service_replicas ADD COLUMN body_format TEXT NOT NULL DEFAULT 'json'",
+        "ALTER TABLE service_replicas ADD COLUMN content_encoding TEXT NOT NULL DEFAULT 'identity'"
+    ],
+}
+
+
+class StateBackend(ABC):
+    """
+    Store of record for jobs, artifacts and services shared by all workers.
+
+    Jobs and artifacts are exchanged as JSON-compatible dicts. Every job is
+    owned by one worker through a lease that the owner keeps renewing; a
+    worker may only dispatch jobs it owns, and jobs whose lease expired
+    (their worker died) can be adopted by another worker.
+    """
+
+    # Jobs
+
+    @abstractmethod
+    def put_jobs(self, jobs: List[Dict[str, Any]], worker_id: str, lease_seconds: float) -> None:
+        """
+        Insert or update jobs.
+
+        New jobs are leased to ``worker_id``. Existing jobs keep their owner
+        and are only updated if ``worker_id`` still owns them.
+
+        Args:
+            jobs: Serialized jobs with at least id, status and created_ts
+            worker_id: Worker writing the jobs
+            lease_seconds: Lease length for newly inserted jobs
+        """
+        pass
+
+    @abstractmethod
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a serialized job, or None if unknown."""
+        pass
+
+    @abstractmethod
+    def list_jobs(
+        self,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        before: Optional[Tuple[float, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        List serialized jobs newest first.
+
+        Args:
+            status: Optional status filter
+            limit: Maximum number of jobs to return
+            before: Only return jobs whose (created_ts, id) is smaller
+        """
+        pass
+
+    @abstractmethod
+    def claim_job(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """
+        Renew the lease on a job the worker is about to dispatch.
+
+        Returns:
+            True if the worker still owns the job
+        """
+        pass
+
+    @abstractmethod
+    def renew_leases(self, worker_id: str, lease_seconds: float) -> None:
+        """Extend the lease on every active job owned by the worker."""
+        pass
+
+    @abstractmethod
+    def release_leases(self, worker_id: str) -> None:
+        """Expire the leases on the worker's active jobs and roles so others take them over at once."""
+        pass
+
+    @abstractmethod
+    def adopt_expired_jobs(self, worker_id: str, lease_seconds: float, limit: int) -> List[Dict[str, Any]]:
+        """
+        Take over active jobs whose lease has expired.
+
+        Returns:
+            The adopted serialized jobs
+        """
+        pass
+
+    @abstractmethod
+    def request_cancel(self, job_id: str) -> bool:
+        """
+        Ask the owner of an active job to cancel it.
+
+        Returns:
+            True if the job exists and is still active
+        """
+        pass
+
+    @abstractmethod
+    def pop_cancel_requests(self, worker_id: str) -> List[str]:
+        """Get and clear cancellation requests for jobs owned by the worker."""
+        pass
+
+    @abstractmethod
+    def delete_jobs(self, job_ids: List[str], worker_id: str) -> None:
+        """Delete finished jobs owned by the worker, once they have been archived or expired."""
+        pass
+
+    @abstractmethod
+    def post_completion(self, job_id: str, token: str, result: Dict[str, Any]) -> bool:
+        """
+        Hand a service's completion callback to the owner of an active job.
+
+        Returns:
+            True if the job exists and is still active
+        """
+        pass
+
+    @abstractmethod
+    def pop_completions(self, worker_id: str) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """Get and clear (job_id, token, result) completions for jobs owned by the worker."""
+        pass
+
+    # Artifacts
+
+    @abstractmethod
+    def put_artifact(self, artifact: Dict[str, Any]) -> None:
+        """Insert or update a serialized artifact."""
+        pass
+
+    @abstractmethod
+    def get_artifact(self, artifact_id: str) -> Optional[Dict[str, Any]]:
+        """Get a serialized artifact, or None if unknown."""
+        pass
+
+    @abstractmethod
+    def delete_artifact(self, artifact_id: str) -> bool:
+        """Delete an artifact; returns False if it did not exist."""
+        pass
+
+    @abstractmethod
+    def list_artifacts(
+        self,
+        artifact_type: Optional[str] = None,
+        job_id: Optional[str] = None,
+        service_id: Optional[str] = None,
+        limit: Optional[int] = None,
+        before: Optional[Tuple[float, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """List serialized artifacts newest first; filters as in ``ArtifactRegistry.list_artifacts``."""
+        pass
+
+    # Services
+
+    @abstractmethod
+    def put_service(
+        self,
+        job_type: str,
+        service_url: str,
+        dispatch_mode: str = "sync",
+        weight: float = 1.0,
+        capacity: Optional[int] = None,
+        lease_expires: Optional[float] = None,
+        body_format: str = "json",
+        content_encoding: str = "identity"
+    ) -> None:
+        """Add or update a replica of a job type's service; ``lease_expires`` is None for static services."""
+        pass
+
+    @abstractmethod
+    def renew_service_lease(self, service_url: str, lease_expires: float) -> None:
+        """Move the lease expiry of every registration of a service URL."""
+        pass
+
+    @abstractmethod
+    def remove_service(self, job_type: str, service_url: str) -> None:
+        """Remove a replica of a job type's service."""
+        pass
+
+    @abstractmethod
+    def get_services(self) -> List[Dict[str, Any]]:
+        """
+        Get every replica as a dict with job_type, service_url, dispatch_mode,
+        weight, capacity, lease_expires, body_format and content_encoding.
+        """
+        pass
+
+    @abstractmethod
+    def claim_health_probes(self, worker_id: str, lease_seconds: float) -> bool:
+        """
+        Take or renew the lease on probing the services' health.
+
+        One worker at a time holds the lease and shares its results through
+        ``put_service_health``; the others read them with ``get_service_health``.
+
+        Returns:
+            True if the worker holds the lease
+        """
+        pass
+
+    @abstractmethod
+    def put_service_health(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Store probe results as exported by ``ServiceHealthMonitor.export``.
+
+        Results of services that are no longer registered are dropped.
+        """
+        pass
+
+    @abstractmethod
+    def get_service_health(self) -> List[Dict[str, Any]]:
+        """Get the stored probe results in the format of ``put_service_health``."""
+        pass
+
+    # Idempotency keys
+
+    @abstractmethod
+    def claim_idempotency_key(
+        self,
+        scope: str,
+        key: str,
+        value: str,
+        fingerprint: Optional[str],
+        ttl_seconds: float
+    ) -> Tuple[str, Optional[str]]:
+        """
+        Record the ID created for an idempotency key unless the key is taken.
+
+        Expired keys are free again. Claiming is atomic across workers, so
+        exactly one of several concurrent requests with a key wins.
+
+        Args:
+            scope: Namespace of the key, e.g. "jobs" or "artifacts"
+            key: Idempotency key
+            value: ID this request would create
+            fingerprint: Hex digest of the request body
+            ttl_seconds: Lifetime of a newly recorded key
+
+        Returns:
+            Tuple of (value, fingerprint) held by the key; the value is
+            ``value`` if this request won the key
+        """
+        pass
+
+    @abstractmethod
+    def release_idempotency_key(self, scope: str, key: str, value: str) -> None:
+        """Free a key claimed for ``value``, e.g. because the request then failed."""
+        pass
+
+    def close(self) -> None:
+        """Release resources held by the backend."""
+
+
+class SQLiteStateBackend(StateBackend):
+    """
+    State backend on a SQLite database in WAL mode.
+
+    WAL lets any number of worker processes on one host read concurrently
+    while writes are serialized by SQLite's file lock, which also makes the
+    lease updates atomic across processes.
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 5.0):
+        self.logger = logging.getLogger("state_backend")
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=busy_timeout, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, created_ts REAL NOT NULL, "
+            "owner TEXT, lease_expires REAL, cancel_requested INTEGER NOT NULL DEFAULT 0, data TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS jobs_created ON jobs (created_ts, id);"
+            "CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_ts, id);"
+            "CREATE INDEX IF NOT EXISTS jobs_owner ON jobs (owner, status);"
+            "CREATE TABLE IF NOT EXISTS artifacts ("
+            "id TEXT PRIMARY KEY, type TEXT NOT NULL, job_id TEXT, service_id TEXT, "
+            "created_ts REAL NOT NULL, data TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS artifacts_created ON artifacts (created_ts, id);"
+            "CREATE INDEX IF NOT EXISTS artifacts_type ON artifacts (type, created_ts, id);"
+            "CREATE INDEX IF NOT EXISTS artifacts_job ON artifacts (job_id, created_ts, id);"
+            "CREATE INDEX IF NOT EXISTS artifacts_service ON artifacts (service_id, created_ts, id);"
+            "CREATE TABLE IF NOT EXISTS service_replicas ("
+            "job_type TEXT NOT NULL, service_url TEXT NOT NULL, dispatch_mode TEXT NOT NULL DEFAULT 'sync', "
+            "weight REAL NOT NULL DEFAULT 1.0, capacity INTEGER, lease_expires REAL, "
+            "body_format TEXT NOT NULL DEFAULT 'json', content_encoding TEXT NOT NULL DEFAULT 'identity', "
+            "updated_ts REAL NOT NULL, "
+            "PRIMARY KEY (job_type, service_url));"
+            "CREATE TABLE IF NOT EXISTS completions ("
+            "job_id TEXT PRIMARY KEY, token TEXT NOT NULL, data TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS idempotency_keys ("
+            "scope TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, fingerprint TEXT, "
+            "expires REAL NOT NULL, PRIMARY KEY (scope, key));"
+            "CREATE INDEX IF NOT EXISTS idempotency_keys_expires ON idempotency_keys (expires);"
+            "CREATE TABLE IF NOT EXISTS service_health ("
+            "service_url TEXT PRIMARY KEY, healthy INTEGER NOT NULL, consecutive_failures INTEGER NOT NULL, "
+            "last_error TEXT, probed_ts REAL NOT NULL, next_probe_ts REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS worker_roles ("
+            "role TEXT PRIMARY KEY, owner TEXT NOT NULL, lease_expires REAL NOT NULL);"
+        )
+        self.logger.info(f"Opened state database at {path}")
+
+    def put_jobs(self, jobs: List[Dict[str, Any]], worker_id: str, lease_seconds: float) -> None:
+        lease_expires = time.time() + lease_seconds
+        rows = [
+            (job["id"], job["status"], job["created_ts"], worker_id, lease_expires, json.dumps(job, default=str))
+            for job in jobs
+        ]
+        with self._transaction() as db:
+            db.executemany(
+                "INSERT INTO jobs (id, status, created_ts, owner, lease_expires, data) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET status = excluded.status, data = excluded.data "
+                "WHERE jobs.owner = excluded.owner",
+                rows
+            )
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list_jobs(
+        self,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        before: Optional[Tuple[float, str]] = None
+    ) -> List[Dict[str, Any]]:
+        return self._list("jobs", {"status": status}, limit, before)
+
+    def claim_job(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE id = ? AND owner = ?",
+                (time.time() + lease_seconds, job_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def renew_leases(self, worker_id: str, lease_seconds: float) -> None:
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE owner = ? AND status IN (?, ?)",
+                (time.time() + lease_seconds, worker_id, *ACTIVE_JOB_STATUSES)
+            )
+
+    def release_leases(self, worker_id: str) -> None:
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE jobs SET lease_expires = 0 WHERE owner = ? AND status IN (?, ?)",
+                (worker_id, *ACTIVE_JOB_STATUSES)
+            )
+            db.execute("UPDATE worker_roles SET lease_expires = 0 WHERE owner = ?", (worker_id,))
+
+    def adopt_expired_jobs(self, worker_id: str, lease_seconds: float, limit: int) -> List[Dict[str, Any]]:
+        now = time.time()
+        with self._transaction() as db:
+            rows = db.execute(
+                "SELECT id, data FROM jobs WHERE status IN (?, ?) AND lease_expires < ? "
+                "ORDER BY created_ts LIMIT ?",
+                (*ACTIVE_JOB_STATUSES, now, limit)
+            ).fetchall()
+            db.executemany(
+                "UPDATE jobs SET owner = ?, lease_expires = ? WHERE id = ?",
+                [(worker_id, now + lease_seconds, job_id) for job_id, _ in rows]
+            )
+        return [json.loads(data) for _, data in rows]
+
+    def request_cancel(self, job_id: str) -> bool:
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status IN (?, ?)",
+                (job_id, *ACTIVE_JOB_STATUSES)
+            )
+            return cursor.rowcount == 1
+
+    def pop_cancel_requests(self, worker_id: str) -> List[str]:
+        with self._transaction() as db:
+            rows = db.execute(
+                "SELECT id FROM jobs WHERE owner = ? AND cancel_requested = 1", (worker_id,)
+            ).fetchall()
+            db.execute("UPDATE jobs SET cancel_requested = 0 WHERE owner = ? AND cancel_requested = 1", (worker_id,))
+        return [job_id for job_id, in rows]
+
+    def delete_jobs(self, job_ids: List[str], worker_id: str) -> None:
+        with self._transaction() as db:
+            db.executemany(
+                "DELETE FROM jobs WHERE id = ? AND owner = ? AND status NOT IN (?, ?)",
+                [(job_id, worker_id, *ACTIVE_JOB_STATUSES) for job_id in job_ids]
+            )
+
+    def post_completion(self, job_id: str, token: str, result: Dict[str, Any]) -> bool:
+        with self._transaction() as db:
+            cursor = db.execute(
+                "INSERT OR REPLACE INTO completions (job_id, token, data) "
+                "SELECT id, ?, ? FROM jobs WHERE id = ? AND status IN (?, ?)",
+                (token, json.dumps(result, default=str), job_id, *ACTIVE_JOB_STATUSES)
+            )
+            return cursor.rowcount == 1
+
+    def pop_completions(self, worker_id: str) -> List[Tuple[str, str, Dict[str, Any]]]:
+        with self._transaction() as db:
+            rows = db.execute(
+                "SELECT c.job_id, c.token, c.data FROM completions c JOIN jobs j ON j.id = c.job_id "
+                "WHERE j.owner = ?",
+                (worker_id,)
+            ).fetchall()
+            db.executemany("DELETE FROM completions WHERE job_id = ?", [(job_id,) for job_id, _, _ in rows])
+        return [(job_id, token, json.loads(data)) for job_id, token, data in rows]
+
+    def put_artifact(self, artifact: Dict[str, Any]) -> None:
+        metadata = artifact["metadata"]
+        with self._transaction() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO artifacts (id, type, job_id, service_id, created_ts, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    metadata["id"], metadata["type"], artifact.get("job_id"), artifact.get("service_id"),
+                    artifact["created_ts"], json.dumps(artifact, default=str)
+                )
+            )
+
+    def get_artifact(self, artifact_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute("SELECT data FROM artifacts WHERE id = ?", (artifact_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete_artifact(self, artifact_id: str) -> bool:
+        with self._transaction() as db:
+            return db.execute("DELETE FROM artifacts WHERE id = ?", (artifact_id,)).rowcount == 1
+
+    def list_artifacts(
+        self,
+        artifact_type: Optional[str] = None,
+        job_id: Optional[str] = None,
+        service_id: Optional[str] = None,
+        limit: Optional[int] = None,
+        before: Optional[Tuple[float, str]] = None
+    ) -> List[Dict[str, Any]]:
+        # Filters are applied one at a time, in the same precedence as ArtifactRegistry
+        if artifact_type:
+            filters = {"type": artifact_type}
+        elif job_id:
+            filters = {"job_id": job_id}
+        elif service_id:
+            filters = {"service_id": service_id}
+        else:
+            filters = {}
+        return self._list("artifacts", filters, limit, before)
+
+    def put_service(
+        self,
+        job_type: str,
+        service_url: str,
+        dispatch_mode: str = "sync",
+        weight: float = 1.0,
+        capacity: Optional[int] = None,
+        lease_expires: Optional[float] = None,
+        body_format: str = "json",
+        content_encoding: str = "identity"
+    ) -> None:
+        with self._transaction() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO service_replicas (job_type, service_url, dispatch_mode, weight, capacity, "
+                "lease_expires, body_format, content_encoding, updated_ts) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job_type, service_url, dispatch_mode, weight, capacity, lease_expires,
+                    body_format, content_encoding, time.time()
+                )
+            )
+
+    def renew_service_lease(self, service_url: str, lease_expires: float) -> None:
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE service_replicas SET lease_expires = ? WHERE service_url = ? AND lease_expires IS NOT NULL",
+                (lease_expires, service_url)
+            )
+
+    def remove_service(self, job_type: str, service_url: str) -> None:
+        with self._transaction() as db:
+            db.execute(
+                "DELETE FROM service_replicas WHERE job_type = ? AND service_url = ?", (job_type, service_url)
+            )
+
+    def get_services(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT job_type, service_url, dispatch_mode, weight, capacity, lease_expires, body_format, "
+                "content_encoding FROM service_replicas "
+                "ORDER BY job_type, updated_ts"
+            ).fetchall()
+        return [
+            {
+                "job_type": job_type,
+                "service_url": service_url,
+                "dispatch_mode": dispatch_mode,
+                "weight": weight,
+                "capacity": capacity,
+                "lease_expires": lease_expires,
+                "body_format": body_format,
+                "content_encoding": content_encoding
+            }
+            for (
+                job_type, service_url, dispatch_mode, weight, capacity, lease_expires, body_format, content_encoding
+            ) in rows
+        ]
+
+    def claim_health_probes(self, worker_id: str, lease_seconds: float) -> bool:
+        now = time.time()
+        with self._transaction() as db:
+            db.execute(
+                "INSERT INTO worker_roles (role, owner, lease_expires) VALUES ('health_probes', ?, ?) "
+                "ON CONFLICT (role) DO UPDATE SET owner = excluded.owner, lease_expires = excluded.lease_expires "
+                "WHERE worker_roles.owner = excluded.owner OR worker_roles.lease_expires < ?",
+                (worker_id, now + lease_seconds, now)
+            )
+            row = db.execute("SELECT owner FROM worker_roles WHERE role = 'health_probes'").fetchone()
+        return row[0] == worker_id
+
+    def put_service_health(self, records: List[Dict[str, Any]]) -> None:
+        rows = [
+            (
+                record["service_url"], int(record["healthy"]), record["consecutive_failures"],
+                record["last_error"], record["probed_ts"], record["next_probe_ts"]
+            )
+            for record in records
+        ]
+        with self._transaction() as db:
+            db.executemany(
+                "INSERT OR REPLACE INTO service_health "
+                "(service_url, healthy, consecutive_failures, last_error, probed_ts, next_probe_ts) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            db.execute(
+                "DELETE FROM service_health WHERE service_url NOT IN (SELECT service_url FROM service_replicas)"
+            )
+
+    def get_service_health(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT service_url, healthy, consecutive_failures, last_error, probed_ts, next_probe_ts "
+                "FROM service_health"
+            ).fetchall()
+        return [
+            {
+                "service_url": service_url,
+                "healthy": bool(healthy),
+                "consecutive_failures": consecutive_failures,
+                "last_error": last_error,
+                "probed_ts": probed_ts,
+                "next_probe_ts": next_probe_ts
+            }
+            for service_url, healthy, consecutive_failures, last_error, probed_ts, next_probe_ts in rows
+        ]
+
+    def claim_idempotency_key(
+        self,
+        scope: str,
+        key: str,
+        value: str,
+        fingerprint: Optional[str],
+        ttl_seconds: float
+    ) -> Tuple[str, Optional[str]]:
+        now = time.time()
+        with self._transaction() as db:
+            db.execute("DELETE FROM idempotency_keys WHERE expires <= ?", (now,))
+            db.execute(
+                "INSERT OR IGNORE INTO idempotency_keys (scope, key, value, fingerprint, expires) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (scope, key, value, fingerprint, now + ttl_seconds)
+            )
+            row = db.execute(
+                "SELECT value, fingerprint FROM idempotency_keys WHERE scope = ? AND key = ?", (scope, key)
+            ).fetchone()
+        return row[0], row[1]
+
+    def release_idempotency_key(self, scope: str, key: str, value: str) -> None:
+        with self._transaction() as db:
+            db.execute(
+                "DELETE FROM idempotency_keys WHERE scope = ? AND key = ? AND value = ?", (scope, key, value)
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _list(
+        self,
+        table: str,
+        filters: Dict[str, Optional[str]],
+        limit: Optional[int],
+        before: Optional[Tuple[float, str]]
+    ) -> List[Dict[str, Any]]:
+        """Page through a table newest first by (created_ts, id)."""
+        clauses = []
+        params: List[Any] = []
+        for column, value in filters.items():
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if before is not None:
+            clauses.append("(created_ts < ? OR (created_ts = ? AND id < ?))")
+            params.extend([before[0], before[0], before[1]])
+
+        query = f"SELECT data FROM {table}"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY created_ts DESC, id DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [json.loads(data) for data, in rows]
+
+    def _migrate(self) -> None:
+        """Upgrade a database written by an older version to SCHEMA_VERSION."""
+        with self._transaction() as db:
+            stored = db.execute("PRAGMA user_version").fetchone()[0]
+            version = stored
+            if version == 0:
+                # Databases created before the layout was versioned have tables but no version
+                has_tables = db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table'").fetchone()
+                version = 1 if has_tables else SCHEMA_VERSION
+            for target in range(version + 1, SCHEMA_VERSION + 1):
+                for statement in SCHEMA_MIGRATIONS[target]:
+                    db.execute(statement)
+                self.logger.info(f"Upgraded state database at {self.path} to schema version {target}")
+            if stored < SCHEMA_VERSION:
+                db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _transaction(self) -> "_Transaction":
+        """Serialize writers in this process and wrap them in an immediate transaction."""
+        return _Transaction(self._db, self._lock)
+
+
+class _Transaction:
+    """Context manager for a BEGIN IMMEDIATE ... COMMIT block."""
+
+    def __init__(self, db: sqlite3.Connection, lock: threading.Lock):
+        self._db = db
+        self._lock = lock
+
+    def __enter__(self) -> sqlite3.Connection:
+        self._lock.acquire()
+        try:
+            self._db.execute("BEGIN IMMEDIATE")
+        except Exception:
+            self._lock.release()
+            raise
+        return self._db
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            self._db.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self._lock.release()
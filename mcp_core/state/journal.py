@@ -0,0 +1,328 @@
+"""
+Write-ahead log of job and artifact state for single-process deployments.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+
+
+_SEGMENT_PATTERN = re.compile(r"^wal-(\d{8})\.log$")
+_SNAPSHOT_NAME = "snapshot.log"
+
+
+class WriteAheadLog:
+    """
+    Append-only log of job, artifact and idempotency key records with group commit.
+
+    Records are appended to numbered segment files as ``kind<TAB>id<TAB>json``
+    lines, so replay only decodes the latest record of each ID. ``append``
+    only buffers a record; a background flush writes everything buffered so
+    far with a single write and fsync, so callers awaiting ``sync`` at the
+    same time share one disk flush. After ``snapshot_records`` records the
+    log rotates to a new segment and the older segments are folded, off
+    the event loop, into a snapshot holding the latest record per job,
+    artifact and unexpired idempotency key, which keeps replay proportional
+    to live state.
+
+    Record kinds:
+        ``job``: full job state (``JobRecord.to_dict`` plus ``created_ts``)
+        ``job_evicted``: job moved to the job archive (data is the job ID)
+        ``artifact``: full artifact state
+        ``artifact_deleted``: artifact removed (data is the artifact ID)
+        ``idempotency``: idempotency key with its scope, the ID it created,
+            the request fingerprint and its expiry (epoch seconds)
+    """
+
+    def __init__(self, directory: str, commit_delay: float = 0.0, snapshot_records: int = 100000):
+        """
+        Args:
+            directory: Directory holding the log segments and snapshot
+            commit_delay: Seconds to wait before each flush to gather more records
+            snapshot_records: Records after which older segments are compacted
+        """
+        self.logger = logging.getLogger("write_ahead_log")
+        self.directory = directory
+        self.commit_delay = commit_delay
+        self.snapshot_records = snapshot_records
+        os.makedirs(directory, exist_ok=True)
+
+        self._buffer: List[str] = []
+        self._appended = 0  # records appended since start
+        self._synced = 0  # records appended since start that are on disk
+        self._waiters: List[Tuple[int, asyncio.Future]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._compact_task: Optional[asyncio.Task] = None
+        self._segment = max(self._segment_numbers(), default=0) + 1
+        self._file = None
+        self._file_segment = 0
+        self._records_since_snapshot = 0
+        self._stats = {
+            "records": 0,
+            "fsyncs": 0,
+            "snapshots": 0,
+            "write_errors": 0
+        }
+
+    def load(self) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Replay the snapshot and the segments written after it.
+
+        A record cut short by a crash ends the replay of its segment.
+        Blocking; call it from a worker thread.
+
+        Returns:
+            Tuple of (jobs, artifacts, idempotency keys): dicts mapping IDs
+            to their latest state, and the unexpired key records
+        """
+        jobs: Dict[str, str] = {}
+        artifacts: Dict[str, str] = {}
+        keys: Dict[str, str] = {}
+        base, _ = self._read(os.path.join(self.directory, _SNAPSHOT_NAME), jobs, artifacts, keys)
+
+        replayed = 0
+        for number in self._segment_numbers():
+            if number > base:
+                replayed += self._read(self._segment_path(number), jobs, artifacts, keys)[1]
+
+        # New records go to a fresh segment, after any torn tail
+        self._segment = max(self._segment_numbers(), default=base) + 1
+        self._records_since_snapshot = replayed
+        now = time.time()
+        return (
+            {key: json.loads(raw) for key, raw in jobs.items()},
+            {key: json.loads(raw) for key, raw in artifacts.items()},
+            [record for record in map(json.loads, keys.values()) if record["expires_at"] > now]
+        )
+
+    def append(self, kind: str, data: Any) -> None:
+        """
+        Buffer a record for the next group commit.
+
+        Args:
+            kind: Record kind
+            data: Record payload (the full object, or an ID for removals)
+        """
+        if kind == "job":
+            line = f"job\t{data['id']}\t{json.dumps(data, separators=(',', ':'), default=str)}"
+        elif kind == "artifact":
+            line = f"artifact\t{data['metadata']['id']}\t{json.dumps(data, separators=(',', ':'), default=str)}"
+        elif kind == "idempotency":
+            # Keys are client-chosen, so they are quoted to keep tabs and newlines out of the record
+            key = quote(f"{data['scope']}:{data['key']}", safe="")
+            line = f"idempotency\t{key}\t{json.dumps(data, separators=(',', ':'))}"
+        else:
+            line = f"{kind}\t{data}\t"
+        self._buffer.append(line)
+        self._appended += 1
+        if self._flush_task is None:
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    async def sync(self) -> None:
+        """
+        Wait until every record appended so far is on disk.
+
+        Raises:
+            OSError: If the log could not be written
+        """
+        target = self._appended
+        if self._synced >= target:
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((target, future))
+        await future
+
+    async def close(self) -> None:
+        """Write out buffered records, finish compaction and close the current segment."""
+        if self._flush_task is not None:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+        if self._compact_task is not None:
+            await asyncio.gather(self._compact_task, return_exceptions=True)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get log counters.
+
+        Returns:
+            Dict of log statistics
+        """
+        return {
+            **self._stats,
+            "unsynced": self._appended - self._synced,
+            "segment": self._segment,
+            "records_since_snapshot": self._records_since_snapshot,
+            "directory": self.directory
+        }
+
+    async def _flush_loop(self) -> None:
+        """Write buffered records until the buffer stays empty."""
+        try:
+            while self._buffer:
+                if self.commit_delay:
+                    await asyncio.sleep(self.commit_delay)
+
+                lines, self._buffer = self._buffer, []
+                committed = self._appended
+                try:
+                    await asyncio.to_thread(self._write, lines)
+                except OSError as e:
+                    self._stats["write_errors"] += 1
+                    self.logger.error(f"Failed to write {len(lines)} record(s) to the write-ahead log: {e}")
+                    self._resolve_waiters(committed, e)
+                    continue
+
+                self._synced = committed
+                self._stats["records"] += len(lines)
+                self._records_since_snapshot += len(lines)
+                self._resolve_waiters(committed)
+
+                if self._records_since_snapshot >= self.snapshot_records and self._compact_task is None:
+                    # Later records go to a new segment while the old ones are compacted
+                    self._records_since_snapshot = 0
+                    self._compact_task = asyncio.create_task(self._compact(self._segment))
+                    self._segment += 1
+        finally:
+            self._flush_task = None
+
+    def _resolve_waiters(self, committed: int, error: Optional[Exception] = None) -> None:
+        """Wake the ``sync`` callers whose records were part of a commit."""
+        waiting = []
+        for target, future in self._waiters:
+            if target > committed:
+                waiting.append((target, future))
+            elif not future.done():
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error)
+        self._waiters = waiting
+
+    def _write(self, lines: List[str]) -> None:
+        """Append lines to the current segment and fsync it."""
+        if self._file_segment != self._segment:
+            if self._file is not None:
+                self._file.close()
+            self._file = open(self._segment_path(self._segment), "a", encoding="utf-8")
+            self._file_segment = self._segment
+            self._fsync_directory()
+
+        self._file.write("\n".join(lines) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._stats["fsyncs"] += 1
+
+    async def _compact(self, last_segment: int) -> None:
+        """Fold the snapshot and segments up to ``last_segment`` into a new snapshot."""
+        try:
+            started = time.monotonic()
+            await asyncio.to_thread(self._write_snapshot, last_segment)
+            self._stats["snapshots"] += 1
+            self.logger.info(
+                f"Compacted write-ahead log up to segment {last_segment} in {time.monotonic() - started:.2f}s"
+            )
+        except OSError as e:
+            self.logger.error(f"Failed to compact the write-ahead log: {e}")
+        finally:
+            self._compact_task = None
+
+    def _write_snapshot(self, last_segment: int) -> None:
+        """Write the compacted snapshot and remove the segments it covers."""
+        jobs: Dict[str, str] = {}
+        artifacts: Dict[str, str] = {}
+        keys: Dict[str, str] = {}
+        snapshot_path = os.path.join(self.directory, _SNAPSHOT_NAME)
+        base, _ = self._read(snapshot_path, jobs, artifacts, keys)
+        for number in self._segment_numbers():
+            if base < number <= last_segment:
+                self._read(self._segment_path(number), jobs, artifacts, keys)
+
+        now = time.time()
+        keys = {key: raw for key, raw in keys.items() if json.loads(raw)["expires_at"] > now}
+
+        tmp_path = snapshot_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as snapshot:
+            snapshot.write(f"snapshot\t{last_segment}\t\n")
+            for kind, records in (("job", jobs), ("artifact", artifacts), ("idempotency", keys)):
+                for key, raw in records.items():
+                    snapshot.write(f"{kind}\t{key}\t{raw}\n")
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(tmp_path, snapshot_path)
+        self._fsync_directory()
+
+        for number in self._segment_numbers():
+            if number <= last_segment:
+                os.remove(self._segment_path(number))
+
+    def _read(
+        self,
+        path: str,
+        jobs: Dict[str, str],
+        artifacts: Dict[str, str],
+        keys: Dict[str, str]
+    ) -> Tuple[int, int]:
+        """
+        Apply the records of one file to maps of ID -> undecoded JSON.
+
+        Returns:
+            Tuple of (last segment covered if the file is a snapshot, records applied)
+        """
+        applied = 0
+        covered = 0
+        try:
+            log_file = open(path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return 0, 0
+
+        with log_file:
+            for line in log_file:
+                fields = line.split("\t", 2)
+                if len(fields) != 3 or not line.endswith("\n"):
+                    self.logger.warning(f"Ignoring a torn record at the end of {path}")
+                    break
+
+                kind, key, raw = fields
+                if kind == "job":
+                    jobs[key] = raw[:-1]
+                elif kind == "job_evicted":
+                    jobs.pop(key, None)
+                elif kind == "artifact":
+                    artifacts[key] = raw[:-1]
+                elif kind == "artifact_deleted":
+                    artifacts.pop(key, None)
+                elif kind == "idempotency":
+                    keys[key] = raw[:-1]
+                elif kind == "snapshot":
+                    covered = int(key)
+                applied += 1
+
+        return covered, applied
+
+    def _segment_numbers(self) -> List[int]:
+        """Numbers of the segment files on disk, in order."""
+        numbers = []
+        for name in os.listdir(self.directory):
+            match = _SEGMENT_PATTERN.match(name)
+            if match:
+                numbers.append(int(match.group(1)))
+        return sorted(numbers)
+
+    def _segment_path(self, number: int) -> str:
+        return os.path.join(self.directory, f"wal-{number:08d}.log")
+
+    def _fsync_directory(self) -> None:
+        """Make file creations, renames and removals in the log directory durable."""
+        fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
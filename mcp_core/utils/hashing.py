@@ -0,0 +1,93 @@
+"""
+Canonical serialization and content hashing helpers for MCP Core.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+
+def canonical_json(value: Any) -> bytes:
+    """
+    Serialize a value to canonical JSON bytes.
+    
+    Keys are sorted and insignificant whitespace is removed so that equal
+    values always produce identical bytes.
+    
+    Args:
+        value: JSON-compatible value
+        
+    Returns:
+        Canonical UTF-8 encoded JSON
+    """
+    return json.dumps(
+        value,
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str
+    ).encode("utf-8")
+
+
+def content_hash(value: Any) -> str:
+    """
+    Compute a content hash of a JSON-compatible value.
+    
+    Args:
+        value: JSON-compatible value
+        
+    Returns:
+        Hex-encoded SHA-256 digest of the canonical JSON
+    """
+    return hashlib.sha256(canonical_json(value)).hexdigest()
+
+
+def payload_fingerprint(job_type: str, payload: Any, options: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Compute a content hash identifying a (job type, payload) pair.
+    
+    Args:
+        job_type: Job type value
+        payload: Job payload
+        options: Other JSON-compatible fields that change how the job executes
+        
+    Returns:
+        Hex-encoded SHA-256 digest
+    """
+    return content_hash({"type": job_type, "payload": payload, "options": options or {}})
+
+
+def estimate_json_size(value: Any, limit: int) -> int:
+    """
+    Estimate the JSON-encoded size of a value without serializing it.
+    
+    Strings are counted by length and scalars by a fixed width, and the walk
+    stops once the estimate exceeds ``limit``, so the cost is bounded by the
+    number of containers visited rather than by the encoded size.
+    
+    Args:
+        value: JSON-compatible value
+        limit: Size in bytes after which the walk stops
+        
+    Returns:
+        Estimated size in bytes; anything over ``limit`` means "at least limit"
+    """
+    size = 0
+    stack = [value]
+    while stack and size <= limit:
+        item = stack.pop()
+        if isinstance(item, str):
+            size += len(item) + 2
+        elif isinstance(item, dict):
+            size += 2
+            for key, child in item.items():
+                size += len(str(key)) + 4
+                stack.append(child)
+                if size > limit:
+                    break
+        elif isinstance(item, (list, tuple)):
+            size += 2
+            stack.extend(item[:limit])  # each element adds at least a byte
+        else:
+            size += 6
+    return size
@@ -0,0 +1,224 @@
+"""
+Bounded, expiring idempotency key index for MCP Core.
+"""
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Tuple
+import asyncio
+import time
+
+if TYPE_CHECKING:
+    from ..state.backend import StateBackend
+
+
+class IdempotencyIndex:
+    """
+    Maps client idempotency keys to the IDs they created.
+
+    Entries expire ``ttl_seconds`` after insertion and the oldest entries are
+    evicted once ``max_entries`` is reached. Keys are kept in insertion order,
+    which is also expiry order, so lookups, inserts and expiry are all O(1).
+
+    With a state backend the keys are shared by all workers: ``claim``
+    records them in the backend, and the in-memory entries only cache what
+    the backend already holds.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1_000_000,
+        ttl_seconds: float = 24 * 3600,
+        state_backend: Optional["StateBackend"] = None,
+        scope: str = "default"
+    ):
+        """
+        Args:
+            max_entries: Most keys cached in memory
+            ttl_seconds: Lifetime of a key
+            state_backend: Shared store of record for the keys
+            scope: Namespace of the keys in the state backend
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.state_backend = state_backend
+        self.scope = scope
+        self._entries: "OrderedDict[str, Tuple[float, str, Optional[bytes]]]" = OrderedDict()  # key -> (expires_at, id, fingerprint)
+        self._replays = 0
+        self._evictions = 0
+
+    def get(self, key: str, fingerprint: Optional[str] = None) -> Optional[str]:
+        """
+        Look up the ID created for a key.
+
+        Args:
+            key: Idempotency key
+            fingerprint: Hex digest of the request body, checked against the original
+
+        Returns:
+            Original ID, or None if the key is unknown or expired
+
+        Raises:
+            ValueError: If the key was used with a different request body
+        """
+        self._expire()
+
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        _, value, original_fingerprint = entry
+        if fingerprint and original_fingerprint and self._compact(fingerprint) != original_fingerprint:
+            raise ValueError(f"Idempotency key {key} was already used with a different request")
+
+        self._replays += 1
+        return value
+
+    def put(self, key: str, value: str, fingerprint: Optional[str] = None) -> None:
+        """
+        Record the ID created for a key.
+
+        Args:
+            key: Idempotency key
+            value: ID created by the first request
+            fingerprint: Hex digest of the request body
+        """
+        self._entries.pop(key, None)
+        self._entries[key] = (
+            time.monotonic() + self.ttl_seconds,
+            value,
+            self._compact(fingerprint) if fingerprint else None
+        )
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    async def claim(self, key: str, value: str, fingerprint: Optional[str] = None) -> str:
+        """
+        Record the ID a request is about to create, unless the key already has one.
+
+        The caller creates ``value`` only if it is returned, and calls
+        ``release`` if creating it fails. Concurrent claims of one key get
+        the same ID back, also across workers sharing a state backend.
+
+        Args:
+            key: Idempotency key
+            value: ID the request would create
+            fingerprint: Hex digest of the request body
+
+        Returns:
+            ``value`` if the key was free, otherwise the original ID
+
+        Raises:
+            ValueError: If the key was used with a different request body
+        """
+        existing = self.get(key, fingerprint)
+        if existing:
+            return existing
+        if self.state_backend is None:
+            self.put(key, value, fingerprint)
+            return value
+
+        stored_value, stored_fingerprint = await asyncio.to_thread(
+            self.state_backend.claim_idempotency_key, self.scope, key, value, fingerprint, self.ttl_seconds
+        )
+        if stored_value != value:
+            if fingerprint and stored_fingerprint and self._compact(fingerprint) != self._compact(stored_fingerprint):
+                raise ValueError(f"Idempotency key {key} was already used with a different request")
+            self._replays += 1
+        self.put(key, stored_value, stored_fingerprint)
+        return stored_value
+
+    async def release(self, key: str, value: str) -> None:
+        """
+        Free a key claimed for ``value``.
+
+        Args:
+            key: Idempotency key
+            value: ID that was not created after all
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] == value:
+            del self._entries[key]
+        if self.state_backend is not None:
+            await asyncio.to_thread(self.state_backend.release_idempotency_key, self.scope, key, value)
+
+    def export(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a key as a record for the write-ahead log.
+
+        Args:
+            key: Idempotency key
+
+        Returns:
+            Dict with scope, key, value, fingerprint and expires_at (epoch
+            seconds), or None if the key is unknown
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value, fingerprint = entry
+        return {
+            "scope": self.scope,
+            "key": key,
+            "value": value,
+            "fingerprint": fingerprint.hex() if fingerprint else None,
+            "expires_at": time.time() + (expires_at - time.monotonic())
+        }
+
+    def restore(self, records: Iterable[Dict[str, Any]]) -> None:
+        """
+        Load keys replayed from the write-ahead log.
+
+        Records of other scopes and expired records are skipped.
+
+        Args:
+            records: Records as returned by ``export``
+        """
+        now = time.time()
+        for record in sorted(records, key=lambda record: record["expires_at"]):
+            if record["scope"] != self.scope or record["expires_at"] <= now:
+                continue
+            # Keep the original expiry rather than a fresh TTL
+            self._entries.pop(record["key"], None)
+            self._entries[record["key"]] = (
+                time.monotonic() + record["expires_at"] - now,
+                record["value"],
+                self._compact(record["fingerprint"]) if record["fingerprint"] else None
+            )
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get index size and counters.
+
+        Returns:
+            Dict of index statistics
+        """
+        return {
+            "keys": len(self._entries),
+            "max_keys": self.max_entries,
+            "replays": self._replays,
+            "evictions": self._evictions
+        }
+
+    @staticmethod
+    def _compact(fingerprint: str) -> bytes:
+        """Keep 128 bits of a hex digest as raw bytes to bound per-key memory."""
+        return bytes.fromhex(fingerprint[:32])
+
+    def _expire(self) -> None:
+        """Drop expired entries from the head of the index."""
+        now = time.monotonic()
+        while self._entries:
+            expires_at = next(iter(self._entries.values()))[0]
+            if expires_at > now:
+                break
+            self._entries.popitem(last=False)
@@ -0,0 +1,141 @@
+"""
+Sorted secondary index for MCP Core records.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Iterator, List, Optional, Tuple
+
+
+class OrderedIndex:
+    """
+    Keys kept in ascending order in a list of sorted chunks.
+
+    Keys are tuples such as ``(created_at, id)`` and are unique. A key is
+    found by binary search over the last key of each chunk and then within
+    its chunk, so an insert or removal only shifts the keys of one chunk of
+    at most ``2 * chunk_size`` keys instead of the whole index; a chunk that
+    grows past that is split in half and an emptied chunk is dropped.
+    Records are usually created in key order, so most inserts append to the
+    last chunk. Reading the first or last ``n`` keys costs O(n) regardless
+    of the index size.
+    """
+
+    def __init__(self, chunk_size: int = 512):
+        """
+        Args:
+            chunk_size: Keys per chunk after a split
+        """
+        self.chunk_size = chunk_size
+        self._chunks: List[List[Tuple[Any, ...]]] = []
+        self._maxes: List[Tuple[Any, ...]] = []  # last key of each chunk
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def add(self, key: Tuple[Any, ...]) -> None:
+        """
+        Insert a key.
+
+        Args:
+            key: Sort key; must not already be present
+        """
+        self._len += 1
+        if not self._chunks:
+            self._chunks.append([key])
+            self._maxes.append(key)
+            return
+
+        position = bisect_left(self._maxes, key)
+        if position == len(self._maxes):
+            position -= 1
+            chunk = self._chunks[position]
+            chunk.append(key)
+            self._maxes[position] = key
+        else:
+            chunk = self._chunks[position]
+            insort(chunk, key)
+
+        if len(chunk) > 2 * self.chunk_size:
+            self._chunks.insert(position + 1, chunk[self.chunk_size:])
+            del chunk[self.chunk_size:]
+            self._maxes.insert(position, chunk[-1])
+
+    def remove(self, key: Tuple[Any, ...]) -> bool:
+        """
+        Remove a key.
+
+        Args:
+            key: Sort key
+
+        Returns:
+            True if the key was present
+        """
+        position = bisect_left(self._maxes, key)
+        if position == len(self._maxes):
+            return False
+        chunk = self._chunks[position]
+        index = bisect_left(chunk, key)
+        if chunk[index] != key:
+            return False
+
+        del chunk[index]
+        self._len -= 1
+        if not chunk:
+            del self._chunks[position]
+            del self._maxes[position]
+        elif index == len(chunk):
+            self._maxes[position] = chunk[-1]
+        return True
+
+    def iter_desc(self, before: Optional[Tuple[Any, ...]] = None) -> Iterator[Tuple[Any, ...]]:
+        """
+        Iterate keys from largest to smallest.
+
+        Args:
+            before: Only yield keys strictly smaller than this one
+
+        Yields:
+            Keys in descending order
+        """
+        if not self._chunks:
+            return
+        if before is None:
+            position = len(self._chunks) - 1
+            end = len(self._chunks[position])
+        else:
+            position = bisect_left(self._maxes, before)
+            if position == len(self._chunks):
+                position -= 1
+                end = len(self._chunks[position])
+            else:
+                end = bisect_left(self._chunks[position], before)
+
+        for chunk_position in range(position, -1, -1):
+            chunk = self._chunks[chunk_position]
+            stop = end if chunk_position == position else len(chunk)
+            for index in range(stop - 1, -1, -1):
+                yield chunk[index]
+
+    def iter_asc(self, after: Optional[Tuple[Any, ...]] = None) -> Iterator[Tuple[Any, ...]]:
+        """
+        Iterate keys from smallest to largest.
+
+        Args:
+            after: Only yield keys strictly larger than this one
+
+        Yields:
+            Keys in ascending order
+        """
+        position = 0 if after is None else bisect_right(self._maxes, after)
+        for chunk_position in range(position, len(self._chunks)):
+            chunk = self._chunks[chunk_position]
+            start = bisect_right(chunk, after) if after is not None and chunk_position == position else 0
+            for index in range(start, len(chunk)):
+                yield chunk[index]
+
+    def clear(self) -> None:
+        """Remove all keys."""
+        self._chunks.clear()
+        self._maxes.clear()
+        self._len = 0
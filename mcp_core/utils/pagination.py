@@ -0,0 +1,51 @@
+"""
+Opaque pagination cursors for MCP Core list endpoints.
+"""
+
+from datetime import datetime, timezone
+from typing import Tuple
+import base64
+import binascii
+import json
+
+
+def encode_cursor(created_at: datetime, item_id: str) -> str:
+    """
+    Encode the position after an item into an opaque cursor.
+
+    Args:
+        created_at: Creation time of the last item on the page
+        item_id: ID of the last item on the page
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = json.dumps([created_at.isoformat(), item_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Decode a cursor produced by ``encode_cursor``.
+
+    Timestamps with a UTC offset are converted to naive UTC, the form every
+    store keys its items by.
+
+    Args:
+        cursor: Cursor string
+
+    Returns:
+        Tuple of (created_at, item_id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, item_id = json.loads(raw)
+        created_at = datetime.fromisoformat(created_at)
+        if created_at.tzinfo is not None:
+            created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+        return created_at, str(item_id)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
@@ -0,0 +1,18 @@
+"""
+Conversions between naive UTC datetimes and epoch seconds.
+"""
+
+from datetime import datetime, timedelta
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def datetime_to_epoch(value: datetime) -> float:
+    """Convert a naive UTC datetime to seconds since the epoch."""
+    return (value - _EPOCH).total_seconds()
+
+
+def epoch_to_datetime(value: float) -> datetime:
+    """Convert seconds since the epoch to a naive UTC datetime."""
+    return _EPOCH + timedelta(seconds=value)
@@ -0,0 +1,305 @@
+"""
+Body formats and compression for requests exchanged with external services.
+"""
+
+import asyncio
+import gzip
+import json
+import zlib
+from enum import Enum
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+
+class BodyFormat(str, Enum):
+    """Serialization of request and response bodies."""
+    JSON = "json"
+    MSGPACK = "msgpack"  # needs the msgpack package
+
+
+class ContentEncoding(str, Enum):
+    """Compression of request and response bodies."""
+    IDENTITY = "identity"
+    GZIP = "gzip"
+    ZSTD = "zstd"  # needs the zstandard package
+
+
+MEDIA_TYPES = {
+    BodyFormat.JSON: "application/json",
+    BodyFormat.MSGPACK: "application/msgpack"
+}
+
+# Bodies smaller than this are sent uncompressed; compression would not pay for itself
+MIN_COMPRESS_BYTES = 1024
+
+# Bodies larger than this are encoded and decoded in a worker thread instead of on the event loop
+THREAD_THRESHOLD_BYTES = 256 * 1024
+
+# Compressed bodies expand when decoded, so they go to a worker thread from a smaller size
+COMPRESSED_THREAD_THRESHOLD_BYTES = 16 * 1024
+
+# Decompressed bodies larger than this are rejected, so a small compressed body cannot exhaust memory
+MAX_DECOMPRESSED_BYTES = 256 * 1024 * 1024
+
+# Output read from a zstd stream at a time
+ZSTD_READ_BYTES = 1024 * 1024
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+def check_available(body_format: BodyFormat, content_encoding: ContentEncoding) -> None:
+    """
+    Check that the packages needed for a format and encoding are installed.
+    
+    Args:
+        body_format: Body format
+        content_encoding: Compression
+        
+    Raises:
+        ValueError: If a needed package is missing
+    """
+    if BodyFormat(body_format) == BodyFormat.MSGPACK and msgpack is None:
+        raise ValueError("The msgpack body format needs the msgpack package")
+    if ContentEncoding(content_encoding) == ContentEncoding.ZSTD and zstandard is None:
+        raise ValueError("The zstd content encoding needs the zstandard package")
+
+
+def accept_headers() -> Dict[str, str]:
+    """
+    Get the Accept and Accept-Encoding headers for everything this process can decode.
+    
+    Returns:
+        Header dict
+    """
+    accept = "application/json"
+    if msgpack is not None:
+        accept = "application/msgpack, application/json;q=0.9"
+    encodings = "gzip, identity" if zstandard is None else "zstd, gzip, identity"
+    return {"Accept": accept, "Accept-Encoding": encodings}
+
+
+def encode_body(
+    data: Any,
+    body_format: BodyFormat = BodyFormat.JSON,
+    content_encoding: ContentEncoding = ContentEncoding.IDENTITY
+) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Serialize and compress a request body.
+    
+    Args:
+        data: JSON-compatible value
+        body_format: Serialization
+        content_encoding: Compression, skipped for bodies under MIN_COMPRESS_BYTES
+        
+    Returns:
+        Tuple of (body, Content-Type and Content-Encoding headers)
+    """
+    body, headers = serialize(data, body_format)
+    content_encoding = ContentEncoding(content_encoding)
+    if content_encoding != ContentEncoding.IDENTITY and len(body) >= MIN_COMPRESS_BYTES:
+        body = compress(body, content_encoding)
+        headers["Content-Encoding"] = content_encoding.value
+    return body, headers
+
+
+async def encode_body_async(
+    data: Any,
+    body_format: BodyFormat = BodyFormat.JSON,
+    content_encoding: ContentEncoding = ContentEncoding.IDENTITY
+) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Encode a body like ``encode_body``, compressing large bodies in a worker thread.
+    
+    Serialization stays on the event loop: the data may still be shared
+    with code running there.
+    
+    Args:
+        data: JSON-compatible value
+        body_format: Serialization
+        content_encoding: Compression, skipped for bodies under MIN_COMPRESS_BYTES
+        
+    Returns:
+        Tuple of (body, Content-Type and Content-Encoding headers)
+    """
+    body, headers = serialize(data, body_format)
+    content_encoding = ContentEncoding(content_encoding)
+    if content_encoding != ContentEncoding.IDENTITY and len(body) >= MIN_COMPRESS_BYTES:
+        if len(body) > THREAD_THRESHOLD_BYTES:
+            body = await asyncio.to_thread(compress, body, content_encoding)
+        else:
+            body = compress(body, content_encoding)
+        headers["Content-Encoding"] = content_encoding.value
+    return body, headers
+
+
+def serialize(data: Any, body_format: BodyFormat = BodyFormat.JSON) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Serialize a value without compressing it.
+    
+    Args:
+        data: JSON-compatible value
+        body_format: Serialization
+        
+    Returns:
+        Tuple of (body, Content-Type header)
+    """
+    body_format = BodyFormat(body_format)
+    if body_format == BodyFormat.MSGPACK:
+        body = msgpack.packb(data, default=str)
+    else:
+        body = json.dumps(data, separators=(",", ":"), default=str).encode("utf-8")
+    return body, {"Content-Type": MEDIA_TYPES[body_format]}
+
+
+def decode_body(
+    body: bytes,
+    content_type: Optional[str],
+    content_encoding: Optional[str],
+    max_size: int = MAX_DECOMPRESSED_BYTES
+) -> Any:
+    """
+    Decompress and deserialize a body.
+    
+    Args:
+        body: Raw body
+        content_type: Content-Type header (JSON if missing or unknown)
+        content_encoding: Content-Encoding header
+        max_size: Largest accepted size of the decompressed body
+        
+    Returns:
+        Decoded value
+        
+    Raises:
+        ValueError: If the body is not valid for its headers or decompresses past max_size
+    """
+    body = decompress(body, content_encoding, max_size)
+    media_type = (content_type or "").split(";", 1)[0].strip().lower()
+    if media_type in ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack"):
+        if msgpack is None:
+            raise ValueError("Received a msgpack body but the msgpack package is not installed")
+        try:
+            return msgpack.unpackb(body)
+        except Exception as e:
+            raise ValueError(f"Invalid msgpack body: {e}")
+    
+    try:
+        return json.loads(body)
+    except UnicodeDecodeError as e:
+        raise ValueError(f"Invalid JSON body: {e}")
+
+
+async def decode_body_async(
+    body: bytes,
+    content_type: Optional[str],
+    content_encoding: Optional[str],
+    max_size: int = MAX_DECOMPRESSED_BYTES
+) -> Any:
+    """
+    Decode a body like ``decode_body``, in a worker thread if it is large.
+    
+    Args:
+        body: Raw body
+        content_type: Content-Type header
+        content_encoding: Content-Encoding header
+        max_size: Largest accepted size of the decompressed body
+        
+    Returns:
+        Decoded value
+        
+    Raises:
+        ValueError: If the body is not valid for its headers or decompresses past max_size
+    """
+    compressed = (content_encoding or "identity").strip().lower() != "identity"
+    if len(body) > (COMPRESSED_THREAD_THRESHOLD_BYTES if compressed else THREAD_THRESHOLD_BYTES):
+        return await asyncio.to_thread(decode_body, body, content_type, content_encoding, max_size)
+    return decode_body(body, content_type, content_encoding, max_size)
+
+
+def compress(body: bytes, content_encoding: ContentEncoding) -> bytes:
+    """Compress a body with the given encoding."""
+    content_encoding = ContentEncoding(content_encoding)
+    if content_encoding == ContentEncoding.GZIP:
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+    if content_encoding == ContentEncoding.ZSTD:
+        check_available(BodyFormat.JSON, content_encoding)
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    return body
+
+
+def decompress(body: bytes, content_encoding: Optional[str], max_size: int = MAX_DECOMPRESSED_BYTES) -> bytes:
+    """
+    Undo a Content-Encoding.
+    
+    Decompression stops as soon as the output grows past ``max_size``, so
+    the whole of an oversized body is never held in memory.
+    
+    Args:
+        body: Raw body
+        content_encoding: Content-Encoding header (identity if missing)
+        max_size: Largest accepted size of the decompressed body
+        
+    Returns:
+        Decompressed body
+        
+    Raises:
+        ValueError: If the encoding is unsupported, the body is corrupt or it decompresses past max_size
+    """
+    encoding = (content_encoding or "identity").strip().lower()
+    if encoding in ("", "identity"):
+        return body
+    if encoding in ("gzip", "x-gzip"):
+        try:
+            return _gunzip(body, max_size)
+        except zlib.error as e:
+            raise ValueError(f"Corrupt gzip body: {e}")
+    if encoding == "zstd":
+        if zstandard is None:
+            raise ValueError("Received a zstd body but the zstandard package is not installed")
+        try:
+            return _unzstd(body, max_size)
+        except zstandard.ZstdError as e:
+            raise ValueError(f"Corrupt zstd body: {e}")
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def _gunzip(body: bytes, max_size: int) -> bytes:
+    """Decompress every gzip member of a body, up to max_size bytes of output."""
+    chunks = []
+    size = 0
+    while body:
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        chunk = decompressor.decompress(body, max_size - size + 1)
+        size += len(chunk)
+        if size > max_size:
+            raise ValueError(f"Body decompresses to more than {max_size} bytes")
+        if not decompressor.eof:
+            raise ValueError("Corrupt gzip body: truncated")
+        chunks.append(chunk)
+        body = decompressor.unused_data
+    return b"".join(chunks)
+
+
+def _unzstd(body: bytes, max_size: int) -> bytes:
+    """Decompress a zstd frame, up to max_size bytes of output."""
+    chunks = []
+    size = 0
+    # Frames written in streaming mode do not record their size, which a stream reader handles
+    with zstandard.ZstdDecompressor().stream_reader(body) as reader:
+        while True:
+            chunk = reader.read(min(ZSTD_READ_BYTES, max_size - size + 1))
+            if not chunk:
+                return b"".join(chunks)
+            size += len(chunk)
+            if size > max_size:
+                raise ValueError(f"Body decompresses to more than {max_size} bytes")
+            chunks.append(chunk)
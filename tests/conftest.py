@@ -0,0 +1,68 @@
+"""
+Shared fixtures for the test suite.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, List
+
+import pytest_asyncio
+from aiohttp import web
+
+
+class StubService:
+    """
+    Minimal external service backed by a real aiohttp server.
+    
+    Every request on any path is recorded in ``calls`` and answered by
+    ``handler``, which tests can replace to script the service's behaviour.
+    """
+    
+    def __init__(self):
+        self.calls: List[Dict[str, Any]] = []
+        self.handler: Callable[[web.Request], Awaitable[web.StreamResponse]] = self._default_handler
+        self.url = ""
+        self._runner = None
+    
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self._dispatch)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+    
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+    
+    async def _dispatch(self, request: web.Request) -> web.StreamResponse:
+        body = await request.read()
+        self.calls.append({"method": request.method, "path": request.path, "body": body})
+        return await self.handler(request)
+    
+    @staticmethod
+    async def _default_handler(request: web.Request) -> web.StreamResponse:
+        return web.json_response({"status": "ok"})
+
+
+@pytest_asyncio.fixture
+async def stub_service():
+    """Start a stub external service for the duration of a test."""
+    service = StubService()
+    await service.start()
+    try:
+        yield service
+    finally:
+        await service.stop()
+
+
+@pytest_asyncio.fixture
+async def second_stub_service():
+    """Start another stub service, for tests that need two separate services."""
+    service = StubService()
+    await service.start()
+    try:
+        yield service
+    finally:
+        await service.stop()
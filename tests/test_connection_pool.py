@@ -0,0 +1,67 @@
+"""
+Tests for the per-service connection pools.
+"""
+
+import pytest
+import pytest_asyncio
+
+from mcp_core.agents.connection_pool import ConnectionPoolPolicy, ServiceConnectionPools
+
+
+@pytest_asyncio.fixture
+async def pools():
+    pools = ServiceConnectionPools(ConnectionPoolPolicy(warm_connections=2))
+    try:
+        yield pools
+    finally:
+        await pools.close()
+
+
+class TestServiceConnectionPools:
+    """Test pool creation, reuse, resizing and closing."""
+
+    @pytest.mark.asyncio
+    async def test_one_session_per_service(self, pools):
+        first = pools.session("http://a", 4)
+        assert pools.session("http://a", 2) is first
+        assert pools.session("http://b") is not first
+        assert pools.get_stats()["http://a"]["limit"] == 4
+        assert pools.get_stats()["http://b"]["limit"] == pools.default_limit
+
+    @pytest.mark.asyncio
+    async def test_limit_is_capped_and_raised(self, pools):
+        small = pools.session("http://a", 4)
+        large = pools.session("http://a", 1000)
+
+        assert large is not small
+        assert pools.get_stats()["http://a"]["limit"] == pools.policy.max_connections
+        await pools.retain(["http://a"])
+        assert small.closed and not large.closed
+
+    @pytest.mark.asyncio
+    async def test_connections_are_kept_alive(self, pools, stub_service):
+        assert await pools.warm(stub_service.url) == 2
+        session = pools.session(stub_service.url)
+        for _ in range(3):
+            async with session.get(f"{stub_service.url}/execute") as response:
+                await response.read()
+
+        stats = pools.get_stats()[stub_service.url]
+        assert stats["requests"] == 5
+        assert stats["connections_created"] == 2
+        assert stats["connections_reused"] == 3
+        assert stats["active"] == 0
+
+    @pytest.mark.asyncio
+    async def test_retain_and_close(self, pools):
+        removed = pools.session("http://a")
+        kept = pools.session("http://b")
+
+        await pools.retain(["http://b"])
+        assert removed.closed and not kept.closed
+        assert list(pools.get_stats()) == ["http://b"]
+
+        await pools.close()
+        assert kept.closed
+        with pytest.raises(RuntimeError):
+            pools.session("http://b")
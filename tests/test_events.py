@@ -0,0 +1,61 @@
+"""
+Tests for the job event broker.
+"""
+
+import json
+
+import pytest
+
+from mcp_core.jobs.events import JobEventBroker
+from mcp_core.jobs.job_record import JobRecord
+from mcp_core.jobs.job_schema import JobStatus, JobType
+
+
+def make_job(job_type: JobType = JobType.GENERIC, status: JobStatus = JobStatus.PENDING):
+    job = JobRecord(type=job_type, payload={})
+    job.status = status
+    return job
+
+
+class TestJobEventBroker:
+    """Test filtering, buffering and closing subscriptions."""
+
+    @pytest.mark.asyncio
+    async def test_filters(self):
+        broker = JobEventBroker()
+        watched, other = make_job(), make_job(JobType.BACKTEST)
+        by_id = broker.subscribe(job_ids=[watched.id])
+        by_type = broker.subscribe(job_types=[JobType.BACKTEST], statuses=[JobStatus.RUNNING])
+
+        broker.publish(watched)
+        broker.publish(other)
+        other.status = JobStatus.RUNNING
+        broker.publish(other)
+
+        assert json.loads(await by_id.get(timeout=0))["job_id"] == watched.id
+        assert await by_id.get(timeout=0) is None
+        assert json.loads(await by_type.get(timeout=0))["status"] == "running"
+        assert await by_type.get(timeout=0) is None
+
+    @pytest.mark.asyncio
+    async def test_slow_consumer_gets_overflow(self):
+        broker = JobEventBroker(max_buffer=2)
+        subscription = broker.subscribe()
+        jobs = [make_job() for _ in range(5)]
+        for job in jobs:
+            broker.publish(job)
+
+        assert json.loads(await subscription.get(timeout=0)) == {"event": "overflow", "dropped": 3}
+        assert [json.loads(await subscription.get(timeout=0))["job_id"] for _ in range(2)] == [
+            job.id for job in jobs[3:]
+        ]
+        assert broker.get_stats()["dropped"] == 3
+
+    @pytest.mark.asyncio
+    async def test_close_wakes_reader(self):
+        broker = JobEventBroker()
+        subscription = broker.subscribe(job_ids=["a"])
+
+        broker.close()
+        assert await subscription.get() is None
+        assert broker.get_stats()["subscribers"] == 0
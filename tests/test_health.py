@@ -0,0 +1,147 @@
+"""
+Tests for service health tracking.
+"""
+
+import time
+
+import pytest
+
+from mcp_core.agents.health import HealthCheckPolicy, ServiceHealthMonitor
+from mcp_core.state.backend import SQLiteStateBackend
+
+
+class FakeClock:
+    """Stand-in for ``time.time`` and ``time.monotonic`` that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(time, "time", fake)
+    monkeypatch.setattr(time, "monotonic", fake)
+    return fake
+
+
+@pytest.fixture
+def backend(tmp_path):
+    state_backend = SQLiteStateBackend(str(tmp_path / "state.db"))
+    yield state_backend
+    state_backend.close()
+
+
+class TestServiceHealthMonitor:
+    """Test probe thresholds, backoff and load reports."""
+
+    def test_thresholds(self):
+        monitor = ServiceHealthMonitor(HealthCheckPolicy(unhealthy_threshold=2, healthy_threshold=2))
+
+        assert not monitor.record_probe("http://svc", False, "down")
+        assert monitor.is_available("http://svc", 0)
+        assert monitor.record_probe("http://svc", False, "down")
+        assert not monitor.is_available("http://svc", 0)
+
+        assert not monitor.record_probe("http://svc", True)
+        assert monitor.record_probe("http://svc", True)
+        assert monitor.is_available("http://svc", 0)
+
+    def test_unhealthy_probes_back_off(self, clock):
+        monitor = ServiceHealthMonitor(HealthCheckPolicy(interval=0.5, max_interval=4))
+
+        delays = []
+        for _ in range(6):
+            monitor.record_probe("http://svc", False, "down")
+            delays.append(monitor.get_health("http://svc").next_probe_ts - clock.now)
+        assert delays == [0.5, 1.0, 2.0, 4.0, 4.0, 4.0]
+
+        assert monitor.due_for_probe(["http://svc", "http://new"]) == ["http://new"]
+        clock.now += 4
+        assert monitor.due_for_probe(["http://svc"]) == ["http://svc"]
+
+        monitor.record_probe("http://svc", True)
+        assert monitor.get_health("http://svc").next_probe_ts - clock.now == 0.5
+
+    def test_failures_below_threshold_keep_interval(self, clock):
+        monitor = ServiceHealthMonitor(HealthCheckPolicy(interval=0.5, unhealthy_threshold=3))
+        monitor.record_probe("http://svc", False, "down")
+        monitor.record_probe("http://svc", False, "down")
+
+        assert monitor.get_health("http://svc").next_probe_ts - clock.now == 0.5
+
+    def test_load_report(self, clock):
+        monitor = ServiceHealthMonitor(HealthCheckPolicy(load_report_ttl=5))
+        monitor.record_heartbeat("http://svc", running=1, in_flight=6, free_slots=2)
+
+        assert monitor.is_available("http://svc", 2)
+        assert not monitor.is_available("http://svc", 3)
+        assert monitor.estimate_in_flight("http://svc", 3) == 8
+
+        # Stale reports are ignored
+        clock.now += 5
+        assert monitor.is_available("http://svc", 3)
+        assert monitor.estimate_in_flight("http://svc", 3) == 3
+
+    def test_retain(self):
+        monitor = ServiceHealthMonitor()
+        monitor.record_probe("http://a", False, "down")
+        monitor.record_probe("http://b", False, "down")
+
+        monitor.retain(["http://b"])
+        assert monitor.get_health("http://a") is None
+        assert monitor.get_stats()["unhealthy"] == 1
+
+
+class TestSharedProbes:
+    """Test sharing probe duty and results between workers."""
+
+    def test_one_worker_holds_the_probe_lease(self, backend, clock):
+        assert backend.claim_health_probes("worker-1", 10)
+        assert not backend.claim_health_probes("worker-2", 10)
+        assert backend.claim_health_probes("worker-1", 10)
+
+        clock.now += 11
+        assert backend.claim_health_probes("worker-2", 10)
+        assert not backend.claim_health_probes("worker-1", 10)
+
+        backend.release_leases("worker-2")
+        assert backend.claim_health_probes("worker-1", 10)
+
+    def test_results_are_adopted(self, backend, clock):
+        backend.put_service("generic", "http://svc")
+        prober, follower = ServiceHealthMonitor(), ServiceHealthMonitor()
+
+        prober.record_probe("http://svc", False, "down")
+        backend.put_service_health([prober.export("http://svc")])
+        assert not follower.apply(backend.get_service_health())
+        assert not follower.is_available("http://svc", 0)
+        assert follower.get_health("http://svc").last_error == "down"
+
+        clock.now += 1
+        prober.record_probe("http://svc", True)
+        backend.put_service_health([prober.export("http://svc")])
+        assert follower.apply(backend.get_service_health())
+        assert follower.is_available("http://svc", 0)
+
+    def test_newer_local_observation_wins(self, backend, clock):
+        backend.put_service("generic", "http://svc")
+        prober, follower = ServiceHealthMonitor(), ServiceHealthMonitor()
+        prober.record_probe("http://svc", True)
+        backend.put_service_health([prober.export("http://svc")])
+
+        clock.now += 1
+        follower.record_probe("http://svc", False, "Connection failed")
+        assert not follower.apply(backend.get_service_health())
+        assert not follower.is_available("http://svc", 0)
+
+    def test_unregistered_services_are_dropped(self, backend):
+        monitor = ServiceHealthMonitor()
+        monitor.record_probe("http://gone", False, "down")
+
+        backend.put_service_health([monitor.export("http://gone")])
+        assert backend.get_service_health() == []
+        assert monitor.export("http://unknown") is None
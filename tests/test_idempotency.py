@@ -0,0 +1,155 @@
+"""
+Tests for the idempotency key index.
+"""
+
+import hashlib
+import time
+
+import pytest
+
+from mcp_core.state.backend import SQLiteStateBackend
+from mcp_core.utils.idempotency import IdempotencyIndex
+
+
+def fingerprint(body: str) -> str:
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+class FakeClock:
+    """Stand-in for ``time.monotonic`` that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(time, "monotonic", fake)
+    return fake
+
+
+class TestIdempotencyIndex:
+    """Test lookups, expiry and eviction of the in-memory index."""
+
+    def test_replay(self):
+        index = IdempotencyIndex()
+        index.put("key", "job-1", fingerprint("body"))
+
+        assert index.get("key", fingerprint("body")) == "job-1"
+        assert index.get("other") is None
+        assert index.get_stats()["replays"] == 1
+
+    def test_fingerprint_mismatch(self):
+        index = IdempotencyIndex()
+        index.put("key", "job-1", fingerprint("body"))
+
+        with pytest.raises(ValueError):
+            index.get("key", fingerprint("other body"))
+        # Without a fingerprint on either side the key simply replays
+        assert index.get("key") == "job-1"
+
+    def test_ttl(self, clock):
+        index = IdempotencyIndex(ttl_seconds=10)
+        index.put("old", "job-1")
+        clock.now += 5
+        index.put("new", "job-2")
+
+        clock.now += 5
+        assert index.get("old") is None
+        assert index.get("new") == "job-2"
+        clock.now += 5
+        assert index.get("new") is None
+        assert len(index) == 0
+
+    def test_put_again_renews_expiry(self, clock):
+        index = IdempotencyIndex(ttl_seconds=10)
+        index.put("key", "job-1")
+        index.put("other", "job-2")
+        clock.now += 5
+        index.put("key", "job-1")
+
+        clock.now += 5
+        assert index.get("other") is None
+        assert index.get("key") == "job-1"
+
+    def test_eviction(self):
+        index = IdempotencyIndex(max_entries=2)
+        for number in range(3):
+            index.put(f"key-{number}", f"job-{number}")
+
+        assert index.get("key-0") is None
+        assert index.get("key-2") == "job-2"
+        assert index.get_stats()["evictions"] == 1
+
+    def test_export_restore(self, clock):
+        index = IdempotencyIndex(ttl_seconds=60, scope="jobs")
+        index.put("key", "job-1", fingerprint("body"))
+        record = index.export("key")
+        expired = {**record, "key": "expired", "expires_at": time.time() - 1}
+        other_scope = {**record, "key": "artifact-key", "scope": "artifacts"}
+
+        restored = IdempotencyIndex(ttl_seconds=60, scope="jobs")
+        restored.restore([record, expired, other_scope])
+        assert len(restored) == 1
+        assert restored.get("key", fingerprint("body")) == "job-1"
+        with pytest.raises(ValueError):
+            restored.get("key", fingerprint("other body"))
+
+        # The restored key keeps its original expiry
+        clock.now += 61
+        assert restored.get("key") is None
+        assert index.export("missing") is None
+
+
+class TestIdempotencyClaims:
+    """Test claiming keys, alone and through a shared state backend."""
+
+    @pytest.mark.asyncio
+    async def test_claim_without_backend(self):
+        index = IdempotencyIndex()
+
+        assert await index.claim("key", "job-1", fingerprint("body")) == "job-1"
+        assert await index.claim("key", "job-2", fingerprint("body")) == "job-1"
+        with pytest.raises(ValueError):
+            await index.claim("key", "job-3", fingerprint("other body"))
+
+        await index.release("key", "job-1")
+        assert await index.claim("key", "job-4") == "job-4"
+
+    @pytest.mark.asyncio
+    async def test_claim_shared_by_workers(self, tmp_path):
+        first_backend = SQLiteStateBackend(str(tmp_path / "state.db"))
+        second_backend = SQLiteStateBackend(str(tmp_path / "state.db"))
+        try:
+            first = IdempotencyIndex(state_backend=first_backend, scope="jobs")
+            second = IdempotencyIndex(state_backend=second_backend, scope="jobs")
+            artifacts = IdempotencyIndex(state_backend=second_backend, scope="artifacts")
+
+            assert await first.claim("key", "job-1", fingerprint("body")) == "job-1"
+            assert await second.claim("key", "job-2", fingerprint("body")) == "job-1"
+            with pytest.raises(ValueError):
+                await second.claim("key", "job-3", fingerprint("other body"))
+            assert await artifacts.claim("key", "artifact-1") == "artifact-1"
+
+            # Releasing another request's ID leaves the key alone
+            await second.release("key", "job-2")
+            assert await IdempotencyIndex(state_backend=second_backend, scope="jobs").claim("key", "job-5") == "job-1"
+
+            await first.release("key", "job-1")
+            assert await IdempotencyIndex(state_backend=second_backend, scope="jobs").claim("key", "job-6") == "job-6"
+        finally:
+            first_backend.close()
+            second_backend.close()
+
+    @pytest.mark.asyncio
+    async def test_backend_keys_expire(self, tmp_path):
+        backend = SQLiteStateBackend(str(tmp_path / "state.db"))
+        try:
+            backend.claim_idempotency_key("jobs", "key", "job-1", None, -1)
+            assert await IdempotencyIndex(state_backend=backend, scope="jobs").claim("key", "job-2") == "job-2"
+        finally:
+            backend.close()
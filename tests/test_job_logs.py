@@ -0,0 +1,94 @@
+"""
+Tests for the job log store.
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from mcp_core.jobs.job_logs import JobLogStore
+
+
+def lines(start: int, stop: int):
+    return [f"line {number}" for number in range(start, stop)]
+
+
+class TestJobLogStore:
+    """Test buffering, spilling and reading job logs."""
+
+    @pytest.mark.asyncio
+    async def test_read_across_spilled_lines(self, tmp_path):
+        store = JobLogStore(str(tmp_path), max_lines=10, checkpoint_lines=4)
+        for start in range(0, 50, 5):
+            assert await store.append("job", lines(start, start + 5)) == start + 5
+
+        assert store.get_stats()["buffered_lines"] <= 10
+        assert await store.read("job") == (lines(0, 50), 50)
+        assert await store.read("job", since=17, limit=6) == (lines(17, 23), 23)
+        assert await store.read("job", since=50) == ([], 50)
+        await store.close()
+
+    @pytest.mark.asyncio
+    async def test_byte_cap(self, tmp_path):
+        store = JobLogStore(str(tmp_path), max_lines=1000, max_bytes=10000)
+        expected = []
+        for number in range(30):
+            line = f"{number:04d}" + "y" * 2996
+            expected.append(line)
+            await store.append("job", [line])
+            assert store.get_stats()["buffered_bytes"] <= 10000 + 3001
+
+        assert (await store.read("job", limit=100))[0] == expected
+        await store.close()
+
+    @pytest.mark.asyncio
+    async def test_finished_job_is_reloaded_from_disk(self, tmp_path):
+        store = JobLogStore(str(tmp_path), max_lines=10, checkpoint_lines=4)
+        await store.append("job", lines(0, 25))
+        store.forget("job")
+        await store.close()
+
+        reopened = JobLogStore(str(tmp_path), max_lines=10, checkpoint_lines=4)
+        assert await reopened.read("job", since=20) == (lines(20, 25), 25)
+        assert await reopened.append("job", lines(25, 27)) == 27
+        assert await reopened.read("job", since=23) == (lines(23, 27), 27)
+        await reopened.close()
+
+    @pytest.mark.asyncio
+    async def test_remove(self, tmp_path):
+        store = JobLogStore(str(tmp_path))
+        await store.append("job/1", lines(0, 3))
+        store.forget("job/1")
+        await store.close()
+
+        assert store.remove("job/1")
+        assert not store.remove("job/1")
+        assert await store.read("job/1") == ([], 0)
+
+    @pytest.mark.asyncio
+    async def test_wait_wakes_on_new_lines(self, tmp_path):
+        store = JobLogStore(str(tmp_path))
+        await store.append("job", lines(0, 1))
+
+        waiter = asyncio.create_task(store.wait("job", 1, timeout=5))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        await store.append("job", lines(1, 2))
+        await asyncio.wait_for(waiter, 1)
+
+        # Already past the offset: returns at once
+        await asyncio.wait_for(store.wait("job", 0, timeout=5), 1)
+        await store.close()
+
+    @pytest.mark.asyncio
+    async def test_temporary_directory_is_removed(self):
+        store = JobLogStore(max_lines=2)
+        await store.append("job", lines(0, 5))
+        await store.read("job")
+        directory = store.directory
+        assert directory is not None
+
+        await store.close()
+        assert store.directory is None
+        assert not os.path.exists(directory)
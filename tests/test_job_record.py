@@ -0,0 +1,65 @@
+"""
+Tests for compact job records.
+"""
+
+from datetime import datetime
+
+from mcp_core.artifacts.artifact_schema import ArtifactReference, ArtifactType
+from mcp_core.jobs.job_record import JobRecord, datetime_to_epoch, epoch_to_datetime
+from mcp_core.jobs.job_schema import JobFailureReason, JobPriority, JobResponse, JobStatus, JobType
+
+
+def make_finished_record() -> JobRecord:
+    record = JobRecord(
+        type=JobType.BACKTEST,
+        payload={"symbol": "AAPL"},
+        priority=JobPriority.HIGH,
+        tenant="team-a",
+        metadata={"owner": "team-a"}
+    )
+    record.status = JobStatus.FAILED
+    record.failure_reason = JobFailureReason.TIMED_OUT
+    record.error = "deadline passed"
+    record.fingerprint = "abc"
+    record.input_artifacts = [ArtifactReference(artifact_id="artifact-1", artifact_type=ArtifactType.MODEL)]
+    record.use_cache = True
+    record.attempts = 2
+    record.started_ts = record.created_ts + 1.5
+    record.completed_ts = record.created_ts + 3.25
+    record.deadline_ts = record.created_ts + 3
+    return record
+
+
+class TestJobRecord:
+    """Test enum codes, timestamps and serialization."""
+    
+    def test_enum_fields(self):
+        record = JobRecord(type="generic", payload={}, priority="low")
+        
+        assert record.type == JobType.GENERIC.value
+        assert record.priority == JobPriority.LOW.value
+        assert record.status == JobStatus.PENDING
+        record.status = "running"
+        assert record.status == JobStatus.RUNNING
+        assert record.failure_reason is None
+    
+    def test_epoch_conversion(self):
+        value = datetime(2024, 5, 1, 12, 30, 15, 123456)
+        
+        assert epoch_to_datetime(datetime_to_epoch(value)) == value
+    
+    def test_dict_round_trip(self):
+        record = make_finished_record()
+        
+        restored = JobRecord.from_dict(record.to_dict())
+        assert restored.to_dict() == record.to_dict()
+        assert restored.failure_reason == JobFailureReason.TIMED_OUT
+        assert restored.input_artifacts[0].artifact_id == "artifact-1"
+        assert restored.started_ts == record.started_ts
+    
+    def test_json_dict_matches_response(self):
+        record = make_finished_record()
+        
+        expected = JobResponse.model_validate(record.to_json_dict()).model_dump(mode="json")
+        assert record.to_json_dict() == expected
+        assert record.to_response().model_dump(mode="json") == expected
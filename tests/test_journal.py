@@ -0,0 +1,101 @@
+"""
+Tests for the write-ahead log.
+"""
+
+import os
+import time
+
+import pytest
+
+from mcp_core.state.journal import WriteAheadLog
+
+
+def job(job_id: str, status: str = "pending"):
+    return {"id": job_id, "status": status, "created_ts": 1.0}
+
+
+def artifact(artifact_id: str):
+    return {"metadata": {"id": artifact_id}}
+
+
+def key_record(key: str, expires_at: float):
+    return {"scope": "jobs", "key": key, "value": f"job-{key}", "fingerprint": None, "expires_at": expires_at}
+
+
+async def write(wal: WriteAheadLog, *records):
+    for kind, data in records:
+        wal.append(kind, data)
+    await wal.sync()
+
+
+class TestWriteAheadLog:
+    """Test appending, replay and compaction."""
+
+    @pytest.mark.asyncio
+    async def test_replay_keeps_latest_state(self, tmp_path):
+        wal = WriteAheadLog(str(tmp_path))
+        await write(
+            wal,
+            ("job", job("a")),
+            ("job", job("b")),
+            ("job", job("a", "completed")),
+            ("job_evicted", "b"),
+            ("artifact", artifact("x")),
+            ("artifact", artifact("y")),
+            ("artifact_deleted", "y"),
+            ("idempotency", key_record("live\tkey", time.time() + 60)),
+            ("idempotency", key_record("expired", time.time() - 1))
+        )
+        await wal.close()
+
+        jobs, artifacts, keys = WriteAheadLog(str(tmp_path)).load()
+        assert jobs == {"a": job("a", "completed")}
+        assert list(artifacts) == ["x"]
+        assert [record["key"] for record in keys] == ["live\tkey"]
+
+    @pytest.mark.asyncio
+    async def test_torn_tail_is_ignored(self, tmp_path):
+        wal = WriteAheadLog(str(tmp_path))
+        await write(wal, ("job", job("a")), ("job", job("b")))
+        await wal.close()
+
+        segment = tmp_path / "wal-00000001.log"
+        with open(segment, "a", encoding="utf-8") as log_file:
+            log_file.write('job\tc\t{"id": "c", "sta')
+
+        reopened = WriteAheadLog(str(tmp_path))
+        jobs, _, _ = reopened.load()
+        assert sorted(jobs) == ["a", "b"]
+
+        # New records go to a fresh segment, so the torn line never precedes them
+        await write(reopened, ("job", job("d")))
+        await reopened.close()
+        assert (tmp_path / "wal-00000002.log").exists()
+        jobs, _, _ = WriteAheadLog(str(tmp_path)).load()
+        assert sorted(jobs) == ["a", "b", "d"]
+
+    @pytest.mark.asyncio
+    async def test_compaction(self, tmp_path):
+        wal = WriteAheadLog(str(tmp_path), snapshot_records=3)
+        await write(wal, ("job", job("a")), ("job", job("b")), ("job", job("c")))
+        await write(wal, ("job", job("a", "completed")), ("job_evicted", "c"))
+        await wal.close()
+
+        assert wal.get_stats()["snapshots"] == 1
+        assert sorted(os.listdir(tmp_path)) == ["snapshot.log", "wal-00000002.log"]
+        jobs, _, _ = WriteAheadLog(str(tmp_path)).load()
+        assert jobs == {"a": job("a", "completed"), "b": job("b")}
+
+    @pytest.mark.asyncio
+    async def test_compaction_drops_expired_keys(self, tmp_path):
+        wal = WriteAheadLog(str(tmp_path), snapshot_records=2)
+        await write(
+            wal,
+            ("idempotency", key_record("live", time.time() + 60)),
+            ("idempotency", key_record("expired", time.time() - 1))
+        )
+        await wal.close()
+
+        with open(tmp_path / "snapshot.log", encoding="utf-8") as snapshot:
+            kinds = [line.split("\t")[0] for line in snapshot]
+        assert kinds == ["snapshot", "idempotency"]
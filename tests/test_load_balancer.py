@@ -0,0 +1,122 @@
+"""
+Tests for replica selection.
+"""
+
+import random
+from collections import Counter
+
+import pytest
+
+from mcp_core.agents.base_agent import AgentRegistry
+from mcp_core.agents.load_balancer import (
+    LeastOutstandingBalancer, LoadBalancingStrategy, PowerOfTwoBalancer, RoundRobinBalancer, ServiceReplica,
+    create_balancer
+)
+from mcp_core.jobs.job_record import JobRecord
+from mcp_core.jobs.job_schema import JobType
+from mcp_core.mcp_server import MCPServer
+
+
+def replicas(**weights: float):
+    return [ServiceReplica(url=url, weight=weight) for url, weight in weights.items()]
+
+
+def no_load(url: str) -> int:
+    return 0
+
+
+class TestBalancers:
+    """Test the selection strategies."""
+
+    def test_smooth_weighted_round_robin(self):
+        balancer = RoundRobinBalancer()
+        candidates = replicas(a=3, b=1)
+
+        picks = [balancer.choose(candidates, no_load).url for _ in range(8)]
+        assert picks == ["a", "a", "b", "a", "a", "a", "b", "a"]
+
+    def test_round_robin_equal_weights_alternate(self):
+        balancer = RoundRobinBalancer()
+        candidates = replicas(a=1, b=1, c=1)
+
+        assert [balancer.choose(candidates, no_load).url for _ in range(6)] == ["a", "b", "c", "a", "b", "c"]
+
+    def test_least_outstanding(self):
+        balancer = LeastOutstandingBalancer(random.Random(0))
+        load = {"a": 4, "b": 1, "c": 3}
+
+        assert balancer.choose(replicas(a=1, b=1, c=1), load.get).url == "b"
+        # Twice the weight halves the load per unit of weight
+        assert balancer.choose(replicas(a=4, b=1), load.get).url == "a"
+
+    def test_power_of_two_prefers_less_loaded(self):
+        balancer = PowerOfTwoBalancer(random.Random(0))
+        load = {"a": 0, "b": 100}
+
+        picks = Counter(balancer.choose(replicas(a=1, b=1), load.get).url for _ in range(100))
+        assert picks == {"a": 100}
+
+    def test_power_of_two_single_replica(self):
+        candidates = replicas(a=1)
+        assert PowerOfTwoBalancer().choose(candidates, no_load) is candidates[0]
+
+    @pytest.mark.parametrize("strategy, balancer_type", [
+        (LoadBalancingStrategy.ROUND_ROBIN, RoundRobinBalancer),
+        (LoadBalancingStrategy.LEAST_OUTSTANDING, LeastOutstandingBalancer),
+        (LoadBalancingStrategy.POWER_OF_TWO, PowerOfTwoBalancer)
+    ])
+    def test_create_balancer(self, strategy, balancer_type):
+        assert isinstance(create_balancer(strategy), balancer_type)
+
+
+class TestReplicaDispatch:
+    """Test how the server offers replicas to the balancers."""
+
+    def setup_method(self):
+        AgentRegistry.clear()
+        AgentRegistry.register_external_service(JobType.GENERIC, "http://a")
+        AgentRegistry.register_external_service(JobType.GENERIC, "http://b")
+        self.server = MCPServer()
+
+    def teardown_method(self):
+        AgentRegistry.clear()
+
+    def test_capacity_checks_do_not_advance_round_robin(self):
+        picks = []
+        for _ in range(4):
+            for _ in range(3):
+                assert self.server._has_service_capacity(JobType.GENERIC)
+            picks.append(self.server._pick_service(JobType.GENERIC))
+
+        assert picks == ["http://a", "http://b", "http://a", "http://b"]
+
+    def occupy(self, url: str) -> None:
+        """Dispatch a queued job to a replica, taking one of its slots."""
+        self.server.scheduler.enqueue(JobRecord(type=JobType.GENERIC, payload={}))
+        assert self.server.scheduler.pop_ready(lambda job_type: url, lambda job_type: True) is not None
+
+    def test_full_replicas_are_skipped(self):
+        AgentRegistry.register_external_service(JobType.GENERIC, "http://a", capacity=1)
+        AgentRegistry.register_external_service(JobType.GENERIC, "http://b", capacity=1)
+        self.occupy("http://a")
+
+        assert self.server._has_service_capacity(JobType.GENERIC)
+        assert [self.server._pick_service(JobType.GENERIC) for _ in range(2)] == ["http://b", "http://b"]
+
+        self.occupy("http://b")
+        assert not self.server._has_service_capacity(JobType.GENERIC)
+
+    def test_no_replicas(self):
+        AgentRegistry.clear()
+
+        assert self.server._has_service_capacity(JobType.GENERIC)
+        assert self.server._pick_service(JobType.GENERIC) is None
+
+    def test_replica_capacity_becomes_service_limit(self):
+        AgentRegistry.register_external_service(JobType.GENERIC, "http://c", capacity=2)
+        assert MCPServer().scheduler.get_service_limit("http://c") == 2
+
+        # Registering after the server exists applies the capacity at once
+        AgentRegistry.register_external_service(JobType.GENERIC, "http://c", capacity=5)
+        assert self.server.scheduler.get_service_limit("http://c") == 5
+        assert self.server._has_service_capacity(JobType.GENERIC)
@@ -0,0 +1,595 @@
+"""
+Tests for the MCP server against a stub external service.
+"""
+
+import asyncio
+import json
+import os
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from mcp_core.agents.base_agent import AgentRegistry, DispatchMode
+from mcp_core.artifacts.artifact_schema import ArtifactReference, ArtifactType
+from mcp_core.jobs.job_logs import JobLogStore
+from mcp_core.jobs.job_schema import JobFailureReason, JobStatus, JobSubmission, JobType
+from mcp_core.jobs.retention import RetentionPolicy
+from mcp_core.jobs.scheduler import JobScheduler, QueueFullError
+from mcp_core import mcp_server
+from mcp_core.mcp_server import MCPServer
+from mcp_core.state.backend import SQLiteStateBackend
+from mcp_core.utils.wire import BodyFormat, ContentEncoding
+
+TERMINAL_STATUSES = (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+async def wait_for_status(server: MCPServer, job_id: str, timeout: float = 5.0):
+    """Poll a job until it reaches a terminal status."""
+    async def poll():
+        while True:
+            status = await server.get_job_status(job_id)
+            if status.status in TERMINAL_STATUSES:
+                return status
+            await asyncio.sleep(0.01)
+    
+    return await asyncio.wait_for(poll(), timeout)
+
+
+@pytest_asyncio.fixture
+async def server(stub_service):
+    AgentRegistry.clear()
+    AgentRegistry.register_external_service(JobType.GENERIC, stub_service.url)
+    server = MCPServer()
+    try:
+        yield server
+    finally:
+        await server.shutdown()
+        AgentRegistry.clear()
+
+
+class TestBatchSubmission:
+    """Test single and batch submission through to the external service."""
+    
+    @pytest.mark.asyncio
+    async def test_submit_job_runs_on_service(self, server, stub_service):
+        job_id = await server.submit_job(JobSubmission(type=JobType.GENERIC, payload={"n": 1}))
+        
+        status = await wait_for_status(server, job_id)
+        assert status.status == JobStatus.COMPLETED
+        assert status.result == {"status": "ok"}
+        assert [call["path"] for call in stub_service.calls] == ["/execute"]
+    
+    @pytest.mark.asyncio
+    async def test_batch_reports_errors_per_item(self, server):
+        results = await server.submit_jobs([
+            {"type": "generic", "payload": {}},
+            {"type": "not-a-type", "payload": {}},
+            JobSubmission(type=JobType.BACKTEST, payload={}),
+        ])
+        
+        assert [item.index for item in results] == [0, 1, 2]
+        assert results[0].job_id and results[0].error is None
+        assert results[1].job_id is None and "type" in results[1].error
+        assert "No external service" in results[2].error
+        assert (await wait_for_status(server, results[0].job_id)).status == JobStatus.COMPLETED
+    
+    @pytest.mark.asyncio
+    async def test_queue_full_rejection(self, stub_service):
+        AgentRegistry.clear()
+        AgentRegistry.register_external_service(JobType.GENERIC, stub_service.url)
+        server = MCPServer(scheduler=JobScheduler(max_pending=2, type_limits={JobType.GENERIC: 0}))
+        try:
+            results = await server.submit_jobs([{"type": "generic", "payload": {}} for _ in range(3)])
+            
+            assert [item.error is None for item in results] == [True, True, False]
+            assert "full" in results[2].error.lower()
+            with pytest.raises(QueueFullError):
+                await server.submit_job(JobSubmission(type=JobType.GENERIC, payload={}))
+            assert len(server.jobs) == 2
+            assert stub_service.calls == []
+        finally:
+            await server.shutdown()
+            AgentRegistry.clear()
+
+
+class TestCoalescing:
+    """Test that identical in-flight jobs share one service call."""
+    
+    @staticmethod
+    def gate(stub_service):
+        """Hold every service call until the returned event is set."""
+        release = asyncio.Event()
+        
+        async def handler(request):
+            await release.wait()
+            return web.json_response({"value": 42})
+        
+        stub_service.handler = handler
+        return release
+    
+    @pytest.mark.asyncio
+    async def test_identical_jobs_share_one_call(self, server, stub_service):
+        release = self.gate(stub_service)
+        submission = JobSubmission(type=JobType.GENERIC, payload={"n": 1}, coalesce=True)
+        job_ids = [await server.submit_job(submission) for _ in range(3)]
+        
+        await asyncio.sleep(0.05)
+        release.set()
+        statuses = [await wait_for_status(server, job_id) for job_id in job_ids]
+        
+        assert len(stub_service.calls) == 1
+        assert all(status.status == JobStatus.COMPLETED for status in statuses)
+        assert all(status.result == {"value": 42} for status in statuses)
+        assert [status.coalesced_with for status in statuses] == [None, job_ids[0], job_ids[0]]
+    
+    @pytest.mark.asyncio
+    async def test_cancelling_one_member_keeps_execution(self, server, stub_service):
+        release = self.gate(stub_service)
+        submission = JobSubmission(type=JobType.GENERIC, payload={"n": 1}, coalesce=True)
+        leader_id = await server.submit_job(submission)
+        follower_id = await server.submit_job(submission)
+        
+        await asyncio.sleep(0.05)
+        assert await server.cancel_job(leader_id)
+        release.set()
+        
+        assert (await wait_for_status(server, follower_id)).status == JobStatus.COMPLETED
+        assert (await server.get_job_status(leader_id)).status == JobStatus.CANCELLED
+        assert len(stub_service.calls) == 1
+    
+    @pytest.mark.asyncio
+    async def test_different_payloads_are_not_coalesced(self, server, stub_service):
+        job_ids = [
+            await server.submit_job(JobSubmission(type=JobType.GENERIC, payload={"n": n}, coalesce=True))
+            for n in range(2)
+        ]
+        
+        for job_id in job_ids:
+            assert (await wait_for_status(server, job_id)).status == JobStatus.COMPLETED
+        assert len(stub_service.calls) == 2
+    
+    @pytest.mark.asyncio
+    async def test_different_inputs_are_not_coalesced(self, server, stub_service):
+        release = self.gate(stub_service)
+        submissions = [
+            JobSubmission(
+                type=JobType.GENERIC, payload={"n": 1}, coalesce=True,
+                input_artifacts=[ArtifactReference(artifact_id=artifact_id, artifact_type=ArtifactType.MODEL)]
+            )
+            for artifact_id in ("model-a", "model-b")
+        ]
+        submissions.append(JobSubmission(type=JobType.GENERIC, payload={"n": 1}, coalesce=True, use_cache=True))
+        job_ids = [await server.submit_job(submission) for submission in submissions]
+        
+        await asyncio.sleep(0.05)
+        release.set()
+        statuses = [await wait_for_status(server, job_id) for job_id in job_ids]
+        
+        assert [status.coalesced_with for status in statuses] == [None, None, None]
+        assert len(stub_service.calls) == 3
+
+
+class TestResultCaching:
+    """Test that cached results complete jobs without calling the service."""
+    
+    @pytest.mark.asyncio
+    async def test_cache_hit_sets_cache_hit(self, server, stub_service):
+        submission = JobSubmission(type=JobType.GENERIC, payload={"n": 1}, use_cache=True)
+        
+        first = await wait_for_status(server, await server.submit_job(submission))
+        second = await wait_for_status(server, await server.submit_job(submission))
+        
+        assert len(stub_service.calls) == 1
+        assert (first.cache_hit, second.cache_hit) == (False, True)
+        assert second.status == JobStatus.COMPLETED
+        assert second.result == first.result
+        assert server.get_metrics()["result_cache"]["memory_hits"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_uncached_jobs_always_call_service(self, server, stub_service):
+        submission = JobSubmission(type=JobType.GENERIC, payload={"n": 1})
+        
+        for _ in range(2):
+            status = await wait_for_status(server, await server.submit_job(submission))
+            assert not status.cache_hit
+        assert len(stub_service.calls) == 2
+
+
+class TestIdempotentSubmission:
+    """Test that repeated submissions with one key create a single job."""
+    
+    @pytest.mark.asyncio
+    async def test_repeat_submission_returns_original_job(self, server, stub_service):
+        submission = JobSubmission(type=JobType.GENERIC, payload={"n": 1}, idempotency_key="key")
+        
+        first_id = await server.submit_job(submission)
+        assert await server.submit_job(submission) == first_id
+        await wait_for_status(server, first_id)
+        
+        assert len(server.jobs) == 1
+        assert len(stub_service.calls) == 1
+        with pytest.raises(ValueError):
+            await server.submit_job(JobSubmission(type=JobType.GENERIC, payload={"n": 2}, idempotency_key="key"))
+
+
+class TestDeadlines:
+    """Test that deadlines fail jobs whether they are queued or running."""
+    
+    @pytest.mark.asyncio
+    async def test_running_job_times_out(self, server, stub_service):
+        headers = []
+        
+        async def slow(request):
+            headers.append(dict(request.headers))
+            await asyncio.sleep(5)
+            return web.json_response({"status": "ok"})
+        
+        stub_service.handler = slow
+        job_id = await server.submit_job(JobSubmission(type=JobType.GENERIC, payload={}, timeout_seconds=0.2))
+        
+        status = await wait_for_status(server, job_id)
+        assert status.status == JobStatus.FAILED
+        assert status.failure_reason == JobFailureReason.TIMED_OUT
+        assert float(headers[0]["X-Job-Timeout"]) <= 0.2
+        assert "X-Job-Deadline" in headers[0]
+    
+    @pytest.mark.asyncio
+    async def test_queued_job_times_out(self, stub_service):
+        AgentRegistry.clear()
+        AgentRegistry.register_external_service(JobType.GENERIC, stub_service.url)
+        server = MCPServer(scheduler=JobScheduler(type_limits={JobType.GENERIC: 0}))
+        try:
+            job_id = await server.submit_job(JobSubmission(type=JobType.GENERIC, payload={}, timeout_seconds=0.1))
+            
+            status = await wait_for_status(server, job_id)
+            assert status.failure_reason == JobFailureReason.TIMED_OUT
+            assert status.started_at is None
+            assert server.scheduler.pending_count == 0
+            assert stub_service.calls == []
+        finally:
+            await server.shutdown()
+            AgentRegistry.clear()
+    
+    @pytest.mark.asyncio
+    async def test_job_without_deadline_is_not_expired(self, server):
+        job_id = await server.submit_job(JobSubmission(type=JobType.GENERIC, payload={}))
+        
+        status = await wait_for_status(server, job_id)
+        assert status.status == JobStatus.COMPLETED
+        assert status.deadline is None and status.failure_reason is None
+
+
+class TestRetention:
+    """Test that finished jobs are evicted to the archive and still resolve."""
+    
+    @staticmethod
+    async def make_server(stub_service, policy):
+        AgentRegistry.clear()
+        AgentRegistry.register_external_service(JobType.GENERIC, stub_service.url)
+        return MCPServer(retention_policy=policy)
+    
+    @pytest.mark.asyncio
+    async def test_evicted_job_is_read_from_archive(self, stub_service):
+        server = await self.make_server(stub_service, RetentionPolicy(max_terminal_jobs=1))
+        try:
+            job_ids = []
+            for n in range(3):
+                job_ids.append(await server.submit_job(JobSubmission(type=JobType.GENERIC, payload={"n": n})))
+                await wait_for_status(server, job_ids[-1])
+            await asyncio.gather(*server._archive_tasks)
+            
+            assert list(server.jobs) == [job_ids[-1]]
+            status = await server.get_job_status(job_ids[0])
+            assert status.status == JobStatus.COMPLETED
+            assert status.result == {"status": "ok"}
+            archive_stats = server.get_metrics()["retention"]["archive"]
+            assert archive_stats["archived"] == 2 and archive_stats["hits"] == 1
+        finally:
+            await server.shutdown()
+            AgentRegistry.clear()
+    
+    @pytest.mark.asyncio
+    async def test_byte_limit_evicts_large_results(self, stub_service):
+        async def large(request):
+            return web.json_response({"data": "x" * 40_000})
+        
+        stub_service.handler = large
+        server = await self.make_server(stub_service, RetentionPolicy(max_terminal_bytes=20_000))
+        try:
+            job_id = await server.submit_job(JobSubmission(type=JobType.GENERIC, payload={}))
+            await wait_for_status(server, job_id)
+            await asyncio.gather(*server._archive_tasks)
+            
+            assert job_id not in server.jobs
+            assert (await server.get_job_status(job_id)).result == {"data": "x" * 40_000}
+        finally:
+            await server.shutdown()
+            AgentRegistry.clear()
+    
+    @pytest.mark.asyncio
+    async def test_large_result_is_stored_out_of_line(self, stub_service):
+        async def large(request):
+            return web.json_response({"status": "ok", "data": "x" * 100_000})
+        
+        stub_service.handler = large
+        server = await self.make_server(stub_service, RetentionPolicy())
+        try:
+            job_id = await server.submit_job(JobSubmission(type=JobType.GENERIC, payload={}))
+            status = await wait_for_status(server, job_id)
+            
+            assert status.result == {"status": "ok"}
+            assert status.result_ref.omitted_keys == 1
+            assert server.result_store.size(job_id) == status.result_ref.size
+            chunks = [chunk async for chunk in server.result_store.iter_chunks(job_id)]
+            assert json.loads(b"".join(chunks))["data"] == "x" * 100_000
+        finally:
+            await server.shutdown()
+            AgentRegistry.clear()
+    
+    @pytest.mark.asyncio
+    async def test_archive_expiry_deletes_log_files(self, stub_service, tmp_path):
+        AgentRegistry.clear()
+        AgentRegistry.register_external_service(JobType.GENERIC, stub_service.url)
+        server = MCPServer(
+            retention_policy=RetentionPolicy(max_terminal_jobs=0, archive_max_age_seconds=0),
+            job_logs=JobLogStore(str(tmp_path))
+        )
+        release = asyncio.Event()
+        
+        async def slow(request):
+            await release.wait()
+            return web.json_response({"status": "ok"})
+        
+        stub_service.handler = slow
+        try:
+            job_id = await server.submit_job(JobSubmission(type=JobType.GENERIC, payload={}))
+            await server.job_logs.append(job_id, ["line"])
+            release.set()
+            await wait_for_status(server, job_id)
+            await asyncio.gather(*server._archive_tasks)
+            
+            path = server.job_logs._path(job_id)
+            for _ in range(100):
+                if os.path.exists(path):
+                    break
+                await asyncio.sleep(0.01)
+            assert os.path.exists(path)
+            
+            await server._expire_archive()
+            assert not os.path.exists(path)
+            assert await server.get_job_status(job_id) is None
+        finally:
+            await server.shutdown()
+            AgentRegistry.clear()
+
+
+class TestSharedState:
+    """Test a worker sharing state with others through a SQLite backend."""
+    
+    @pytest_asyncio.fixture
+    async def backends(self, tmp_path):
+        """The worker's backend and a second connection standing in for another worker."""
+        AgentRegistry.clear()
+        own = SQLiteStateBackend(str(tmp_path / "state.db"))
+        other = SQLiteStateBackend(str(tmp_path / "state.db"))
+        try:
+            yield own, other
+        finally:
+            other.close()
+            AgentRegistry.set_state_backend(None)
+            AgentRegistry.clear()
+    
+    @pytest.mark.asyncio
+    async def test_service_registered_by_another_worker_is_found(self, backends, stub_service):
+        own, other = backends
+        server = MCPServer(state_backend=own)
+        try:
+            other.put_service(JobType.GENERIC.value, stub_service.url)
+            
+            job_id = await server.submit_job(JobSubmission(type=JobType.GENERIC, payload={}))
+            assert (await wait_for_status(server, job_id)).status == JobStatus.COMPLETED
+        finally:
+            await server.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_modes_of_removed_services_are_dropped(self, backends):
+        own, other = backends
+        server = MCPServer(state_backend=own)
+        try:
+            AgentRegistry.register_external_service(
+                JobType.GENERIC, "http://old", DispatchMode.CALLBACK, content_encoding=ContentEncoding.GZIP
+            )
+            await AgentRegistry.flush_backend()
+            other.remove_service(JobType.GENERIC.value, "http://old")
+            other.put_service(JobType.GENERIC.value, "http://new", DispatchMode.POLL.value)
+            
+            await AgentRegistry.refresh_from_backend()
+            assert AgentRegistry.get_service_url(JobType.GENERIC) == "http://new"
+            assert AgentRegistry._dispatch_modes == {"http://new": DispatchMode.POLL}
+            assert AgentRegistry._wire_formats == {"http://new": (BodyFormat.JSON, ContentEncoding.IDENTITY)}
+        finally:
+            await server.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_evicted_jobs_are_deleted_from_backend(self, backends, stub_service):
+        own, other = backends
+        server = MCPServer(state_backend=own, retention_policy=RetentionPolicy(max_terminal_jobs=1))
+        AgentRegistry.register_external_service(JobType.GENERIC, stub_service.url)
+        try:
+            job_ids = []
+            for n in range(2):
+                job_ids.append(await server.submit_job(JobSubmission(type=JobType.GENERIC, payload={"n": n})))
+                await wait_for_status(server, job_ids[-1])
+            await asyncio.gather(*server._archive_tasks)
+            await server._sync_state()
+            
+            assert other.get_job(job_ids[0]) is None
+            assert other.get_job(job_ids[1])["status"] == JobStatus.COMPLETED.value
+            assert (await server.get_job_status(job_ids[0])).status == JobStatus.COMPLETED
+        finally:
+            await server.shutdown()
+
+
+class TestDispatchModes:
+    """Test callback- and poll-mode services that acknowledge /execute with 202."""
+    
+    @pytest_asyncio.fixture
+    async def register(self, stub_service):
+        """Register the stub service for generic jobs in a given dispatch mode."""
+        AgentRegistry.clear()
+        yield lambda mode: AgentRegistry.register_external_service(JobType.GENERIC, stub_service.url, mode)
+        AgentRegistry.clear()
+    
+    @pytest.mark.asyncio
+    async def test_callback_completes_job(self, register, stub_service):
+        register(DispatchMode.CALLBACK)
+        acknowledged = asyncio.Event()
+        
+        async def accept(request):
+            acknowledged.set()
+            return web.json_response({"status": "accepted"}, status=202)
+        
+        stub_service.handler = accept
+        server = MCPServer()
+        try:
+            job_id = await server.submit_job(JobSubmission(type=JobType.GENERIC, payload={}))
+            await asyncio.wait_for(acknowledged.wait(), 5.0)
+            sent = json.loads(stub_service.calls[0]["body"])
+            assert sent["dispatch_mode"] == "callback"
+            assert sent["callback_path"] == f"/jobs/{job_id}/complete"
+            
+            assert not await server.complete_job(job_id, "wrong token", {"status": "ok"})
+            assert await server.complete_job(job_id, sent["callback_token"], {"value": 1})
+            status = await wait_for_status(server, job_id)
+            assert status.status == JobStatus.COMPLETED
+            assert status.result == {"value": 1}
+            assert server.get_metrics()["async_dispatch"]["callbacks_received"] == 1
+        finally:
+            await server.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_poll_reads_status_until_done(self, register, stub_service, monkeypatch):
+        monkeypatch.setattr(mcp_server, "POLL_INTERVAL_INITIAL", 0.01)
+        register(DispatchMode.POLL)
+        polls = []
+        
+        async def service(request):
+            if request.method == "POST":
+                return web.json_response({"status_url": "/status/1"}, status=202)
+            polls.append(request.path)
+            if len(polls) < 3:
+                return web.json_response({"status": "running"})
+            return web.json_response({"status": "completed", "value": 2})
+        
+        stub_service.handler = service
+        server = MCPServer()
+        try:
+            job_id = await server.submit_job(JobSubmission(type=JobType.GENERIC, payload={}))
+            
+            status = await wait_for_status(server, job_id)
+            assert status.status == JobStatus.COMPLETED
+            assert status.result == {"status": "completed", "value": 2}
+            assert polls == ["/status/1"] * 3
+            assert [call["method"] for call in stub_service.calls] == ["POST", "GET", "GET", "GET"]
+        finally:
+            await server.shutdown()
+
+
+class TestEvents:
+    """Test job status events delivered to subscriptions."""
+    
+    @pytest.mark.asyncio
+    async def test_subscription_receives_status_changes(self, server):
+        subscription = server.subscribe_events(job_types=[JobType.GENERIC])
+        try:
+            job_id = await server.submit_job(JobSubmission(type=JobType.GENERIC, payload={}))
+            
+            statuses = []
+            while not statuses or statuses[-1] not in ("completed", "failed"):
+                event = json.loads(await asyncio.wait_for(subscription.get(), 5.0))
+                assert event["job_id"] == job_id
+                statuses.append(event["status"])
+            assert statuses == ["pending", "running", "completed"]
+        finally:
+            subscription.close()
+    
+    @pytest.mark.asyncio
+    async def test_job_subscription_starts_with_current_status(self, server):
+        job_id = await server.submit_job(JobSubmission(type=JobType.GENERIC, payload={}))
+        await wait_for_status(server, job_id)
+        
+        subscription = server.subscribe_events(job_ids=[job_id], statuses=[JobStatus.COMPLETED])
+        try:
+            event = json.loads(await asyncio.wait_for(subscription.get(), 5.0))
+            assert (event["job_id"], event["status"]) == (job_id, "completed")
+            assert await subscription.get(timeout=0.05) is None
+        finally:
+            subscription.close()
+        assert server.get_metrics()["events"]["subscribers"] == 0
+
+
+class TestWaitForJobs:
+    """Test waiting for jobs to finish or change status."""
+    
+    @pytest.mark.asyncio
+    async def test_returns_first_finished_job(self, server, stub_service):
+        release = asyncio.Event()
+        
+        async def held(request):
+            if (await request.json())["payload"]["n"] == 0:
+                await release.wait()
+            return web.json_response({"status": "ok"})
+        
+        stub_service.handler = held
+        slow = await server.submit_job(JobSubmission(type=JobType.GENERIC, payload={"n": 0}))
+        fast = await server.submit_job(JobSubmission(type=JobType.GENERIC, payload={"n": 1}))
+        try:
+            done = await server.wait_for_jobs([slow, fast], timeout=5.0)
+            assert [job.id for job in done] == [fast]
+        finally:
+            release.set()
+    
+    @pytest.mark.asyncio
+    async def test_change_and_timeout(self, server, stub_service):
+        release = asyncio.Event()
+        
+        async def held(request):
+            await release.wait()
+            return web.json_response({"status": "ok"})
+        
+        stub_service.handler = held
+        job_id = await server.submit_job(JobSubmission(type=JobType.GENERIC, payload={}))
+        try:
+            await server.wait_for_jobs([job_id], timeout=5.0, until="change")
+            assert (await server.get_job_status(job_id)).status == JobStatus.RUNNING
+            assert await server.wait_for_jobs([job_id], timeout=0.05) == []
+        finally:
+            release.set()
+        
+        done = await server.wait_for_jobs([job_id], timeout=5.0)
+        assert done[0].status == JobStatus.COMPLETED
+    
+    @pytest.mark.asyncio
+    async def test_unknown_job(self, server):
+        assert await server.wait_for_jobs(["missing"], timeout=0.05) is None
+
+
+class TestConnectionPools:
+    """Test that each service is called through its own connection pool."""
+    
+    @pytest.mark.asyncio
+    async def test_services_get_separate_pools(self, server, stub_service, second_stub_service):
+        AgentRegistry.register_external_service(JobType.BACKTEST, second_stub_service.url, capacity=2)
+        
+        job_ids = [
+            await server.submit_job(JobSubmission(type=job_type, payload={"n": n}))
+            for n, job_type in enumerate([JobType.GENERIC, JobType.GENERIC, JobType.BACKTEST])
+        ]
+        for job_id in job_ids:
+            assert (await wait_for_status(server, job_id)).status == JobStatus.COMPLETED
+        
+        pools = server.get_metrics()["connection_pools"]
+        assert pools[stub_service.url]["requests"] == 2
+        assert pools[second_stub_service.url]["requests"] == 1
+        assert pools[second_stub_service.url]["limit"] == 2 + mcp_server.POOL_HEADROOM
@@ -0,0 +1,72 @@
+"""
+Tests for the sorted secondary index.
+"""
+
+from mcp_core.utils.ordered_index import OrderedIndex
+
+
+class TestOrderedIndex:
+    """Test inserts, removals and range iteration."""
+
+    def setup_method(self):
+        self.index = OrderedIndex()
+        for key in [(2.0, "b"), (1.0, "a"), (3.0, "c"), (2.0, "a")]:
+            self.index.add(key)
+
+    def test_keys_are_sorted(self):
+        assert list(self.index.iter_asc()) == [(1.0, "a"), (2.0, "a"), (2.0, "b"), (3.0, "c")]
+        assert list(self.index.iter_desc()) == [(3.0, "c"), (2.0, "b"), (2.0, "a"), (1.0, "a")]
+        assert len(self.index) == 4
+
+    def test_iter_desc_before(self):
+        assert list(self.index.iter_desc(before=(2.0, "b"))) == [(2.0, "a"), (1.0, "a")]
+        assert list(self.index.iter_desc(before=(2.5, ""))) == [(2.0, "b"), (2.0, "a"), (1.0, "a")]
+        assert list(self.index.iter_desc(before=(0.0, ""))) == []
+
+    def test_iter_asc_after(self):
+        assert list(self.index.iter_asc(after=(2.0, "a"))) == [(2.0, "b"), (3.0, "c")]
+        assert list(self.index.iter_asc(after=(3.0, "c"))) == []
+
+    def test_remove(self):
+        assert self.index.remove((2.0, "a"))
+        assert not self.index.remove((2.0, "a"))
+        assert not self.index.remove((9.0, "z"))
+        assert list(self.index.iter_asc()) == [(1.0, "a"), (2.0, "b"), (3.0, "c")]
+
+    def test_pages_cover_every_key_once(self):
+        index = OrderedIndex()
+        for number in range(25):
+            index.add((float(number // 3), f"id-{number:02d}"))
+
+        seen = []
+        before = None
+        while True:
+            page = []
+            for key in index.iter_desc(before):
+                page.append(key)
+                if len(page) == 10:
+                    break
+            seen.extend(page)
+            if len(page) < 10:
+                break
+            before = page[-1]
+        assert seen == list(index.iter_desc())
+
+    def test_chunks_split_and_empty(self):
+        index = OrderedIndex(chunk_size=2)
+        keys = [(float(number), "id") for number in range(20)]
+        for key in keys[::2] + keys[1::2]:
+            index.add(key)
+        assert list(index.iter_asc()) == keys
+
+        # Removing from the front empties whole chunks
+        for key in keys[:9]:
+            assert index.remove(key)
+        assert len(index) == 11
+        assert list(index.iter_desc(before=(12.0, "id"))) == keys[11:8:-1]
+        assert list(index.iter_asc(after=(15.0, "id"))) == keys[16:]
+
+    def test_clear(self):
+        self.index.clear()
+        assert len(self.index) == 0
+        assert list(self.index.iter_desc()) == []
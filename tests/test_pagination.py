@@ -0,0 +1,74 @@
+"""
+Tests for pagination cursors and list endpoint bounds.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from mcp_core.agents.base_agent import AgentRegistry
+from mcp_core.api.endpoints import MAX_PAGE_SIZE
+from mcp_core.api.server import app
+from mcp_core.jobs.job_schema import JobType
+from mcp_core.utils.pagination import decode_cursor, encode_cursor
+
+
+class TestCursors:
+    """Test cursor encoding."""
+
+    def test_round_trip(self):
+        created_at = datetime(2024, 5, 1, 12, 30, 15, 123456)
+        cursor = encode_cursor(created_at, "job-1")
+
+        assert decode_cursor(cursor) == (created_at, "job-1")
+        assert "=" not in cursor
+
+    def test_unicode_id(self):
+        cursor = encode_cursor(datetime(2024, 5, 1), "jöb/1?&")
+
+        assert decode_cursor(cursor) == (datetime(2024, 5, 1), "jöb/1?&")
+
+    def test_offset_is_converted_to_naive_utc(self):
+        created_at = datetime(2024, 5, 1, 14, 30, tzinfo=timezone(timedelta(hours=2)))
+
+        assert decode_cursor(encode_cursor(created_at, "job-1")) == (datetime(2024, 5, 1, 12, 30), "job-1")
+
+    @pytest.mark.parametrize("cursor", ["zzz", "", "bm90IGpzb24", encode_cursor(datetime(2024, 1, 1), "x")[:-4]])
+    def test_malformed(self, cursor):
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+
+class TestListLimits:
+    """Test the page size bounds of the list endpoints."""
+
+    @pytest.mark.parametrize("path", ["/jobs/", "/artifacts/", "/workflows/"])
+    def test_limit_bounds(self, path):
+        with TestClient(app) as client:
+            assert client.get(path, params={"limit": 0}).status_code == 422
+            assert client.get(path, params={"limit": -1}).status_code == 422
+            assert client.get(path, params={"limit": MAX_PAGE_SIZE + 1}).status_code == 422
+            assert client.get(path, params={"limit": 1}).status_code == 200
+
+    def test_malformed_cursor(self):
+        with TestClient(app) as client:
+            assert client.get("/jobs/", params={"cursor": "zzz"}).status_code == 400
+
+    def test_cursor_with_utc_offset(self):
+        # An unreachable service is enough to keep a job in the store
+        AgentRegistry.register_external_service(JobType.GENERIC, "http://127.0.0.1:9")
+        cursor = encode_cursor(datetime(2999, 1, 1, tzinfo=timezone(timedelta(hours=2))), "z")
+        try:
+            with TestClient(app) as client:
+                assert client.post("/jobs/", json={"type": "generic", "payload": {}}).status_code == 200
+                assert client.post(
+                    "/artifacts/", json={"name": "a", "type": "model", "storage_location": "/tmp/a"}
+                ).status_code == 200
+
+                for path in ("/jobs/", "/artifacts/"):
+                    response = client.get(path, params={"cursor": cursor})
+                    assert response.status_code == 200
+                    assert response.json()
+        finally:
+            AgentRegistry.clear()
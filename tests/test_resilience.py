@@ -0,0 +1,117 @@
+"""
+Tests for retry policies and circuit breakers.
+"""
+
+import random
+import time
+
+import pytest
+
+from mcp_core.agents.resilience import CircuitBreaker, CircuitBreakerPolicy, CircuitState, RetryPolicy
+
+
+class FakeClock:
+    """Stand-in for ``time.monotonic`` that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(time, "monotonic", fake)
+    return fake
+
+
+class TestRetryPolicy:
+    """Test backoff delays."""
+
+    def test_exponential_without_jitter(self):
+        policy = RetryPolicy(initial_delay=1.0, multiplier=2.0, max_delay=5.0, jitter=0)
+
+        assert [policy.next_delay(attempt) for attempt in range(1, 6)] == [1.0, 2.0, 4.0, 5.0, 5.0]
+
+    def test_jitter_bounds(self, monkeypatch):
+        policy = RetryPolicy(initial_delay=2.0, jitter=0.5)
+
+        monkeypatch.setattr(random, "random", lambda: 0.0)
+        assert policy.next_delay(1) == 2.0
+        monkeypatch.setattr(random, "random", lambda: 0.999999)
+        assert 1.0 <= policy.next_delay(1) < 1.001
+
+    def test_invalid_policy(self):
+        with pytest.raises(ValueError):
+            RetryPolicy(max_attempts=0)
+        with pytest.raises(ValueError):
+            RetryPolicy(jitter=1.5)
+
+
+class TestCircuitBreaker:
+    """Test circuit breaker state transitions."""
+
+    def make_breaker(self, **policy) -> CircuitBreaker:
+        return CircuitBreaker("http://svc", CircuitBreakerPolicy(**policy))
+
+    def test_opens_after_consecutive_failures(self, clock):
+        breaker = self.make_breaker(failure_threshold=3, recovery_timeout=10)
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == CircuitState.CLOSED
+
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+        assert not breaker.allows_dispatch()
+        assert breaker.retry_after() == 10
+
+    def test_half_open_trial_success_closes(self, clock):
+        breaker = self.make_breaker(failure_threshold=1, recovery_timeout=10, half_open_max_calls=1)
+        breaker.record_failure()
+
+        clock.now += 10
+        assert breaker.retry_after() == 0
+        assert breaker.allows_dispatch()
+        breaker.on_dispatch()
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert not breaker.allows_dispatch()
+
+        breaker.record_success()
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.allows_dispatch()
+
+    def test_half_open_trial_failure_reopens(self, clock):
+        breaker = self.make_breaker(failure_threshold=1, recovery_timeout=10)
+        breaker.record_failure()
+        clock.now += 10
+        breaker.on_dispatch()
+
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+        assert breaker.retry_after() == 10
+        assert breaker.get_stats()["times_opened"] == 2
+
+    def test_abandoned_trial_frees_its_slot(self, clock):
+        breaker = self.make_breaker(failure_threshold=1, recovery_timeout=0)
+        breaker.record_failure()
+        breaker.on_dispatch()
+        assert not breaker.allows_dispatch()
+
+        breaker.record_abandoned()
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert breaker.allows_dispatch()
+
+    def test_open_time_is_accounted(self, clock):
+        breaker = self.make_breaker(failure_threshold=1, recovery_timeout=5)
+        breaker.record_failure()
+        clock.now += 7
+        breaker.on_dispatch()
+        breaker.record_success()
+
+        clock.now += 100
+        assert breaker.get_stats()["open_seconds_total"] == 7
@@ -0,0 +1,73 @@
+"""
+Tests for pre-encoded JSON responses.
+"""
+
+import json
+
+from mcp_core.api import response_cache
+from mcp_core.api.response_cache import EncodedResponseCache, encode_json, json_array
+
+
+class TestEncoding:
+    """Test JSON encoding."""
+
+    def test_matches_json_module(self, monkeypatch):
+        content = {"id": "job-1", "values": [1, 2.5, None, True], "name": "ünïcode"}
+        expected = json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+        assert encode_json(content) == expected
+        monkeypatch.setattr(response_cache, "orjson", None)
+        assert encode_json(content) == expected
+
+    def test_falls_back_for_non_string_keys(self):
+        assert json.loads(encode_json({1: "a"})) == {"1": "a"}
+
+    def test_json_array(self):
+        assert json.loads(json_array([b'{"a":1}', b"2"])) == [{"a": 1}, 2]
+        assert json_array([]) == b"[]"
+
+
+class TestEncodedResponseCache:
+    """Test the bounded body cache."""
+
+    def test_hit_and_miss(self):
+        cache = EncodedResponseCache()
+        cache.put("job-1", b"{}")
+
+        assert cache.get("job-1") == b"{}"
+        assert cache.get("job-2") is None
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    def test_least_recently_used_is_evicted(self):
+        cache = EncodedResponseCache(max_entries=2)
+        cache.put("a", b"1")
+        cache.put("b", b"2")
+        cache.get("a")
+        cache.put("c", b"3")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == b"1"
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_byte_limit(self):
+        cache = EncodedResponseCache(max_bytes=10)
+        cache.put("a", b"12345")
+        cache.put("b", b"123456")
+        cache.put("huge", b"x" * 11)
+
+        assert cache.get("a") is None
+        assert cache.get("huge") is None
+        assert cache.get_stats()["bytes"] == 6
+
+    def test_replace_and_invalidate(self):
+        cache = EncodedResponseCache()
+        cache.put("a", b"12345")
+        cache.put("a", b"12")
+        assert cache.get_stats()["bytes"] == 2
+
+        cache.invalidate("a")
+        cache.invalidate("a")
+        assert cache.get("a") is None
+        assert cache.get_stats()["invalidations"] == 1
+        assert cache.get_stats()["bytes"] == 0
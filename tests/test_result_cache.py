@@ -0,0 +1,86 @@
+"""
+Tests for the job result cache.
+"""
+
+import asyncio
+
+import pytest
+
+from mcp_core.jobs import result_cache as result_cache_module
+from mcp_core.jobs.result_cache import ResultCache
+
+
+class TestResultCache:
+    """Test the memory and disk tiers."""
+    
+    def test_key_ignores_payload_order(self):
+        first = ResultCache.make_key("generic", {"a": 1, "b": 2}, {"art": "abc"})
+        second = ResultCache.make_key("generic", {"b": 2, "a": 1}, {"art": "abc"})
+        
+        assert first == second
+        assert first != ResultCache.make_key("generic", {"a": 1, "b": 2}, {"art": "def"})
+    
+    @pytest.mark.asyncio
+    async def test_memory_hit_and_miss(self):
+        cache = ResultCache()
+        await cache.put("key", {"value": 1})
+        
+        assert await cache.get("key") == {"value": 1}
+        assert await cache.get("other") is None
+        stats = cache.get_stats()
+        assert (stats["memory_hits"], stats["misses"]) == (1, 1)
+    
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        cache = ResultCache(max_entries=2)
+        for key in ("a", "b"):
+            await cache.put(key, {"key": key})
+        await cache.get("a")
+        await cache.put("c", {"key": "c"})
+        
+        assert await cache.get("b") is None
+        assert await cache.get("a") == {"key": "a"}
+        assert cache.get_stats()["evictions"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_expired_entry_is_a_miss(self):
+        cache = ResultCache(ttl_seconds=0)
+        await cache.put("key", {"value": 1})
+        await asyncio.sleep(0.01)
+        
+        assert await cache.get("key") is None
+        assert cache.get_stats()["expirations"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_disk_tier_survives_restart(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        cache = ResultCache(disk_path=path)
+        await cache.put("key", {"value": 1})
+        cache.close()
+        
+        reopened = ResultCache(disk_path=path)
+        try:
+            assert await reopened.get("key") == {"value": 1}
+            assert reopened.get_stats()["disk_hits"] == 1
+        finally:
+            reopened.close()
+    
+    @pytest.mark.asyncio
+    async def test_large_entries_decode_in_thread(self, monkeypatch):
+        decoded_in = []
+        real_to_thread = asyncio.to_thread
+        
+        async def to_thread(func, *args):
+            decoded_in.append(func)
+            return await real_to_thread(func, *args)
+        
+        monkeypatch.setattr(result_cache_module, "DECODE_THREAD_THRESHOLD", 16)
+        monkeypatch.setattr(result_cache_module.asyncio, "to_thread", to_thread)
+        cache = ResultCache()
+        await cache.put("small", {"v": 1})
+        await cache.put("large", {"value": "x" * 64})
+        
+        assert await cache.get("small") == {"v": 1}
+        assert decoded_in == []
+        assert await cache.get("large") == {"value": "x" * 64}
+        assert len(decoded_in) == 1
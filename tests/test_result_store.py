@@ -0,0 +1,60 @@
+"""
+Tests for out-of-line result storage.
+"""
+
+import json
+
+import pytest
+
+from mcp_core.jobs.result_store import ResultStore
+
+
+LARGE = {"status": "ok", "count": 3, "rows": ["x" * 100] * 100, "note": "n" * 500}
+
+
+async def read_all(store: ResultStore, job_id: str) -> bytes:
+    return b"".join([chunk async for chunk in store.iter_chunks(job_id)])
+
+
+class TestResultStore:
+    """Test storing, streaming, sharing and removing results."""
+
+    @pytest.mark.asyncio
+    async def test_small_results_stay_inline(self, tmp_path):
+        store = ResultStore(str(tmp_path), inline_limit=1024)
+
+        assert await store.store("job", {"value": 1}) is None
+        assert await store.store("job", ["not", "a", "dict"] * 1000) is None
+        assert store.size("job") is None
+
+    @pytest.mark.asyncio
+    async def test_large_result_round_trip(self, tmp_path):
+        store = ResultStore(str(tmp_path), inline_limit=1024, chunk_size=1000)
+
+        summary, reference = await store.store("job", LARGE)
+        assert summary == {"status": "ok", "count": 3}
+        assert reference == {"size": store.size("job"), "omitted_keys": 2}
+        assert json.loads(await read_all(store, "job")) == LARGE
+
+    @pytest.mark.asyncio
+    async def test_linked_result_outlives_removal(self, tmp_path):
+        store = ResultStore(str(tmp_path), inline_limit=1024)
+        await store.store("job", LARGE)
+        store.link("job", "duplicate")
+
+        assert store.remove("job")
+        assert not store.remove("job")
+        assert await read_all(store, "job") == b""
+        assert json.loads(await read_all(store, "duplicate")) == LARGE
+        assert store.get_stats()["removed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_temporary_directory(self):
+        store = ResultStore(inline_limit=1024)
+        assert store.remove("job") is False
+
+        await store.store("job", LARGE)
+        assert store.directory is not None
+        store.close()
+        assert store.directory is None
+        assert store.size("job") is None
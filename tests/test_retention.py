@@ -0,0 +1,82 @@
+"""
+Tests for job retention sizing and the job archive.
+"""
+
+import json
+import os
+
+import pytest
+
+from mcp_core.jobs.job_record import JobRecord
+from mcp_core.jobs.job_schema import JobStatus, JobType
+from mcp_core.jobs.retention import JobArchive, estimate_job_size
+from mcp_core.utils.hashing import estimate_json_size
+
+
+class TestSizeEstimate:
+    """Test the bounded JSON size estimate."""
+    
+    def test_close_to_encoded_size(self):
+        value = {"name": "x" * 1000, "items": [{"id": n, "tags": ["a", "b"]} for n in range(100)]}
+        encoded = len(json.dumps(value))
+        
+        assert encoded * 0.5 <= estimate_json_size(value, 10 ** 9) <= encoded * 2
+    
+    def test_stops_past_limit(self):
+        value = [[n] for n in range(100_000)]
+        
+        assert 1000 < estimate_json_size(value, 1000) < 10_000
+    
+    def test_job_estimate_grows_with_result(self):
+        job = JobRecord(type=JobType.GENERIC, payload={})
+        empty = estimate_job_size(job, 10 ** 9)
+        job.result = {"data": "x" * 10_000}
+        
+        assert estimate_job_size(job, 10 ** 9) >= empty + 10_000
+
+
+class TestJobArchive:
+    """Test writing and reading archived jobs."""
+    
+    @pytest.mark.asyncio
+    async def test_round_trip(self, tmp_path):
+        archive = JobArchive(str(tmp_path / "archive.sqlite3"))
+        job = JobRecord(type=JobType.GENERIC, payload={"n": 1})
+        job.status = JobStatus.COMPLETED
+        job.result = {"value": 1}
+        try:
+            await archive.put_many([job])
+            
+            restored = await archive.get(job.id)
+            assert restored.result == {"value": 1}
+            assert restored.status == JobStatus.COMPLETED
+            assert await archive.get("missing") is None
+        finally:
+            archive.close()
+    
+    @pytest.mark.asyncio
+    async def test_expire(self, tmp_path):
+        archive = JobArchive(str(tmp_path / "archive.sqlite3"))
+        old = JobRecord(type=JobType.GENERIC, payload={})
+        old.completed_ts = 100.0
+        recent = JobRecord(type=JobType.GENERIC, payload={})
+        recent.completed_ts = 200.0
+        try:
+            await archive.put_many([old, recent])
+            
+            assert await archive.expire(150.0) == [old.id]
+            assert await archive.get(old.id) is None
+            assert await archive.get(recent.id) is not None
+            assert archive.get_stats()["expired"] == 1
+        finally:
+            archive.close()
+    
+    @pytest.mark.asyncio
+    async def test_temporary_archive_is_removed(self):
+        archive = JobArchive()
+        await archive.put_many([JobRecord(type=JobType.GENERIC, payload={})])
+        path = archive.path
+        
+        assert os.path.exists(path)
+        archive.close()
+        assert not os.path.exists(path)
@@ -0,0 +1,177 @@
+"""
+Tests for the job scheduler.
+"""
+
+import pytest
+
+from mcp_core.jobs.job_record import JobRecord
+from mcp_core.jobs.job_schema import JobPriority, JobType
+from mcp_core.jobs.scheduler import JobScheduler, QueueFullError
+
+
+def make_job(job_type: JobType = JobType.GENERIC, priority: JobPriority = JobPriority.NORMAL, tenant: str = "default"):
+    return JobRecord(type=job_type, payload={}, priority=priority, tenant=tenant)
+
+
+def drain(scheduler: JobScheduler, resolve_service=lambda job_type: None):
+    """Pop every dispatchable job, returning them in dispatch order."""
+    jobs = []
+    while True:
+        ready = scheduler.pop_ready(resolve_service)
+        if ready is None:
+            return jobs
+        jobs.append(ready[0])
+
+
+class TestConcurrencyLimits:
+    """Test admission and per-type and per-service slots."""
+
+    def test_queue_full(self):
+        scheduler = JobScheduler(max_pending=2)
+        scheduler.enqueue(make_job())
+        scheduler.enqueue(make_job())
+
+        with pytest.raises(QueueFullError):
+            scheduler.enqueue(make_job())
+        assert scheduler.pending_count == 2
+
+    def test_fifo_within_tenant(self):
+        scheduler = JobScheduler()
+        jobs = [make_job(JobType.GENERIC), make_job(JobType.BACKTEST), make_job(JobType.GENERIC)]
+        for job in jobs:
+            scheduler.enqueue(job)
+
+        assert drain(scheduler) == jobs
+
+    def test_type_limit(self):
+        scheduler = JobScheduler(type_limits={JobType.GENERIC: 1})
+        first, second = make_job(), make_job()
+        scheduler.enqueue(first)
+        scheduler.enqueue(second)
+
+        assert drain(scheduler) == [first]
+        scheduler.release(JobType.GENERIC.value, None)
+        assert drain(scheduler) == [second]
+
+    def test_type_limit_does_not_block_other_types(self):
+        scheduler = JobScheduler(type_limits={JobType.GENERIC: 0})
+        blocked, other = make_job(JobType.GENERIC), make_job(JobType.BACKTEST)
+        scheduler.enqueue(blocked)
+        scheduler.enqueue(other)
+
+        assert drain(scheduler) == [other]
+        assert scheduler.pending_count == 1
+
+    def test_service_limit(self):
+        scheduler = JobScheduler(service_limits={"http://svc": 2})
+        for _ in range(3):
+            scheduler.enqueue(make_job())
+
+        ready = [scheduler.pop_ready(lambda job_type: "http://svc") for _ in range(3)]
+        assert [entry[1] for entry in ready[:2]] == ["http://svc", "http://svc"]
+        assert ready[2] is None
+        assert scheduler.get_stats()["services"]["http://svc"]["running"] == 2
+
+        scheduler.release(JobType.GENERIC.value, "http://svc")
+        assert scheduler.pop_ready(lambda job_type: "http://svc") is not None
+
+    def test_discard(self):
+        scheduler = JobScheduler()
+        discarded, kept = make_job(), make_job()
+        scheduler.enqueue(discarded)
+        scheduler.enqueue(kept)
+
+        assert scheduler.discard(discarded.id)
+        assert not scheduler.discard(discarded.id)
+        assert drain(scheduler) == [kept]
+
+    def test_limits_split_across_workers(self):
+        scheduler = JobScheduler(
+            type_limits={JobType.GENERIC: 2, JobType.BACKTEST: 0},
+            default_type_limit=16,
+            workers=4
+        )
+
+        assert scheduler.get_type_limit(JobType.ML_EXPERIMENT.value) == 4
+        assert scheduler.get_type_limit(JobType.GENERIC.value) == 1
+        assert scheduler.get_type_limit(JobType.BACKTEST.value) == 0
+        assert scheduler.get_service_limit("http://svc") == 4
+
+    def test_discarded_entries_are_compacted(self):
+        scheduler = JobScheduler(type_limits={JobType.GENERIC: 0})
+        head = make_job()
+        scheduler.enqueue(head)
+        for _ in range(100):
+            job = make_job()
+            scheduler.enqueue(job)
+            scheduler.discard(job.id)
+
+        # The blocked head keeps lazy removal from ever reaching the discarded entries
+        assert len(scheduler._queues[(JobType.GENERIC.value, JobPriority.NORMAL.value)]) <= 2
+        scheduler.set_type_limit(JobType.GENERIC, 1)
+        assert drain(scheduler) == [head]
+
+
+class TestFairQueuing:
+    """Test strict priority classes and weighted fair queuing across tenants."""
+
+    def test_strict_priority(self):
+        scheduler = JobScheduler()
+        low = make_job(priority=JobPriority.LOW)
+        normal = make_job(priority=JobPriority.NORMAL)
+        high = make_job(priority=JobPriority.HIGH)
+        for job in (low, normal, high):
+            scheduler.enqueue(job)
+
+        assert drain(scheduler) == [high, normal, low]
+
+    def test_priority_blocked_by_limit_falls_through(self):
+        scheduler = JobScheduler(type_limits={JobType.GENERIC: 0})
+        high = make_job(JobType.GENERIC, JobPriority.HIGH)
+        low = make_job(JobType.BACKTEST, JobPriority.LOW)
+        scheduler.enqueue(high)
+        scheduler.enqueue(low)
+
+        assert drain(scheduler) == [low]
+
+    def test_backlog_does_not_starve_other_tenant(self):
+        scheduler = JobScheduler()
+        backlog = [make_job(tenant="a") for _ in range(4)]
+        for job in backlog:
+            scheduler.enqueue(job)
+        occasional = make_job(tenant="b")
+        scheduler.enqueue(occasional)
+
+        assert drain(scheduler) == [backlog[0], occasional, *backlog[1:]]
+
+    def test_tenant_weights(self):
+        scheduler = JobScheduler(tenant_weights={"a": 2.0})
+        for _ in range(6):
+            scheduler.enqueue(make_job(tenant="a"))
+            scheduler.enqueue(make_job(tenant="b"))
+
+        tenants = [job.tenant for job in drain(scheduler)[:6]]
+        assert tenants.count("a") == 4
+
+    def test_invalid_tenant_weight(self):
+        with pytest.raises(ValueError):
+            JobScheduler().set_tenant_weight("a", 0)
+
+    def test_idle_tenants_are_forgotten(self):
+        scheduler = JobScheduler(default_type_limit=1000)
+        for tenant in range(1000):
+            scheduler.enqueue(make_job(tenant=str(tenant)))
+        drain(scheduler)
+
+        assert scheduler.get_stats()["tracked_tenants"] <= 1
+
+    def test_returning_tenant_starts_at_virtual_time(self):
+        scheduler = JobScheduler()
+        for _ in range(3):
+            scheduler.enqueue(make_job(tenant="a"))
+        drain(scheduler)
+
+        scheduler.enqueue(make_job(tenant="a"))
+        newcomer = make_job(tenant="b")
+        scheduler.enqueue(newcomer)
+        assert [job.tenant for job in drain(scheduler)] == ["a", "b"]
@@ -0,0 +1,192 @@
+"""
+Tests for the shared SQLite state backend.
+"""
+
+import sqlite3
+
+import pytest
+
+from mcp_core.state.backend import SCHEMA_VERSION, SQLiteStateBackend
+
+
+def job(job_id: str, status: str = "pending", created_ts: float = 1.0):
+    return {"id": job_id, "status": status, "created_ts": created_ts}
+
+
+# Service table of each older layout version, with one registered service
+OLD_SERVICE_LAYOUTS = {
+    1: [
+        "CREATE TABLE services (job_type TEXT PRIMARY KEY, service_url TEXT NOT NULL, updated_ts REAL NOT NULL)",
+        "INSERT INTO services VALUES ('generic', 'http://a', 1.0)"
+    ],
+    2: [
+        "CREATE TABLE services ("
+        "job_type TEXT PRIMARY KEY, service_url TEXT NOT NULL, dispatch_mode TEXT NOT NULL DEFAULT 'sync', "
+        "updated_ts REAL NOT NULL)",
+        "INSERT INTO services VALUES ('generic', 'http://a', 'sync', 1.0)"
+    ],
+    3: [
+        "CREATE TABLE service_replicas ("
+        "job_type TEXT NOT NULL, service_url TEXT NOT NULL, dispatch_mode TEXT NOT NULL DEFAULT 'sync', "
+        "weight REAL NOT NULL DEFAULT 1.0, capacity INTEGER, updated_ts REAL NOT NULL, "
+        "PRIMARY KEY (job_type, service_url))",
+        "INSERT INTO service_replicas VALUES ('generic', 'http://a', 'sync', 1.0, NULL, 1.0)"
+    ],
+    4: [
+        "CREATE TABLE service_replicas ("
+        "job_type TEXT NOT NULL, service_url TEXT NOT NULL, dispatch_mode TEXT NOT NULL DEFAULT 'sync', "
+        "weight REAL NOT NULL DEFAULT 1.0, capacity INTEGER, lease_expires REAL, updated_ts REAL NOT NULL, "
+        "PRIMARY KEY (job_type, service_url))",
+        "INSERT INTO service_replicas VALUES ('generic', 'http://a', 'sync', 1.0, NULL, NULL, 1.0)"
+    ],
+}
+
+
+def registrations(backend: SQLiteStateBackend):
+    return [
+        (service["job_type"], service["service_url"], service["dispatch_mode"])
+        for service in backend.get_services()
+    ]
+
+
+@pytest.fixture
+def workers(tmp_path):
+    """Two connections to one database, standing in for two worker processes."""
+    first = SQLiteStateBackend(str(tmp_path / "state.db"))
+    second = SQLiteStateBackend(str(tmp_path / "state.db"))
+    yield first, second
+    first.close()
+    second.close()
+
+
+class TestJobLeases:
+    """Test job ownership across workers."""
+
+    def test_only_the_owner_updates_a_job(self, workers):
+        first, second = workers
+        first.put_jobs([job("a")], "worker-1", 30)
+
+        second.put_jobs([job("a", "completed")], "worker-2", 30)
+        assert second.get_job("a")["status"] == "pending"
+        first.put_jobs([job("a", "running")], "worker-1", 30)
+        assert second.get_job("a")["status"] == "running"
+
+        assert first.claim_job("a", "worker-1", 30)
+        assert not second.claim_job("a", "worker-2", 30)
+
+    def test_expired_jobs_are_adopted(self, workers):
+        first, second = workers
+        first.put_jobs([job("a", created_ts=1.0), job("b", created_ts=2.0), job("c", "completed")], "worker-1", 30)
+        assert second.adopt_expired_jobs("worker-2", 30, 10) == []
+
+        first.release_leases("worker-1")
+        adopted = second.adopt_expired_jobs("worker-2", 30, 1)
+        assert [data["id"] for data in adopted] == ["a"]
+        assert not first.claim_job("a", "worker-1", 30)
+        assert second.claim_job("a", "worker-2", 30)
+
+    def test_cancel_requests_reach_the_owner(self, workers):
+        first, second = workers
+        first.put_jobs([job("a"), job("done", "completed")], "worker-1", 30)
+
+        assert second.request_cancel("a")
+        assert not second.request_cancel("done")
+        assert second.pop_cancel_requests("worker-2") == []
+        assert first.pop_cancel_requests("worker-1") == ["a"]
+        assert first.pop_cancel_requests("worker-1") == []
+
+    def test_delete_jobs_only_removes_finished_jobs_of_the_owner(self, workers):
+        first, second = workers
+        first.put_jobs([job("done", "completed"), job("active")], "worker-1", 30)
+        second.put_jobs([job("theirs", "completed")], "worker-2", 30)
+
+        first.delete_jobs(["done", "active", "theirs"], "worker-1")
+        assert second.get_job("done") is None
+        assert second.get_job("active") is not None
+        assert first.get_job("theirs") is not None
+
+    def test_completions_reach_the_owner(self, workers):
+        first, second = workers
+        first.put_jobs([job("a")], "worker-1", 30)
+
+        assert second.post_completion("a", "token", {"value": 1})
+        assert not second.post_completion("missing", "token", {})
+        assert second.pop_completions("worker-2") == []
+        assert first.pop_completions("worker-1") == [("a", "token", {"value": 1})]
+        assert first.pop_completions("worker-1") == []
+
+    def test_list_jobs_newest_first(self, workers):
+        first, second = workers
+        first.put_jobs([job(f"job-{number}", created_ts=float(number)) for number in range(5)], "worker-1", 30)
+
+        page = second.list_jobs(limit=2)
+        assert [data["id"] for data in page] == ["job-4", "job-3"]
+        page = second.list_jobs(limit=10, before=(3.0, "job-3"))
+        assert [data["id"] for data in page] == ["job-2", "job-1", "job-0"]
+
+
+class TestServices:
+    """Test shared service registrations."""
+
+    def test_register_and_remove_replicas(self, workers):
+        first, second = workers
+        first.put_service("generic", "http://a", "callback", weight=2.0, capacity=4)
+        first.put_service("generic", "http://b")
+        first.put_service("backtest", "http://a")
+        services = second.get_services()
+        assert {(service["job_type"], service["service_url"]) for service in services} == {
+            ("generic", "http://a"), ("generic", "http://b"), ("backtest", "http://a")
+        }
+        assert services[-1] == {
+            "job_type": "generic", "service_url": "http://b", "dispatch_mode": "sync", "weight": 1.0,
+            "capacity": None, "lease_expires": None, "body_format": "json", "content_encoding": "identity"
+        }
+
+        second.remove_service("generic", "http://a")
+        assert [(service["job_type"], service["service_url"]) for service in first.get_services()] == [
+            ("backtest", "http://a"), ("generic", "http://b")
+        ]
+
+    def test_renew_leases(self, workers):
+        first, second = workers
+        first.put_service("generic", "http://a", lease_expires=100.0)
+        first.put_service("backtest", "http://a", lease_expires=100.0)
+        first.put_service("generic", "http://static")
+
+        first.renew_service_lease("http://a", 200.0)
+        first.renew_service_lease("http://static", 200.0)
+        services = second.get_services()
+        assert {(service["job_type"], service["service_url"], service["lease_expires"]) for service in services} == {
+            ("generic", "http://a", 200.0), ("backtest", "http://a", 200.0), ("generic", "http://static", None)
+        }
+
+
+class TestSchemaMigrations:
+    """Test upgrades of databases written by older versions."""
+
+    def test_new_databases_get_the_current_version(self, tmp_path):
+        backend = SQLiteStateBackend(str(tmp_path / "state.db"))
+        assert backend._db.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        backend.close()
+
+    @pytest.mark.parametrize("version", sorted(OLD_SERVICE_LAYOUTS))
+    def test_old_databases_are_upgraded(self, tmp_path, version):
+        path = str(tmp_path / "state.db")
+        db = sqlite3.connect(path)
+        for statement in OLD_SERVICE_LAYOUTS[version]:
+            db.execute(statement)
+        if version > 1:
+            db.execute(f"PRAGMA user_version = {version}")
+        db.commit()
+        db.close()
+
+        backend = SQLiteStateBackend(path)
+        assert registrations(backend) == [("generic", "http://a", "sync")]
+        backend.put_service("backtest", "http://b", "poll")
+        backend.close()
+
+        # Reopening an upgraded database leaves it as it is
+        backend = SQLiteStateBackend(path)
+        assert registrations(backend) == [("backtest", "http://b", "poll"), ("generic", "http://a", "sync")]
+        assert backend._db.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        backend.close()
@@ -0,0 +1,114 @@
+"""
+Tests for request body formats and compression.
+"""
+
+import gzip
+
+import pytest
+
+from mcp_core.utils import wire
+from mcp_core.utils.wire import (
+    BodyFormat, ContentEncoding, MIN_COMPRESS_BYTES, THREAD_THRESHOLD_BYTES,
+    accept_headers, check_available, decode_body, decode_body_async, encode_body, encode_body_async, serialize
+)
+
+
+SMALL = {"id": "job-1", "values": [1, 2.5, None, True], "name": "ünïcode"}
+LARGE = {"rows": [{"index": number, "label": f"row-{number}"} for number in range(20000)]}
+
+
+class TestJSONBodies:
+    """Test JSON bodies with and without gzip."""
+
+    def test_identity_round_trip(self):
+        body, headers = encode_body(SMALL)
+
+        assert headers == {"Content-Type": "application/json"}
+        assert decode_body(body, headers["Content-Type"], None) == SMALL
+
+    def test_gzip_round_trip(self):
+        body, headers = encode_body(LARGE, content_encoding=ContentEncoding.GZIP)
+
+        assert headers["Content-Encoding"] == "gzip"
+        assert decode_body(body, headers["Content-Type"], headers["Content-Encoding"]) == LARGE
+
+    def test_small_bodies_stay_uncompressed(self):
+        body, headers = encode_body(SMALL, content_encoding=ContentEncoding.GZIP)
+
+        assert len(body) < MIN_COMPRESS_BYTES
+        assert "Content-Encoding" not in headers
+
+    def test_missing_content_type_is_json(self):
+        body, _ = encode_body(SMALL)
+        assert decode_body(body, None, None) == SMALL
+        assert decode_body(body, "application/json; charset=utf-8", "identity") == SMALL
+
+    @pytest.mark.parametrize(
+        "body, content_encoding",
+        [
+            (b"not gzip", "gzip"), (gzip.compress(b"{}")[:-4], "gzip"), (b"{}", "br"), (b"{not json", None),
+            (b"\xff\xfe", None)
+        ]
+    )
+    def test_invalid_bodies(self, body, content_encoding):
+        with pytest.raises(ValueError):
+            decode_body(body, "application/json", content_encoding)
+
+    @pytest.mark.asyncio
+    async def test_async_round_trip(self):
+        body, headers = await encode_body_async(LARGE, content_encoding=ContentEncoding.GZIP)
+        assert await decode_body_async(body, headers["Content-Type"], headers["Content-Encoding"]) == LARGE
+
+        body, headers = await encode_body_async(LARGE)
+        assert len(body) > THREAD_THRESHOLD_BYTES
+        assert await decode_body_async(body, headers["Content-Type"], None) == LARGE
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("content_encoding", [ContentEncoding.GZIP, ContentEncoding.ZSTD])
+    async def test_decompressed_size_is_capped(self, content_encoding):
+        if content_encoding == ContentEncoding.ZSTD:
+            pytest.importorskip("zstandard")
+        body, headers = encode_body({"data": "x" * 1_000_000}, content_encoding=content_encoding)
+        decoded_size = len(serialize({"data": "x" * 1_000_000})[0])
+
+        assert len(body) < 10_000
+        with pytest.raises(ValueError):
+            await decode_body_async(body, headers["Content-Type"], content_encoding.value, max_size=decoded_size - 1)
+        assert await decode_body_async(body, headers["Content-Type"], content_encoding.value, max_size=decoded_size)
+
+    def test_multi_member_gzip(self):
+        body = gzip.compress(b'{"a": ') + gzip.compress(b"1}")
+        assert decode_body(body, "application/json", "gzip") == {"a": 1}
+
+
+class TestOptionalCodecs:
+    """Test MessagePack and zstd, which need optional packages."""
+
+    def test_msgpack_round_trip(self):
+        pytest.importorskip("msgpack")
+        body, headers = encode_body(SMALL, body_format=BodyFormat.MSGPACK)
+
+        assert headers["Content-Type"] == "application/msgpack"
+        assert decode_body(body, headers["Content-Type"], None) == SMALL
+
+    def test_zstd_round_trip(self):
+        pytest.importorskip("zstandard")
+        body, headers = encode_body(LARGE, content_encoding=ContentEncoding.ZSTD)
+
+        assert headers["Content-Encoding"] == "zstd"
+        assert decode_body(body, headers["Content-Type"], "zstd") == LARGE
+
+    def test_missing_packages(self, monkeypatch):
+        monkeypatch.setattr(wire, "msgpack", None)
+        monkeypatch.setattr(wire, "zstandard", None)
+
+        with pytest.raises(ValueError):
+            check_available(BodyFormat.MSGPACK, ContentEncoding.IDENTITY)
+        with pytest.raises(ValueError):
+            check_available(BodyFormat.JSON, ContentEncoding.ZSTD)
+        check_available(BodyFormat.JSON, ContentEncoding.GZIP)
+        with pytest.raises(ValueError):
+            decode_body(b"\x80", "application/msgpack", None)
+        with pytest.raises(ValueError):
+            decode_body(b"", "application/json", "zstd")
+        assert accept_headers() == {"Accept": "application/json", "Accept-Encoding": "gzip, identity"}
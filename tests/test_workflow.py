@@ -0,0 +1,120 @@
+"""
+Tests for workflow dependency tracking.
+"""
+
+import pytest
+
+from mcp_core.jobs.job_schema import JobStatus, JobType
+from mcp_core.jobs.workflow import WorkflowRun
+from mcp_core.jobs.workflow_schema import (
+    WorkflowInput, WorkflowNode, WorkflowNodeStatus, WorkflowStatus, WorkflowSubmission
+)
+
+
+def node(node_id: str, *depends_on: str, inputs=()):
+    return WorkflowNode(
+        id=node_id,
+        type=JobType.GENERIC,
+        depends_on=list(depends_on),
+        inputs=[WorkflowInput(node=upstream) for upstream in inputs]
+    )
+
+
+def make_run(*nodes: WorkflowNode, fail_fast: bool = False) -> WorkflowRun:
+    return WorkflowRun(WorkflowSubmission(nodes=list(nodes), fail_fast=fail_fast))
+
+
+def submit(run: WorkflowRun, *node_ids: str) -> None:
+    for node_id in node_ids:
+        run.node_submitted(node_id, f"job-{node_id}")
+
+
+class TestWorkflowValidation:
+    """Test rejection of malformed graphs."""
+
+    def test_cycle(self):
+        with pytest.raises(ValueError, match="cycle"):
+            make_run(node("a", "c"), node("b", "a"), node("c", "b"))
+
+    def test_cycle_through_inputs(self):
+        with pytest.raises(ValueError, match="cycle"):
+            make_run(node("a", inputs=["b"]), node("b", "a"))
+
+    def test_self_dependency(self):
+        with pytest.raises(ValueError, match="itself"):
+            make_run(node("a", "a"))
+
+    def test_unknown_dependency(self):
+        with pytest.raises(ValueError, match="unknown"):
+            make_run(node("a", "missing"))
+
+    def test_duplicate_node(self):
+        with pytest.raises(ValueError, match="Duplicate"):
+            make_run(node("a"), node("a"))
+
+
+class TestWorkflowRun:
+    """Test readiness, skipping and completion."""
+
+    def test_diamond(self):
+        run = make_run(node("a"), node("b", "a"), node("c", inputs=["a"]), node("d", "b", "c"))
+        assert run.ready_nodes() == ["a"]
+        submit(run, "a")
+
+        assert sorted(run.node_finished("a", JobStatus.COMPLETED)) == ["b", "c"]
+        submit(run, "b", "c")
+        assert run.node_finished("b", JobStatus.COMPLETED) == []
+        assert run.node_finished("c", JobStatus.COMPLETED) == ["d"]
+        submit(run, "d")
+        run.node_finished("d", JobStatus.COMPLETED)
+
+        assert run.finished
+        assert run.status == WorkflowStatus.COMPLETED
+        assert run.to_response().progress == {"completed": 4}
+
+    def test_failure_skips_downstream_only(self):
+        run = make_run(node("a"), node("b", "a"), node("c", "b"), node("x"), node("y", "x"))
+        submit(run, "a", "x")
+
+        assert run.node_finished("a", JobStatus.FAILED, "boom") == []
+        assert run.node_status["b"] == WorkflowNodeStatus.SKIPPED
+        assert run.node_status["c"] == WorkflowNodeStatus.SKIPPED
+        assert "a" in run.errors["c"]
+        assert not run.finished
+
+        # The independent branch keeps running
+        assert run.node_finished("x", JobStatus.COMPLETED) == ["y"]
+        submit(run, "y")
+        run.node_finished("y", JobStatus.COMPLETED)
+        assert run.status == WorkflowStatus.FAILED
+        assert run.errors["a"] == "boom"
+
+    def test_duplicate_outcome_is_ignored(self):
+        run = make_run(node("a"), node("b", "a"))
+        submit(run, "a")
+        assert run.node_finished("a", JobStatus.COMPLETED) == ["b"]
+        assert run.node_finished("a", JobStatus.COMPLETED) == []
+        assert run.waiting["b"] == 0
+
+    def test_fail_fast_cancel(self):
+        run = make_run(node("a"), node("b"), node("c", "a"), node("d", "b"), fail_fast=True)
+        submit(run, "a", "b")
+
+        run.node_finished("a", JobStatus.FAILED)
+        assert run.fail_fast and not run.finished
+        assert run.cancel(WorkflowStatus.FAILED) == ["job-b"]
+        assert run.node_status["d"] == WorkflowNodeStatus.SKIPPED
+
+        # The cancelled job reports back and settles the workflow
+        run.node_finished("b", JobStatus.CANCELLED)
+        assert run.finished
+        assert run.status == WorkflowStatus.FAILED
+        assert run.to_response().progress == {"failed": 1, "cancelled": 1, "skipped": 2}
+
+    def test_cancel(self):
+        run = make_run(node("a"), node("b", "a"))
+        submit(run, "a")
+
+        assert run.cancel() == ["job-a"]
+        run.node_finished("a", JobStatus.CANCELLED)
+        assert run.status == WorkflowStatus.CANCELLED